@@ -139,18 +139,12 @@ def lista_ingresos(request):
     # Alquileres a cobrar del mes (pendientes): aparecen acá para
     # poder cobrarlos. El cobro cae en Ingresos Personales.
     # ----------------------------------------------------------
-    from cuentas_internas.models import Alquiler
+    from cuentas_internas.services import pendientes_de_cobro
     alquileres_a_cobrar = []
     total_alq_cobrar = Decimal("0")
     if filtro in ("pendientes", "todos"):
-        for alq in Alquiler.objects.filter(activo=True):
-            if alq.pagos.filter(periodo_mes=mes, periodo_anio=anio).exists():
-                continue
-            for f in alq.cronograma():
-                if f["mes"] == mes and f["anio"] == anio:
-                    alquileres_a_cobrar.append({"alquiler": alq, "monto": f["monto"]})
-                    total_alq_cobrar += f["monto"] or Decimal("0")
-                    break
+        alquileres_a_cobrar = pendientes_de_cobro(anio, mes)
+        total_alq_cobrar = sum((f["monto"] or Decimal("0") for f in alquileres_a_cobrar), Decimal("0"))
 
     return render(request, "agenda_ingresos/lista.html", {
         "ingresos": qs,
@@ -8,8 +8,12 @@ from django.db import transaction
 from django.db.models import Sum
 from django.urls import reverse
 
+from auditoria.signals import registrar_lote
+from gastos_mensuales import recurrencia
+from gastos_mensuales import resumenes as gastos_resumenes
 from gastos_mensuales.models import GastoMensual, CategoriaGasto
 from gastos_personales.models import GastoPersonal
+from inicio import dashboard
 
 from .models import PagoFuturo
 from .forms import PagoFuturoForm, MarcarPagadoForm
@@ -45,7 +49,13 @@ def _sync_destino(pago, default_user):
     anio = fecha_ref.year
 
     if pago.destino == PagoFuturo.DESTINO_CONTROL_GASTOS:
-        if pago.gasto_mensual_id and GastoMensual.objects.filter(pk=pago.gasto_mensual_id).exists():
+        previo = None
+        if pago.gasto_mensual_id:
+            previo = (
+                GastoMensual.objects.filter(pk=pago.gasto_mensual_id)
+                .values_list("anio", "mes").first()
+            )
+        if previo:
             GastoMensual.objects.filter(pk=pago.gasto_mensual_id).update(
                 categoria=pago.categoria,
                 descripcion=pago.descripcion,
@@ -55,6 +65,8 @@ def _sync_destino(pago, default_user):
                 fecha_pago=pago.fecha_pago,
                 observaciones=pago.observaciones or "",
             )
+            # update() no pasa por los signals: rehacer los resúmenes a mano
+            gastos_resumenes.recalcular({previo, (anio, mes)})
         else:
             gm = GastoMensual.objects.create(
                 categoria=pago.categoria,
@@ -117,42 +129,127 @@ def _borrar_destino(pago):
     pago.save(update_fields=["gasto_mensual_id", "gasto_personal_id"])
 
 
+# Clave con la que la copia mensual detecta pagos ya agendados. No es única
+# en la base: dos pagos del mismo concepto pueden vencer el mismo día.
+CLAVE_RECURRENCIA = ("descripcion", "destino", "fecha_vencimiento")
+
+
+def _plan_copias(pagos, anio, mes, meses, usuario, monto=None, solo_futuro=False):
+    """
+    Plan de copias de `pagos` a `meses` meses consecutivos desde (anio, mes),
+    con una sola query para detectar los que ya están agendados. Respeta la
+    fecha de término de los recurrentes. `monto=None` copia el monto del
+    origen; `solo_futuro` descarta fechas ya vencidas.
+    """
+    hoy = date.today()
+
+    def construir(p, a, m):
+        fecha = recurrencia.fecha_en_mes(p.fecha_vencimiento, a, m)
+        if solo_futuro and fecha < hoy:
+            return None
+        if p.recurrente_hasta and fecha > p.recurrente_hasta:
+            return None
+        return PagoFuturo(
+            descripcion=p.descripcion,
+            monto=p.monto if monto is None else monto,
+            fecha_vencimiento=fecha,
+            categoria_id=p.categoria_id,
+            destino=p.destino,
+            es_recurrente_mensual=p.es_recurrente_mensual,
+            recurrente_hasta=p.recurrente_hasta,
+            observaciones=p.observaciones,
+            creado_por=usuario,
+        )
+
+    return recurrencia.planificar(
+        pagos, recurrencia.meses_desde(anio, mes, meses), construir,
+        PagoFuturo.objects.all(), CLAVE_RECURRENCIA,
+    )
+
+
+def _insertar_copias(plan):
+    """Inserta las copias nuevas del plan en un solo INSERT (vuelven con pk)."""
+    creados = recurrencia.insertar(PagoFuturo, plan)
+    if creados:
+        # bulk_create no pasa por los signals que invalidan el dashboard
+        dashboard.invalidar()
+    return creados
+
+
+def _sync_destinos_lote(pagos, default_user):
+    """
+    Versión en lote de `_sync_destino` para pagos RECIÉN creados (sin
+    registro destino todavía): un `bulk_create` por módulo destino y un
+    `bulk_update` para guardar los ids en los PagoFuturo.
+    Los pagos sin categoría se omiten (igual que en `_sync_destino`).
+    """
+    gastos, personales = [], []
+    for pago in pagos:
+        if not pago.categoria_id:
+            continue
+        fecha_ref = pago.fecha_pago or pago.fecha_vencimiento
+        comunes = dict(
+            categoria_id=pago.categoria_id,
+            descripcion=pago.descripcion,
+            monto=pago.monto,
+            mes=fecha_ref.month, anio=fecha_ref.year,
+            pagado=pago.pagado,
+            fecha_pago=pago.fecha_pago,
+            observaciones=pago.observaciones or "",
+        )
+        if pago.destino == PagoFuturo.DESTINO_CONTROL_GASTOS:
+            gastos.append((pago, GastoMensual(
+                unidad="ambas", creado_por=pago.creado_por or default_user, **comunes
+            )))
+        elif pago.destino == PagoFuturo.DESTINO_GASTOS_PERSONALES:
+            personales.append((pago, GastoPersonal(
+                usuario=pago.creado_por or pago.pagado_por or default_user, **comunes
+            )))
+
+    if gastos:
+        GastoMensual.objects.bulk_create([g for _, g in gastos])
+        gastos_resumenes.recalcular({(g.anio, g.mes) for _, g in gastos})
+        for pago, g in gastos:
+            pago.gasto_mensual_id = g.id
+        registrar_lote(
+            "crear", GastoMensual, [g for _, g in gastos],
+            f"Creó {len(gastos)} gasto(s) desde la Agenda de Pagos",
+        )
+    if personales:
+        GastoPersonal.objects.bulk_create([g for _, g in personales])
+        for pago, g in personales:
+            pago.gasto_personal_id = g.id
+
+    actualizados = [p for p, _ in gastos + personales]
+    if actualizados:
+        PagoFuturo.objects.bulk_update(actualizados, ["gasto_mensual_id", "gasto_personal_id"])
+    return len(actualizados)
+
+
 def _crear_proximo_mes(pago, request_user):
     """
     Crea el pago del mes siguiente (misma descripción, +1 mes) si todavía
     no existe uno con la misma descripción/destino/fecha. Devuelve el
     nuevo PagoFuturo o None si no se creó.
     """
-    next_fecha = pago.proxima_fecha_mensual
-    # No generar meses que ya quedaron vencidos (evita encadenar placeholders
-    # en $0 cuando se paga un mes atrasado). Solo se agenda a futuro.
-    if next_fecha < date.today():
-        return None
-    # Respeta la fecha de término del recurrente (ej: último mes de un crédito).
-    if pago.recurrente_hasta and next_fecha > pago.recurrente_hasta:
-        return None
-    if PagoFuturo.objects.filter(
-        descripcion=pago.descripcion,
-        destino=pago.destino,
-        fecha_vencimiento=next_fecha,
-    ).exists():
-        return None
-    nuevo = PagoFuturo.objects.create(
-        descripcion=pago.descripcion,
-        monto=0,  # se completa cuando se pague
-        fecha_vencimiento=next_fecha,
-        categoria=pago.categoria,
-        destino=pago.destino,
-        es_recurrente_mensual=pago.es_recurrente_mensual,
-        recurrente_hasta=pago.recurrente_hasta,
-        observaciones=pago.observaciones,
-        creado_por=request_user,
+    f = pago.fecha_vencimiento
+    anio, mes = recurrencia.sumar_meses(f.year, f.month, 1)
+    # - monto=0: se completa cuando se pague.
+    # - solo_futuro: no generar meses que ya quedaron vencidos (evita
+    #   encadenar placeholders en $0 cuando se paga un mes atrasado).
+    # - respeta la fecha de término del recurrente (ej: fin de un crédito).
+    plan = _plan_copias([pago], anio, mes, 1, request_user, monto=0, solo_futuro=True)
+    creados = _insertar_copias(plan)
+    # bulk_create no pasa por los signals
+    registrar_lote(
+        "crear", PagoFuturo, creados,
+        f"Agendó el pago del mes siguiente de «{pago.descripcion}»",
     )
     # No sincronizamos el destino todavía: el pago del mes siguiente nace en $0
     # y crearía una fila fantasma en $0 en Gastos Personales/Concesionario. El
     # reflejo se crea cuando se le carga monto (al editar o al pagar, que llaman
     # a _sync_destino).
-    return nuevo
+    return creados[0] if creados else None
 
 
 def _next_month_date(fecha):
@@ -445,43 +542,49 @@ def copiar_mes_anterior(request):
     elif tipo_sel == "variable":
         pagos_origen = pagos_origen.filter(categoria__es_fijo=False)
 
-    # Cuáles ya existen en el mes destino (para mostrar y excluir)
-    last_day = calendar.monthrange(anio, mes)[1]
+    # Cantidad de meses a generar hacia adelante (el destino y los siguientes)
+    try:
+        meses = int(request.GET.get("meses", request.POST.get("meses", 1)))
+    except ValueError:
+        meses = 1
+    meses = min(max(meses, 1), 12)
+
+    # Todas las filas destino se calculan en memoria y los que ya existen
+    # se detectan con una sola query (para mostrar y excluir).
+    pagos_origen = list(pagos_origen)
+    plan = _plan_copias(pagos_origen, anio, mes, meses, request.user)
+    fechas_por_pago = {}
+    for item in plan:
+        fechas_por_pago.setdefault(item["origen"].pk, []).append(item)
     pagos_info = []
     for p in pagos_origen:
-        nueva_fecha = date(anio, mes, min(p.fecha_vencimiento.day, last_day))
-        ya_existe = PagoFuturo.objects.filter(
-            descripcion=p.descripcion,
-            destino=p.destino,
-            fecha_vencimiento=nueva_fecha,
-        ).exists()
-        pagos_info.append({"pago": p, "nueva_fecha": nueva_fecha, "ya_existe": ya_existe})
+        items = fechas_por_pago.get(p.pk, [])
+        pagos_info.append({
+            "pago": p,
+            "nueva_fecha": items[0]["nuevo"].fecha_vencimiento if items else None,
+            "fechas": [{"fecha": i["nuevo"].fecha_vencimiento, "ya_existe": i["ya_existe"]} for i in items],
+            "ya_existe": all(i["ya_existe"] for i in items),
+            "finalizado": not items,
+        })
 
     if request.method == "POST":
         seleccionados = set(request.POST.getlist("pagos_seleccionados"))
-        creados = 0
         with transaction.atomic():
-            for info in pagos_info:
-                p = info["pago"]
-                if str(p.pk) not in seleccionados:
-                    continue
-                if info["ya_existe"]:
-                    continue
-                nuevo = PagoFuturo.objects.create(
-                    descripcion=p.descripcion,
-                    monto=p.monto,
-                    fecha_vencimiento=info["nueva_fecha"],
-                    categoria=p.categoria,
-                    destino=p.destino,
-                    es_recurrente_mensual=p.es_recurrente_mensual,
-                    recurrente_hasta=p.recurrente_hasta,
-                    observaciones=p.observaciones,
-                    creado_por=request.user,
-                )
-                _sync_destino(nuevo, request.user)
-                creados += 1
+            nuevos = _insertar_copias(
+                [i for i in plan if str(i["origen"].pk) in seleccionados]
+            )
+            registrar_lote(
+                "crear", PagoFuturo, nuevos,
+                f"Copió {len(nuevos)} pago(s) de {mes_origen}/{anio_origen} a la Agenda de Pagos",
+            )
+            _sync_destinos_lote(nuevos, request.user)
+        creados = len(nuevos)
         if creados > 0:
-            messages.success(request, f"Se copiaron {creados} pago{'s' if creados != 1 else ''} al {MESES[mes]} {anio}.")
+            destino_txt = f"{MESES[mes]} {anio}"
+            if meses > 1:
+                anio_fin, mes_fin = recurrencia.sumar_meses(anio, mes, meses - 1)
+                destino_txt += f" – {MESES[mes_fin]} {anio_fin}"
+            messages.success(request, f"Se copiaron {creados} pago{'s' if creados != 1 else ''} al {destino_txt}.")
         else:
             messages.info(request, "No se copió ningún pago.")
         return redirect(f"{reverse('agenda_pagos:lista')}?mes={mes}&anio={anio}")
@@ -490,6 +593,8 @@ def copiar_mes_anterior(request):
         "pagos_info": pagos_info,
         "mes_destino": mes,
         "anio_destino": anio,
+        "meses": meses,
+        "meses_opciones": [1, 2, 3, 6, 12],
         "mes_origen": mes_origen,
         "anio_origen": anio_origen,
         "mes_destino_nombre": MESES[mes],
@@ -0,0 +1,124 @@
+"""
+Representación compacta de la asistencia: un string con UN carácter por
+día (365/366 para un año, 28-31 para un mes). La posición i es el día i
+desde el inicio del período y el carácter es el código del estado.
+
+Se arma con una sola query de (empleado, fecha, estado) y de ahí salen el
+calendario, el resumen por estado, el JSON de la API y el PDF anual.
+"""
+import calendar
+import hashlib
+from collections import Counter
+from datetime import date, timedelta
+
+from .models import AsistenciaDiaria
+
+
+SIN_CARGA = "-"
+
+# estado -> código de 1 carácter (estable: lo usa el front para pintar)
+CODIGOS = {
+    "presente": "P",
+    "falta_justificada": "J",
+    "falta_injustificada": "F",
+    "permiso": "M",
+    "vacaciones": "V",
+    "estudio": "E",
+}
+ESTADOS_POR_CODIGO = {c: e for e, c in CODIGOS.items()}
+
+FALTAS = ("falta_justificada", "falta_injustificada")
+
+
+def _periodo(anio, mes=None):
+    if mes:
+        return date(anio, mes, 1), calendar.monthrange(anio, mes)[1]
+    return date(anio, 1, 1), 366 if calendar.isleap(anio) else 365
+
+
+def grillas(empleado_ids, anio, mes=None):
+    """
+    {empleado_id: grilla} del año (o del mes) para varios empleados, con
+    UNA sola query sobre AsistenciaDiaria.
+    """
+    inicio, dias = _periodo(anio, mes)
+    fin = inicio + timedelta(days=dias - 1)
+    celdas = {eid: [SIN_CARGA] * dias for eid in empleado_ids}
+    filas = (
+        AsistenciaDiaria.objects
+        .filter(empleado_id__in=list(celdas), fecha__range=(inicio, fin))
+        .order_by()
+        .values_list("empleado_id", "fecha", "estado")
+    )
+    for eid, fecha, estado in filas:
+        celdas[eid][(fecha - inicio).days] = CODIGOS.get(estado, SIN_CARGA)
+    return {eid: "".join(c) for eid, c in celdas.items()}
+
+
+def grilla_anual(empleado_id, anio):
+    """Grilla de un año para un empleado (1 query)."""
+    return grillas([empleado_id], anio)[empleado_id]
+
+
+def resumen(grilla):
+    """{estado: cantidad de días} a partir de la grilla (sin query)."""
+    return {
+        ESTADOS_POR_CODIGO[c]: n
+        for c, n in Counter(grilla).items() if c in ESTADOS_POR_CODIGO
+    }
+
+
+def dias_con_estado(grilla, anio, estados, mes=None):
+    """Lista de (fecha, estado) de la grilla cuyo estado está en `estados`."""
+    inicio, _ = _periodo(anio, mes)
+    codigos = {CODIGOS[e] for e in estados}
+    return [
+        (inicio + timedelta(days=i), ESTADOS_POR_CODIGO[c])
+        for i, c in enumerate(grilla) if c in codigos
+    ]
+
+
+def run_length(grilla):
+    """Compresión por tramos: [[código, cantidad], ...] (ej: vacaciones)."""
+    tramos = []
+    for c in grilla:
+        if tramos and tramos[-1][0] == c:
+            tramos[-1][1] += 1
+        else:
+            tramos.append([c, 1])
+    return tramos
+
+
+def etag(*grillas_):
+    """ETag fuerte derivado del contenido de una o más grillas."""
+    h = hashlib.md5(usedforsecurity=False)
+    for g in grillas_:
+        h.update(g.encode())
+        h.update(b"|")
+    return f'"{h.hexdigest()}"'
+
+
+def marcar_rango(empleado_ids, desde, hasta, estado, observaciones="", solo_habiles=False):
+    """
+    Marca `estado` en todos los días de [desde, hasta] para los empleados
+    dados (vacaciones, semanas completas...). Upsert en un único INSERT:
+    los días ya cargados se pisan con el nuevo estado.
+    Devuelve la cantidad de días escritos.
+    """
+    filas = []
+    dia = desde
+    while dia <= hasta:
+        if not (solo_habiles and dia.weekday() >= 5):
+            for eid in empleado_ids:
+                filas.append(AsistenciaDiaria(
+                    empleado_id=eid, fecha=dia, estado=estado, observaciones=observaciones,
+                ))
+        dia += timedelta(days=1)
+    if filas:
+        AsistenciaDiaria.objects.bulk_create(
+            filas,
+            update_conflicts=True,
+            unique_fields=["empleado", "fecha"],
+            update_fields=["estado", "observaciones"],
+        )
+    return len(filas)
@@ -1,3 +1,43 @@
+"""
+Tests de la grilla compacta de asistencia y del marcado por rango.
+"""
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from . import grilla
+from .models import AsistenciaDiaria, Empleado
+
+
+class GrillaTests(TestCase):
+    def setUp(self):
+        self.emp = Empleado.objects.create(nombre="Ana")
+        self.otro = Empleado.objects.create(nombre="Beto")
+
+    def test_un_caracter_por_dia(self):
+        AsistenciaDiaria.objects.create(empleado=self.emp, fecha=date(2024, 1, 2), estado="presente")
+        AsistenciaDiaria.objects.create(empleado=self.emp, fecha=date(2024, 12, 31), estado="falta_injustificada")
+        with self.assertNumQueries(1):
+            dias = grilla.grilla_anual(self.emp.id, 2024)
+        self.assertEqual(len(dias), 366)
+        self.assertEqual(dias[:3], "-P-")
+        self.assertEqual(dias[-1], "F")
+        self.assertEqual(grilla.resumen(dias), {"presente": 1, "falta_injustificada": 1})
+        self.assertEqual(
+            grilla.dias_con_estado(dias, 2024, grilla.FALTAS),
+            [(date(2024, 12, 31), "falta_injustificada")],
+        )
+
+    def test_marcar_rango_pisa_dias_existentes(self):
+        AsistenciaDiaria.objects.create(empleado=self.emp, fecha=date(2026, 1, 5), estado="presente")
+        # Lunes 5 a domingo 11 de enero, solo hábiles, para los dos empleados
+        n = grilla.marcar_rango(
+            [self.emp.id, self.otro.id], date(2026, 1, 5), date(2026, 1, 11), "vacaciones",
+            solo_habiles=True,
+        )
+        self.assertEqual(n, 10)
+        with self.assertNumQueries(1):
+            mes = grilla.grillas([self.emp.id, self.otro.id], 2026, 1)
+        self.assertEqual(mes[self.emp.id][4:11], "VVVVV--")
+        self.assertEqual(mes[self.otro.id], mes[self.emp.id])
+        self.assertEqual(grilla.run_length(mes[self.emp.id])[:2], [["-", 4], ["V", 5]])
@@ -37,6 +37,33 @@ urlpatterns = [
         name="marcar_asistencia"
     ),
 
+    path(
+        "marcar-rango/",
+        views.marcar_rango,
+        name="marcar_rango"
+    ),
+
+    # ===============================
+    # PLANILLA MENSUAL / API COMPACTA
+    # ===============================
+    path(
+        "mes/",
+        views.planilla_mensual,
+        name="planilla_mensual"
+    ),
+
+    path(
+        "api/empleado/<int:empleado_id>/<int:anio>/",
+        views.api_grilla_anual,
+        name="api_grilla_anual"
+    ),
+
+    path(
+        "api/mes/<int:anio>/<int:mes>/",
+        views.api_grilla_mes,
+        name="api_grilla_mes"
+    ),
+
     # ===============================
     # PDF – FALTAS ANUALES
     # ===============================
@@ -1,9 +1,11 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse, HttpResponse
-from django.db import models
+from django.utils.cache import get_conditional_response
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.utils.dateparse import parse_date
+import calendar
 from datetime import date, timedelta
 
 # PDF
@@ -12,10 +14,18 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 
+from . import grilla as grilla_asistencia
 from .models import Empleado, AsistenciaDiaria
 from .forms import EmpleadoForm
 
 
+MESES = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+         "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+# Tope de días por marcado masivo (un año, con margen de bisiesto)
+MAX_DIAS_RANGO = 366
+
+
 # ==========================================================
 # LISTA DE EMPLEADOS
 # ==========================================================
@@ -69,54 +79,10 @@ def calendario_empleado(request, empleado_id):
     except (ValueError, TypeError):
         anio = hoy.year
 
-    asistencias = AsistenciaDiaria.objects.filter(
-        empleado=empleado,
-        fecha__year=anio
-    )
-
-    asistencia_por_fecha = {a.fecha: a.estado for a in asistencias}
-
-    colores = {
-        "presente": "#28a745",
-        "falta_justificada": "#ffc107",
-        "falta_injustificada": "#dc3545",
-        "permiso": "#fd7e14",
-        "vacaciones": "#0dcaf0",
-        "estudio": "#6f42c1",
-        None: "#e9ecef",
-    }
-
-    calendario = {}
-
-    for mes in range(1, 13):
-        dias_mes = []
-        primer_dia = date(anio, mes, 1)
-
-        if mes == 12:
-            ultimo_dia = date(anio, 12, 31)
-        else:
-            ultimo_dia = date(anio, mes + 1, 1) - timedelta(days=1)
-
-        dia_actual = primer_dia
-        while dia_actual <= ultimo_dia:
-            estado = asistencia_por_fecha.get(dia_actual)
-            dias_mes.append({
-                "fecha": dia_actual,
-                "estado": estado,
-                "color": colores.get(estado),
-            })
-            dia_actual += timedelta(days=1)
-
-        calendario[mes] = dias_mes
-
-    resumen_qs = (
-        AsistenciaDiaria.objects
-        .filter(empleado=empleado, fecha__year=anio)
-        .values("estado")
-        .annotate(total=models.Count("id"))
-    )
-
-    resumen = {r["estado"]: r["total"] for r in resumen_qs}
+    # Una sola query: la grilla del año (1 carácter por día). El calendario
+    # se pinta en el navegador a partir de ella y el resumen sale de contarla.
+    dias = grilla_asistencia.grilla_anual(empleado.id, anio)
+    resumen = grilla_asistencia.resumen(dias)
 
     return render(
         request,
@@ -124,7 +90,8 @@ def calendario_empleado(request, empleado_id):
         {
             "page_title": f"Asistencia – {empleado.nombre}",
             "empleado": empleado,
-            "calendario": calendario,
+            "grilla": dias,
+            "codigos": grilla_asistencia.CODIGOS,
             "anio": anio,
             "resumen": resumen,
         }
@@ -185,6 +152,150 @@ def marcar_asistencia(request):
     return JsonResponse({"ok": False}, status=400)
 
 
+# ==========================================================
+# MARCADO MASIVO POR RANGO (vacaciones, semanas completas)
+# ==========================================================
+@login_required
+@require_POST
+def marcar_rango(request):
+    """
+    Marca un estado en todos los días de un rango para uno o varios
+    empleados, en un único upsert. Campos: empleado_id (repetible), desde,
+    hasta, estado, observaciones, solo_habiles ("1" = saltea sáb/dom).
+    """
+    empleado_ids = [e for e in request.POST.getlist("empleado_id") if e.isdigit()]
+    if not empleado_ids:
+        return JsonResponse({"ok": False, "error": "ID de empleado requerido"}, status=400)
+
+    desde = parse_date(request.POST.get("desde") or "")
+    hasta = parse_date(request.POST.get("hasta") or "")
+    if not desde or not hasta or hasta < desde:
+        return JsonResponse({"ok": False, "error": "Rango de fechas inválido"}, status=400)
+    if (hasta - desde).days >= MAX_DIAS_RANGO:
+        return JsonResponse({"ok": False, "error": "El rango no puede superar un año"}, status=400)
+
+    estado = request.POST.get("estado")
+    if estado not in dict(AsistenciaDiaria.ESTADOS):
+        return JsonResponse({"ok": False, "error": "Estado inválido"}, status=400)
+
+    ids = list(Empleado.objects.filter(id__in=empleado_ids).values_list("id", flat=True))
+    if len(ids) != len(set(empleado_ids)):
+        return JsonResponse({"ok": False, "error": "Empleado inexistente"}, status=404)
+
+    dias = grilla_asistencia.marcar_rango(
+        ids, desde, hasta, estado,
+        observaciones=request.POST.get("observaciones", ""),
+        solo_habiles=request.POST.get("solo_habiles") == "1",
+    )
+    return JsonResponse({"ok": True, "dias": dias, "estado": estado})
+
+
+# ==========================================================
+# API COMPACTA (JSON con ETag)
+# ==========================================================
+def _json_con_etag(request, data, etag):
+    """
+    Devuelve 304 si el navegador ya tiene esta versión; si no, el JSON con
+    su ETag. `no-cache` obliga a revalidar siempre (nunca datos viejos),
+    pero permite reusar la copia local cuando no cambió nada.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(data)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@login_required
+def api_grilla_anual(request, empleado_id, anio):
+    """Año de un empleado: un carácter por día + códigos + resumen."""
+    empleado = get_object_or_404(Empleado, id=empleado_id)
+    dias = grilla_asistencia.grilla_anual(empleado.id, anio)
+    data = {
+        "empleado": empleado.id,
+        "anio": anio,
+        "inicio": f"{anio}-01-01",
+        "dias": dias,
+        "codigos": grilla_asistencia.CODIGOS,
+        "resumen": grilla_asistencia.resumen(dias),
+    }
+    if request.GET.get("formato") == "rle":
+        data["tramos"] = grilla_asistencia.run_length(dias)
+    return _json_con_etag(request, data, grilla_asistencia.etag(str(empleado.id), dias))
+
+
+def _mes_de_request(request):
+    hoy = date.today()
+    try:
+        anio = int(request.GET.get("anio", hoy.year))
+        mes = int(request.GET.get("mes", hoy.month))
+    except (ValueError, TypeError):
+        anio, mes = hoy.year, hoy.month
+    if not (1 <= mes <= 12) or anio < 2000:
+        anio, mes = hoy.year, hoy.month
+    return anio, mes
+
+
+@login_required
+def api_grilla_mes(request, anio, mes):
+    """Mes de todos los empleados activos (1 query de asistencia)."""
+    if not 1 <= mes <= 12:
+        return JsonResponse({"ok": False, "error": "Mes inválido"}, status=400)
+    empleados = list(Empleado.objects.filter(activo=True).values_list("id", "nombre"))
+    por_empleado = grilla_asistencia.grillas([e[0] for e in empleados], anio, mes)
+    data = {
+        "anio": anio,
+        "mes": mes,
+        "codigos": grilla_asistencia.CODIGOS,
+        "empleados": [
+            {"id": eid, "nombre": nombre, "dias": por_empleado[eid]}
+            for eid, nombre in empleados
+        ],
+    }
+    return _json_con_etag(
+        request, data,
+        grilla_asistencia.etag(*(f"{eid}:{por_empleado[eid]}" for eid, _ in empleados)),
+    )
+
+
+# ==========================================================
+# PLANILLA MENSUAL (todos los empleados)
+# ==========================================================
+@login_required
+def planilla_mensual(request):
+    anio, mes = _mes_de_request(request)
+    empleados = list(Empleado.objects.filter(activo=True))
+    por_empleado = grilla_asistencia.grillas([e.id for e in empleados], anio, mes)
+
+    filas = [
+        {
+            "empleado": e,
+            "dias": [grilla_asistencia.ESTADOS_POR_CODIGO.get(c) for c in por_empleado[e.id]],
+            "resumen": grilla_asistencia.resumen(por_empleado[e.id]),
+        }
+        for e in empleados
+    ]
+    anterior = date(anio, mes, 1) - timedelta(days=1)
+    siguiente = date(anio, mes, 28) + timedelta(days=4)
+
+    return render(
+        request,
+        "asistencia/planilla_mensual.html",
+        {
+            "page_title": "Asistencia mensual",
+            "filas": filas,
+            "anio": anio,
+            "mes": mes,
+            "mes_nombre": MESES[mes],
+            "numeros_dia": range(1, calendar.monthrange(anio, mes)[1] + 1),
+            "anterior": anterior,
+            "siguiente": siguiente,
+            "estados": AsistenciaDiaria.ESTADOS,
+        }
+    )
+
+
 # ==========================================================
 # PDF – REPORTE ANUAL DE ASISTENCIA POR EMPLEADO
 # ==========================================================
@@ -204,18 +315,11 @@ def pdf_faltas_anuales(request, empleado_id, anio):
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib import colors
 
-    # Todas las asistencias del año
-    asistencias = AsistenciaDiaria.objects.filter(
-        empleado=empleado,
-        fecha__year=anio,
-    ).order_by("fecha")
-
-    faltas = asistencias.filter(estado__in=["falta_injustificada", "falta_justificada"])
-
-    # Resumen
-    from django.db.models import Count
-    resumen_qs = asistencias.values("estado").annotate(total=Count("id"))
-    resumen = {r["estado"]: r["total"] for r in resumen_qs}
+    # Todo sale de la grilla del año (una sola query)
+    dias = grilla_asistencia.grilla_anual(empleado.id, anio)
+    faltas = grilla_asistencia.dias_con_estado(dias, anio, grilla_asistencia.FALTAS)
+    resumen = grilla_asistencia.resumen(dias)
+    etiquetas_estado = dict(AsistenciaDiaria.ESTADOS)
 
     response = HttpResponse(content_type="application/pdf")
     response["Content-Disposition"] = f'inline; filename="asistencia_{empleado.id}_{anio}.pdf"'
@@ -288,8 +392,8 @@ def pdf_faltas_anuales(request, empleado_id, anio):
     elements.append(Paragraph("Detalle de faltas", section_style))
 
     data = [["Fecha", "Tipo de falta"]]
-    for f in faltas:
-        data.append([f.fecha.strftime("%d/%m/%Y"), f.get_estado_display()])
+    for fecha, estado in faltas:
+        data.append([fecha.strftime("%d/%m/%Y"), etiquetas_estado[estado]])
 
     if len(data) == 1:
         elements.append(Paragraph("El empleado no registra faltas en este año.", normal))
@@ -312,7 +416,7 @@ def pdf_faltas_anuales(request, empleado_id, anio):
     pie_style = ParagraphStyle("pie", fontSize=8,
         textColor=colors.HexColor("#888888"), alignment=1)
     elements.append(Paragraph(
-        f"Total de faltas: <b>{faltas.count()}</b> &nbsp;|&nbsp; Registros totales: <b>{asistencias.count()}</b>",
+        f"Total de faltas: <b>{len(faltas)}</b> &nbsp;|&nbsp; Registros totales: <b>{sum(resumen.values())}</b>",
         pie_style
     ))
 
@@ -1,5 +1,7 @@
 import threading
 
+from django.conf import settings
+
 _thread_locals = threading.local()
 
 
@@ -12,14 +14,22 @@ def get_current_user():
     return getattr(req, "user", None) if req else None
 
 
+def ip_cliente(request):
+    """
+    IP del cliente. De X-Forwarded-For solo vale el salto que agregó el
+    último de los PROXIES_CONFIABLES (lo de antes lo escribe el cliente);
+    sin proxies o sin ese header, REMOTE_ADDR.
+    """
+    saltos = getattr(settings, "PROXIES_CONFIABLES", 1)
+    xff = [parte.strip() for parte in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if parte.strip()]
+    if saltos and len(xff) >= saltos:
+        return xff[-saltos]
+    return request.META.get("REMOTE_ADDR")
+
+
 def get_current_ip():
     req = get_current_request()
-    if not req:
-        return None
-    xff = req.META.get("HTTP_X_FORWARDED_FOR")
-    if xff:
-        return xff.split(",")[0].strip()
-    return req.META.get("REMOTE_ADDR")
+    return ip_cliente(req) if req else None
 
 
 class AuditoriaMiddleware:
@@ -53,8 +63,47 @@ class NoBrowserCacheMiddleware:
         response = self.get_response(request)
         if getattr(request, "user", None) and request.user.is_authenticated:
             content_type = response.get("Content-Type", "")
-            if "text/html" in content_type or "application/json" in content_type:
+            if "application/json" in content_type and response.has_header("ETag"):
+                # Respuestas con ETag (APIs compactas): se pueden guardar pero
+                # siempre se revalidan, así el navegador recibe un 304 barato.
+                response["Cache-Control"] = "private, no-cache"
+            elif "text/html" in content_type or "application/json" in content_type:
                 response["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
                 response["Pragma"] = "no-cache"
                 response["Expires"] = "0"
         return response
+
+
+class PerfiladorMiddleware:
+    """
+    Perfilador opt-in de requests (cantidad y tiempo de SQL, queries
+    repetidas, render de templates). Se activa:
+      - para admins, si PERFILADOR_ADMINS = True, o
+      - en cualquier request con el header `X-Perfilar: <PERFILADOR_TOKEN>`.
+    Las mediciones se ven en /auditoria/perfiles/.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _activo(self, request):
+        from django.conf import settings
+        token = getattr(settings, "PERFILADOR_TOKEN", "")
+        if token and request.headers.get("X-Perfilar") == token:
+            return True
+        if getattr(settings, "PERFILADOR_ADMINS", False):
+            from permisos.access import es_admin
+            return es_admin(getattr(request, "user", None))
+        return False
+
+    def __call__(self, request):
+        if not self._activo(request):
+            return self.get_response(request)
+
+        from . import perfilador
+        response, perfil = perfilador.perfilar(self.get_response, request)
+        try:
+            perfilador.guardar(request, response, perfil)
+        except Exception:
+            pass
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfilRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('vista', models.CharField(help_text='Nombre de la vista (url name) o ruta', max_length=200)),
+                ('ruta', models.CharField(max_length=300)),
+                ('metodo', models.CharField(max_length=10)),
+                ('status', models.PositiveSmallIntegerField()),
+                ('usuario_texto', models.CharField(blank=True, max_length=150)),
+                ('ms_total', models.FloatField()),
+                ('ms_sql', models.FloatField()),
+                ('ms_template', models.FloatField(default=0)),
+                ('queries', models.PositiveIntegerField()),
+                ('queries_duplicadas', models.PositiveIntegerField(default=0, help_text='Queries de más con la misma forma (posible N+1)')),
+                ('repetidas', models.JSONField(blank=True, default=list, help_text='Formas de query repetidas: [{sql, n, ms}, ...]')),
+            ],
+            options={
+                'verbose_name': 'Perfil de request',
+                'verbose_name_plural': 'Perfiles de requests',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['vista', '-fecha'], name='auditoria_p_vista_46b828_idx')],
+            },
+        ),
+    ]
@@ -134,3 +134,44 @@ class LogActividad(models.Model):
         except Exception:
             pass
         return {}
+
+
+# ============================================================
+# PERFILADOR DE REQUESTS (SQL / LATENCIA)
+# ============================================================
+class PerfilRequest(models.Model):
+    """
+    Una medición de un request perfilado (ver `PerfiladorMiddleware`).
+    Funciona como buffer circular: se conservan las últimas
+    `PERFILADOR_MAX_FILAS` filas y las más viejas se van borrando.
+    """
+
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+    vista = models.CharField(max_length=200, help_text="Nombre de la vista (url name) o ruta")
+    ruta = models.CharField(max_length=300)
+    metodo = models.CharField(max_length=10)
+    status = models.PositiveSmallIntegerField()
+    usuario_texto = models.CharField(max_length=150, blank=True)
+    ms_total = models.FloatField()
+    ms_sql = models.FloatField()
+    ms_template = models.FloatField(default=0)
+    queries = models.PositiveIntegerField()
+    queries_duplicadas = models.PositiveIntegerField(
+        default=0,
+        help_text="Queries de más con la misma forma (posible N+1)",
+    )
+    repetidas = models.JSONField(
+        default=list, blank=True,
+        help_text="Formas de query repetidas: [{sql, n, ms}, ...]",
+    )
+
+    class Meta:
+        ordering = ["-fecha"]
+        verbose_name = "Perfil de request"
+        verbose_name_plural = "Perfiles de requests"
+        indexes = [
+            models.Index(fields=["vista", "-fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y %H:%M} {self.metodo} {self.vista} {self.ms_total:.0f} ms / {self.queries} q"
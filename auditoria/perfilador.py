@@ -0,0 +1,142 @@
+"""
+Medición de un request: cantidad y tiempo de queries, formas de query
+repetidas (para detectar N+1) y tiempo de render de templates.
+
+Lo usa `auditoria.middleware.PerfiladorMiddleware`; los resultados van a
+`PerfilRequest`.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+_estado = threading.local()
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+def forma_sql(sql):
+    """
+    Forma normalizada de una query: sin literales y con las listas de IN
+    colapsadas, así `WHERE id = 3` y `WHERE id = 8` cuentan como la misma.
+    """
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_LISTA.sub("(...)", sql)
+    return _RE_ESPACIOS.sub(" ", sql).strip()
+
+
+class Perfil:
+    """Acumula las mediciones de un request."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.queries = 0
+        self.ms_sql = 0.0
+        self.ms_template = 0.0
+        self.en_template = False
+        self.por_forma = defaultdict(lambda: [0, 0.0])  # forma -> [n, ms]
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.queries += 1
+            self.ms_sql += ms
+            acumulado = self.por_forma[forma_sql(sql)]
+            acumulado[0] += 1
+            acumulado[1] += ms
+
+    def ms_total(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def duplicadas(self):
+        """Queries de más: por cada forma, todas menos la primera."""
+        return sum(n - 1 for n, _ in self.por_forma.values() if n > 1)
+
+    def repetidas(self, limite=5):
+        """Las formas más repetidas: [{"sql", "n", "ms"}, ...]."""
+        filas = [
+            {"sql": sql[:500], "n": n, "ms": round(ms, 1)}
+            for sql, (n, ms) in self.por_forma.items() if n > 1
+        ]
+        filas.sort(key=lambda f: (f["n"], f["ms"]), reverse=True)
+        return filas[:limite]
+
+
+def _instalar_medicion_templates():
+    """
+    Envuelve `Template.render` una sola vez para sumar el tiempo de render
+    del template de más afuera (los includes quedan dentro) cuando hay un
+    perfil activo en el thread. Sin perfil activo solo agrega un getattr.
+    """
+    from django.template.base import Template
+
+    if getattr(Template.render, "_perfilador", False):
+        return
+    original = Template.render
+
+    def render(self, context):
+        perfil = getattr(_estado, "perfil", None)
+        if perfil is None or perfil.en_template:
+            return original(self, context)
+        perfil.en_template = True
+        t0 = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            perfil.ms_template += (time.perf_counter() - t0) * 1000
+            perfil.en_template = False
+
+    render._perfilador = True
+    Template.render = render
+
+
+def perfilar(get_response, request):
+    """Ejecuta el request midiendo SQL y templates. Devuelve (response, perfil)."""
+    _instalar_medicion_templates()
+    perfil = Perfil()
+    _estado.perfil = perfil
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(perfil))
+            response = get_response(request)
+    finally:
+        _estado.perfil = None
+    return response, perfil
+
+
+def guardar(request, response, perfil):
+    """Graba la medición y recorta el buffer circular cada tanto."""
+    from .models import PerfilRequest
+
+    match = getattr(request, "resolver_match", None)
+    vista = (match.view_name if match else "") or request.path
+    user = getattr(request, "user", None)
+    fila = PerfilRequest.objects.create(
+        vista=vista[:200],
+        ruta=request.get_full_path()[:300],
+        metodo=request.method[:10],
+        status=response.status_code,
+        usuario_texto=user.username if user and user.is_authenticated else "",
+        ms_total=round(perfil.ms_total(), 1),
+        ms_sql=round(perfil.ms_sql, 1),
+        ms_template=round(perfil.ms_template, 1),
+        queries=perfil.queries,
+        queries_duplicadas=perfil.duplicadas(),
+        repetidas=perfil.repetidas(),
+    )
+    maximo = getattr(settings, "PERFILADOR_MAX_FILAS", 5000)
+    if fila.pk % 100 == 0:
+        PerfilRequest.objects.filter(pk__lte=fila.pk - maximo).delete()
+    return fila
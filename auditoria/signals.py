@@ -6,7 +6,7 @@ from django.db.models.signals import post_save, post_delete, pre_save
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.dispatch import receiver
 
-from .middleware import get_current_user, get_current_ip
+from .middleware import get_current_user, get_current_ip, ip_cliente
 from .models import LogActividad
 
 
@@ -202,6 +202,34 @@ def _registrar(accion, instance, datos_antes=None, datos_despues=None):
     )
 
 
+def registrar_lote(accion, model, objetos, descripcion=None):
+    """
+    Un solo log para una operación masiva. `bulk_create`/`bulk_update` no
+    disparan los signals de save, así que quien los usa sobre un modelo
+    auditado registra acá un resumen (cantidad + ids) en vez de N logs.
+    """
+    objetos = list(objetos)
+    if not objetos:
+        return None
+    nombre = model.__name__
+    verbose = str(model._meta.verbose_name_plural).capitalize()
+    ids = [o.pk for o in objetos if o.pk is not None]
+    if descripcion is None:
+        verbo = {"crear": "Creó", "editar": "Editó", "eliminar": "Eliminó"}.get(accion, accion)
+        descripcion = f"{verbo} {len(objetos)} registro(s) de {verbose} en lote"
+    try:
+        return LogActividad.registrar(
+            usuario=get_current_user(),
+            accion=accion,
+            modelo=nombre,
+            descripcion=descripcion[:500],
+            datos_despues={"cantidad": len(objetos), "ids": ids},
+            ip=get_current_ip(),
+        )
+    except Exception:
+        return None
+
+
 # ============================================================
 # SIGNALS: CAPTURA DE DIFF
 # ============================================================
@@ -287,8 +315,7 @@ def conectar_signals():
 def log_login(sender, request, user, **kwargs):
     ip = None
     if request:
-        xff = request.META.get("HTTP_X_FORWARDED_FOR")
-        ip = xff.split(",")[0].strip() if xff else request.META.get("REMOTE_ADDR")
+        ip = ip_cliente(request)
     LogActividad.objects.create(
         usuario=user,
         usuario_texto=user.username,
@@ -304,8 +331,7 @@ def log_logout(sender, request, user, **kwargs):
         return
     ip = None
     if request:
-        xff = request.META.get("HTTP_X_FORWARDED_FOR")
-        ip = xff.split(",")[0].strip() if xff else request.META.get("REMOTE_ADDR")
+        ip = ip_cliente(request)
     LogActividad.objects.create(
         usuario=user,
         usuario_texto=user.username,
@@ -319,8 +345,7 @@ def log_logout(sender, request, user, **kwargs):
 def log_login_fallido(sender, credentials, request, **kwargs):
     ip = None
     if request:
-        xff = request.META.get("HTTP_X_FORWARDED_FOR")
-        ip = xff.split(",")[0].strip() if xff else request.META.get("REMOTE_ADDR")
+        ip = ip_cliente(request)
     username = (credentials or {}).get("username", "desconocido")
     LogActividad.objects.create(
         usuario=None,
@@ -1,3 +1,38 @@
-from django.test import TestCase
+"""
+Tests del perfilador de requests.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from .models import PerfilRequest
+from .perfilador import forma_sql
+
+
+class FormaSqlTests(TestCase):
+    def test_literales_y_listas_in(self):
+        a = forma_sql('SELECT * FROM "t" WHERE "id" = 3 AND "x" IN (%s, %s, %s)')
+        b = forma_sql('SELECT * FROM "t"  WHERE "id" = 15 AND "x" IN (%s)')
+        self.assertEqual(a, b)
+        self.assertEqual(forma_sql("SELECT 'abc', 'a''b'"), "SELECT ?, ?")
+
+
+@override_settings(PERFILADOR_TOKEN="secreto", PERFILADOR_ADMINS=False)
+class PerfiladorMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("Vamichetti", "a@a.com", "x")
+        self.client.force_login(self.user)
+
+    def test_sin_header_no_mide(self):
+        self.client.get("/auditoria/", secure=True)
+        self.assertFalse(PerfilRequest.objects.exists())
+
+    def test_con_header_graba_medicion(self):
+        r = self.client.get("/auditoria/", secure=True, headers={"X-Perfilar": "secreto"})
+        self.assertEqual(r.status_code, 200)
+        perfil = PerfilRequest.objects.get()
+        self.assertEqual(perfil.vista, "auditoria:lista_logs")
+        self.assertGreater(perfil.queries, 0)
+        self.assertGreater(perfil.ms_template, 0)
+
+        r = self.client.get("/auditoria/perfiles/", secure=True)
+        self.assertContains(r, "auditoria:lista_logs")
@@ -190,3 +190,82 @@ def restaurar_registro(request, log_id):
         f"Restaurado: {Model.__name__} #{instancia.pk} — {instancia}"
     )
     return redirect("auditoria:lista_eliminados")
+
+
+# ==========================================================
+# PERFILADOR: ENDPOINTS MÁS LENTOS Y QUERIES REPETIDAS
+# ==========================================================
+def _es_admin_sistema(user):
+    from permisos.access import es_admin
+    return es_admin(user)
+
+
+ORDENES_PERFIL = {
+    "ms": "-ms_prom",
+    "queries": "-queries_prom",
+    "duplicadas": "-duplicadas_prom",
+    "max": "-ms_max",
+}
+
+
+@login_required
+@user_passes_test(_es_admin_sistema, login_url="inicio")
+def perfiles(request):
+    """
+    Resumen del perfilador: por vista, requests medidos en las últimas
+    `horas`, tiempos promedio/máximo, queries y las formas de query más
+    repetidas (candidatas a N+1).
+    """
+    from collections import defaultdict
+    from datetime import timedelta
+    from django.db.models import Avg, Count, Max
+    from django.utils import timezone
+    from .models import PerfilRequest
+
+    try:
+        horas = max(1, min(int(request.GET.get("horas", 24)), 24 * 30))
+    except ValueError:
+        horas = 24
+    orden = request.GET.get("orden", "ms")
+    if orden not in ORDENES_PERFIL:
+        orden = "ms"
+
+    recientes = PerfilRequest.objects.filter(fecha__gte=timezone.now() - timedelta(hours=horas))
+    vistas = list(
+        recientes.values("vista").annotate(
+            n=Count("id"),
+            ms_prom=Avg("ms_total"),
+            ms_max=Max("ms_total"),
+            sql_prom=Avg("ms_sql"),
+            template_prom=Avg("ms_template"),
+            queries_prom=Avg("queries"),
+            queries_max=Max("queries"),
+            duplicadas_prom=Avg("queries_duplicadas"),
+        ).order_by(ORDENES_PERFIL[orden])[:30]
+    )
+
+    # Formas repetidas por vista: se suman los top de cada request medido
+    repetidas = defaultdict(lambda: defaultdict(lambda: {"n": 0, "requests": 0, "ms": 0.0}))
+    filas = (
+        recientes.filter(vista__in=[v["vista"] for v in vistas], queries_duplicadas__gt=0)
+        .order_by("-fecha").values_list("vista", "repetidas")[:2000]
+    )
+    for vista, lista in filas:
+        for q in lista or []:
+            acc = repetidas[vista][q["sql"]]
+            acc["n"] += q["n"]
+            acc["requests"] += 1
+            acc["ms"] += q.get("ms", 0)
+    for v in vistas:
+        formas = repetidas.get(v["vista"], {})
+        v["repetidas"] = sorted(
+            ({"sql": sql, **datos} for sql, datos in formas.items()),
+            key=lambda f: f["n"], reverse=True,
+        )[:5]
+
+    return render(request, "auditoria/perfiles.html", {
+        "vistas": vistas,
+        "horas": horas,
+        "orden": orden,
+        "total": recientes.count(),
+    })
@@ -0,0 +1,178 @@
+"""
+Creación de lotes de pagarés y generación de su PDF.
+
+    lotes.crear_lote(cliente, items, ...)   -> PagareLote   (items = [(monto, vencimiento), ...])
+    lotes.generar_pdf(lote_id)              -> True si lo generó
+    lotes.procesar_pendientes()             -> cantidad de PDFs generados
+
+El lote se crea en una transacción: reserva el rango de números con un
+UPDATE atómico sobre `NumeradorPagare` (dos lotes simultáneos no pueden
+tomar los mismos), inserta los pagarés con un solo bulk_create y deja un
+único registro de auditoría.
+
+El PDF no se arma en la request: al confirmar la transacción se genera en
+un hilo aparte (o en el momento, con PAGARES_PDF_EN_SEGUNDO_PLANO=False) y
+`ver_lote` muestra el estado. Cada generación reclama el lote con un UPDATE
+condicionado al estado, así un lote se genera una sola vez aunque lo pidan
+el hilo y el comando `generar_pdfs_pagares` a la vez.
+
+El reclamo anota la hora en `pdf_tomado`. Si el hilo muere a mitad de camino
+(reinicio del servidor) o nunca arranca, el lote queda "generando" o
+"pendiente": pasados PAGARES_PDF_VENCIMIENTO minutos se da por trabado, el
+comando lo vuelve a tomar y `ver_lote` ofrece "Reintentar". Un hilo viejo
+que termine después solo guarda su resultado si el reclamo sigue siendo suyo.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import pagares_pdf
+from .models import NumeradorPagare, Pagare, PagareLote
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# NUMERACIÓN
+# ==========================================================
+def reservar_numeros(cantidad):
+    """
+    Reserva `cantidad` números consecutivos y devuelve el range. Un solo
+    UPDATE (que además salta por encima de cualquier número cargado a mano
+    más alto); llamarlo dentro de la transacción que crea los pagarés.
+    """
+    tope = Coalesce(
+        Subquery(Pagare.objects.order_by("-numero").values("numero")[:1]), Value(0),
+    )
+    with transaction.atomic():
+        nuevo = Greatest(F("ultimo"), tope) + cantidad
+        if not NumeradorPagare.objects.filter(pk=1).update(ultimo=nuevo):
+            NumeradorPagare.objects.get_or_create(pk=1)
+            NumeradorPagare.objects.filter(pk=1).update(ultimo=nuevo)
+        ultimo = NumeradorPagare.objects.values_list("ultimo", flat=True).get(pk=1)
+    return range(ultimo - cantidad + 1, ultimo + 1)
+
+
+# ==========================================================
+# CREACIÓN DEL LOTE
+# ==========================================================
+def crear_lote(cliente, items, beneficiario, lugar_emision, fecha_emision):
+    """Lote + pagarés (1 UPDATE de numeración, 1 INSERT del lote, 1 de pagarés)."""
+    from auditoria.signals import registrar_lote
+
+    with transaction.atomic():
+        numeros = reservar_numeros(len(items))
+        lote = PagareLote.objects.create(
+            cliente=cliente, beneficiario=beneficiario,
+            lugar_emision=lugar_emision, fecha_emision=fecha_emision,
+            cantidad=len(items), monto_total=sum((monto for monto, _ in items), 0),
+            pdf_estado="pendiente", pdf_tomado=timezone.now(),
+        )
+        pagares = Pagare.objects.bulk_create([
+            Pagare(
+                lote=lote, cliente=cliente, numero=numero,
+                beneficiario=beneficiario, monto=monto,
+                lugar_emision=lugar_emision, fecha_emision=fecha_emision,
+                fecha_vencimiento=vencimiento,
+            )
+            for numero, (monto, vencimiento) in zip(numeros, items)
+        ])
+        if pagares:
+            registrar_lote(
+                "crear", Pagare, pagares,
+                descripcion=f"Creó el lote #{lote.pk} de {cliente} con {len(pagares)} pagaré(s) "
+                            f"(Nº {numeros[0]} a {numeros[-1]})",
+            )
+        transaction.on_commit(lambda: encolar_pdf(lote.pk))
+    return lote
+
+
+# ==========================================================
+# PDF
+# ==========================================================
+def en_segundo_plano():
+    return getattr(settings, "PAGARES_PDF_EN_SEGUNDO_PLANO", True)
+
+
+def limite_trabado():
+    """Un lote en cola o generándose desde antes de este momento está trabado."""
+    return timezone.now() - timedelta(minutes=getattr(settings, "PAGARES_PDF_VENCIMIENTO", 10))
+
+
+def _trabados():
+    return Q(pdf_estado__in=("pendiente", "generando")) & (
+        Q(pdf_tomado__isnull=True) | Q(pdf_tomado__lt=limite_trabado())
+    )
+
+
+def _trabajar(lote_id):
+    try:
+        generar_pdf(lote_id)
+    finally:
+        close_old_connections()
+
+
+def encolar_pdf(lote_id):
+    """Genera el PDF del lote en un hilo aparte (o ya, si está desactivado)."""
+    if en_segundo_plano():
+        threading.Thread(target=_trabajar, args=(lote_id,), daemon=True, name=f"pdf-lote-{lote_id}").start()
+    else:
+        generar_pdf(lote_id)
+
+
+def regenerar(lote):
+    """Vuelve a poner el lote en cola (botón de `ver_lote` o un lote trabado)."""
+    PagareLote.objects.filter(pk=lote.pk).update(pdf_estado="pendiente", pdf_error="", pdf_tomado=timezone.now())
+    encolar_pdf(lote.pk)
+
+
+def generar_pdf(lote_id):
+    """Arma y guarda el PDF si el lote está pendiente, con error o trabado. True si lo generó."""
+    tomado = timezone.now()
+    reclamables = Q(pdf_estado__in=("pendiente", "error")) | _trabados()
+    if not PagareLote.objects.filter(reclamables, pk=lote_id).update(
+        pdf_estado="generando", pdf_error="", pdf_tomado=tomado,
+    ):
+        return False
+    propio = PagareLote.objects.filter(pk=lote_id, pdf_tomado=tomado)
+    try:
+        lote = PagareLote.objects.get(pk=lote_id)
+        pagares = list(lote.pagares.select_related("cliente").order_by("numero"))
+        contenido = pagares_pdf.generar_lote(pagares)
+        anterior = lote.pdf.name if lote.pdf else None
+        lote.pdf.save(
+            f"pagares_lote_{lote.id}_{lote.fecha_emision.isoformat()}.pdf",
+            ContentFile(contenido), save=False,
+        )
+        # update() en lugar de save(): no vuelve a disparar la auditoría del lote
+        if not propio.update(pdf=lote.pdf.name, pdf_estado="listo"):
+            # Otro lo reclamó mientras tanto (se dio por trabado): queda el suyo
+            lote.pdf.storage.delete(lote.pdf.name)
+            return False
+        if anterior and anterior != lote.pdf.name:
+            lote.pdf.storage.delete(anterior)
+    except Exception as e:
+        logger.exception("Error generando el PDF del lote de pagarés %s", lote_id)
+        propio.update(pdf_estado="error", pdf_error=f"{type(e).__name__}: {e}"[:2000])
+        return False
+    return True
+
+
+def procesar_pendientes(con_errores=False):
+    """
+    Genera los PDFs que quedaron pendientes o trabados (p. ej. si se reinició
+    el servidor a mitad de la generación), y los fallidos con `con_errores`.
+    """
+    estados = ("pendiente", "error") if con_errores else ("pendiente",)
+    ids = (
+        PagareLote.objects.filter(Q(pdf_estado__in=estados) | _trabados())
+        .order_by("id").values_list("id", flat=True)
+    )
+    return sum(1 for lote_id in list(ids) if generar_pdf(lote_id))
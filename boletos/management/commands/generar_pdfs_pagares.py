@@ -0,0 +1,26 @@
+"""
+Genera los PDFs de los lotes de pagarés que quedaron en cola o trabados (el
+hilo que los arma se corta si el servidor se reinicia mientras trabaja). Un
+lote "generando" se retoma pasados PAGARES_PDF_VENCIMIENTO minutos.
+
+Uso:
+    python manage.py generar_pdfs_pagares                 # pendientes y trabados
+    python manage.py generar_pdfs_pagares --con-errores   # reintenta también los fallidos
+"""
+from django.core.management.base import BaseCommand
+
+from boletos import lotes
+
+
+class Command(BaseCommand):
+    help = "Genera los PDFs pendientes de los lotes de pagarés"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--con-errores", action="store_true",
+            help="Reintentar también los lotes cuyo PDF falló",
+        )
+
+    def handle(self, *args, **opts):
+        generados = lotes.procesar_pendientes(con_errores=opts["con_errores"])
+        self.stdout.write(self.style.SUCCESS(f"PDFs de lotes de pagarés generados: {generados}"))
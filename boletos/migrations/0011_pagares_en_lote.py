@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:11
+
+from django.db import migrations, models
+
+
+def inicializar(apps, schema_editor):
+    """Numerador desde el último pagaré y los lotes existentes como listos."""
+    Pagare = apps.get_model("boletos", "Pagare")
+    PagareLote = apps.get_model("boletos", "PagareLote")
+    NumeradorPagare = apps.get_model("boletos", "NumeradorPagare")
+    ultimo = Pagare.objects.aggregate(m=models.Max("numero"))["m"] or 0
+    NumeradorPagare.objects.update_or_create(pk=1, defaults={"ultimo": ultimo})
+    PagareLote.objects.update(pdf_estado="listo")
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boletos', '0010_reserva_permuta2_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumeradorPagare',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultimo', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Numerador de pagarés',
+                'verbose_name_plural': 'Numerador de pagarés',
+            },
+        ),
+        migrations.AddField(
+            model_name='pagarelote',
+            name='pdf_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='pagarelote',
+            name='pdf_estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('generando', 'Generando'), ('listo', 'Listo'), ('error', 'Error')], default='pendiente', max_length=10),
+        ),
+        migrations.RunPython(inicializar, noop),
+    ]
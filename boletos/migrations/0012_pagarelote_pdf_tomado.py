@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boletos', '0011_pagares_en_lote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagarelote',
+            name='pdf_tomado',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
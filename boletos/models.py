@@ -103,6 +103,18 @@ class PagareLote(models.Model):
         blank=True
     )
 
+    # El PDF se genera fuera de la request (ver boletos.lotes)
+    PDF_ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("generando", "Generando"),
+        ("listo", "Listo"),
+        ("error", "Error"),
+    ]
+    pdf_estado = models.CharField(max_length=10, choices=PDF_ESTADOS, default="pendiente")
+    pdf_error = models.TextField(blank=True, default="")
+    # Cuándo se encoló o se reclamó el PDF por última vez (para ver si quedó trabado)
+    pdf_tomado = models.DateTimeField(null=True, blank=True)
+
     creado = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -111,6 +123,33 @@ class PagareLote(models.Model):
     def __str__(self):
         return f"Lote de pagarés ({self.cantidad}) - {self.cliente}"
 
+    @property
+    def pdf_en_proceso(self):
+        return self.pdf_estado in ("pendiente", "generando")
+
+    @property
+    def pdf_trabado(self):
+        """En cola o generándose desde hace más de PAGARES_PDF_VENCIMIENTO minutos."""
+        from .lotes import limite_trabado
+
+        return self.pdf_en_proceso and (self.pdf_tomado is None or self.pdf_tomado < limite_trabado())
+
+
+class NumeradorPagare(models.Model):
+    """
+    Última numeración entregada a pagarés (una sola fila). Cada lote
+    reserva su rango con un UPDATE atómico (ver boletos.lotes.reservar_numeros),
+    así dos lotes simultáneos nunca toman los mismos números.
+    """
+    ultimo = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Numerador de pagarés"
+        verbose_name_plural = "Numerador de pagarés"
+
+    def __str__(self):
+        return f"Último pagaré: {self.ultimo}"
+
 
 # ==========================================================
 # PAGARÉ (INDIVIDUAL – LEGAL)
@@ -0,0 +1,189 @@
+"""
+PDF de los lotes de pagarés: A4 vertical, 2 pagarés por hoja uno debajo
+del otro.
+
+Todo lo fijo de cada mitad de hoja (encabezado, recuadros de IMPORTE y
+VENCE EL, líneas de firma) se dibuja una sola vez como Form XObject y cada
+pagaré lo reutiliza: el PDF lo guarda una vez y cada pagaré solo agrega
+sus datos. Los colores se arman una vez por proceso, y el texto legal se
+parte en líneas una sola vez por texto distinto (en un lote suelen
+repetirse), con los anchos de palabra cacheados.
+"""
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+ANCHO, ALTO = A4
+MITAD = ALTO / 2
+MARGEN = 1.5 * cm
+X = MARGEN
+W = ANCHO - 2 * MARGEN
+
+AZUL = colors.HexColor("#002855")
+GRIS = colors.HexColor("#555555")
+GRIS_TEXTO = colors.HexColor("#6b7280")
+VERDE = colors.HexColor("#059669")
+GRIS_CORTE = colors.HexColor("#999999")
+
+FUENTE, FUENTE_BOLD = "Helvetica", "Helvetica-Bold"
+CUERPO = 7.5
+INTERLINEA = 0.38 * cm
+
+# Geometría de cada mitad, relativa a su borde inferior (0) y superior (MITAD)
+Y_ENCABEZADO = MITAD - 0.8 * cm
+Y_TITULO = Y_ENCABEZADO - 1.0 * cm
+Y_NUMERO = Y_TITULO - 0.5 * cm
+Y_TEXTO = Y_NUMERO - 0.5 * cm
+Y_LIMITE_TEXTO = 2.2 * cm
+Y_FIRMA = 1.0 * cm
+IMPORTE = (X + W - 4.5 * cm, Y_TITULO - 0.1 * cm, 4.5 * cm, 1.0 * cm)  # x, y, ancho, alto
+VENCE = (X + W / 2 - 1.5 * cm, 0.3 * cm, 3 * cm, 1.1 * cm)
+
+FORM_FIJO = "pagare_fijo"
+
+MESES = [
+    "", "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+    "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+]
+
+
+def fecha_letras(f):
+    return f"{f.day} de {MESES[f.month]} de {f.year}"
+
+
+@lru_cache(maxsize=4096)
+def _ancho(palabra):
+    return stringWidth(palabra, FUENTE, CUERPO)
+
+
+@lru_cache(maxsize=256)
+def _lineas(texto):
+    """Líneas del texto legal que entran entre Y_TEXTO y Y_LIMITE_TEXTO."""
+    lineas, linea, ancho, y = [], "", 0.0, Y_TEXTO
+    for palabra in texto.split(" "):
+        ancho_palabra = _ancho(palabra + " ")
+        if ancho + ancho_palabra > W:
+            if y - INTERLINEA > Y_LIMITE_TEXTO:
+                lineas.append(linea.rstrip())
+                y -= INTERLINEA
+            linea, ancho = palabra + " ", ancho_palabra
+        else:
+            linea += palabra + " "
+            ancho += ancho_palabra
+    if linea and y > Y_LIMITE_TEXTO:
+        lineas.append(linea.rstrip())
+    return tuple(lineas)
+
+
+def _definir_fijo(c):
+    """Form con lo que no cambia entre pagarés (mitad de hoja con base en y=0)."""
+    c.beginForm(FORM_FIJO)
+
+    c.setFont(FUENTE_BOLD, 9); c.setFillColor(AZUL)
+    c.drawString(X, Y_ENCABEZADO, "AMICHETTI AUTOMOTORES")
+    c.setFont(FUENTE, 7); c.setFillColor(GRIS)
+    c.drawString(X + 5.5 * cm, Y_ENCABEZADO, "Larrea 255, Rojas, Buenos Aires")
+    c.setStrokeColor(AZUL); c.setLineWidth(1)
+    c.line(X, Y_ENCABEZADO - 0.5 * cm, X + W, Y_ENCABEZADO - 0.5 * cm)
+
+    c.setFont(FUENTE_BOLD, 14); c.setFillColor(AZUL)
+    c.drawString(X, Y_TITULO, "PAGARE")
+    bx, by, bw, bh = IMPORTE
+    c.setStrokeColor(AZUL); c.setLineWidth(0.8)
+    c.rect(bx, by, bw, bh)
+    c.setFont(FUENTE, 6); c.setFillColor(AZUL)
+    c.drawCentredString(bx + bw / 2, by + 0.75 * cm, "IMPORTE")
+
+    c.setStrokeColor(colors.black); c.setLineWidth(0.5)
+    c.line(X, Y_FIRMA, X + W * 0.35, Y_FIRMA)
+    c.setFont(FUENTE, 6.5); c.setFillColor(GRIS)
+    c.drawString(X, Y_FIRMA - 0.3 * cm, "FIRMA DEL DEUDOR")
+
+    vx, vy, vw, vh = VENCE
+    c.setStrokeColor(AZUL); c.setLineWidth(0.8)
+    c.rect(vx, vy, vw, vh)
+    c.setFont(FUENTE_BOLD, 6.5); c.setFillColor(AZUL)
+    c.drawCentredString(vx + vw / 2, vy + 0.78 * cm, "VENCE EL")
+
+    c.setStrokeColor(colors.black); c.setLineWidth(0.5)
+    c.line(X + W * 0.65, Y_FIRMA, X + W, Y_FIRMA)
+    c.setFont(FUENTE, 6.5); c.setFillColor(GRIS)
+    c.drawString(X + W * 0.65, Y_FIRMA - 0.3 * cm, "ACLARACION")
+
+    c.endForm()
+
+
+def _dibujar_pagare(c, pagare, y_base):
+    """Un pagaré en la mitad de hoja que empieza en `y_base` (0 o MITAD)."""
+    cl = pagare.cliente
+    c.saveState()
+    c.translate(0, y_base)
+    c.doForm(FORM_FIJO)
+
+    monto_str = f"$ {pagare.monto:,.0f}".replace(",", ".")
+    bx, by, bw, _ = IMPORTE
+    c.setFont(FUENTE_BOLD, 11); c.setFillColor(VERDE)
+    c.drawCentredString(bx + bw / 2, by + 0.2 * cm, monto_str)
+
+    venc_str = pagare.fecha_vencimiento.strftime("%d/%m/%Y") if pagare.fecha_vencimiento else "A la vista"
+    c.setFont(FUENTE, 7); c.setFillColor(GRIS_TEXTO)
+    c.drawString(X, Y_NUMERO, f"N {pagare.numero}  Lugar: {pagare.lugar_emision}  Fecha de emision: {pagare.fecha_emision.strftime('%d/%m/%Y')}")
+
+    venc_letras = fecha_letras(pagare.fecha_vencimiento) if pagare.fecha_vencimiento else "pagadero a la vista"
+    texto = (
+        f"Debo/Debemos y pagare/pagaremos mancomunada y solidariamente SIN PROTESTO "
+        f"(Art. 50 D. Ley 5965/63), a la orden de {pagare.beneficiario.upper()}, "
+        f"la suma de PESOS {pagare.monto:,.0f} ($ {monto_str}), "
+        f"en {pagare.lugar_emision} el dia {venc_letras}. "
+        f"En caso de mora el deudor pagara intereses punitorios. "
+        f"El deudor constituye domicilio especial en {cl.direccion or pagare.lugar_emision} "
+        f"y renuncia a los fueros que pudieran corresponderle."
+    )
+    c.setFont(FUENTE, CUERPO); c.setFillColor(colors.black)
+    y = Y_TEXTO
+    for linea in _lineas(texto):
+        c.drawString(X, y, linea)
+        y -= INTERLINEA
+
+    y -= 0.2 * cm
+    c.setFont(FUENTE_BOLD, CUERPO); c.setFillColor(AZUL)
+    c.drawString(X, y, "El presente pagare es librado por:")
+    y -= INTERLINEA
+    c.setFont(FUENTE, CUERPO); c.setFillColor(colors.black)
+    c.drawString(X, y, f"{cl.nombre_completo.upper()}, DNI/CUIT {cl.dni_cuit or ''}, con domicilio en {cl.direccion or ''}")
+
+    c.setFont(FUENTE, 6.5); c.setFillColor(GRIS)
+    c.drawString(X, Y_FIRMA - 0.55 * cm, cl.nombre_completo.upper()[:35])
+    c.drawString(X, Y_FIRMA - 0.78 * cm, f"DNI: {cl.dni_cuit or ''}")
+
+    vx, vy, vw, _ = VENCE
+    c.setFont(FUENTE_BOLD, 9); c.setFillColor(colors.black)
+    c.drawCentredString(vx + vw / 2, vy + 0.25 * cm, venc_str)
+    c.restoreState()
+
+
+def _linea_corte(c):
+    c.setStrokeColor(GRIS_CORTE)
+    c.setDash(4, 4); c.setLineWidth(0.6)
+    c.line(MARGEN, MITAD, ANCHO - MARGEN, MITAD)
+    c.setDash()
+
+
+def generar_lote(pagares):
+    """Bytes del PDF del lote (los pagarés con su cliente ya cargado)."""
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    _definir_fijo(c)
+    for i in range(0, len(pagares), 2):
+        _dibujar_pagare(c, pagares[i], MITAD)
+        _linea_corte(c)
+        if i + 1 < len(pagares):
+            _dibujar_pagare(c, pagares[i + 1], 0)
+        c.showPage()
+    c.save()
+    return buf.getvalue()
@@ -1,3 +1,100 @@
-from django.test import TestCase
+"""
+Tests de los lotes de pagarés: numeración reservada en bloque, pagarés con
+un solo INSERT y el PDF armado fuera de la request.
+"""
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clientes.models import Cliente
+
+from . import lotes
+from .models import Pagare, PagareLote
+
+MEDIA = tempfile.mkdtemp()
+
+
+@override_settings(PAGARES_PDF_EN_SEGUNDO_PLANO=False, MEDIA_ROOT=MEDIA)
+class LotesPagaresTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(nombre_completo="Juan Pérez", dni_cuit="20123", direccion="Larrea 1")
+
+    def _items(self, n):
+        return [(Decimal("1000") * (i + 1), date(2026, i % 12 + 1, 10)) for i in range(n)]
+
+    def _crear(self, n):
+        return lotes.crear_lote(self.cliente, self._items(n), "AMICHETTI", "Rojas", date(2026, 1, 5))
+
+    def test_numeracion_consecutiva_entre_lotes(self):
+        Pagare.objects.create(cliente=self.cliente, numero=40, monto=Decimal("1"))  # cargado a mano
+        primero, segundo = self._crear(3), self._crear(2)
+        numeros = lambda lote: list(lote.pagares.order_by("numero").values_list("numero", flat=True))
+        self.assertEqual(numeros(primero), [41, 42, 43])
+        self.assertEqual(numeros(segundo), [44, 45])
+        self.assertEqual(primero.monto_total, Decimal("6000"))
+
+    def test_queries_constantes_por_cantidad(self):
+        self._crear(1)  # crea el numerador
+        cantidades = []
+        for n in (2, 12):
+            with CaptureQueriesContext(connection) as ctx:
+                self._crear(n)
+            cantidades.append(len(ctx.captured_queries))
+        self.assertEqual(cantidades[0], cantidades[1])
+
+    def test_pdf_al_confirmar_y_estado_en_ver_lote(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            lote = self._crear(3)
+        lote.refresh_from_db()
+        self.assertEqual(lote.pdf_estado, "listo")
+        self.assertTrue(lote.pdf.read().startswith(b"%PDF"))
+        self.assertFalse(lotes.generar_pdf(lote.pk))  # ya generado: no lo vuelve a tomar
+
+        PagareLote.objects.filter(pk=lote.pk).update(pdf_estado="pendiente")
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        r = self.client.get(reverse("boletos:ver_lote", args=[lote.pk]), secure=True)
+        self.assertTrue(r.context["refrescar"])
+        self.assertContains(r, "en cola")
+
+        self.assertEqual(lotes.procesar_pendientes(), 1)
+        r = self.client.get(reverse("boletos:ver_lote", args=[lote.pk]), secure=True)
+        self.assertFalse(r.context["refrescar"])
+        self.assertContains(r, "PDF del lote listo")
+
+    def test_lote_trabado_se_retoma_y_ofrece_reintentar(self):
+        # El hilo murió a mitad de la generación, o nunca arrancó
+        lote = self._crear(2)
+        otro = self._crear(1)
+        hace_rato = timezone.now() - timedelta(minutes=30)
+        PagareLote.objects.filter(pk=lote.pk).update(pdf_estado="generando", pdf_tomado=hace_rato)
+        PagareLote.objects.filter(pk=otro.pk).update(pdf_tomado=hace_rato)
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        r = self.client.get(reverse("boletos:ver_lote", args=[lote.pk]), secure=True)
+        self.assertTrue(r.context["trabado"])
+        self.assertFalse(r.context["refrescar"])
+        self.assertContains(r, "Reintentar")
+
+        # Uno que se está generando ahora no se toma dos veces
+        PagareLote.objects.filter(pk=lote.pk).update(pdf_tomado=timezone.now())
+        self.assertFalse(lotes.generar_pdf(lote.pk))
+        r = self.client.get(reverse("boletos:ver_lote", args=[lote.pk]), secure=True)
+        self.assertTrue(r.context["refrescar"])
+
+        PagareLote.objects.filter(pk=lote.pk).update(pdf_tomado=hace_rato)
+        self.assertEqual(lotes.procesar_pendientes(), 2)
+        self.assertEqual(
+            set(PagareLote.objects.values_list("pdf_estado", flat=True)), {"listo"},
+        )
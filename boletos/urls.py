@@ -22,6 +22,7 @@ urlpatterns = [
     path("pagare/pdf/<int:pagare_id>/", views.pagare_pdf, name="pagare_pdf"),
     path("pagare/lote/<int:lote_id>/pdf/", views.descargar_pdf_lote, name="descargar_pdf_lote"),
     path("pagare/lote/<int:lote_id>/", views.ver_lote, name="ver_lote"),
+    path("pagare/lote/<int:lote_id>/regenerar/", views.regenerar_pdf_lote, name="regenerar_pdf_lote"),
     path("pagare/eliminar/<int:lote_id>/", views.eliminar_lote, name="eliminar_lote"),
 
     # RESERVAS
@@ -22,6 +22,7 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.lib import colors
 
+from . import lotes, pagares_pdf
 from .models import BoletoCompraventa, Pagare, PagareLote, Reserva, EntregaDocumentacion
 from .forms import CrearBoletoForm, CrearPagareLoteForm, ReservaForm, EntregaDocumentacionForm
 from clientes.models import Cliente
@@ -371,122 +372,7 @@ def monto_en_letras_simple(monto) -> str:
 
 def _generar_pdf_lote_pagares_3_por_hoja(pagares):
     """PDF A4 vertical, 2 pagares por hoja uno debajo del otro."""
-    buf = BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
-    ancho, alto = A4
-    AZUL = colors.HexColor("#002855")
-    margen = 1.5 * cm
-    mitad_y = alto / 2
-
-    meses_es = ["","enero","febrero","marzo","abril","mayo","junio","julio","agosto","septiembre","octubre","noviembre","diciembre"]
-    def fecha_letras(f): return f"{f.day} de {meses_es[f.month]} de {f.year}"
-
-    def dibujar_pagare(c, pagare, y_top, y_bottom):
-        x = margen
-        w = ancho - 2 * margen
-        y = y_top - 0.8 * cm
-        cl = pagare.cliente
-
-        c.setFont("Helvetica-Bold", 9); c.setFillColor(AZUL)
-        c.drawString(x, y, "AMICHETTI AUTOMOTORES")
-        c.setFont("Helvetica", 7); c.setFillColor(colors.HexColor("#555555"))
-        c.drawString(x + 5.5*cm, y, "Larrea 255, Rojas, Buenos Aires")
-        y -= 0.5*cm
-
-        c.setStrokeColor(AZUL); c.setLineWidth(1)
-        c.line(x, y, x + w, y); y -= 0.5*cm
-
-        c.setFont("Helvetica-Bold", 14); c.setFillColor(AZUL)
-        c.drawString(x, y, "PAGARE")
-        monto_str = f"$ {pagare.monto:,.0f}".replace(",", ".")
-        bw = 4.5*cm; bh = 1.0*cm
-        bx = x + w - bw; by = y - 0.1*cm
-        c.setStrokeColor(AZUL); c.setLineWidth(0.8)
-        c.rect(bx, by, bw, bh)
-        c.setFont("Helvetica", 6); c.setFillColor(AZUL)
-        c.drawCentredString(bx + bw/2, by + 0.75*cm, "IMPORTE")
-        c.setFont("Helvetica-Bold", 11); c.setFillColor(colors.HexColor("#059669"))
-        c.drawCentredString(bx + bw/2, by + 0.2*cm, monto_str)
-        y -= 0.5*cm
-
-        venc_str = pagare.fecha_vencimiento.strftime("%d/%m/%Y") if pagare.fecha_vencimiento else "A la vista"
-        c.setFont("Helvetica", 7); c.setFillColor(colors.HexColor("#6b7280"))
-        c.drawString(x, y, f"N {pagare.numero}  Lugar: {pagare.lugar_emision}  Fecha de emision: {pagare.fecha_emision.strftime('%d/%m/%Y')}")
-        y -= 0.5*cm
-
-        c.setFont("Helvetica", 7.5); c.setFillColor(colors.black)
-        venc_letras = fecha_letras(pagare.fecha_vencimiento) if pagare.fecha_vencimiento else "pagadero a la vista"
-        texto = (
-            f"Debo/Debemos y pagare/pagaremos mancomunada y solidariamente SIN PROTESTO "
-            f"(Art. 50 D. Ley 5965/63), a la orden de {pagare.beneficiario.upper()}, "
-            f"la suma de PESOS {pagare.monto:,.0f} ($ {monto_str}), "
-            f"en {pagare.lugar_emision} el dia {venc_letras}. "
-            f"En caso de mora el deudor pagara intereses punitorios. "
-            f"El deudor constituye domicilio especial en {cl.direccion or pagare.lugar_emision} "
-            f"y renuncia a los fueros que pudieran corresponderle."
-        )
-
-        y_firma = y_bottom + 2.2*cm
-        palabras = texto.split(" "); linea = ""
-        for p in palabras:
-            prueba = linea + p + " "
-            if c.stringWidth(prueba, "Helvetica", 7.5) > w:
-                if y - 0.38*cm > y_firma:
-                    c.drawString(x, y, linea.rstrip()); y -= 0.38*cm
-                linea = p + " "
-            else:
-                linea = prueba
-        if linea and y > y_firma:
-            c.drawString(x, y, linea.rstrip()); y -= 0.38*cm
-
-        y -= 0.2*cm
-        c.setFont("Helvetica-Bold", 7.5); c.setFillColor(AZUL)
-        c.drawString(x, y, "El presente pagare es librado por:")
-        y -= 0.38*cm
-        c.setFont("Helvetica", 7.5); c.setFillColor(colors.black)
-        c.drawString(x, y, f"{cl.nombre_completo.upper()}, DNI/CUIT {cl.dni_cuit or ''}, con domicilio en {cl.direccion or ''}")
-        y -= 0.5*cm
-
-        firma_y = y_bottom + 1.0*cm
-        c.setStrokeColor(colors.black); c.setLineWidth(0.5)
-        c.line(x, firma_y, x + w*0.35, firma_y)
-        c.setFont("Helvetica", 6.5); c.setFillColor(colors.HexColor("#555555"))
-        c.drawString(x, firma_y - 0.3*cm, "FIRMA DEL DEUDOR")
-        c.drawString(x, firma_y - 0.55*cm, cl.nombre_completo.upper()[:35])
-        c.drawString(x, firma_y - 0.78*cm, f"DNI: {cl.dni_cuit or ''}")
-
-        vbw = 3*cm; vbh = 1.1*cm
-        vbx = x + w/2 - vbw/2
-        vby = y_bottom + 0.3*cm
-        c.setStrokeColor(AZUL); c.setLineWidth(0.8)
-        c.rect(vbx, vby, vbw, vbh)
-        c.setFont("Helvetica-Bold", 6.5); c.setFillColor(AZUL)
-        c.drawCentredString(vbx + vbw/2, vby + 0.78*cm, "VENCE EL")
-        c.setFont("Helvetica-Bold", 9); c.setFillColor(colors.black)
-        c.drawCentredString(vbx + vbw/2, vby + 0.25*cm, venc_str)
-
-        c.setStrokeColor(colors.black); c.setLineWidth(0.5)
-        c.line(x + w*0.65, firma_y, x + w, firma_y)
-        c.setFont("Helvetica", 6.5); c.setFillColor(colors.HexColor("#555555"))
-        c.drawString(x + w*0.65, firma_y - 0.3*cm, "ACLARACION")
-
-    def linea_corte(c, y):
-        c.setStrokeColor(colors.HexColor("#999999"))
-        c.setDash(4, 4); c.setLineWidth(0.6)
-        c.line(margen, y, ancho - margen, y)
-        c.setDash()
-
-    i = 0
-    while i < len(pagares):
-        dibujar_pagare(c, pagares[i], alto, mitad_y)
-        linea_corte(c, mitad_y)
-        if i + 1 < len(pagares):
-            dibujar_pagare(c, pagares[i+1], mitad_y, 0)
-        c.showPage()
-        i += 2
-
-    c.save(); buf.seek(0)
-    return buf.getvalue()
+    return pagares_pdf.generar_lote(pagares)
 
 
 # ====================================
@@ -510,16 +396,7 @@ def crear_pagares(request):
                 fecha_emision = date.today()
             cantidad = int(request.POST.get("cantidad", 1))
 
-            lote = PagareLote.objects.create(
-                cliente=cliente, beneficiario=beneficiario,
-                lugar_emision=lugar_emision, fecha_emision=fecha_emision,
-                cantidad=cantidad, monto_total=Decimal("0.00"),
-            )
-
-            ultimo = Pagare.objects.aggregate(max_num=Max("numero")).get("max_num") or 0
-            pagares = []
-            monto_total = Decimal("0.00")
-
+            items = []
             for i in range(1, cantidad + 1):
                 monto   = Decimal(request.POST.get(f"monto_{i}", "0"))
                 fecha_v = request.POST.get(f"fecha_vencimiento_{i}")
@@ -527,27 +404,12 @@ def crear_pagares(request):
                     fecha_v = date.fromisoformat(fecha_v) if fecha_v else None
                 except ValueError:
                     fecha_v = None
-                pagare  = Pagare.objects.create(
-                    lote=lote, cliente=cliente, numero=ultimo + i,
-                    beneficiario=beneficiario, monto=monto,
-                    lugar_emision=lugar_emision, fecha_emision=fecha_emision,
-                    fecha_vencimiento=fecha_v
-                )
-                pagares.append(pagare)
-                monto_total += monto
-
-            pdf_bytes = _generar_pdf_lote_pagares_3_por_hoja(pagares)
-            if not pdf_bytes:
-                raise ValueError("No se pudo generar el PDF del pagaré.")
+                items.append((monto, fecha_v))
 
-            filename = f"pagares_lote_{lote.id}_{fecha_emision.isoformat()}.pdf"
-            lote.pdf.save(filename, ContentFile(pdf_bytes), save=True)
-            lote.monto_total = monto_total
-            lote.cantidad = len(pagares)
-            lote.save(update_fields=["monto_total", "cantidad"])
+            lote = lotes.crear_lote(cliente, items, beneficiario, lugar_emision, fecha_emision)
 
-            messages.success(request, f"✅ Se creó el lote con {len(pagares)} pagarés en UN solo PDF.")
-            return redirect("boletos:lista_pagares")
+            messages.success(request, f"✅ Se creó el lote con {len(items)} pagarés. El PDF se está generando.")
+            return redirect("boletos:ver_lote", lote_id=lote.id)
 
         except Exception as e:
             _tb.print_exc()
@@ -608,7 +470,7 @@ def pagare_pdf(request, pagare_id):
 @login_required
 def descargar_pdf_lote(request, lote_id):
     lote = get_object_or_404(PagareLote, id=lote_id)
-    pagares = list(lote.pagares.all().order_by('numero'))
+    pagares = list(lote.pagares.select_related('cliente').order_by('numero'))
     pdf_bytes = _generar_pdf_lote_pagares_3_por_hoja(pagares)
     response = HttpResponse(pdf_bytes, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="pagares_lote_{lote.id}.pdf"'
@@ -630,7 +492,25 @@ def ver_lote(request, lote_id):
             if '?' not in url:
                 url = url + '?fl_attachment'
         pdf_url = url
-    return render(request, 'boletos/pagare/lote_detalle.html', {'lote': lote, 'pagares': pagares, 'pdf_url': pdf_url})
+    trabado = lote.pdf_trabado
+    return render(request, 'boletos/pagare/lote_detalle.html', {
+        'lote': lote, 'pagares': pagares,
+        'pdf_url': pdf_url if lote.pdf_estado == 'listo' else None,
+        'trabado': trabado,
+        'refrescar': lote.pdf_en_proceso and not trabado,
+    })
+
+
+# ====================================
+# REGENERAR PDF DEL LOTE
+# ====================================
+@login_required
+def regenerar_pdf_lote(request, lote_id):
+    lote = get_object_or_404(PagareLote, id=lote_id)
+    if request.method == 'POST':
+        lotes.regenerar(lote)
+        messages.success(request, 'El PDF del lote se está generando de nuevo.')
+    return redirect('boletos:ver_lote', lote_id=lote.id)
 
 
 # ====================================
@@ -665,7 +545,12 @@ def _fmt_moneda(valor):
     return f"$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
+_GRIS_RESERVA = colors.HexColor("#CCCCCC")
+
+
 def _generar_pdf_reserva(reserva):
+    from reportes.pdf_utils import partir_lineas, recortar
+
     buf = BytesIO()
     page_w, page_h = A4
     c = canvas.Canvas(buf, pagesize=A4)
@@ -673,7 +558,7 @@ def _generar_pdf_reserva(reserva):
     ML = 2 * cm          # margen izquierdo
     MR = 2 * cm          # margen derecho
     CW = page_w - ML - MR  # ancho útil
-    GRIS = colors.HexColor("#CCCCCC")
+    GRIS = _GRIS_RESERVA
     NEGRO = colors.black
 
     y = page_h - 1.5 * cm
@@ -725,9 +610,7 @@ def _generar_pdf_reserva(reserva):
             # Recorta el valor para que nunca se desborde del campo (evita pisar el de al lado)
             disponible = (x + at) - (lx + 0.12 * cm) - 0.05 * cm
             c.setFont("Helvetica-Bold", 8)
-            while txt and c.stringWidth(txt, "Helvetica-Bold", 8) > disponible:
-                txt = txt[:-1]
-            c.drawString(lx + 0.12 * cm, y, txt)
+            c.drawString(lx + 0.12 * cm, y, recortar(txt, "Helvetica-Bold", 8, disponible))
 
     def monto_box(label, valor):
         nonlocal y
@@ -880,16 +763,8 @@ def _generar_pdf_reserva(reserva):
         "reclamo y/o indemnización alguna por parte del Solicitante."
     )
     c.setFont("Helvetica", 6.5)
-    linea_actual = ""
-    for palabra in clausula.split():
-        prueba = linea_actual + " " + palabra if linea_actual else palabra
-        if c.stringWidth(prueba, "Helvetica", 6.5) < CW:
-            linea_actual = prueba
-        else:
-            c.drawString(ML, y, linea_actual); y -= 0.3 * cm
-            linea_actual = palabra
-    if linea_actual:
-        c.drawString(ML, y, linea_actual); y -= 0.3 * cm
+    for linea in partir_lineas(clausula, "Helvetica", 6.5, CW):
+        c.drawString(ML, y, linea); y -= 0.3 * cm
     y -= 0.6 * cm
 
     # ── Firmas ───────────────────────────────────────────
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.core.exceptions import ValidationError
-from .models import Evento
+from .models import Evento, Feriado
 
 
 @admin.register(Evento)
@@ -14,3 +14,10 @@ class EventoAdmin(admin.ModelAdmin):
                 "Los vencimientos se cargan desde la ficha del vehículo"
             )
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Feriado)
+class FeriadoAdmin(admin.ModelAdmin):
+    list_display = ("fecha", "nombre")
+    date_hierarchy = "fecha"
+    search_fields = ("nombre",)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CalendarioConfig(AppConfig):
+    name = "calendario"
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
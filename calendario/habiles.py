@@ -0,0 +1,187 @@
+"""
+Calendario de días hábiles: lunes a viernes menos los feriados nacionales
+(tabla `Feriado`, editable en el admin y cargada desde `feriados_ar.json`).
+
+Por cada año se arman una vez la lista de sus días hábiles y el acumulado
+de hábiles por día del año; sumar o contar días hábiles es después un
+par de lookups en esas listas, sin recorrer día por día:
+
+    habiles.sumar(fecha, 90)          -> fecha + 90 días hábiles
+    habiles.contar(desde, hasta)      -> hábiles en (desde, hasta]
+    habiles.es_habil(fecha)
+    habiles.sumar_lote(fechas, 90)    -> {fecha: resultado}
+
+Cada proceso guarda su calendario armado junto con la versión de los
+feriados, que vive en el cache compartido (settings.CACHES). Cuando cambia
+un feriado (signals de `calendario.signals`) se escribe una versión nueva:
+el proceso que hizo el cambio rearma el suyo enseguida y los demás la ven
+en la primera consulta después de CALENDARIO_REVISION segundos. La versión
+se lee como mucho una vez por ese intervalo; el resto de las consultas
+(p. ej. cada `habitualista_vencimiento` de una ficha) no tocan la base.
+"""
+import json
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+ARCHIVO_FERIADOS = Path(__file__).with_name("feriados_ar.json")
+
+
+class Calendario:
+    def __init__(self, feriados=()):
+        self.feriados = frozenset(feriados)
+        self._anios = {}
+
+    def _anio(self, anio):
+        """(hábiles del año en orden, acumulado[día del año - 1])."""
+        datos = self._anios.get(anio)
+        if datos is None:
+            inicio = date(anio, 1, 1)
+            habiles, acumulado = [], []
+            for i in range((date(anio + 1, 1, 1) - inicio).days):
+                dia = inicio + timedelta(days=i)
+                if self.es_habil(dia):
+                    habiles.append(dia)
+                acumulado.append(len(habiles))
+            datos = self._anios[anio] = (habiles, acumulado)
+        return datos
+
+    def es_habil(self, fecha):
+        return fecha.weekday() < 5 and fecha not in self.feriados
+
+    def _posicion(self, fecha):
+        """Cantidad de hábiles del año de `fecha` hasta esa fecha inclusive."""
+        return self._anio(fecha.year)[1][fecha.timetuple().tm_yday - 1]
+
+    def sumar(self, fecha, dias):
+        """`fecha` + `dias` hábiles (negativo para ir hacia atrás)."""
+        if not fecha:
+            return None
+        if not dias:
+            return fecha
+        anio = fecha.year
+        habiles = self._anio(anio)[0]
+        if dias > 0:
+            i = self._posicion(fecha) + dias - 1
+            while i >= len(habiles):
+                i -= len(habiles)
+                anio += 1
+                habiles = self._anio(anio)[0]
+        else:
+            i = self._posicion(fecha) - (1 if self.es_habil(fecha) else 0) + dias
+            while i < 0:
+                anio -= 1
+                habiles = self._anio(anio)[0]
+                i += len(habiles)
+        return habiles[i]
+
+    def contar(self, desde, hasta):
+        """Días hábiles en (desde, hasta]; negativo si `hasta` es anterior."""
+        if hasta < desde:
+            return -self.contar(hasta, desde)
+        total = self._posicion(hasta) - self._posicion(desde)
+        for anio in range(desde.year, hasta.year):
+            total += len(self._anio(anio)[0])
+        return total
+
+
+# ==========================================================
+# CALENDARIO DEL PROCESO
+# ==========================================================
+CLAVE_VERSION = "calendario:feriados:version"
+
+_calendario = None  # (versión, Calendario, hasta cuándo no se vuelve a mirar la versión)
+
+
+def _revision():
+    return getattr(settings, "CALENDARIO_REVISION", 30)
+
+
+def version():
+    """Versión actual de los feriados (si se perdió del cache, una nueva)."""
+    actual = cache.get(CLAVE_VERSION)
+    if actual is None:
+        cache.add(CLAVE_VERSION, uuid.uuid4().hex, None)
+        actual = cache.get(CLAVE_VERSION)
+    return actual
+
+
+def calendario():
+    """
+    Calendario con los feriados de la base (1 query cada vez que cambian;
+    la versión se mira como mucho cada CALENDARIO_REVISION segundos).
+    """
+    global _calendario
+    ahora = time.monotonic()
+    if _calendario is not None and ahora < _calendario[2]:
+        return _calendario[1]
+    actual = version()
+    if _calendario is None or _calendario[0] != actual:
+        from .models import Feriado
+        cal = Calendario(Feriado.objects.values_list("fecha", flat=True))
+    else:
+        cal = _calendario[1]
+    _calendario = (actual, cal, ahora + _revision())
+    return cal
+
+
+def olvidar():
+    """Cambiaron los feriados: versión nueva para todos los procesos."""
+    global _calendario
+    _calendario = None
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, None)
+
+
+def sumar(fecha, dias):
+    return calendario().sumar(fecha, dias)
+
+
+def contar(desde, hasta):
+    return calendario().contar(desde, hasta)
+
+
+def es_habil(fecha):
+    return calendario().es_habil(fecha)
+
+
+def sumar_lote(fechas, dias):
+    """{fecha: fecha + dias hábiles} de muchas fechas con un solo calendario."""
+    cal = calendario()
+    return {f: cal.sumar(f, dias) for f in set(fechas) if f}
+
+
+# ==========================================================
+# CARGA DESDE EL ARCHIVO
+# ==========================================================
+def leer_archivo(ruta=None):
+    """[(fecha, nombre), ...] del archivo de feriados (JSON)."""
+    with open(ruta or ARCHIVO_FERIADOS, encoding="utf-8") as f:
+        datos = json.load(f)
+    return [(date.fromisoformat(d["fecha"]), d["nombre"]) for d in datos["feriados"]]
+
+
+def cargar(ruta=None, apps=None):
+    """
+    Carga (o actualiza el nombre de) los feriados del archivo. Recibe el
+    registro de apps para usarse desde una migración. Devuelve cuántos
+    feriados tiene el archivo.
+    """
+    Feriado = apps.get_model("calendario", "Feriado") if apps else None
+    if Feriado is None:
+        from .models import Feriado
+    filas = leer_archivo(ruta)
+    Feriado.objects.bulk_create(
+        [Feriado(fecha=fecha, nombre=nombre) for fecha, nombre in filas],
+        update_conflicts=True,
+        unique_fields=["fecha"],
+        update_fields=["nombre"],
+    )
+    # Desde una migración la tabla del cache puede no existir todavía; los
+    # procesos arrancan de nuevo después del deploy de todas formas.
+    if apps is None:
+        olvidar()
+    return len(filas)
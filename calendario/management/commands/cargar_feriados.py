@@ -0,0 +1,31 @@
+"""
+Carga los feriados nacionales en la tabla de feriados.
+
+Uso:
+    python manage.py cargar_feriados
+    python manage.py cargar_feriados --archivo otro.json
+
+Por defecto lee calendario/feriados_ar.json. Los feriados existentes
+actualizan su nombre; los cargados a mano en el admin no se tocan. Después
+recalcula el fin del beneficio habitualista en el índice de vencimientos.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from calendario import habiles
+from vehiculos import vencimientos
+
+
+class Command(BaseCommand):
+    help = "Carga los feriados nacionales desde un archivo JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--archivo", default=None, help="Ruta del JSON (por defecto el incluido)")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            cargados = habiles.cargar(opts["archivo"])
+            fichas = vencimientos.actualizar_habitualistas()
+        self.stdout.write(self.style.SUCCESS(
+            f"Feriados cargados: {cargados} | Vencimientos habitualista recalculados: {fichas}"
+        ))
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def cargar_feriados(apps, schema_editor):
+    """Feriados del archivo incluido y fin del beneficio habitualista con ellos."""
+    from calendario import habiles
+    from vehiculos import vencimientos
+
+    habiles.cargar(apps=apps)
+    vencimientos.actualizar_habitualistas(apps)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calendario", "0002_feriado"),
+        ("vehiculos", "0045_vencimientos_desde_fichas"),
+    ]
+
+    operations = [
+        migrations.RunPython(cargar_feriados, noop),
+    ]
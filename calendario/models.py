@@ -61,3 +61,19 @@ class Evento(models.Model):
     @property
     def tiene_vehiculo(self):
         return self.vehiculo is not None
+
+
+# ============================================================
+# FERIADOS NACIONALES (calendario de días hábiles)
+# ============================================================
+class Feriado(models.Model):
+    fecha = models.DateField(unique=True)
+    nombre = models.CharField(max_length=120)
+
+    class Meta:
+        ordering = ["fecha"]
+        verbose_name = "Feriado"
+        verbose_name_plural = "Feriados"
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} – {self.nombre}"
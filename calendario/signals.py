@@ -0,0 +1,27 @@
+"""
+Al cambiar un feriado se sube la versión del calendario de días hábiles
+(todos los procesos lo rearman) y se recalculan los vencimientos del beneficio habitualista (90
+días hábiles) del índice de vencimientos.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import habiles
+
+
+def _feriado_cambiado(sender, **kwargs):
+    from vehiculos import vencimientos
+
+    habiles.olvidar()
+    transaction.on_commit(vencimientos.actualizar_habitualistas)
+
+
+def conectar_signals():
+    from .models import Feriado
+
+    post_save.connect(
+        _feriado_cambiado, sender=Feriado, weak=False, dispatch_uid="feriado_save",
+    )
+    post_delete.connect(
+        _feriado_cambiado, sender=Feriado, weak=False, dispatch_uid="feriado_delete",
+    )
@@ -0,0 +1,97 @@
+"""
+Tests del calendario de días hábiles (feriados nacionales) y de su efecto
+en el vencimiento del beneficio habitualista.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from vehiculos import vencimientos
+from vehiculos.models import FichaVehicular, VencimientoVehiculo, Vehiculo
+
+from . import habiles
+from .models import Feriado
+
+
+def _sumar_dia_por_dia(fecha, dias, feriados):
+    paso = 1 if dias > 0 else -1
+    while dias:
+        fecha += timedelta(days=paso)
+        if fecha.weekday() < 5 and fecha not in feriados:
+            dias -= paso
+    return fecha
+
+
+class CalendarioTests(TestCase):
+    def setUp(self):
+        # El calendario del proceso no vuelve atrás con el rollback del test
+        self.addCleanup(habiles.olvidar)
+
+    def test_coincide_con_contar_dia_por_dia(self):
+        feriados = {date(2026, 2, 16), date(2026, 2, 17), date(2026, 12, 25), date(2027, 1, 1)}
+        cal = habiles.Calendario(feriados)
+        azar = random.Random(43)
+        for _ in range(300):
+            fecha = date(2025, 6, 1) + timedelta(days=azar.randrange(900))
+            dias = azar.randrange(-300, 400)
+            esperado = _sumar_dia_por_dia(fecha, dias, feriados)
+            self.assertEqual(cal.sumar(fecha, dias), esperado, (fecha, dias))
+            if dias > 0:
+                self.assertEqual(cal.contar(fecha, esperado), dias, (fecha, dias))
+
+    def test_fin_de_semana_y_feriado(self):
+        cal = habiles.Calendario({date(2026, 2, 16), date(2026, 2, 17)})
+        self.assertEqual(cal.sumar(date(2026, 2, 13), 1), date(2026, 2, 18))  # viernes + carnaval
+        self.assertEqual(cal.sumar(date(2026, 2, 14), 0), date(2026, 2, 14))
+        self.assertFalse(cal.es_habil(date(2026, 2, 16)))
+        self.assertIsNone(cal.sumar(None, 5))
+
+    def test_feriados_incluidos_se_cargan_en_la_migracion(self):
+        self.assertTrue(Feriado.objects.filter(fecha=date(2026, 7, 9)).exists())
+        self.assertEqual(habiles.cargar(), Feriado.objects.count())
+        self.assertFalse(habiles.es_habil(date(2026, 5, 25)))
+
+    def test_cambio_en_otro_proceso_rearma_el_calendario(self):
+        feriado = date(2026, 5, 25)
+        self.assertFalse(habiles.es_habil(feriado))
+        with self.assertNumQueries(0):  # dentro de CALENDARIO_REVISION ni la versión
+            habiles.es_habil(feriado)
+
+        # Otro worker borra el feriado: su signal escribe una versión nueva
+        Feriado.objects.filter(fecha=feriado).update(fecha=date(2026, 5, 24))
+        cache.set(habiles.CLAVE_VERSION, "otra", None)
+        self.assertFalse(habiles.es_habil(feriado))  # todavía no miró la versión
+        with override_settings(CALENDARIO_REVISION=0):
+            habiles._calendario = habiles._calendario[:2] + (0,)  # pasó el intervalo
+            self.assertTrue(habiles.es_habil(feriado))
+            with self.assertNumQueries(1):  # sin cambios: solo la versión
+                habiles.es_habil(feriado)
+
+
+class HabitualistaConFeriadosTests(TestCase):
+    def setUp(self):
+        self.addCleanup(habiles.olvidar)
+        Feriado.objects.all().delete()
+        vehiculo = Vehiculo.objects.create(
+            marca="Ford", modelo="Ka", dominio="AAA111", anio=2020,
+            precio=Decimal("1000"), es_habitualista=True,
+        )
+        self.ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=vehiculo)
+        self.ficha.fecha_inscripcion_habitualista = date(2026, 1, 2)
+        self.ficha.save()
+
+    def _indice(self):
+        return VencimientoVehiculo.objects.get(campo="habitualista").fecha
+
+    def test_un_feriado_nuevo_corre_el_vencimiento(self):
+        sin_feriados = self.ficha.habitualista_vencimiento
+        self.assertEqual(self._indice(), sin_feriados)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Feriado.objects.create(fecha=date(2026, 2, 16), nombre="Carnaval")
+        self.assertEqual(self.ficha.habitualista_vencimiento, habiles.sumar(sin_feriados, 1))
+        self.assertEqual(self._indice(), self.ficha.habitualista_vencimiento)
+        self.assertEqual(vencimientos.actualizar_habitualistas(), 1)
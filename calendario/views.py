@@ -4,10 +4,11 @@ from django.http import JsonResponse, HttpResponse
 
 from django.conf import settings
 
-from vehiculos.models import FichaVehicular
+from vehiculos import vencimientos
 from calendario.models import Evento
 from agenda_pagos.models import PagoFuturo
 
+import calendar
 from datetime import date
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -21,6 +22,15 @@ def _es_admin_agenda(user):
     permitidos = {u.lower() for u in permitidos}
     return user.is_authenticated and (user.is_superuser or user.username.lower() in permitidos)
 
+# Color de cada tipo de vencimiento en el calendario
+COLORES_VENCIMIENTO = {
+    "vtv": "#dc3545",           # rojo
+    "verificacion": "#fd7e14",  # naranja
+    "patente": "#ffc107",       # amarillo
+    "habitualista": "#6f42c1",  # violeta
+}
+
+
 # ==========================================================
 # 📅 VISTA CALENDARIO
 # ==========================================================
@@ -31,7 +41,7 @@ def calendario_vencimientos(request):
 
 # ==========================================================
 # 📅 API DE EVENTOS (VENCIMIENTOS + TURNOS)
-# 👉 Vencimientos: FichaVehicular
+# 👉 Vencimientos: índice de vencimientos (vehiculos.vencimientos)
 # 👉 Turnos: Modelo Evento
 # ==========================================================
 @login_required
@@ -39,73 +49,26 @@ def api_calendario_vencimientos(request):
     eventos = {}
 
     # ==================================================
-    # 🔹 VENCIMIENTOS (DESDE FICHA VEHICULAR)
+    # 🔹 VENCIMIENTOS (ÍNDICE DE VENCIMIENTOS DE LAS FICHAS)
     # ==================================================
-    fichas = (
-        FichaVehicular.objects
-        .select_related("vehiculo")
-        .filter(vehiculo__estado="stock")
-    )
-
-    for ficha in fichas:
-        vehiculo = ficha.vehiculo
-        if not vehiculo:
-            continue
-
+    for venc in vencimientos.todos(vencimientos.VENCIMIENTOS):
+        vehiculo = venc.vehiculo
         base = f"{vehiculo.marca} {vehiculo.modelo} ({vehiculo.dominio})"
-
-        # 🆕 DATOS COMUNES DEL VEHÍCULO
-        vehiculo_data = {
+        # patente1 … patente5: un evento por cada vencimiento de patentes
+        clave = f"patente{venc.campo[-1]}" if venc.tipo == "patente" else venc.tipo
+        event_id = f"{clave}-{vehiculo.id}-{venc.fecha}"
+        eventos[event_id] = {
+            "id": event_id,
+            "start": venc.fecha,
+            "title": f"{venc.get_tipo_display()} – {base}",
+            "allDay": True,
+            "color": COLORES_VENCIMIENTO[venc.tipo],
+            # 🆕 DATOS COMUNES DEL VEHÍCULO
             "vehiculo_id": vehiculo.id,
             "vehiculo_info": base,
             "url": f"/vehiculos/ficha-completa/{vehiculo.id}/"  # 🔗 Link a la ficha
         }
 
-        # VTV
-        if ficha.vtv_vencimiento:
-            event_id = f"vtv-{vehiculo.id}-{ficha.vtv_vencimiento}"
-            eventos[event_id] = {
-                "id": event_id,
-                "start": ficha.vtv_vencimiento,
-                "title": f"Vencimiento VTV – {base}",
-                "allDay": True,
-                "color": "#dc3545",  # 🆕 Color rojo para vencimientos
-                **vehiculo_data  # 🆕 Datos del vehículo
-            }
-
-        # VERIFICACIÓN
-        if ficha.verificacion_vencimiento:
-            event_id = f"verificacion-{vehiculo.id}-{ficha.verificacion_vencimiento}"
-            eventos[event_id] = {
-                "id": event_id,
-                "start": ficha.verificacion_vencimiento,
-                "title": f"Vencimiento Verificación – {base}",
-                "allDay": True,
-                "color": "#fd7e14",  # 🆕 Color naranja
-                **vehiculo_data
-            }
-
-        # PATENTES (simplificado con loop)
-        patentes_vtos = [
-            (ficha.patentes_vto1, 1),
-            (ficha.patentes_vto2, 2),
-            (ficha.patentes_vto3, 3),
-            (ficha.patentes_vto4, 4),
-            (ficha.patentes_vto5, 5),
-        ]
-
-        for patente_vto, num in patentes_vtos:
-            if patente_vto:
-                event_id = f"patente{num}-{vehiculo.id}-{patente_vto}"
-                eventos[event_id] = {
-                    "id": event_id,
-                    "start": patente_vto,
-                    "title": f"Vencimiento Patente – {base}",
-                    "allDay": True,
-                    "color": "#ffc107",  # 🆕 Color amarillo
-                    **vehiculo_data
-                }
-
     # ==================================================
     # 🔹 TURNOS (MODELO EVENTO)
     # ==================================================
@@ -186,36 +149,17 @@ def calendario_pdf_mensual(request, anio, mes):
     eventos_pdf = []
 
     # ==================================================
-    # 🔹 VENCIMIENTOS (FICHA VEHICULAR)
+    # 🔹 VENCIMIENTOS (ÍNDICE DE VENCIMIENTOS DE LAS FICHAS)
     # ==================================================
-    fichas = (
-        FichaVehicular.objects
-        .select_related("vehiculo")
-        .filter(
-            vehiculo__estado="stock",
-            vehiculo__isnull=False
-        )
-    )
-
-    for ficha in fichas:
-        vehiculo = ficha.vehiculo
-        base = f"{vehiculo.marca} {vehiculo.modelo} ({vehiculo.dominio})"
-
-        def agregar(fecha, tipo):
-            if fecha and fecha.year == anio and fecha.month == mes:
-                eventos_pdf.append({
-                    "fecha": fecha,
-                    "tipo": tipo,
-                    "detalle": base
-                })
-
-        agregar(ficha.vtv_vencimiento, "Vencimiento VTV")
-        agregar(ficha.verificacion_vencimiento, "Vencimiento Verificación")
-        agregar(ficha.patentes_vto1, "Vencimiento Patente")
-        agregar(ficha.patentes_vto2, "Vencimiento Patente")
-        agregar(ficha.patentes_vto3, "Vencimiento Patente")
-        agregar(ficha.patentes_vto4, "Vencimiento Patente")
-        agregar(ficha.patentes_vto5, "Vencimiento Patente")
+    primer_dia = date(anio, mes, 1)
+    ultimo_dia = date(anio, mes, calendar.monthrange(anio, mes)[1])
+    for venc in vencimientos.en_ventana(primer_dia, ultimo_dia, tipos=vencimientos.VENCIMIENTOS):
+        vehiculo = venc.vehiculo
+        eventos_pdf.append({
+            "fecha": venc.fecha,
+            "tipo": venc.get_tipo_display(),
+            "detalle": f"{vehiculo.marca} {vehiculo.modelo} ({vehiculo.dominio})"
+        })
 
     # ==================================================
     # 🔹 TURNOS (EVENTOS)
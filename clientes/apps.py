@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ClientesConfig(AppConfig):
     name = 'clientes'
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
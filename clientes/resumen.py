@@ -0,0 +1,182 @@
+"""
+Resumen 360° de clientes: deuda total, monto vencido, planes activos,
+vehículos comprados y entregados en permuta, y último pago.
+
+Se calcula para uno o varios clientes con una cantidad fija de queries
+(cuentas con sus movimientos / planes / cuotas / pagos en prefetch, gastos
+de ingreso de las permutas agrupados, ventas y último pago) y se cachea
+por cliente en el cache compartido (settings.CACHES), así que invalidar
+vale para todos los workers. Los signals de `clientes.signals` invalidan
+la entrada del cliente cuando cambia alguna de las filas de las que sale;
+los inserts masivos que no disparan signals (p. ej.
+`vehiculos.services.registrar_pagos_gastos_lote`) llaman a `invalidar`.
+
+    resumen.de_cliente(cliente)          -> dict
+    resumen.de_clientes([id1, id2, ...]) -> {cliente_id: dict}
+    resumen.invalidar([cliente_id, ...])
+
+Lo usan la ficha del cliente, el CRM y el bot de WhatsApp.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+
+
+def ttl():
+    return getattr(settings, "CLIENTE_RESUMEN_CACHE_TTL", 300)
+
+
+def _clave(cliente_id):
+    return f"clientes:resumen:{cliente_id}"
+
+
+def invalidar(cliente_ids):
+    """Borra las entradas ya y de nuevo al confirmar la transacción del que
+    escribe: un worker que recalculó en el medio leyó las filas viejas."""
+    claves = [_clave(pk) for pk in set(cliente_ids) if pk]
+    if not claves:
+        return
+    cache.delete_many(claves)
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+
+def _vehiculo(v):
+    return {
+        "id": v.pk,
+        "texto": f"{v.marca} {v.modelo}" + (f" · {v.anio}" if v.anio else ""),
+        "dominio": v.dominio or "",
+    }
+
+
+def calcular(cliente_ids, hoy=None):
+    """Arma los resúmenes sin pasar por el cache: {cliente_id: dict}."""
+    from cuentas.models import CuentaCorriente, Pago
+    from vehiculos.models import Vehiculo
+    from vehiculos.services import saldos_gastos_cliente
+    from ventas.models import Venta
+
+    hoy = hoy or date.today()
+    cliente_ids = list(set(cliente_ids))
+    resumenes = {
+        pk: {
+            "deuda_total": Decimal("0"),
+            "monto_vencido": Decimal("0"),
+            "cuotas_vencidas": 0,
+            "cuentas_activas": 0,
+            "planes_activos": [],
+            "vehiculos_comprados": [],
+            "vehiculos_permuta": [],
+            "ultimo_pago": None,
+        }
+        for pk in cliente_ids
+    }
+    if not cliente_ids:
+        return resumenes
+
+    cuentas = list(
+        CuentaCorriente.objects
+        .filter(cliente_id__in=cliente_ids)
+        .exclude(estado="cerrada")
+        .prefetch_related("movimientos", "planes__cuotas__pagos")
+    )
+
+    # Usados de permuta por cuenta (los movimientos 'permuta' los marcan)
+    permutas = {
+        c.pk: {m.vehiculo_id for m in c.movimientos.all() if m.origen == "permuta" and m.vehiculo_id}
+        for c in cuentas
+    }
+    ids_permuta = set().union(*permutas.values()) if permutas else set()
+    gastos_permuta = saldos_gastos_cliente(ids_permuta)
+
+    for cuenta in cuentas:
+        r = resumenes[cuenta.cliente_id]
+        r["cuentas_activas"] += 1
+        r["deuda_total"] += cuenta.deuda_sin_gastos_permuta() + sum(
+            (gastos_permuta.get(v, Decimal("0")) for v in permutas[cuenta.pk]), Decimal("0"),
+        )
+        for plan in cuenta.planes.all():
+            cuotas = list(plan.cuotas.all())
+            vencidas = [
+                q for q in cuotas
+                if q.estado == "pendiente" and q.vencimiento < hoy and q.saldo_pendiente > 0
+            ]
+            r["cuotas_vencidas"] += len(vencidas)
+            r["monto_vencido"] += sum((q.saldo_pendiente for q in vencidas), Decimal("0"))
+            if plan.estado == "activo":
+                r["planes_activos"].append({
+                    "id": plan.pk,
+                    "cuenta_id": cuenta.pk,
+                    "cuotas": len(cuotas),
+                    "pagadas": sum(1 for q in cuotas if q.estado == "pagada"),
+                    "saldo": sum((q.saldo_pendiente for q in cuotas), Decimal("0")),
+                })
+
+    # Vehículos entregados en permuta (también los de cuentas ya cerradas)
+    for cliente_id, pk, marca, modelo, anio, dominio in (
+        Vehiculo.objects
+        .filter(
+            movimientos_cuenta__origen="permuta",
+            movimientos_cuenta__cuenta__cliente_id__in=cliente_ids,
+        )
+        .order_by("id")
+        .values_list("movimientos_cuenta__cuenta__cliente_id", "id", "marca", "modelo", "anio", "dominio")
+        .distinct()
+    ):
+        resumenes[cliente_id]["vehiculos_permuta"].append(
+            _vehiculo(Vehiculo(pk=pk, marca=marca, modelo=modelo, anio=anio, dominio=dominio))
+        )
+
+    ventas = (
+        Venta.objects
+        .filter(cliente_id__in=cliente_ids)
+        .exclude(estado="revertida")
+        .select_related("vehiculo")
+        .order_by("-fecha_venta", "-id")
+    )
+    for venta in ventas:
+        if venta.vehiculo_id:
+            resumenes[venta.cliente_id]["vehiculos_comprados"].append(_vehiculo(venta.vehiculo))
+
+    ultimos = (
+        Pago.objects
+        .filter(cuenta__cliente_id__in=cliente_ids)
+        .order_by()
+        .values("cuenta__cliente_id")
+        .annotate(ultimo=Max("id"))
+        .values_list("ultimo", flat=True)
+    )
+    for pago in Pago.objects.filter(pk__in=ultimos).select_related("cuenta"):
+        resumenes[pago.cuenta.cliente_id]["ultimo_pago"] = {
+            "id": pago.pk,
+            "fecha": pago.fecha,
+            "monto": pago.monto_total,
+            "recibo": pago.numero_recibo or "",
+        }
+    return resumenes
+
+
+def de_clientes(cliente_ids, refrescar=False):
+    """{cliente_id: resumen} leyendo del cache y calculando solo los que faltan."""
+    cliente_ids = list({getattr(c, "pk", c) for c in cliente_ids})
+    encontrados = {} if refrescar else cache.get_many([_clave(pk) for pk in cliente_ids])
+    resumenes = {}
+    faltan = []
+    for pk in cliente_ids:
+        if _clave(pk) in encontrados:
+            resumenes[pk] = encontrados[_clave(pk)]
+        else:
+            faltan.append(pk)
+    if faltan:
+        nuevos = calcular(faltan)
+        cache.set_many({_clave(pk): r for pk, r in nuevos.items()}, ttl())
+        resumenes.update(nuevos)
+    return resumenes
+
+
+def de_cliente(cliente, refrescar=False):
+    pk = getattr(cliente, "pk", cliente)
+    return de_clientes([pk], refrescar=refrescar)[pk]
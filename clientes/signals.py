@@ -0,0 +1,79 @@
+"""
+Invalida el resumen 360° cacheado (`clientes.resumen`) de los clientes
+afectados cuando cambia alguna de las filas de las que sale.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from clientes import resumen
+
+
+# (app_label, model_name) -> (lookup desde CuentaCorriente, atributo de la instancia).
+# None: la instancia tiene `cliente_id` propio.
+MODELOS_RESUMEN = {
+    ("cuentas", "CuentaCorriente"): None,
+    ("ventas", "Venta"): None,
+    ("cuentas", "MovimientoCuenta"): ("pk", "cuenta_id"),
+    ("cuentas", "PlanPago"): ("pk", "cuenta_id"),
+    ("cuentas", "Pago"): ("pk", "cuenta_id"),
+    ("cuentas", "CuotaPlan"): ("planes__id", "plan_id"),
+    ("cuentas", "PagoCuota"): ("planes__cuotas__id", "cuota_id"),
+    # Gastos de ingreso de un usado: pesan en la deuda de quien lo entregó
+    ("vehiculos", "PagoGastoIngreso"): ("movimientos__vehiculo_id", "vehiculo_id"),
+    ("vehiculos", "FichaVehicular"): ("movimientos__vehiculo_id", "vehiculo_id"),
+}
+
+
+def _clientes_de(instance):
+    ruta = MODELOS_RESUMEN[(instance._meta.app_label, instance._meta.object_name)]
+    if ruta is None:
+        return [instance.cliente_id]
+    lookup, attr = ruta
+    valor = getattr(instance, attr, None)
+    if valor is None:
+        return []
+    from cuentas.models import CuentaCorriente
+    return list(
+        CuentaCorriente.objects.filter(**{lookup: valor})
+        .values_list("cliente_id", flat=True).distinct()
+    )
+
+
+def _guardar_cliente_previo(sender, instance, update_fields=None, **kwargs):
+    """Si el save puede cambiar el cliente, recuerda el anterior (1 query)."""
+    instance._cliente_previo = None
+    if not instance.pk:
+        return
+    if update_fields is None or {"cliente", "cliente_id"} & set(update_fields):
+        instance._cliente_previo = (
+            sender.objects.filter(pk=instance.pk).values_list("cliente_id", flat=True).first()
+        )
+
+
+def _invalidar(sender, instance, **kwargs):
+    clientes = _clientes_de(instance)
+    previo = getattr(instance, "_cliente_previo", None)
+    if previo:
+        clientes.append(previo)
+    resumen.invalidar(clientes)
+
+
+def conectar_signals():
+    from django.apps import apps
+    for app_label, model_name in MODELOS_RESUMEN:
+        try:
+            Model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        if MODELOS_RESUMEN[(app_label, model_name)] is None:
+            pre_save.connect(
+                _guardar_cliente_previo, sender=Model, weak=False,
+                dispatch_uid=f"cliente_resumen_presave_{app_label}_{model_name}",
+            )
+        post_save.connect(
+            _invalidar, sender=Model, weak=False,
+            dispatch_uid=f"cliente_resumen_save_{app_label}_{model_name}",
+        )
+        post_delete.connect(
+            _invalidar, sender=Model, weak=False,
+            dispatch_uid=f"cliente_resumen_delete_{app_label}_{model_name}",
+        )
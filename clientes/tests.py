@@ -1,3 +1,81 @@
+"""
+Tests del resumen 360° del cliente: cantidad fija de queries para un lote,
+cache y su invalidación por signals.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cuentas.models import CuentaCorriente, CuotaPlan, Pago, PlanPago
+
+from . import resumen
+from .models import Cliente
+
+
+class ResumenClienteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clientes = []
+        for i in range(3):
+            cliente = Cliente.objects.create(nombre_completo=f"Cliente {i}")
+            cuenta = CuentaCorriente.objects.create(cliente=cliente)
+            plan = PlanPago.objects.create(
+                cuenta=cuenta, descripcion="Plan", cantidad_cuotas=2,
+                monto_cuota=Decimal("100"), fecha_inicio=date(2026, 1, 1),
+                monto_financiado=Decimal("200"),
+            )
+            CuotaPlan.objects.create(plan=plan, numero=1, vencimiento=date(2026, 2, 1), monto=Decimal("100"))
+            CuotaPlan.objects.create(plan=plan, numero=2, vencimiento=date(2099, 3, 1), monto=Decimal("100"))
+            self.clientes.append(cliente)
+        self.cliente = self.clientes[0]
+
+    def _queries(self, ids):
+        with CaptureQueriesContext(connection) as ctx:
+            resultado = resumen.calcular(ids, hoy=date(2026, 6, 1))
+        return len(ctx.captured_queries), resultado
+
+    def test_lote_en_queries_fijas(self):
+        uno, _ = self._queries([self.cliente.pk])
+        tres, resumenes = self._queries([c.pk for c in self.clientes])
+        self.assertEqual(uno, tres)
+        r = resumenes[self.cliente.pk]
+        self.assertEqual((r["monto_vencido"], r["cuotas_vencidas"]), (Decimal("100"), 1))
+        self.assertEqual(len(r["planes_activos"]), 1)
+
+    def test_cache_y_invalidacion(self):
+        self.assertIsNone(resumen.de_cliente(self.cliente)["ultimo_pago"])
+        with self.assertNumQueries(1):  # solo la lectura del cache compartido
+            resumen.de_clientes([c.pk for c in self.clientes[:1]])
+
+        pago = Pago.objects.create(
+            cuenta=self.cliente.cuentas_corrientes.get(), monto_total=Decimal("50"), forma_pago="efectivo",
+        )
+        self.assertEqual(resumen.de_cliente(self.cliente)["ultimo_pago"]["id"], pago.pk)
+
+    def test_cambiar_cliente_invalida_los_dos(self):
+        otro = self.clientes[1]
+        resumen.de_clientes([self.cliente.pk, otro.pk])
+        cuenta = self.cliente.cuentas_corrientes.get()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            cuenta.cliente = otro
+            cuenta.save()
+            # Un worker que recalcula antes del commit deja el resumen viejo...
+            resumen.de_clientes([self.cliente.pk, otro.pk])
+        # ...y el borrado al confirmar lo descarta.
+        self.assertTrue(callbacks)
+        self.assertEqual(cache.get_many([resumen._clave(self.cliente.pk), resumen._clave(otro.pk)]), {})
+        self.assertEqual(resumen.de_cliente(self.cliente)["cuentas_activas"], 0)
+        self.assertEqual(resumen.de_cliente(otro)["cuentas_activas"], 2)
+
+    def test_detalle_cliente_muestra_resumen(self):
+        from django.contrib.auth.models import User
 
-# Create your tests here.
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        r = self.client.get(reverse("clientes:detalle_cliente", args=[self.cliente.pk]), secure=True)
+        self.assertEqual(r.status_code, 200)
+        self.assertContains(r, "Deuda total")
@@ -7,6 +7,7 @@ from decimal import Decimal
 from django.utils import timezone
 from django.http import JsonResponse
 
+from . import resumen
 from .models import Cliente
 from .forms import ClienteForm
 from cuentas.models import CuentaCorriente, CuotaPlan
@@ -14,21 +15,27 @@ from ventas.models import Venta
 from boletos.models import BoletoCompraventa
 
 
-# ==========================================================
-# LISTA DE CLIENTES
-# ==========================================================
-@login_required(login_url='ingreso')
-def lista_clientes(request):
-    query = request.GET.get('q', '')
-
+def clientes_filtrados(query):
+    """Clientes activos del listado (búsqueda por nombre / teléfono /
+    email). La usan la lista y su PDF."""
     clientes = Cliente.objects.filter(activo=True).order_by('nombre_completo')
-
     if query:
         clientes = clientes.filter(
             Q(nombre_completo__icontains=query) |
             Q(telefono__icontains=query) |
             Q(email__icontains=query)
         )
+    return clientes
+
+
+# ==========================================================
+# LISTA DE CLIENTES
+# ==========================================================
+@login_required(login_url='ingreso')
+def lista_clientes(request):
+    query = request.GET.get('q', '')
+
+    clientes = clientes_filtrados(query)
 
     hoy = timezone.now().date()
     clientes_con_estado = []
@@ -85,28 +92,24 @@ def pdf_lista_clientes(request):
     from reportes.pdf_utils import render_pdf_listado
 
     query = request.GET.get('q', '')
-    clientes = Cliente.objects.filter(activo=True).order_by('nombre_completo')
-    if query:
-        clientes = clientes.filter(
-            Q(nombre_completo__icontains=query) |
-            Q(telefono__icontains=query) |
-            Q(email__icontains=query)
-        )
+    clientes = clientes_filtrados(query).values(
+        'nombre_completo', 'dni_cuit', 'telefono', 'email',
+    )
 
-    filas = [
+    filas = (
         [
-            c.nombre_completo,
-            c.dni_cuit or "—",
-            c.telefono or "—",
-            c.email or "—",
+            c['nombre_completo'],
+            c['dni_cuit'] or "—",
+            c['telefono'] or "—",
+            c['email'] or "—",
         ]
-        for c in clientes
-    ]
+        for c in clientes.iterator(chunk_size=500)
+    )
 
     return render_pdf_listado(
         filename="clientes.pdf",
         titulo="Listado de Clientes",
-        subtitulo=(f"Búsqueda: «{query}» – " if query else "") + f"{len(filas)} cliente(s)",
+        subtitulo=lambda n: (f"Búsqueda: «{query}» – " if query else "") + f"{n} cliente(s)",
         columnas=["Nombre", "DNI / CUIT", "Teléfono", "Email"],
         filas=filas,
         pie=f"Generado el {date.today().strftime('%d/%m/%Y')}",
@@ -156,6 +159,8 @@ def detalle_cliente(request, cliente_id):
         .prefetch_related('planes')
         .order_by('-creada')
     )
+    # Deuda / vencido / planes / último pago: resumen 360° cacheado
+    resumen_cliente = resumen.de_cliente(cliente)
     # Compatibilidad: algunos lugares siguen usando una sola cuenta.
     cuenta_activa = cuentas_activas[0] if cuentas_activas else None
 
@@ -190,6 +195,7 @@ def detalle_cliente(request, cliente_id):
             'cuentas_historial': cuentas_historial,
             'boletos': boletos,
             'tiene_venta_0km': tiene_venta_0km,
+            'resumen': resumen_cliente,
         }
     )
 
@@ -289,31 +295,3 @@ def cliente_datos_ajax(request):
         "domicilio": cliente.direccion or "",
     })
 
-
-# ==========================================================
-# HISTORIAL DE FINANCIACIÓN (CUENTA CERRADA)
-# ==========================================================
-@login_required(login_url='ingreso')
-def historial_financiacion(request, cuenta_id):
-    cuenta = get_object_or_404(
-        CuentaCorriente.objects.select_related(
-            'cliente',
-            'venta',
-            'venta__vehiculo'
-        ),
-        id=cuenta_id,
-        estado='cerrada'
-    )
-
-    plan = getattr(cuenta, 'plan_pago', None)
-    cuotas = plan.cuotas.all().order_by('numero') if plan else []
-
-    return render(
-        request,
-        'cuentas/historial_financiacion.html',
-        {
-            'cuenta': cuenta,
-            'plan': plan,
-            'cuotas': cuotas,
-        }
-    )
\ No newline at end of file
@@ -7,7 +7,6 @@ from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.db.models import Q
 from datetime import date
 from io import BytesIO
-import urllib.request
 
 from PIL import Image as PILImage, ImageOps
 
@@ -250,11 +249,22 @@ def catalogo_publico(request):
 # ==========================================================
 # PDF CATÁLOGO (SIN PRECIO)
 # ==========================================================
+_GRIS_DATO = colors.HexColor("#555555")
+_ESTILO_FILA_CATALOGO = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+])
+
+
 @login_not_required
 def catalogo_pdf(request):
+    from reportes.pdf_utils import encabezado, estilo, imagen_remota, pie_empresa
+
     vehiculos = Vehiculo.objects.filter(
         estado__in=["stock", "temporal"]
-    ).order_by("marca", "modelo")
+    ).order_by("marca", "modelo").prefetch_related("fotos")
 
     hoy = date.today()
     buffer = BytesIO()
@@ -264,37 +274,24 @@ def catalogo_pdf(request):
         rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30,
     )
 
-    AZUL = colors.HexColor("#002855")
-    GRIS = colors.HexColor("#F4F6F8")
-
     elementos = []
 
     # Header
-    header = Table([[
-        Paragraph(
-            "<b>AMICHETTI AUTOMOTORES</b><br/>Catálogo de vehículos en stock",
-            ParagraphStyle("h1", fontSize=14, textColor=colors.white)
-        ),
-        Paragraph(
-            f"Fecha: {hoy.strftime('%d/%m/%Y')}",
-            ParagraphStyle("h2", fontSize=10, textColor=colors.white, alignment=2)
-        ),
-    ]], colWidths=[340, 180])
-    header.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), AZUL),
-        ("PADDING", (0, 0), (-1, -1), 14),
-    ]))
-    elementos.append(header)
+    elementos.append(encabezado(
+        "<b>AMICHETTI AUTOMOTORES</b><br/>Catálogo de vehículos en stock",
+        f"Fecha: {hoy.strftime('%d/%m/%Y')}",
+    ))
     elementos.append(Spacer(1, 16))
 
-    # Recorrer vehículos de a 2 por fila
+    # Recorrer vehículos de a 2 por fila (portada elegida sobre las fotos ya traídas)
     vehiculos_con_foto = []
     for v in vehiculos:
-        portada = v.fotos.filter(es_portada=True).first() or v.fotos.first()
+        fotos = list(v.fotos.all())
+        portada = next((f for f in fotos if f.es_portada), fotos[0] if fotos else None)
         vehiculos_con_foto.append((v, portada))
 
-    estilo_titulo = ParagraphStyle("t", fontSize=11, fontName="Helvetica-Bold", leading=13)
-    estilo_dato = ParagraphStyle("d", fontSize=9, textColor=colors.HexColor("#555555"), leading=11)
+    estilo_titulo = estilo("t", fontSize=11, fontName="Helvetica-Bold", leading=13)
+    estilo_dato = estilo("d", fontSize=9, textColor=_GRIS_DATO, leading=11)
 
     for i in range(0, len(vehiculos_con_foto), 2):
         celdas = []
@@ -323,7 +320,7 @@ def catalogo_pdf(request):
                         if len(url_parts) == 2:
                             url = f"{url_parts[0]}/upload/w_350,q_auto,f_jpg/{url_parts[1]}"
 
-                    img_data = BytesIO(urllib.request.urlopen(url).read())
+                    img_data = BytesIO(imagen_remota(url))
                     img = Image(img_data, width=10 * cm, height=6.5 * cm)
                     img.hAlign = "CENTER"
                     parts.insert(0, img)
@@ -336,19 +333,13 @@ def catalogo_pdf(request):
             celdas.append(parts)
 
         fila = Table([celdas], colWidths=[doc.width / 2, doc.width / 2])
-        fila.setStyle(TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-        ]))
+        fila.setStyle(_ESTILO_FILA_CATALOGO)
         elementos.append(fila)
 
     # Pie
     elementos.append(Spacer(1, 16))
-    elementos.append(Paragraph(
+    elementos.append(pie_empresa(
         f"Total: {len(vehiculos_con_foto)} vehículos · Amichetti Automotores · Rojas, Buenos Aires",
-        ParagraphStyle("f", fontSize=8, textColor=colors.grey, alignment=1),
     ))
 
     doc.build(elementos)
@@ -45,6 +45,10 @@ class Proveedor(models.Model):
 
     @property
     def deuda_total(self) -> Decimal:
+        # Anotado por compraventa.saldos.proveedores_con_deuda: sin queries
+        anotado = getattr(self, "deuda_anotada", None)
+        if anotado is not None:
+            return anotado
         total = Decimal("0")
         for d in self.deudas.all():
             total += d.saldo
@@ -160,6 +164,13 @@ class DeudaProveedor(models.Model):
     # ======================================================
     @property
     def monto_pagado(self) -> Decimal:
+        # Anotado por compraventa.saldos.con_saldos, o con los pagos en
+        # prefetch: sin query. Si no, un aggregate.
+        anotado = getattr(self, "pagado_anotado", None)
+        if anotado is not None:
+            return anotado
+        if "pagos" in getattr(self, "_prefetched_objects_cache", {}):
+            return sum((p.monto for p in self.pagos.all()), Decimal("0"))
         agg = self.pagos.aggregate(models.Sum("monto"))
         return agg["monto__sum"] or Decimal("0")
 
@@ -0,0 +1,78 @@
+"""
+Saldos de la cuenta con proveedores (lo que nosotros debemos).
+
+    saldos.con_saldos(qs)                  -> deudas con `pagado_anotado` / `saldo_anotado`
+    saldos.totales(qs)                     -> {"comprado", "pagado", "saldo", "con_saldo"}
+    saldos.totales_por_proveedor([ids])    -> {proveedor_id: totales}
+    saldos.proveedores_con_deuda(qs)       -> proveedores con `deuda_anotada`
+
+Lo pagado sale de una subquery agrupada de PagoProveedor, así que cada
+listado o total es una sola query sin importar la cantidad de deudas.
+`DeudaProveedor.monto_pagado` / `saldo` y `Proveedor.deuda_total` usan la
+anotación (o el prefetch de `pagos`) cuando está.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import DeudaProveedor, PagoProveedor, Proveedor
+
+_MONTO = DecimalField(max_digits=14, decimal_places=2)
+_CERO = Value(Decimal("0"))
+
+
+def con_saldos(qs=None):
+    """Anota `pagado_anotado` y `saldo_anotado` en cada deuda."""
+    qs = DeudaProveedor.objects.all() if qs is None else qs
+    pagado = (
+        PagoProveedor.objects.filter(deuda=OuterRef("pk"))
+        .order_by().values("deuda").annotate(t=Sum("monto")).values("t")[:1]
+    )
+    return qs.annotate(
+        pagado_anotado=Coalesce(Subquery(pagado), _CERO, output_field=_MONTO),
+    ).annotate(
+        saldo_anotado=Coalesce("monto_total", _CERO, output_field=_MONTO) - Coalesce(
+            "pagado_anotado", _CERO, output_field=_MONTO,
+        ),
+    )
+
+
+def _agregados():
+    return {
+        "comprado": Coalesce(Sum("monto_total"), _CERO, output_field=_MONTO),
+        "pagado": Coalesce(Sum("pagado_anotado"), _CERO, output_field=_MONTO),
+        "saldo": Coalesce(Sum("saldo_anotado"), _CERO, output_field=_MONTO),
+        "con_saldo": Count("id", filter=Q(saldo_anotado__gt=0)),
+    }
+
+
+def totales(qs=None):
+    """Comprado / pagado / saldo / deudas con saldo de `qs` (1 query)."""
+    return con_saldos(qs).aggregate(**_agregados())
+
+
+def totales_por_proveedor(proveedor_ids=None):
+    """{proveedor_id: totales} en una query agrupada."""
+    qs = DeudaProveedor.objects.all()
+    if proveedor_ids is not None:
+        qs = qs.filter(proveedor_id__in=list(proveedor_ids))
+    filas = con_saldos(qs).order_by().values("proveedor_id").annotate(**_agregados())
+    return {f.pop("proveedor_id"): f for f in filas}
+
+
+def proveedores_con_deuda(qs=None):
+    """Anota `deuda_anotada` (comprado − pagado) en cada proveedor."""
+    qs = Proveedor.objects.all() if qs is None else qs
+    comprado = (
+        DeudaProveedor.objects.filter(proveedor=OuterRef("pk"))
+        .order_by().values("proveedor").annotate(t=Sum("monto_total")).values("t")[:1]
+    )
+    pagado = (
+        PagoProveedor.objects.filter(deuda__proveedor=OuterRef("pk"))
+        .order_by().values("deuda__proveedor").annotate(t=Sum("monto")).values("t")[:1]
+    )
+    return qs.annotate(
+        deuda_anotada=Coalesce(Subquery(comprado), _CERO, output_field=_MONTO)
+        - Coalesce(Subquery(pagado), _CERO, output_field=_MONTO),
+    )
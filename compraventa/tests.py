@@ -1,3 +1,96 @@
+"""
+Tests de los saldos con proveedores: lo pagado y el saldo salen de una
+subquery agrupada, así que los totales y los listados no hacen una query
+por deuda.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from vehiculos.models import Vehiculo
+
+from . import saldos
+from .models import DeudaProveedor, PagoProveedor, Proveedor
+
+
+def _deuda(proveedor, dominio, total, pagos=()):
+    vehiculo = Vehiculo.objects.create(
+        marca="Ford", modelo="Ka", dominio=dominio, anio=2020, precio=Decimal("1000"),
+    )
+    deuda = DeudaProveedor.objects.create(
+        proveedor=proveedor, vehiculo=vehiculo, monto_total=Decimal(total),
+    )
+    for monto in pagos:
+        PagoProveedor.objects.create(deuda=deuda, monto=Decimal(monto))
+    return deuda
+
+
+class SaldosProveedorTests(TestCase):
+    def setUp(self):
+        self.uno = Proveedor.objects.create(nombre_empresa="Uno", cuit="20-11111111-1")
+        self.dos = Proveedor.objects.create(nombre_empresa="Dos", cuit="20-22222222-2")
+        _deuda(self.uno, "AAA111", "1000", ["300", "200"])
+        _deuda(self.uno, "AAA222", "500", ["500"])
+        _deuda(self.dos, "BBB111", "800")
+
+    def test_totales_en_una_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            t = saldos.totales()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(t["comprado"], Decimal("2300"))
+        self.assertEqual(t["pagado"], Decimal("1000"))
+        self.assertEqual(t["saldo"], Decimal("1300"))
+        self.assertEqual(t["con_saldo"], 2)
+
+    def test_totales_por_proveedor(self):
+        por_prov = saldos.totales_por_proveedor()
+        self.assertEqual(por_prov[self.uno.pk]["saldo"], Decimal("500"))
+        self.assertEqual(por_prov[self.uno.pk]["con_saldo"], 1)
+        self.assertEqual(por_prov[self.dos.pk]["pagado"], Decimal("0"))
+        self.assertEqual(por_prov[self.dos.pk]["saldo"], Decimal("800"))
+
+    def test_properties_usan_la_anotacion(self):
+        deudas = list(saldos.con_saldos().order_by("id"))
+        with CaptureQueriesContext(connection) as ctx:
+            valores = [(d.monto_pagado, d.saldo) for d in deudas]
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(valores, [
+            (Decimal("500"), Decimal("500")),
+            (Decimal("500"), Decimal("0")),
+            (Decimal("0"), Decimal("800")),
+        ])
+        # Sin anotar sigue dando lo mismo (aggregate)
+        sueltas = DeudaProveedor.objects.order_by("id")
+        self.assertEqual([(d.monto_pagado, d.saldo) for d in sueltas], valores)
+
+    def test_deuda_total_del_proveedor_anotada(self):
+        proveedores = {p.pk: p for p in saldos.proveedores_con_deuda()}
+        with CaptureQueriesContext(connection) as ctx:
+            uno, dos = proveedores[self.uno.pk].deuda_total, proveedores[self.dos.pk].deuda_total
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual((uno, dos), (Decimal("500"), Decimal("800")))
+        self.assertEqual(Proveedor.objects.get(pk=self.uno.pk).deuda_total, Decimal("500"))
+
+    def test_vistas_con_queries_constantes(self):
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        urls = [
+            reverse("compraventa:home"),
+            reverse("compraventa:proveedor_cuenta_corriente", args=[self.uno.pk]),
+        ]
+        antes = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+            antes[url] = len(ctx.captured_queries)
 
-# Create your tests here.
+        for i in range(5):
+            _deuda(self.uno, f"CCC{i:03}", "100", ["50"])
+        Proveedor.objects.create(nombre_empresa="Tres", cuit="20-33333333-3")
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+            self.assertEqual(len(ctx.captured_queries), antes[url], url)
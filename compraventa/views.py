@@ -12,6 +12,7 @@ from .models import (
     PagoProveedor,
     ReintegroProveedor,
 )
+from . import saldos
 from .forms import (
     ProveedorForm,
     CompraOperacionForm,
@@ -47,7 +48,7 @@ def _parse_monto(raw):
 def compraventa_home(request):
     q = request.GET.get("q", "").strip()
 
-    proveedores = Proveedor.objects.all().order_by("nombre_empresa")
+    proveedores = saldos.proveedores_con_deuda().order_by("nombre_empresa")
     if q:
         proveedores = proveedores.filter(
             Q(nombre_empresa__icontains=q) |
@@ -56,13 +57,10 @@ def compraventa_home(request):
             Q(ciudad__icontains=q)
         )
 
-    # Resumen general
-    total_deuda = Decimal("0")
-    total_pagado = Decimal("0")
-    for p in Proveedor.objects.all():
-        for d in p.deudas.all():
-            total_deuda += d.monto_total
-            total_pagado += d.monto_pagado
+    # Resumen general (1 query)
+    resumen = saldos.totales()
+    total_deuda = resumen["comprado"]
+    total_pagado = resumen["pagado"]
 
     return render(
         request,
@@ -182,11 +180,11 @@ def proveedor_unidades(request, proveedor_id):
     # 🆕 OPTIMIZACIÓN: Traer todas las deudas de una sola vez
     vehiculos_ids = [op.vehiculo.id for op in operaciones if op.vehiculo]
     deudas_dict = {
-        d.vehiculo_id: d 
-        for d in DeudaProveedor.objects.filter(
+        d.vehiculo_id: d
+        for d in saldos.con_saldos(DeudaProveedor.objects.filter(
             proveedor=proveedor,
             vehiculo_id__in=vehiculos_ids
-        )
+        ))
     }
     
     # Agregar información de deuda a cada operación y separar stock / vendidas
@@ -236,11 +234,9 @@ def proveedor_cuenta_corriente(request, proveedor_id):
     No modifica nada: solo lectura y render.
     """
     proveedor = get_object_or_404(Proveedor, id=proveedor_id)
-    deudas = (
-        DeudaProveedor.objects
-        .filter(proveedor=proveedor)
+    deudas = list(
+        saldos.con_saldos(DeudaProveedor.objects.filter(proveedor=proveedor))
         .select_related("vehiculo")
-        .prefetch_related("pagos")
         .order_by("-creado")
     )
     pagos = (
@@ -249,11 +245,11 @@ def proveedor_cuenta_corriente(request, proveedor_id):
         .select_related("deuda", "deuda__vehiculo")
         .order_by("-fecha", "-id")
     )
-    
-    # 🆕 USAR MÉTODOS PROPERTY EN VEZ DE CÁLCULOS MANUALES
-    total_deuda = sum([d.monto_total or 0 for d in deudas], 0)
-    total_pagado = sum([d.monto_pagado for d in deudas], 0)
-    saldo_total = sum([d.saldo for d in deudas], 0)
+
+    # Los montos vienen anotados en las deudas: se suman en memoria
+    total_deuda = sum((d.monto_total or 0 for d in deudas), Decimal("0"))
+    total_pagado = sum((d.monto_pagado for d in deudas), Decimal("0"))
+    saldo_total = sum((d.saldo for d in deudas), Decimal("0"))
     
     return render(
         request,
@@ -577,10 +573,10 @@ def proveedor_pdf(request, proveedor_id):
         elementos.append(tb)
         elementos.append(Spacer(1, 20))
 
-    # Resumen deuda
-    deudas = proveedor.deudas.all()
-    total_comprado = sum(d.monto_total for d in deudas)
-    total_pagado = sum(d.monto_pagado for d in deudas)
+    # Resumen deuda (1 query)
+    resumen_prov = saldos.totales(proveedor.deudas.all())
+    total_comprado = resumen_prov["comprado"]
+    total_pagado = resumen_prov["pagado"]
     saldo = total_comprado - total_pagado
 
     elementos.append(Paragraph("<b>RESUMEN FINANCIERO</b>", ParagraphStyle("sec3", fontSize=12, textColor=COLOR_AZUL, spaceAfter=10)))
@@ -615,11 +611,11 @@ def proveedor_cuenta_corriente_pdf(request, proveedor_id):
     proveedor = get_object_or_404(Proveedor, id=proveedor_id)
     hoy = date.today()
 
-    deudas = proveedor.deudas.select_related("vehiculo").all()
+    deudas = list(saldos.con_saldos(proveedor.deudas.select_related("vehiculo")))
     pagos = PagoProveedor.objects.filter(deuda__proveedor=proveedor).select_related("deuda__vehiculo").order_by("-fecha")
 
-    total_comprado = sum(d.monto_total for d in deudas)
-    total_pagado = sum(d.monto_pagado for d in deudas)
+    total_comprado = sum((d.monto_total for d in deudas), Decimal("0"))
+    total_pagado = sum((d.monto_pagado for d in deudas), Decimal("0"))
     saldo = total_comprado - total_pagado
 
     response = HttpResponse(content_type="application/pdf")
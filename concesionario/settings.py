@@ -39,6 +39,11 @@ if RENDER_HOST:
 
 ALLOWED_HOSTS.append(".onrender.com")
 
+# Proxies delante de la app que agregan su salto a X-Forwarded-For (Render:
+# uno). La IP del cliente es la que anotó el último de ellos; las entradas
+# anteriores las manda el cliente y no sirven para auditoría ni límites.
+PROXIES_CONFIABLES = int(os.getenv("PROXIES_CONFIABLES", "1"))
+
 # ==========================================================
 # CSRF (RENDER / PRODUCCIÓN)
 # ==========================================================
@@ -141,10 +146,18 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "auditoria.middleware.AuditoriaMiddleware",
+    # Perfilador de SQL / latencia (opt-in, ver PERFILADOR_*)
+    "auditoria.middleware.PerfiladorMiddleware",
     "auditoria.middleware.NoBrowserCacheMiddleware",
     "permisos.middleware.PermisosMiddleware",
 ]
 
+# Perfilador de requests: para admins (PERFILADOR_ADMINS=True) o con el
+# header X-Perfilar: <PERFILADOR_TOKEN>. Guarda las últimas N mediciones.
+PERFILADOR_ADMINS = os.getenv("PERFILADOR_ADMINS", "False") == "True"
+PERFILADOR_TOKEN = os.getenv("PERFILADOR_TOKEN", "")
+PERFILADOR_MAX_FILAS = int(os.getenv("PERFILADOR_MAX_FILAS", "5000"))
+
 # ==========================================================
 # URLS / WSGI
 # ==========================================================
@@ -266,6 +279,51 @@ LOGIN_URL = "ingreso"
 LOGIN_REDIRECT_URL = "inicio"
 LOGOUT_REDIRECT_URL = "ingreso"
 
+# ==========================================================
+# CACHE
+# Compartido entre todos los workers de gunicorn (tabla en la misma base,
+# la crea la migración inicio.0005): lo que invalida un proceso deja de
+# valer para todos. El dashboard de inicio cachea sus paneles unos
+# segundos y el resumen 360° de cada cliente unos minutos; los dos se
+# invalidan al guardar. El bot de WhatsApp guarda ahí las páginas de
+# stock / precios y el cursor de cada teléfono; el contacto web, sus
+# claves de dedupe.
+# ==========================================================
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache_compartido",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    }
+}
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "60"))
+CLIENTE_RESUMEN_CACHE_TTL = int(os.getenv("CLIENTE_RESUMEN_CACHE_TTL", "300"))
+# Cada cuántos segundos un proceso mira si cambiaron los feriados (calendario.habiles)
+CALENDARIO_REVISION = int(os.getenv("CALENDARIO_REVISION", "30"))
+# Tope en bytes del cache por proceso de fotos achicadas de los PDFs (reportes.pdf_utils)
+PDF_IMAGENES_CACHE_BYTES = int(os.getenv("PDF_IMAGENES_CACHE_BYTES", str(8 * 1024 * 1024)))
+WHATSAPP_CURSOR_TTL = int(os.getenv("WHATSAPP_CURSOR_TTL", "1800"))
+
+# ==========================================================
+# AVISOS EN VIVO (recordatorios + CRM, ver proyectos.avisos)
+# SSE bajo ASGI; bajo WSGI el navegador consulta al cargar cada página y
+# al volver a la pestaña (sin timer), y la consulta responde enseguida.
+# Sin cache compartido, los cambios de otros procesos se ven en la
+# revisión de cada AVISOS_REVISION segundos.
+# ==========================================================
+AVISOS_REVISION = int(os.getenv("AVISOS_REVISION", "120"))
+AVISOS_LATIDO = int(os.getenv("AVISOS_LATIDO", "20"))
+
+# ==========================================================
+# PDF DE LOTES DE PAGARÉS (ver boletos.lotes)
+# Se genera en un hilo al confirmar el lote; en "0" se genera en la misma
+# request. Los que queden en cola los toma `generar_pdfs_pagares`; uno en
+# cola o generándose hace más de PAGARES_PDF_VENCIMIENTO minutos se da por
+# trabado (se retoma y `ver_lote` ofrece reintentar).
+# ==========================================================
+PAGARES_PDF_EN_SEGUNDO_PLANO = os.getenv("PAGARES_PDF_EN_SEGUNDO_PLANO", "1") == "1"
+PAGARES_PDF_VENCIMIENTO = int(os.getenv("PAGARES_PDF_VENCIMIENTO", "10"))
+
 # ==========================================================
 # DEFAULT FIELD
 # ==========================================================
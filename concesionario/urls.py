@@ -27,6 +27,7 @@ urlpatterns = [
     # 🏠 DASHBOARD PRINCIPAL
     # ===============================
     path('inicio/', inicio_views.inicio, name='inicio'),
+    path('inicio/tiempos/', inicio_views.dashboard_tiempos, name='dashboard_tiempos'),
 
     # PDF: documentación para la entrega de un vehículo
     path('doc-entrega/pdf/', inicio_views.doc_entrega_pdf, name='doc_entrega_pdf'),
@@ -0,0 +1,159 @@
+"""
+Entrada del formulario de contacto público (`crm.views.contacto_publico`).
+
+Es un endpoint sin login, así que antes de crear nada:
+  - `permitir(ip, telefono)`: token bucket por IP y por teléfono (ráfaga
+    corta permitida, después N por hora). Cada balde es una fila de
+    `BaldeContacto` que se toma con SELECT ... FOR UPDATE: el límite es
+    el mismo con uno o N workers y dos requests no gastan la misma ficha.
+  - `es_repetido(datos)`: el mismo envío dentro de la ventana de dedupe
+    se responde como enviado pero no se vuelve a guardar. Usa `add` del
+    cache compartido (clave única en la tabla), que es atómico.
+
+`registrar` guarda el prospecto y agrupa los avisos: mientras la última
+notificación "desde la web" siga sin leer y dentro de la ventana, se
+actualiza esa misma fila en lugar de crear una por contacto, así una
+ráfaga deja un solo aviso en el dashboard.
+
+Las opciones de vehículos del formulario se cachean unos segundos.
+"""
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# (fichas de ráfaga, fichas que se recargan por hora)
+LIMITES = {
+    "ip": (5, 10),
+    "telefono": (3, 4),
+}
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def _hash(*partes):
+    return hashlib.sha1("|".join(str(p) for p in partes).encode()).hexdigest()[:20]
+
+
+# ==========================================================
+# RATE LIMIT (token bucket en la base)
+# ==========================================================
+def _tomar_ficha(clave, capacidad, por_hora, ahora, recarga):
+    from .models import BaldeContacto
+
+    with transaction.atomic():
+        balde, nuevo = BaldeContacto.objects.select_for_update().get_or_create(
+            clave=clave, defaults={"fichas": capacidad, "desde": ahora},
+        )
+        if nuevo:
+            # Un balde que ya se volvió a llenar equivale a no tener fila
+            BaldeContacto.objects.filter(desde__lt=ahora - recarga).delete()
+        fichas = min(capacidad, balde.fichas + max(ahora - balde.desde, 0) * por_hora / 3600)
+        permitido = fichas >= 1
+        if permitido:
+            fichas -= 1
+        BaldeContacto.objects.filter(pk=balde.pk).update(fichas=fichas, desde=ahora)
+    return permitido
+
+
+def permitir(ip, telefono="", ahora=None):
+    """False si la IP o el teléfono ya agotaron sus fichas."""
+    limites = _config("CONTACTO_LIMITES", LIMITES)
+    ahora = time.time() if ahora is None else ahora
+    recarga = max(capacidad * 3600 / por_hora for capacidad, por_hora in limites.values())
+    if ip and not _tomar_ficha(f"ip:{_hash(ip)}", *limites["ip"], ahora, recarga):
+        return False
+    digitos = re.sub(r"\D", "", telefono or "")
+    if digitos and not _tomar_ficha(f"tel:{_hash(digitos)}", *limites["telefono"], ahora, recarga):
+        return False
+    return True
+
+
+# ==========================================================
+# DEDUPE
+# ==========================================================
+def es_repetido(datos):
+    """True si el mismo envío ya entró dentro de la ventana."""
+    clave = "crm:contacto:dup:" + _hash(
+        datos["nombre"].lower(), re.sub(r"\D", "", datos["telefono"]),
+        datos["email"].lower(), datos["vehiculo_id"], datos["vehiculo_texto"].lower(),
+    )
+    return not cache.add(clave, 1, _config("CONTACTO_VENTANA_DEDUPE", 600))
+
+
+# ==========================================================
+# OPCIONES DEL FORMULARIO
+# ==========================================================
+def opciones_vehiculos():
+    """Vehículos en stock para el select (lista de dicts, cacheada)."""
+    opciones = cache.get("crm:contacto:vehiculos")
+    if opciones is None:
+        from vehiculos.models import Vehiculo
+        opciones = list(
+            Vehiculo.objects.filter(estado="stock").order_by("marca", "modelo")
+            .values("id", "marca", "modelo", "anio", "dominio")
+        )
+        cache.set("crm:contacto:vehiculos", opciones, _config("CONTACTO_STOCK_TTL", 60))
+    return opciones
+
+
+# ==========================================================
+# REGISTRO DEL CONTACTO
+# ==========================================================
+_AVISO = "crm:contacto:aviso"
+
+
+def _avisar(prospecto, vehiculo, descripcion_veh):
+    from .models import NotificacionCRM
+
+    ventana = _config("CONTACTO_VENTANA_AVISOS", 300)
+    aviso = cache.get(_AVISO)
+    if aviso:
+        nombres = aviso["nombres"] + [prospecto.nombre_completo]
+        mensaje = (
+            f"{len(nombres)} contactos nuevos desde la web: " + ", ".join(nombres[-5:])
+        )[:300]
+        # El último contacto queda como el de la notificación
+        if NotificacionCRM.objects.filter(pk=aviso["id"], leida=False).update(
+            prospecto=prospecto, vehiculo=None, mensaje=mensaje,
+        ):
+            cache.set(_AVISO, {"id": aviso["id"], "nombres": nombres}, ventana)
+            return
+
+    notificacion = NotificacionCRM.objects.create(
+        prospecto=prospecto,
+        vehiculo_id=vehiculo["id"] if vehiculo else None,
+        mensaje=f"Nuevo contacto desde la web: {prospecto.nombre_completo}{descripcion_veh}"[:300],
+    )
+    cache.set(_AVISO, {"id": notificacion.pk, "nombres": [prospecto.nombre_completo]}, ventana)
+
+
+def registrar(datos, vehiculo=None):
+    """Crea el prospecto y su aviso (agrupado). `vehiculo` es una opción de
+    `opciones_vehiculos()` o None."""
+    from .models import Prospecto
+
+    descripcion_veh = ""
+    if vehiculo:
+        descripcion_veh = f" – interés en {vehiculo['marca']} {vehiculo['modelo']}"
+    elif datos["vehiculo_texto"]:
+        descripcion_veh = f" – interés en {datos['vehiculo_texto'][:80]}"
+
+    with transaction.atomic():
+        prospecto = Prospecto.objects.create(
+            nombre_completo=datos["nombre"][:150],
+            telefono=datos["telefono"][:50] or None,
+            email=datos["email"][:254] or None,
+            origen="web",
+            etapa="nuevo",
+            vehiculo_interes_id=vehiculo["id"] if vehiculo else None,
+            vehiculo_interes_texto=datos["vehiculo_texto"][:200] or None,
+            observaciones=datos["observaciones"] or None,
+        )
+        _avisar(prospecto, vehiculo, descripcion_veh)
+    return prospecto
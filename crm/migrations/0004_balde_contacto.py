@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0003_prospecto_origen_web_notificacion_vehiculo_optional'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BaldeContacto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=64, unique=True)),
+                ('fichas', models.FloatField()),
+                ('desde', models.FloatField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Balde de contacto',
+                'verbose_name_plural': 'Baldes de contacto',
+            },
+        ),
+    ]
@@ -198,3 +198,22 @@ class NotificacionCRM(models.Model):
 
     def __str__(self):
         return f"{self.prospecto.nombre_completo} ← {self.vehiculo}"
+
+
+# ============================================================
+# RATE LIMIT DEL CONTACTO PÚBLICO (ver crm.contacto_web)
+# ============================================================
+class BaldeContacto(models.Model):
+    """Token bucket por IP / teléfono; compartido por todos los workers."""
+
+    clave = models.CharField(max_length=64, unique=True)
+    fichas = models.FloatField()
+    # time.time() de la última toma (las fichas se recargan desde acá)
+    desde = models.FloatField(db_index=True)
+
+    class Meta:
+        verbose_name = "Balde de contacto"
+        verbose_name_plural = "Baldes de contacto"
+
+    def __str__(self):
+        return f"{self.clave}: {self.fichas:.2f}"
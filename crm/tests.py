@@ -1,3 +1,74 @@
-from django.test import TestCase
+"""
+Tests del formulario de contacto público: rate limit por IP / teléfono,
+dedupe de envíos repetidos y avisos agrupados.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from . import contacto_web
+from .models import BaldeContacto, NotificacionCRM, Prospecto
+
+
+class ContactoPublicoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _enviar(self, nombre="Ana", telefono="11 5555-0000", ip="1.2.3.4"):
+        return self.client.post(
+            reverse("contacto_publico"),
+            {"nombre_completo": nombre, "telefono": telefono},
+            REMOTE_ADDR=ip, secure=True,
+        )
+
+    def test_token_bucket_recarga_con_el_tiempo(self):
+        self.assertTrue(all(contacto_web.permitir("", "1111", ahora=0) for _ in range(3)))
+        self.assertFalse(contacto_web.permitir("", "11-11", ahora=1))
+        # 4 fichas por hora: a los 15 minutos hay una nueva
+        self.assertTrue(contacto_web.permitir("", "1111", ahora=15 * 60 + 1))
+        self.assertEqual(BaldeContacto.objects.count(), 1)
+
+        # Un balde que ya se llenó de nuevo se borra al crear otro
+        contacto_web.permitir("", "2222", ahora=10 * 3600)
+        self.assertEqual(list(BaldeContacto.objects.values_list("fichas", flat=True)), [2])
+
+    def test_repetido_no_se_guarda_dos_veces_y_avisos_agrupados(self):
+        self.assertContains(self._enviar(), "Mensaje enviado")
+        self.assertContains(self._enviar(), "Mensaje enviado")
+        self.assertEqual(Prospecto.objects.count(), 1)
+
+        self._enviar(nombre="Beto", telefono="11 4444-0000")
+        self._enviar(nombre="Caro", telefono="11 3333-0000")
+        self.assertEqual(Prospecto.objects.filter(origen="web").count(), 3)
+        aviso = NotificacionCRM.objects.get()
+        self.assertEqual(aviso.prospecto.nombre_completo, "Caro")
+        self.assertIn("3 contactos nuevos desde la web", aviso.mensaje)
+
+    @override_settings(CONTACTO_LIMITES={"ip": (2, 1), "telefono": (3, 4)})
+    def test_rafaga_desde_una_ip_se_corta_antes_de_guardar(self):
+        for i in range(2):
+            self._enviar(nombre=f"Spam {i}", telefono=f"11 000{i}")
+        with CaptureQueriesContext(connection) as ctx:
+            r = self._enviar(nombre="Spam 9", telefono="11 0009")
+        # Solo se tocó el balde de la IP: ni prospectos ni avisos
+        tablas = ("crm_prospecto", "crm_notificacioncrm")
+        self.assertFalse([q for q in ctx.captured_queries if any(t in q["sql"] for t in tablas)])
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(Prospecto.objects.count(), 2)
+
+    @override_settings(CONTACTO_LIMITES={"ip": (2, 1), "telefono": (3, 4)}, PROXIES_CONFIABLES=1)
+    def test_x_forwarded_for_falseado_no_saltea_el_limite(self):
+        # El cliente inventa la primera entrada; el proxy agrega la IP real al final
+        respuestas = [
+            self.client.post(
+                reverse("contacto_publico"),
+                {"nombre_completo": f"Spam {i}", "telefono": f"11 000{i}"},
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{i}, 200.1.1.1", REMOTE_ADDR="10.9.9.9", secure=True,
+            )
+            for i in range(4)
+        ]
+        self.assertEqual([r.status_code for r in respuestas], [200, 200, 429, 429])
+        self.assertEqual(Prospecto.objects.count(), 2)
+        self.assertEqual(BaldeContacto.objects.filter(clave__startswith="ip:").count(), 1)
@@ -1,41 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_not_required, login_required
 from django.contrib import messages
 from django.db.models import Q, Count
 from datetime import date
 
+from . import contacto_web
 from .models import Prospecto, Seguimiento, NotificacionCRM
 from .forms import ProspectoForm, SeguimientoForm
+from auditoria.middleware import ip_cliente
+from clientes import resumen
 from clientes.models import Cliente
 
 
-# ==========================================================
-# LISTA DE PROSPECTOS
-# ==========================================================
-@login_required
-def lista_prospectos(request):
-    query = request.GET.get("q", "")
-    etapa_filtro = request.GET.get("etapa", "")
-    origen_filtro = request.GET.get("origen", "")
-    prioridad_filtro = request.GET.get("prioridad", "")
-
+def prospectos_filtrados(params):
+    """Prospectos según la búsqueda (q) y los filtros de etapa / origen /
+    prioridad. La usan la lista y su PDF."""
     prospectos = Prospecto.objects.all()
-
+    query = params.get("q", "")
     if query:
         prospectos = prospectos.filter(
             Q(nombre_completo__icontains=query)
             | Q(telefono__icontains=query)
             | Q(email__icontains=query)
         )
+    for campo in ("etapa", "origen", "prioridad"):
+        if params.get(campo):
+            prospectos = prospectos.filter(**{campo: params[campo]})
+    return prospectos
 
-    if etapa_filtro:
-        prospectos = prospectos.filter(etapa=etapa_filtro)
 
-    if origen_filtro:
-        prospectos = prospectos.filter(origen=origen_filtro)
+# ==========================================================
+# LISTA DE PROSPECTOS
+# ==========================================================
+@login_required
+def lista_prospectos(request):
+    query = request.GET.get("q", "")
+    etapa_filtro = request.GET.get("etapa", "")
+    origen_filtro = request.GET.get("origen", "")
+    prioridad_filtro = request.GET.get("prioridad", "")
 
-    if prioridad_filtro:
-        prospectos = prospectos.filter(prioridad=prioridad_filtro)
+    prospectos = prospectos_filtrados(request.GET)
 
     # Contadores por etapa
     contadores = dict(
@@ -72,43 +76,40 @@ def lista_prospectos(request):
 def pdf_lista_prospectos(request):
     from reportes.pdf_utils import render_pdf_listado
 
-    query = request.GET.get("q", "")
-    etapa_filtro = request.GET.get("etapa", "")
-    origen_filtro = request.GET.get("origen", "")
-    prioridad_filtro = request.GET.get("prioridad", "")
+    etapas = dict(Prospecto.ETAPA_CHOICES)
+    prospectos = prospectos_filtrados(request.GET).values(
+        "nombre_completo", "telefono", "etapa", "fecha_proximo_contacto",
+        "vehiculo_interes_id", "vehiculo_interes__marca", "vehiculo_interes__modelo",
+        "vehiculo_interes__dominio", "vehiculo_interes__anio", "vehiculo_interes_texto",
+    )
 
-    prospectos = Prospecto.objects.all().select_related("vehiculo_interes")
-    if query:
-        prospectos = prospectos.filter(
-            Q(nombre_completo__icontains=query)
-            | Q(telefono__icontains=query)
-            | Q(email__icontains=query)
+    def interes(p):
+        # Mismo texto que Vehiculo.__str__
+        if not p["vehiculo_interes_id"]:
+            return p["vehiculo_interes_texto"] or "—"
+        txt = (
+            f"{p['vehiculo_interes__marca']} {p['vehiculo_interes__modelo']} "
+            f"({p['vehiculo_interes__dominio']})"
         )
-    if etapa_filtro:
-        prospectos = prospectos.filter(etapa=etapa_filtro)
-    if origen_filtro:
-        prospectos = prospectos.filter(origen=origen_filtro)
-    if prioridad_filtro:
-        prospectos = prospectos.filter(prioridad=prioridad_filtro)
-
-    filas = []
-    for p in prospectos:
-        if p.vehiculo_interes_id:
-            interes = str(p.vehiculo_interes)
-        else:
-            interes = p.vehiculo_interes_texto or "—"
-        filas.append([
-            p.nombre_completo,
-            p.telefono or "—",
-            p.get_etapa_display(),
-            interes,
-            p.fecha_proximo_contacto.strftime("%d/%m/%Y") if p.fecha_proximo_contacto else "—",
-        ])
+        if p["vehiculo_interes__anio"]:
+            txt += f" · {p['vehiculo_interes__anio']}"
+        return txt
+
+    filas = (
+        [
+            p["nombre_completo"],
+            p["telefono"] or "—",
+            etapas.get(p["etapa"], p["etapa"]),
+            interes(p),
+            p["fecha_proximo_contacto"].strftime("%d/%m/%Y") if p["fecha_proximo_contacto"] else "—",
+        ]
+        for p in prospectos.iterator(chunk_size=500)
+    )
 
     return render_pdf_listado(
         filename="prospectos_crm.pdf",
         titulo="CRM – Prospectos",
-        subtitulo=f"{len(filas)} prospecto(s)",
+        subtitulo=lambda n: f"{n} prospecto(s)",
         columnas=["Nombre", "Teléfono", "Etapa", "Vehículo de interés", "Próx. contacto"],
         filas=filas,
         pie=f"Generado el {date.today().strftime('%d/%m/%Y')}",
@@ -143,7 +144,7 @@ def crear_prospecto(request):
 # ==========================================================
 @login_required
 def detalle_prospecto(request, pk):
-    prospecto = get_object_or_404(Prospecto, pk=pk)
+    prospecto = get_object_or_404(Prospecto.objects.select_related("cliente"), pk=pk)
     seguimientos = prospecto.seguimientos.all()
 
     form_seguimiento = SeguimientoForm()
@@ -152,6 +153,7 @@ def detalle_prospecto(request, pk):
         "prospecto": prospecto,
         "seguimientos": seguimientos,
         "form_seguimiento": form_seguimiento,
+        "resumen_cliente": resumen.de_cliente(prospecto.cliente_id) if prospecto.cliente_id else None,
     })
 
 
@@ -285,10 +287,11 @@ def marcar_notificacion_leida(request, pk):
 # ==========================================================
 # FORMULARIO DE CONTACTO PÚBLICO (sin login)
 # ==========================================================
+@login_not_required
 def contacto_publico(request):
-    from vehiculos.models import Vehiculo
-
     enviado = False
+    estado = 200
+    vehiculos_stock = contacto_web.opciones_vehiculos()
 
     if request.method == "POST":
         # Anti-spam: honeypot. Si el campo "website" viene completado,
@@ -296,53 +299,33 @@ def contacto_publico(request):
         if request.POST.get("website", "").strip():
             return render(request, "crm/contacto_publico.html", {"enviado": True})
 
-        nombre = request.POST.get("nombre_completo", "").strip()
-        telefono = request.POST.get("telefono", "").strip()
-        email = request.POST.get("email", "").strip()
-        vehiculo_id = request.POST.get("vehiculo_interes", "")
-        vehiculo_texto = request.POST.get("vehiculo_interes_texto", "").strip()
-        observaciones = request.POST.get("observaciones", "").strip()
+        datos = {
+            "nombre": request.POST.get("nombre_completo", "").strip(),
+            "telefono": request.POST.get("telefono", "").strip(),
+            "email": request.POST.get("email", "").strip(),
+            "vehiculo_id": request.POST.get("vehiculo_interes", ""),
+            "vehiculo_texto": request.POST.get("vehiculo_interes_texto", "").strip(),
+            "observaciones": request.POST.get("observaciones", "").strip(),
+        }
 
-        if not nombre or (not telefono and not email):
+        if not datos["nombre"] or (not datos["telefono"] and not datos["email"]):
             messages.error(request, "Completá nombre y al menos teléfono o email.")
             return redirect("contacto_publico")
 
-        vehiculo_obj = None
-        if vehiculo_id:
-            vehiculo_obj = Vehiculo.objects.filter(pk=vehiculo_id, estado="stock").first()
-
-        prospecto = Prospecto.objects.create(
-            nombre_completo=nombre[:150],
-            telefono=telefono[:50] or None,
-            email=email[:254] or None,
-            origen="web",
-            etapa="nuevo",
-            vehiculo_interes=vehiculo_obj,
-            vehiculo_interes_texto=vehiculo_texto[:200] or None,
-            observaciones=observaciones or None,
-        )
-
-        # Notificación interna para que el sistema avise
-        descripcion_veh = ""
-        if vehiculo_obj:
-            descripcion_veh = f" – interés en {vehiculo_obj}"
-        elif vehiculo_texto:
-            descripcion_veh = f" – interés en {vehiculo_texto[:80]}"
-        NotificacionCRM.objects.create(
-            prospecto=prospecto,
-            vehiculo=vehiculo_obj,
-            mensaje=f"Nuevo contacto desde la web: {nombre}{descripcion_veh}",
-        )
-
-        enviado = True
-
-    vehiculos_stock = (
-        Vehiculo.objects
-        .filter(estado="stock")
-        .order_by("marca", "modelo")
-    )
+        if not contacto_web.permitir(ip_cliente(request), datos["telefono"]):
+            messages.error(request, "Recibimos muchas consultas seguidas. Probá de nuevo en unos minutos.")
+            estado = 429
+        elif contacto_web.es_repetido(datos):
+            # Mismo envío repetido (doble click / reenvío): ya quedó registrado
+            enviado = True
+        else:
+            vehiculo = next(
+                (v for v in vehiculos_stock if str(v["id"]) == datos["vehiculo_id"]), None,
+            )
+            contacto_web.registrar(datos, vehiculo)
+            enviado = True
 
     return render(request, "crm/contacto_publico.html", {
         "enviado": enviado,
         "vehiculos_stock": vehiculos_stock,
-    })
+    }, status=estado)
@@ -0,0 +1,146 @@
+"""
+Extracto de la cuenta corriente: los movimientos en orden con el saldo
+acumulado, y los totales que comparten el detalle de la cuenta, el PDF del
+plan y el historial de financiación.
+
+    extracto.pagina(cuenta, antes=None)   -> dict con las filas (cada una con .saldo)
+    extracto.totales(cuenta)              -> debe/haber por origen, en una sola query
+    extracto.cuotas(plan)                 -> cuotas con sus pagos precargados
+
+La página se pide hacia atrás: sin cursor trae los últimos movimientos y
+`anterior` es el cursor (fecha + id del primero mostrado) para ver los de
+antes. Con el índice (cuenta, fecha, id) cada página es un rango del
+índice, sin OFFSET, por más movimientos que tenga la cuenta.
+
+El saldo acumulado:
+- en PostgreSQL sale de la misma query con una window function (SUM OVER
+  fecha, id sobre todos los movimientos hasta el cursor);
+- en SQLite los decimales se guardan como REAL y una suma acumulada en SQL
+  arrastra error de redondeo, así que se toma el saldo anterior con un
+  aggregate y se acumula en Python, en Decimal, en una sola pasada.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When, Window
+
+# Movimientos que suman deuda (los demás la descuentan), como en recalcular_saldo
+TIPOS_DEBE = ("debe", "deuda")
+
+POR_PAGINA = 50
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+_IMPORTE = DecimalField(max_digits=14, decimal_places=2)
+
+_FIRMADO = Case(
+    When(tipo__in=TIPOS_DEBE, then=F("monto")),
+    default=-F("monto"),
+    output_field=_IMPORTE,
+)
+
+
+# ==========================================================
+# CURSOR
+# ==========================================================
+def cursor(mov):
+    """'<microsegundos>-<id>' del movimiento (seguro para usar en la URL)."""
+    micro = (mov.fecha - _EPOCA) // timedelta(microseconds=1)
+    return f"{micro}-{mov.pk}"
+
+
+def leer_cursor(valor):
+    """(fecha, id) del cursor, o None si no vino o no es válido."""
+    try:
+        micro, pk = (int(parte) for parte in (valor or "").split("-"))
+    except ValueError:
+        return None
+    return _EPOCA + timedelta(microseconds=micro), pk
+
+
+def _antes_de(fecha, pk):
+    return Q(fecha__lt=fecha) | Q(fecha=fecha, id__lt=pk)
+
+
+# ==========================================================
+# PÁGINA DEL EXTRACTO
+# ==========================================================
+def _firmado(mov):
+    return mov.monto if mov.tipo in TIPOS_DEBE else -mov.monto
+
+
+def pagina(cuenta, antes=None, limite=POR_PAGINA):
+    """
+    Hasta `limite` movimientos anteriores al cursor `antes` (o los últimos),
+    en orden cronológico y cada uno con `.saldo` (saldo de la cuenta después
+    de ese movimiento). Dos queries como mucho, sin importar el largo.
+    """
+    qs = cuenta.movimientos.all()
+    desde = leer_cursor(antes)
+    if desde:
+        qs = qs.filter(_antes_de(*desde))
+
+    por_sql = connection.vendor == "postgresql"
+    if por_sql:
+        qs = qs.annotate(saldo=Window(Sum(_FIRMADO), order_by=[F("fecha").asc(), F("id").asc()]))
+    filas = list(qs.order_by("-fecha", "-id")[:limite + 1])
+    hay_anteriores = len(filas) > limite
+    filas = filas[:limite][::-1]
+
+    if not filas:
+        saldo_anterior = Decimal("0")
+    elif por_sql:
+        saldo_anterior = filas[0].saldo - _firmado(filas[0])
+    else:
+        saldo_anterior = Decimal("0")
+        if hay_anteriores:
+            saldo_anterior = (
+                cuenta.movimientos.filter(_antes_de(filas[0].fecha, filas[0].pk))
+                .aggregate(t=Sum(_FIRMADO))["t"] or Decimal("0")
+            )
+        saldo = saldo_anterior
+        for mov in filas:
+            saldo += _firmado(mov)
+            mov.saldo = saldo
+
+    for mov in filas:
+        mov.es_debe = mov.tipo in TIPOS_DEBE
+
+    return {
+        "filas": filas,
+        "saldo_anterior": saldo_anterior,
+        "saldo_final": filas[-1].saldo if filas else saldo_anterior,
+        "anterior": cursor(filas[0]) if hay_anteriores else None,
+        "es_reciente": desde is None,
+    }
+
+
+# ==========================================================
+# TOTALES Y CUOTAS
+# ==========================================================
+def _suma(**filtro):
+    return Sum("monto", filter=Q(**filtro), default=Value(Decimal("0"), output_field=_IMPORTE))
+
+
+def totales(cuenta):
+    """
+    Debe y haber de la cuenta, de gestoría y de los gastos extra (manual y
+    ajuste) en un solo aggregate.
+    """
+    extra = ("manual", "ajuste")
+    return cuenta.movimientos.aggregate(
+        debe=_suma(tipo__in=TIPOS_DEBE),
+        haber=_suma(tipo__in=("haber", "pago")),
+        gestoria_debe=_suma(origen="gestoria", tipo="debe"),
+        gestoria_haber=_suma(origen="gestoria", tipo="haber"),
+        extra_debe=_suma(origen__in=extra, tipo__in=TIPOS_DEBE),
+        extra_haber=_suma(origen__in=extra, tipo__in=("haber", "pago")),
+    )
+
+
+def cuotas(plan):
+    """Cuotas del plan por número, con `pagos` precargado (total_pagado sin queries)."""
+    if not plan:
+        return []
+    return list(plan.cuotas.prefetch_related("pagos").order_by("numero"))
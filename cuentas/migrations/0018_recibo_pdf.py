@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cuentas', '0017_refinanciacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReciboPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modo_saldo', models.CharField(max_length=10)),
+                ('huella', models.CharField(max_length=64)),
+                ('archivo', models.FileField(upload_to='recibos/')),
+                ('generado', models.DateTimeField(auto_now=True)),
+                ('pago', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recibos_pdf', to='cuentas.pago')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('pago', 'modo_saldo'), name='recibo_pdf_por_modo')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cuentas', '0018_recibo_pdf'),
+        ('vehiculos', '0045_vencimientos_desde_fichas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimientocuenta',
+            index=models.Index(fields=['cuenta', 'fecha', 'id'], name='cuentas_mov_extracto'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cuentas', '0019_movimiento_indice_extracto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pago',
+            name='saldos_recibo',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
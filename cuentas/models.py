@@ -316,6 +316,26 @@ class CuentaCorriente(models.Model):
         """
         Saldo pendiente actual = saldo cuotas del plan + gestoría pendiente + gastos pendientes
         """
+        total = self.deuda_sin_gastos_permuta()
+
+        # Gastos de ingreso del/los vehículo(s) de permuta: los paga el CLIENTE,
+        # así que son deuda suya y entran en la cuenta corriente. Usamos el saldo
+        # DEL CLIENTE: si marcó "el cliente me pagó" (cli_concesion), ese gasto ya
+        # no se lo debe (aunque el concesionario todavía no le pagó al organismo).
+        for vehiculo in self._vehiculos_para_gastos():
+            try:
+                total += vehiculo.ficha.saldo_total_gastos_cliente()
+            except Exception:
+                pass
+
+        return total
+
+    def deuda_sin_gastos_permuta(self):
+        """
+        `deuda_total_real` sin los gastos de ingreso de los usados de permuta.
+        Solo usa movimientos y planes (con prefetch no hace consultas); el
+        resumen de clientes suma esos gastos aparte, calculados en lote.
+        """
         total = Decimal("0")
         movs = list(self.movimientos.all())  # 1 consulta (0 si viene con prefetch)
 
@@ -352,16 +372,6 @@ class CuentaCorriente(models.Model):
             haber = self._suma_mov(movs, excl_origen="permuta", tipos=["haber", "pago"])
             total += max(debe - haber, Decimal("0"))
 
-        # Gastos de ingreso del/los vehículo(s) de permuta: los paga el CLIENTE,
-        # así que son deuda suya y entran en la cuenta corriente. Usamos el saldo
-        # DEL CLIENTE: si marcó "el cliente me pagó" (cli_concesion), ese gasto ya
-        # no se lo debe (aunque el concesionario todavía no le pagó al organismo).
-        for vehiculo in self._vehiculos_para_gastos():
-            try:
-                total += vehiculo.ficha.saldo_total_gastos_cliente()
-            except Exception:
-                pass
-
         return total
 
 
@@ -419,6 +429,12 @@ class MovimientoCuenta(models.Model):
         help_text="Pago que originó este movimiento (si aplica)",
     )
 
+    class Meta:
+        indexes = [
+            # Extracto: cada página es un rango (cuenta, fecha, id) del índice
+            models.Index(fields=["cuenta", "fecha", "id"], name="cuentas_mov_extracto"),
+        ]
+
     def __str__(self):
         return f"{self.get_tipo_display()} - ${self.monto}"
 
@@ -683,6 +699,9 @@ class Pago(models.Model):
         blank=True
     )
 
+    # Bloque de saldo del recibo tal como estaba al registrar el pago (ver cuentas.recibos)
+    saldos_recibo = models.JSONField(null=True, blank=True)
+
     def __str__(self):
         return f"Recibo {self.numero_recibo or self.id} - ${self.monto_total}"
 
@@ -702,6 +721,34 @@ class Pago(models.Model):
         super().save(*args, **kwargs)
 
 
+# ==========================================================
+# RECIBO PDF GUARDADO
+# ==========================================================
+class ReciboPDF(models.Model):
+    """
+    PDF ya generado del recibo de un pago, uno por modo de saldo (ver
+    cuentas.recibos). `huella` es el sha256 de lo que se imprime: si cambia,
+    el recibo se vuelve a generar.
+    """
+    pago = models.ForeignKey(
+        Pago,
+        on_delete=models.CASCADE,
+        related_name="recibos_pdf"
+    )
+    modo_saldo = models.CharField(max_length=10)
+    huella = models.CharField(max_length=64)
+    archivo = models.FileField(upload_to="recibos/")
+    generado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["pago", "modo_saldo"], name="recibo_pdf_por_modo"),
+        ]
+
+    def __str__(self):
+        return f"Recibo {self.pago.numero_recibo} ({self.modo_saldo})"
+
+
 # ==========================================================
 # APLICACIÓN DEL PAGO A CUOTAS
 # ==========================================================
@@ -0,0 +1,385 @@
+"""
+Recibos de pago en PDF, generados una vez y guardados.
+
+    recibos.fijar_saldos(pago, cuenta)                         -> congela el bloque de saldo
+    recibos.pdf_recibo(pago, cuenta, modo_saldo="completo")   -> bytes del PDF
+    recibos.invalidar(pago)                                   -> borra los guardados
+    recibos.iterar_zip(cuenta, pagos, modo_saldo)              -> chunks de un ZIP
+
+El recibo se arma con `datos_recibo`, que junta todo lo que se imprime. El
+bloque de saldo sale de `Pago.saldos_recibo`, que se guarda al registrar el
+pago: el recibo muestra la deuda de ese momento y no cambia con los pagos
+que vengan después. Los pagos anteriores a ese campo lo fijan la primera vez
+que se imprime su recibo.
+
+La huella (sha256 de esos datos) decide si el PDF guardado en `ReciboPDF`
+sigue sirviendo:
+- si coincide, se devuelve el archivo del storage sin pasar por ReportLab;
+- si no (pago editado, otro diseño), se regenera y se reemplaza.
+Hay un archivo por pago y modo de saldo, con nombre
+`recibos/<numero_recibo>-<huella>.pdf`. El ZIP de la cuenta solo lee lo
+guardado: lo que falte lo arma en memoria, sin escribir en el storage.
+"""
+import hashlib
+import logging
+from decimal import Decimal
+from io import BytesIO
+from zipfile import ZIP_STORED, ZipFile
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Sum
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .models import ReciboPDF
+
+logger = logging.getLogger(__name__)
+
+MODOS_SALDO = ("completo", "plan", "oculto")
+
+# Subir cuando cambie el diseño del recibo: invalida todos los guardados
+VERSION = 1
+
+COLOR_AZUL = colors.HexColor("#002855")
+COLOR_NARANJA = colors.HexColor("#FF6C1A")
+
+_ESTILO_TITULO = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
+    ("ROWBACKGROUNDS", (0, 0), (-1, -1), [COLOR_AZUL]),
+    ("LINEBELOW", (0, 0), (-1, -1), 4, COLOR_NARANJA),
+    ("TOPPADDING", (0, 0), (-1, -1), 14),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
+    ("LEFTPADDING", (0, 0), (0, -1), 14),
+    ("RIGHTPADDING", (-1, 0), (-1, -1), 14),
+])
+
+
+def normalizar_modo(modo_saldo):
+    # Cualquier valor desconocido se imprimía como "plan"
+    return modo_saldo if modo_saldo in MODOS_SALDO else "plan"
+
+
+# ==========================================================
+# DATOS
+# ==========================================================
+def saldos_recibo(cuenta, modo_saldo):
+    """Montos del bloque de saldo (iguales para todos los pagos de la cuenta)."""
+    from vehiculos.models import FichaVehicular, Vehiculo
+
+    modo_saldo = normalizar_modo(modo_saldo)
+    if modo_saldo == "oculto":
+        return {}
+
+    plan_obj = getattr(cuenta, "plan_pago", None)
+    saldo_plan = Decimal("0")
+    if plan_obj:
+        saldo_plan = sum(
+            (cuota.saldo_pendiente for cuota in plan_obj.cuotas.all()),
+            Decimal("0")
+        )
+    if modo_saldo == "plan":
+        return {"plan": saldo_plan}
+
+    # Gestoría
+    gestoria_debe = (
+        cuenta.movimientos.filter(origen="gestoria", tipo="debe")
+        .aggregate(total=Sum("monto")).get("total") or Decimal("0")
+    )
+    gestoria_haber = (
+        cuenta.movimientos.filter(origen="gestoria", tipo="haber")
+        .aggregate(total=Sum("monto")).get("total") or Decimal("0")
+    )
+    total_gestoria = max(gestoria_debe - gestoria_haber, Decimal("0"))
+
+    # Gastos de ingreso pendientes
+    saldo_gastos = Decimal("0")
+    vehiculo_permuta = (
+        Vehiculo.objects.filter(
+            movimientos_cuenta__cuenta=cuenta,
+            movimientos_cuenta__origen="permuta"
+        ).distinct().first()
+    )
+    if vehiculo_permuta:
+        try:
+            saldo_gastos = vehiculo_permuta.ficha.saldo_total_gastos()
+        except FichaVehicular.DoesNotExist:
+            pass
+
+    return {"plan": saldo_plan, "gestoria": total_gestoria, "gastos": saldo_gastos}
+
+
+def fijar_saldos(pago, cuenta):
+    """Guarda en el pago el bloque de saldo de la cuenta (llamar al registrarlo)."""
+    pago.saldos_recibo = {k: str(v) for k, v in saldos_recibo(cuenta, "completo").items()}
+    pago.save(update_fields=["saldos_recibo"])
+
+
+def saldos_del_pago(pago, modo_saldo):
+    """Bloque de saldo congelado en el pago, o None si el pago no lo tiene."""
+    if pago.saldos_recibo is None:
+        return None
+    modo_saldo = normalizar_modo(modo_saldo)
+    if modo_saldo == "oculto":
+        return {}
+    saldos = {k: Decimal(v) for k, v in pago.saldos_recibo.items()}
+    return {"plan": saldos["plan"]} if modo_saldo == "plan" else saldos
+
+
+def datos_recibo(pago, cuenta, concepto_extra="", modo_saldo="completo", saldos=None):
+    """Todo lo que imprime el recibo (y de lo que sale la huella)."""
+    modo_saldo = normalizar_modo(modo_saldo)
+    if saldos is None:
+        saldos = saldos_del_pago(pago, modo_saldo)
+    if saldos is None:
+        saldos = saldos_recibo(cuenta, modo_saldo)
+    cliente = cuenta.cliente
+    return {
+        "numero_recibo": pago.numero_recibo,
+        "cliente": cliente.nombre_completo,
+        "documento": getattr(cliente, "cuit", None) or getattr(cliente, "dni", None) or "-",
+        "concepto": concepto_extra or pago.observaciones or "Pago",
+        "forma_pago": pago.get_forma_pago_display(),
+        "banco": pago.banco,
+        "numero_cheque": pago.numero_cheque,
+        "monto": pago.monto_total,
+        "modo_saldo": modo_saldo,
+        "saldos": saldos,
+    }
+
+
+def huella(datos):
+    texto = repr((VERSION, sorted((k, repr(v)) for k, v in datos.items())))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+# ==========================================================
+# PDF
+# ==========================================================
+def _estilos():
+    from reportes.pdf_utils import estilo, hoja_base
+
+    return {
+        "Normal": hoja_base()["Normal"],
+        "Heading3Custom": estilo(
+            "Heading3Custom", fontSize=12, textColor=COLOR_AZUL,
+            spaceAfter=4, fontName="Helvetica-Bold",
+        ),
+        "H": estilo("H", fontSize=14, textColor=colors.white, fontName="Helvetica-Bold", leading=18),
+        "R": estilo("R", fontSize=12, textColor=colors.white, fontName="Helvetica-Bold", alignment=2, leading=18),
+    }
+
+
+def generar_pdf(datos):
+    """Arma el PDF del recibo con ReportLab (sin pasar por lo guardado)."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        topMargin=1.5 * cm,
+        bottomMargin=1.5 * cm,
+        leftMargin=2 * cm,
+        rightMargin=2 * cm,
+    )
+    styles = _estilos()
+    normal = styles["Normal"]
+    elements = []
+
+    # ----------------------------------------------------------
+    # ENCABEZADO
+    # ----------------------------------------------------------
+    titulo_table = Table([[
+        Paragraph(
+            "<font color='white'><b>Amichetti Automotores</b></font><br/>"
+            "<font color='#cccccc' size=9>"
+            "Titular: Hugo Alberto Amichetti · CUIT: 20-13814200-1 · "
+            "Tel: 2474 660154"
+            "</font>",
+            styles["H"]
+        ),
+        Paragraph(
+            f"<font color='white'><b>RECIBO</b></font><br/>"
+            f"<font color='#cccccc' size=9>N° {datos['numero_recibo']}</font>",
+            styles["R"]
+        )
+    ]], colWidths=[12 * cm, 5 * cm])
+    titulo_table.setStyle(_ESTILO_TITULO)
+    elements.append(titulo_table)
+    elements.append(Spacer(1, 18))
+
+    # ----------------------------------------------------------
+    # DATOS DEL CLIENTE
+    # ----------------------------------------------------------
+    elements.append(Paragraph("<b>Datos del cliente</b>", styles["Heading3Custom"]))
+    elements.append(Spacer(1, 6))
+    elements.append(Paragraph(f"Nombre: {datos['cliente']}", normal))
+    elements.append(Paragraph(f"CUIT/DNI: {datos['documento']}", normal))
+    elements.append(Spacer(1, 16))
+
+    # ----------------------------------------------------------
+    # DETALLE DEL PAGO
+    # ----------------------------------------------------------
+    elements.append(Paragraph("<b>Detalle del pago</b>", styles["Heading3Custom"]))
+    elements.append(Spacer(1, 6))
+    elements.append(Paragraph(f"Concepto: {datos['concepto']}", normal))
+    elements.append(Paragraph(f"Método de pago: {datos['forma_pago']}", normal))
+    if datos["banco"]:
+        elements.append(Paragraph(f"Banco: {datos['banco']}", normal))
+    if datos["numero_cheque"]:
+        elements.append(Paragraph(f"N° cheque: {datos['numero_cheque']}", normal))
+    elements.append(Paragraph(f"Monto abonado: $ {datos['monto']:,.2f}", normal))
+    elements.append(Spacer(1, 12))
+
+    # ----------------------------------------------------------
+    # SALDO PENDIENTE (según modo elegido)
+    # ----------------------------------------------------------
+    saldos = datos["saldos"]
+    if datos["modo_saldo"] == "completo":
+        saldo_plan, total_gestoria, saldo_gastos = saldos["plan"], saldos["gestoria"], saldos["gastos"]
+        deuda_total = saldo_plan + total_gestoria + saldo_gastos
+
+        elements.append(Paragraph("<b>Estado de cuenta</b>", styles["Heading3Custom"]))
+        elements.append(Spacer(1, 6))
+        if saldo_plan > 0:
+            elements.append(Paragraph(f"Plan de pago: $ {saldo_plan:,.2f}", normal))
+        if total_gestoria > 0:
+            elements.append(Paragraph(f"Gestoría: $ {total_gestoria:,.2f}", normal))
+        if saldo_gastos > 0:
+            elements.append(Paragraph(f"Gastos de ingreso: $ {saldo_gastos:,.2f}", normal))
+        elements.append(Spacer(1, 4))
+        elements.append(Paragraph(
+            f"<b>Deuda total pendiente:</b> "
+            f"<font color='red'><b>$ {deuda_total:,.2f}</b></font>",
+            normal
+        ))
+    elif datos["modo_saldo"] == "plan":
+        elements.append(Paragraph(
+            f"<b>Saldo pendiente del plan de pago:</b> "
+            f"<font color='red'><b>$ {saldos['plan']:,.2f}</b></font>",
+            normal
+        ))
+
+    elements.append(Spacer(1, 50))
+
+    # ----------------------------------------------------------
+    # FIRMA
+    # ----------------------------------------------------------
+    elements.append(Paragraph(
+        "<para alignment='right'>"
+        "<font color='#666666'>"
+        "_____________________________<br/>"
+        "Firma y aclaración"
+        "</font></para>",
+        normal
+    ))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+# ==========================================================
+# GUARDADOS
+# ==========================================================
+def _guardado(pago, modo_saldo):
+    # Usa el prefetch de `recibos_pdf` si vino (ZIP de la cuenta)
+    return next((r for r in pago.recibos_pdf.all() if r.modo_saldo == modo_saldo), None)
+
+
+def _guardar(pago, modo_saldo, firma, contenido, anterior):
+    try:
+        recibo = anterior or ReciboPDF(pago=pago, modo_saldo=modo_saldo)
+        viejo = recibo.archivo.name if recibo.archivo else None
+        recibo.huella = firma
+        recibo.archivo.save(f"{pago.numero_recibo or pago.pk}-{firma[:16]}.pdf", ContentFile(contenido), save=False)
+        with transaction.atomic():
+            recibo.save()
+        if viejo and viejo != recibo.archivo.name:
+            recibo.archivo.storage.delete(viejo)
+    except Exception:
+        # Sin guardar se sigue sirviendo el PDF; la próxima vez se reintenta
+        logger.exception("No se pudo guardar el recibo %s", pago.numero_recibo)
+
+
+def pdf_recibo(pago, cuenta, concepto_extra="", modo_saldo="completo", saldos=None, guardar=True):
+    """
+    Bytes del recibo: el guardado si sigue vigente, si no se genera y (con
+    `guardar`) se guarda. Un pago sin saldos congelados los fija acá.
+    """
+    if guardar and saldos is None and pago.saldos_recibo is None:
+        fijar_saldos(pago, cuenta)
+    datos = datos_recibo(pago, cuenta, concepto_extra, modo_saldo, saldos)
+    firma = huella(datos)
+    anterior = _guardado(pago, datos["modo_saldo"])
+    if anterior and anterior.huella == firma:
+        try:
+            with anterior.archivo.open("rb") as archivo:
+                return archivo.read()
+        except (OSError, ValueError):
+            logger.warning("Falta el archivo del recibo %s, se regenera", pago.numero_recibo)
+    contenido = generar_pdf(datos)
+    if guardar:
+        _guardar(pago, datos["modo_saldo"], firma, contenido, anterior)
+    return contenido
+
+
+def invalidar(pago):
+    """Borra los recibos guardados del pago (los archivos, al confirmar)."""
+    guardados = list(ReciboPDF.objects.filter(pago=pago))
+    if not guardados:
+        return
+    ReciboPDF.objects.filter(pk__in=[r.pk for r in guardados]).delete()
+
+    def borrar_archivos():
+        for recibo in guardados:
+            try:
+                recibo.archivo.delete(save=False)
+            except Exception:
+                logger.exception("No se pudo borrar el archivo %s", recibo.archivo.name)
+
+    transaction.on_commit(borrar_archivos)
+
+
+# ==========================================================
+# ZIP DE LA CUENTA
+# ==========================================================
+class _Salida:
+    """Destino no seekable del ZipFile: junta lo escrito hasta el próximo chunk."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        chunk, self.partes = b"".join(self.partes), []
+        return chunk
+
+
+def iterar_zip(cuenta, pagos, modo_saldo="completo"):
+    """
+    Genera el ZIP de los recibos de `pagos` de a un archivo por chunk (para
+    un StreamingHttpResponse). No escribe en el storage ni en la base: cada
+    pago usa sus saldos congelados; los que no los tienen comparten el saldo
+    actual de la cuenta, calculado una sola vez.
+    """
+    actuales = None
+    salida = _Salida()
+    with ZipFile(salida, "w") as zf:
+        for pago in pagos:
+            saldos = saldos_del_pago(pago, modo_saldo)
+            if saldos is None:
+                if actuales is None:
+                    actuales = saldos_recibo(cuenta, modo_saldo)
+                saldos = actuales
+            contenido = pdf_recibo(pago, cuenta, modo_saldo=modo_saldo, saldos=saldos, guardar=False)
+            # Los PDF ya vienen comprimidos: se guardan tal cual
+            zf.writestr(f"recibo_{pago.numero_recibo or pago.pk}.pdf", contenido, compress_type=ZIP_STORED)
+            yield salida.vaciar()
+    yield salida.vaciar()
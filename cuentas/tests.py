@@ -1,14 +1,26 @@
 """
 Tests del módulo de cuentas corrientes — el de mayor lógica financiera.
 Cubren: cálculo de deuda, aplicación de pagos a cuotas, manejo del
-excedente (que no se pierda) y la bitácora de auditoría.
+excedente (que no se pierda), la bitácora de auditoría, los recibos PDF
+guardados y el extracto con saldo acumulado.
 """
+import shutil
+import tempfile
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from unittest import mock
+from zipfile import ZipFile
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
 from clientes.models import Cliente
+from cuentas import extracto, recibos
 from cuentas.models import (
     CuentaCorriente,
     PlanPago,
@@ -16,8 +28,11 @@ from cuentas.models import (
     Pago,
     PagoCuota,
     MovimientoCuenta,
+    ReciboPDF,
 )
 
+MEDIA = tempfile.mkdtemp()
+
 
 class BaseCuentaTest(TestCase):
     def setUp(self):
@@ -157,3 +172,127 @@ class BitacoraTests(BaseCuentaTest):
         except Exception as exc:  # pragma: no cover
             self.fail(f"log() no debería romper: {exc}")
         self.assertEqual(self.cuenta.bitacora.count(), 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA)
+class RecibosGuardadosTests(BaseCuentaTest):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        self.pago = Pago.objects.create(cuenta=self.cuenta, forma_pago="efectivo", monto_total=Decimal("1000"))
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+
+    def _recibo(self, modo="completo"):
+        url = reverse("cuentas:recibo_pago_pdf", args=[self.pago.pk])
+        return self.client.get(url, {"saldo": modo}, secure=True)
+
+    def test_se_genera_una_vez_y_se_invalida(self):
+        with mock.patch.object(recibos, "generar_pdf", wraps=recibos.generar_pdf) as generar:
+            primero = self._recibo()
+            segundo = self._recibo()
+            self.assertEqual(generar.call_count, 1)
+            self.assertEqual(primero.content, segundo.content)
+            self.assertTrue(primero.content.startswith(b"%PDF"))
+
+            # Cambia el saldo de la cuenta: el recibo muestra el de su momento
+            self._plan_con_dos_cuotas()
+            self.assertEqual(self._recibo().content, primero.content)
+            self.assertEqual(generar.call_count, 1)
+            self.pago.refresh_from_db()
+            self.assertEqual(Decimal(self.pago.saldos_recibo["plan"]), 0)
+
+            # Editar el pago borra lo guardado
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse("cuentas:editar_pago", args=[self.pago.pk]),
+                    {"forma_pago": "transferencia", "banco": "Nación"}, secure=True,
+                )
+            self.assertFalse(ReciboPDF.objects.exists())
+            self._recibo()
+            self.assertEqual(generar.call_count, 2)
+            self.assertEqual(generar.call_args.args[0]["banco"], "Nación")
+            self.assertEqual(generar.call_args.args[0]["saldos"]["plan"], 0)
+
+    def test_saldos_congelados_al_registrar_el_pago(self):
+        self._plan_con_dos_cuotas()
+        self.client.post(
+            reverse("cuentas:registrar_movimiento", args=[self.cuenta.pk]),
+            {"tipo_movimiento": "cuota", "forma_pago": "efectivo", "monto": "60000"}, secure=True,
+        )
+        pago = Pago.objects.exclude(pk=self.pago.pk).get()
+        self.assertEqual(Decimal(pago.saldos_recibo["plan"]), Decimal("60000"))
+
+    def test_zip_de_la_cuenta(self):
+        otro = Pago.objects.create(cuenta=self.cuenta, forma_pago="efectivo", monto_total=Decimal("500"))
+        self._recibo()  # uno ya guardado, el otro se arma en memoria en el ZIP
+        respuesta = self.client.get(reverse("cuentas:recibos_cuenta_zip", args=[self.cuenta.pk]), secure=True)
+        self.assertEqual(respuesta["Content-Type"], "application/zip")
+        with ZipFile(BytesIO(b"".join(respuesta.streaming_content))) as zf:
+            self.assertEqual(
+                zf.namelist(),
+                [f"recibo_{self.pago.numero_recibo}.pdf", f"recibo_{otro.numero_recibo}.pdf"],
+            )
+            self.assertTrue(all(zf.read(n).startswith(b"%PDF") for n in zf.namelist()))
+        # El ZIP no escribe: ni archivos nuevos ni saldos congelados
+        self.assertEqual(ReciboPDF.objects.count(), 1)
+        otro.refresh_from_db()
+        self.assertIsNone(otro.saldos_recibo)
+
+
+class ExtractoTests(BaseCuentaTest):
+    def setUp(self):
+        super().setUp()
+        inicio = timezone.make_aware(datetime(2026, 1, 1, 10))
+        movimientos = [
+            ("debe", 1000, 0), ("haber", 300, 1), ("deuda", 500, 1),  # dos en la misma fecha
+            ("pago", 200, 2), ("debe", 50, 3), ("haber", 1200, 4), ("debe", 75, 5),
+        ]
+        self.esperado = []
+        saldo = Decimal("0")
+        for tipo, monto, dia in movimientos:
+            mov = MovimientoCuenta.objects.create(
+                cuenta=self.cuenta, descripcion=f"{tipo} {monto}", tipo=tipo, monto=Decimal(monto),
+            )
+            MovimientoCuenta.objects.filter(pk=mov.pk).update(fecha=inicio + timedelta(days=dia))
+            saldo += Decimal(monto) if tipo in ("debe", "deuda") else -Decimal(monto)
+            self.esperado.append((mov.pk, saldo))
+
+    def _recorrer(self, limite):
+        filas, antes = [], None
+        while True:
+            with CaptureQueriesContext(connection) as ctx:
+                pag = extracto.pagina(self.cuenta, antes=antes, limite=limite)
+            self.assertLessEqual(len(ctx.captured_queries), 2)
+            filas = pag["filas"] + filas
+            if not pag["anterior"]:
+                return filas
+            self.assertEqual(pag["saldo_anterior"], self.esperado[-len(filas) - 1][1])
+            antes = pag["anterior"]
+
+    def test_saldo_acumulado_por_paginas(self):
+        filas = self._recorrer(limite=3)
+        self.assertEqual([(m.pk, m.saldo) for m in filas], self.esperado)
+
+        # El camino con window function (PostgreSQL) da lo mismo
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            filas = self._recorrer(limite=2)
+        self.assertEqual([(m.pk, m.saldo) for m in filas], self.esperado)
+
+        self.assertIsNone(extracto.leer_cursor("basura"))
+        t = extracto.totales(self.cuenta)
+        self.assertEqual(t["debe"] - t["haber"], self.esperado[-1][1])
+
+    def test_detalle_historial_y_pdf_usan_el_extracto(self):
+        self._plan_con_dos_cuotas()  # agrega el movimiento de la deuda del plan
+        t = extracto.totales(self.cuenta)
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        for nombre in ("cuenta_corriente_detalle", "historial_financiacion"):
+            r = self.client.get(reverse(f"cuentas:{nombre}", args=[self.cuenta.pk]), secure=True)
+            self.assertEqual(r.context["extracto"]["saldo_final"], t["debe"] - t["haber"])
+            self.assertContains(r, "Extracto de la cuenta")
+        r = self.client.get(reverse("cuentas:plan_pago_pdf", args=[self.cuenta.pk]), secure=True)
+        self.assertTrue(r.content.startswith(b"%PDF"))
@@ -147,6 +147,11 @@ urlpatterns = [
         views.recibo_pago_pdf,
         name="recibo_pago_pdf"
     ),
+    path(
+        "<int:cuenta_id>/recibos.zip",
+        views.recibos_cuenta_zip,
+        name="recibos_cuenta_zip"
+    ),
     path(
         "pago/<int:pago_id>/editar/",
         views.editar_pago,
@@ -7,7 +7,7 @@ from django.db.models.functions import Coalesce
 from datetime import timedelta, datetime, date
 from decimal import Decimal, InvalidOperation
 from django.utils import timezone
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 
 # ===============================
 # REPORTLAB – PDF
@@ -80,185 +80,19 @@ def _parse_monto_argentino(raw: str) -> Decimal:
 
 def _generar_pdf_recibo(pago, cuenta, concepto_extra="", modo_saldo="completo"):
     """
-    Genera el PDF de recibo con ReportLab y devuelve un HttpResponse.
+    Devuelve el HttpResponse con el PDF del recibo (ver cuentas.recibos:
+    se reutiliza el guardado mientras no cambie lo que imprime).
     Se usa tanto para recibos normales como para anticipo.
     """
-    cliente = cuenta.cliente
+    from . import recibos
 
-    response = HttpResponse(content_type="application/pdf")
+    response = HttpResponse(
+        recibos.pdf_recibo(pago, cuenta, concepto_extra, modo_saldo),
+        content_type="application/pdf",
+    )
     response["Content-Disposition"] = (
         f'inline; filename="recibo_{pago.numero_recibo}.pdf"'
     )
-
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=A4,
-        topMargin=1.5 * cm,
-        bottomMargin=1.5 * cm,
-        leftMargin=2 * cm,
-        rightMargin=2 * cm,
-    )
-
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name="Heading3Custom",
-        fontSize=12,
-        textColor=COLOR_AZUL,
-        spaceAfter=4,
-        fontName="Helvetica-Bold"
-    ))
-
-    elements = []
-
-    # ----------------------------------------------------------
-    # ENCABEZADO
-    # ----------------------------------------------------------
-    header_data = [[
-        Paragraph(
-            "<font color='white'><b>Amichetti Automotores</b></font><br/>"
-            "<font color='#cccccc' size=9>"
-            "Titular: Hugo Alberto Amichetti · CUIT: 20-13814200-1 · "
-            "Tel: 2474 660154"
-            "</font>",
-            ParagraphStyle("H", fontSize=14, textColor=colors.white,
-                           fontName="Helvetica-Bold", leading=18)
-        ),
-        Paragraph(
-            f"<font color='white'><b>RECIBO</b></font><br/>"
-            f"<font color='#cccccc' size=9>N° {pago.numero_recibo}</font>",
-            ParagraphStyle("R", fontSize=12, textColor=colors.white,
-                           fontName="Helvetica-Bold", alignment=2, leading=18)
-        )
-    ]]
-
-    titulo_table = Table(header_data, colWidths=[12 * cm, 5 * cm])
-    titulo_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
-        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [COLOR_AZUL]),
-        ("LINEBELOW", (0, 0), (-1, -1), 4, COLOR_NARANJA),
-        ("TOPPADDING", (0, 0), (-1, -1), 14),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
-        ("LEFTPADDING", (0, 0), (0, -1), 14),
-        ("RIGHTPADDING", (-1, 0), (-1, -1), 14),
-    ]))
-
-    elements.append(titulo_table)
-    elements.append(Spacer(1, 18))
-
-    # ----------------------------------------------------------
-    # DATOS DEL CLIENTE
-    # ----------------------------------------------------------
-    documento = (
-        getattr(cliente, "cuit", None)
-        or getattr(cliente, "dni", None)
-        or "-"
-    )
-
-    elements.append(Paragraph("<b>Datos del cliente</b>", styles["Heading3Custom"]))
-    elements.append(Spacer(1, 6))
-    elements.append(Paragraph(f"Nombre: {cliente.nombre_completo}", styles["Normal"]))
-    elements.append(Paragraph(f"CUIT/DNI: {documento}", styles["Normal"]))
-    elements.append(Spacer(1, 16))
-
-    # ----------------------------------------------------------
-    # DETALLE DEL PAGO
-    # ----------------------------------------------------------
-    elements.append(Paragraph("<b>Detalle del pago</b>", styles["Heading3Custom"]))
-    elements.append(Spacer(1, 6))
-
-    concepto = concepto_extra or pago.observaciones or "Pago"
-    elements.append(Paragraph(f"Concepto: {concepto}", styles["Normal"]))
-    elements.append(Paragraph(
-        f"Método de pago: {pago.get_forma_pago_display()}",
-        styles["Normal"]
-    ))
-    if pago.banco:
-        elements.append(Paragraph(f"Banco: {pago.banco}", styles["Normal"]))
-    if pago.numero_cheque:
-        elements.append(Paragraph(f"N° cheque: {pago.numero_cheque}", styles["Normal"]))
-    elements.append(Paragraph(
-        f"Monto abonado: $ {pago.monto_total:,.2f}",
-        styles["Normal"]
-    ))
-    elements.append(Spacer(1, 12))
-
-    # ----------------------------------------------------------
-    # SALDO PENDIENTE (según modo elegido)
-    # ----------------------------------------------------------
-    if modo_saldo != "oculto":
-        plan_obj   = getattr(cuenta, "plan_pago", None)
-        saldo_plan = Decimal("0")
-        if plan_obj:
-            saldo_plan = sum(
-                (cuota.saldo_pendiente for cuota in plan_obj.cuotas.all()),
-                Decimal("0")
-            )
-
-        if modo_saldo == "completo":
-            # Gestoría
-            gestoria_debe = (
-                cuenta.movimientos.filter(origen="gestoria", tipo="debe")
-                .aggregate(total=Sum("monto")).get("total") or Decimal("0")
-            )
-            gestoria_haber = (
-                cuenta.movimientos.filter(origen="gestoria", tipo="haber")
-                .aggregate(total=Sum("monto")).get("total") or Decimal("0")
-            )
-            total_gestoria = max(gestoria_debe - gestoria_haber, Decimal("0"))
-
-            # Gastos de ingreso pendientes
-            saldo_gastos = Decimal("0")
-            vehiculo_permuta = (
-                Vehiculo.objects.filter(
-                    movimientos_cuenta__cuenta=cuenta,
-                    movimientos_cuenta__origen="permuta"
-                ).distinct().first()
-            )
-            if vehiculo_permuta:
-                try:
-                    saldo_gastos = vehiculo_permuta.ficha.saldo_total_gastos()
-                except FichaVehicular.DoesNotExist:
-                    pass
-
-            deuda_total = saldo_plan + total_gestoria + saldo_gastos
-
-            elements.append(Paragraph("<b>Estado de cuenta</b>", styles["Heading3Custom"]))
-            elements.append(Spacer(1, 6))
-            if saldo_plan > 0:
-                elements.append(Paragraph(f"Plan de pago: $ {saldo_plan:,.2f}", styles["Normal"]))
-            if total_gestoria > 0:
-                elements.append(Paragraph(f"Gestoría: $ {total_gestoria:,.2f}", styles["Normal"]))
-            if saldo_gastos > 0:
-                elements.append(Paragraph(f"Gastos de ingreso: $ {saldo_gastos:,.2f}", styles["Normal"]))
-            elements.append(Spacer(1, 4))
-            elements.append(Paragraph(
-                f"<b>Deuda total pendiente:</b> "
-                f"<font color='red'><b>$ {deuda_total:,.2f}</b></font>",
-                styles["Normal"]
-            ))
-
-        else:  # modo_saldo == "plan"
-            elements.append(Paragraph(
-                f"<b>Saldo pendiente del plan de pago:</b> "
-                f"<font color='red'><b>$ {saldo_plan:,.2f}</b></font>",
-                styles["Normal"]
-            ))
-
-    elements.append(Spacer(1, 50))
-
-    # ----------------------------------------------------------
-    # FIRMA
-    # ----------------------------------------------------------
-    elements.append(Paragraph(
-        "<para alignment='right'>"
-        "<font color='#666666'>"
-        "_____________________________<br/>"
-        "Firma y aclaración"
-        "</font></para>",
-        styles["Normal"]
-    ))
-
-    doc.build(elements)
     return response
 
 
@@ -524,32 +358,27 @@ def crear_cuenta_corriente(request, cliente_id):
 # ==========================================================
 @login_required
 def cuenta_corriente_detalle(request, cuenta_id):
+    from . import extracto
+
     cuenta = get_object_or_404(CuentaCorriente, id=cuenta_id)
 
     plan        = getattr(cuenta, "plan_pago", None)
-    cuotas      = plan.cuotas.all().order_by("numero") if plan else []
     # Todos los planes de la cuenta, cada uno con sus cuotas (para mostrarlos sumados)
     planes_detalle = [
-        {"plan": p, "cuotas": p.cuotas.all().order_by("numero")}
+        {"plan": p, "cuotas": extracto.cuotas(p)}
         for p in cuenta.planes.order_by("id")
     ]
+    cuotas = next((pd["cuotas"] for pd in planes_detalle if pd["plan"] == plan), [])
     movimientos = cuenta.movimientos.order_by("-fecha")
+    totales = extracto.totales(cuenta)
 
     # Para el modal de Vincular vehículo: TODOS los vehículos, incluidos los
     # vendidos. A veces los gastos de ingreso de un auto vendido a otra persona
     # los paga/debe el cliente de ESTA cuenta, así que hay que poder vincularlo.
     vehiculos = Vehiculo.objects.all().order_by("marca", "modelo")
 
-    gestoria_debe = (
-        movimientos.filter(origen="gestoria", tipo="debe")
-        .aggregate(total=Sum("monto"))
-        .get("total") or Decimal("0")
-    )
-    gestoria_haber = (
-        movimientos.filter(origen="gestoria", tipo="haber")
-        .aggregate(total=Sum("monto"))
-        .get("total") or Decimal("0")
-    )
+    gestoria_debe = totales["gestoria_debe"]
+    gestoria_haber = totales["gestoria_haber"]
     total_gestoria = gestoria_debe - gestoria_haber
 
     vehiculos_permuta = list(
@@ -670,13 +499,7 @@ def cuenta_corriente_detalle(request, cuenta_id):
 
     # Gastos extra / ajustes manuales (movimientos no ligados al plan ni gestoría)
     gastos_extra = movimientos.filter(origen__in=["manual", "ajuste"]).order_by("-fecha")
-    ge_debe = (
-        gastos_extra.filter(tipo__in=["debe", "deuda"]).aggregate(t=Sum("monto"))["t"] or Decimal("0")
-    )
-    ge_haber = (
-        gastos_extra.filter(tipo__in=["haber", "pago"]).aggregate(t=Sum("monto"))["t"] or Decimal("0")
-    )
-    gastos_extra_saldo = ge_debe - ge_haber
+    gastos_extra_saldo = totales["extra_debe"] - totales["extra_haber"]
 
     # Deuda total = saldo de cuotas + gestoría pendiente + gastos de ingreso
     #               de permuta (los paga el cliente) + gastos extra pendientes.
@@ -696,6 +519,7 @@ def cuenta_corriente_detalle(request, cuenta_id):
             "cuotas": cuotas,
             "planes_detalle": planes_detalle,
             "movimientos": movimientos,
+            "extracto": extracto.pagina(cuenta, antes=request.GET.get("antes")),
             "gastos_extra": gastos_extra,
             "gastos_extra_saldo": gastos_extra_saldo,
             "vehiculos": vehiculos,
@@ -721,6 +545,8 @@ def cuenta_corriente_detalle(request, cuenta_id):
 @login_required
 @transaction.atomic
 def crear_plan_pago(request, cuenta_id):
+    from . import recibos
+
     cuenta = get_object_or_404(CuentaCorriente, id=cuenta_id)
 
     if cuenta.estado == "cerrada":
@@ -915,6 +741,7 @@ def crear_plan_pago(request, cuenta_id):
                     saldo_anterior=cuenta.saldo + anticipo,
                     saldo_posterior=cuenta.saldo,
                 )
+                recibos.fijar_saldos(pago_anticipo, cuenta)
 
                 # Registrar cada cheque del anticipo en el módulo Cheques
                 for _idx, ch in enumerate(cheques_anticipo, start=1):
@@ -966,6 +793,8 @@ def crear_plan_pago(request, cuenta_id):
 @login_required
 @transaction.atomic
 def registrar_movimiento(request, cuenta_id):
+    from . import recibos
+
     cuenta = get_object_or_404(CuentaCorriente, id=cuenta_id)
     plan   = getattr(cuenta, "plan_pago", None)
     # Cuotas pendientes de TODOS los planes de la cuenta (orden por vencimiento)
@@ -1146,6 +975,7 @@ def registrar_movimiento(request, cuenta_id):
 
             pago.saldo_posterior = cuenta.saldo
             pago.save(update_fields=["saldo_posterior"])
+            recibos.fijar_saldos(pago, cuenta)
 
         if excedente_total > 0:
             messages.info(
@@ -1194,6 +1024,8 @@ def registrar_movimiento(request, cuenta_id):
 @login_required
 @transaction.atomic
 def registrar_pago_gestoria(request, cuenta_id):
+    from . import recibos
+
     cuenta = get_object_or_404(CuentaCorriente, id=cuenta_id)
 
     gest_debe = (
@@ -1247,6 +1079,7 @@ def registrar_pago_gestoria(request, cuenta_id):
 
         pago.saldo_posterior = cuenta.saldo
         pago.save(update_fields=["saldo_posterior"])
+        recibos.fijar_saldos(pago, cuenta)
 
         messages.success(
             request,
@@ -1266,12 +1099,29 @@ def registrar_pago_gestoria(request, cuenta_id):
 # ==========================================================
 @login_required
 def recibo_pago_pdf(request, pago_id):
-    pago   = get_object_or_404(Pago, id=pago_id)
+    pago   = get_object_or_404(Pago.objects.select_related("cuenta__cliente"), id=pago_id)
     cuenta = pago.cuenta
     modo_saldo = request.GET.get("saldo", "completo")
     return _generar_pdf_recibo(pago, cuenta, modo_saldo=modo_saldo)
 
 
+# ==========================================================
+# TODOS LOS RECIBOS DE LA CUENTA EN UN ZIP
+# ==========================================================
+@login_required
+def recibos_cuenta_zip(request, cuenta_id):
+    from . import recibos
+
+    cuenta = get_object_or_404(CuentaCorriente.objects.select_related("cliente"), id=cuenta_id)
+    pagos = cuenta.pagos.prefetch_related("recibos_pdf").order_by("fecha", "id")
+    response = StreamingHttpResponse(
+        recibos.iterar_zip(cuenta, pagos, request.GET.get("saldo", "completo")),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = f'attachment; filename="recibos_cuenta_{cuenta.id}.zip"'
+    return response
+
+
 # ==========================================================
 # EDITAR CUOTA
 # ==========================================================
@@ -1753,14 +1603,24 @@ def eliminar_gasto_extra(request, movimiento_id):
 # ==========================================================
 @login_required
 def historial_financiacion(request, cuenta_id):
-    cuenta = get_object_or_404(CuentaCorriente, id=cuenta_id)
+    cuenta = get_object_or_404(
+        CuentaCorriente.objects.select_related("cliente", "venta", "venta__vehiculo"),
+        id=cuenta_id,
+    )
+    from . import extracto
+
     plan   = getattr(cuenta, "plan_pago", None)
-    cuotas = plan.cuotas.all() if plan else []
+    cuotas = extracto.cuotas(plan)
 
     return render(
         request,
         "cuentas/historial_financiacion.html",
-        {"cuenta": cuenta, "plan": plan, "cuotas": cuotas}
+        {
+            "cuenta": cuenta,
+            "plan": plan,
+            "cuotas": cuotas,
+            "extracto": extracto.pagina(cuenta, antes=request.GET.get("antes")),
+        }
     )
 
 
@@ -1866,6 +1726,8 @@ def documentacion_entregada(request, cuenta_id):
 @login_required
 @transaction.atomic
 def editar_pago(request, pago_id):
+    from . import recibos
+
     pago = get_object_or_404(Pago, id=pago_id)
     cuenta = pago.cuenta
 
@@ -1882,6 +1744,7 @@ def editar_pago(request, pago_id):
         pago.save(update_fields=[
             "forma_pago", "banco", "numero_cheque", "observaciones"
         ])
+        recibos.invalidar(pago)
 
         cuenta.log(
             "Pago editado",
@@ -1902,6 +1765,8 @@ def editar_pago(request, pago_id):
 @login_required
 @transaction.atomic
 def eliminar_pago(request, pago_id):
+    from . import recibos
+
     pago = get_object_or_404(Pago, id=pago_id)
     cuenta = pago.cuenta
 
@@ -1914,6 +1779,7 @@ def eliminar_pago(request, pago_id):
 
     _recibo = pago.numero_recibo
     _monto = pago.monto_total
+    recibos.invalidar(pago)
     pago.movimientos_creados.all().delete()
     pago.delete()
 
@@ -1960,10 +1826,16 @@ def desvincular_vehiculo_permuta(request, cuenta_id, vehiculo_id):
 # ==========================================================
 # PDF: PLAN DE PAGO
 # ==========================================================
+# Movimientos del extracto que entran al final del PDF (los más recientes)
+EXTRACTO_PDF_FILAS = 40
+
+
 @login_required
 def plan_pago_pdf(request, cuenta_id):
     from io import BytesIO
+    from django.utils.html import escape
     from reportlab.lib.enums import TA_CENTER
+    from . import extracto
 
     cuenta = get_object_or_404(CuentaCorriente, id=cuenta_id)
     plan_id = request.GET.get("plan_id")
@@ -1977,7 +1849,7 @@ def plan_pago_pdf(request, cuenta_id):
         return redirect("cuentas:cuenta_corriente_detalle", cuenta_id=cuenta.id)
 
     cliente = cuenta.cliente
-    cuotas = plan.cuotas.all().order_by("numero")
+    cuotas = extracto.cuotas(plan)
 
     total_monto = sum((c.monto for c in cuotas), Decimal("0"))
     total_pagado = sum((c.total_pagado for c in cuotas), Decimal("0"))
@@ -2113,14 +1985,9 @@ def plan_pago_pdf(request, cuenta_id):
     # ----------------------------------------------------------
     # GESTORÍA
     # ----------------------------------------------------------
-    gestoria_debe = (
-        cuenta.movimientos.filter(origen="gestoria", tipo="debe")
-        .aggregate(total=Sum("monto")).get("total") or Decimal("0")
-    )
-    gestoria_haber = (
-        cuenta.movimientos.filter(origen="gestoria", tipo="haber")
-        .aggregate(total=Sum("monto")).get("total") or Decimal("0")
-    )
+    totales = extracto.totales(cuenta)
+    gestoria_debe = totales["gestoria_debe"]
+    gestoria_haber = totales["gestoria_haber"]
     gestoria_saldo = max(gestoria_debe - gestoria_haber, Decimal("0"))
 
     if gestoria_debe > 0:
@@ -2240,6 +2107,48 @@ def plan_pago_pdf(request, cuenta_id):
         ]))
         elements.append(t_gastos)
 
+    # ----------------------------------------------------------
+    # ÚLTIMOS MOVIMIENTOS (mismo extracto que el detalle)
+    # ----------------------------------------------------------
+    ext = extracto.pagina(cuenta, limite=EXTRACTO_PDF_FILAS)
+    if ext["filas"]:
+        elements.append(Paragraph("<b>Últimos movimientos de la cuenta</b>", h3))
+        chico = ParagraphStyle("chico", parent=normal, fontSize=8, leading=10)
+        data_mov = [["Fecha", "Concepto", "Debe", "Haber", "Saldo"]]
+        if ext["anterior"]:
+            data_mov.append(["", "Saldo anterior", "", "", f"$ {ext['saldo_anterior']:,.2f}"])
+        for m in ext["filas"]:
+            data_mov.append([
+                timezone.localtime(m.fecha).strftime("%d/%m/%Y"),
+                Paragraph(escape(m.descripcion), chico),
+                f"$ {m.monto:,.2f}" if m.es_debe else "",
+                "" if m.es_debe else f"$ {m.monto:,.2f}",
+                f"$ {m.saldo:,.2f}",
+            ])
+
+        t_mov = Table(
+            data_mov,
+            colWidths=[2.2 * cm, 6.4 * cm, 2.6 * cm, 2.6 * cm, 2.7 * cm],
+            repeatRows=1,
+        )
+        t_mov.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("ALIGN", (2, 0), (4, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#d1d5db")),
+            ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#9ca3af")),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f9fafb")]),
+            ("FONTNAME", (4, 1), (4, -1), "Helvetica-Bold"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 5),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 5),
+            ("TOPPADDING", (0, 0), (-1, -1), 3),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+        ]))
+        elements.append(t_mov)
+
     # ----------------------------------------------------------
     # RESUMEN FINAL
     # ----------------------------------------------------------
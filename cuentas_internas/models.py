@@ -100,18 +100,26 @@ class Alquiler(models.Model):
     def __str__(self):
         return self.nombre
 
+    # Las properties de cobros/montos usan los valores precalculados por
+    # services.anotar_alquileres (listados) si están; si no, consultan.
     @property
     def total_pagado(self):
+        if hasattr(self, "total_pagado_anotado"):
+            return self.total_pagado_anotado
         from django.db.models import Sum
         return self.pagos.aggregate(t=Sum('monto'))['t'] or 0
 
     @property
     def ultimo_pago(self):
+        if hasattr(self, "ultimo_pago_anotado"):
+            return self.ultimo_pago_anotado
         return self.pagos.order_by('-fecha', '-id').first()
 
     @property
     def pagado_mes_actual(self):
         """True si ya hay un pago registrado en el mes/año en curso."""
+        if hasattr(self, "pagado_mes_anotado"):
+            return self.pagado_mes_anotado
         hoy = date.today()
         return self.pagos.filter(fecha__year=hoy.year, fecha__month=hoy.month).exists()
 
@@ -120,71 +128,27 @@ class Alquiler(models.Model):
         Devuelve una fila por cada mes del contrato (de fecha_inicio a
         fecha_fin) con el monto a cobrar y el pago asociado (si existe).
         """
-        if not (self.fecha_inicio and self.fecha_fin):
-            return []
-        from decimal import Decimal
-        MESES = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-                 "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
-        pagos = {}
-        for p in self.pagos.all():
-            if p.periodo_anio and p.periodo_mes:
-                pagos[(p.periodo_anio, p.periodo_mes)] = p
-
-        base = self.monto_mensual or Decimal("0")
-        # Montos por tramo (vigentes desde una fecha). Ordenados ascendente.
-        escalas = [
-            ((e.vigente_desde.year, e.vigente_desde.month), e.monto)
-            for e in self.escalas.all().order_by("vigente_desde")
-        ]
-
-        def monto_de(y, m):
-            monto = base
-            for (ey, em), valor in escalas:
-                if (ey, em) <= (y, m):
-                    monto = valor
-                else:
-                    break
-            return monto
-
-        filas = []
-        y, m = self.fecha_inicio.year, self.fecha_inicio.month
-        endy, endm = self.fecha_fin.year, self.fecha_fin.month
-        guard = 0
-        while (y, m) <= (endy, endm) and guard < 600:
-            guard += 1
-            pago = pagos.get((y, m))
-            filas.append({
-                "anio": y, "mes": m,
-                "label": f"{MESES[m]} {y}",
-                "monto": monto_de(y, m),
-                "pago": pago,
-                "cobrado": pago is not None,
-            })
-            m += 1
-            if m > 12:
-                m = 1
-                y += 1
-        return filas
+        from .services import cronograma
+        return cronograma(self)
+
+    def monto_del_mes(self, anio, mes):
+        """Monto a cobrar en un mes dado (según los tramos cargados)."""
+        from .services import monto_en
+        return monto_en(self, anio, mes)
 
     @property
     def total_a_cobrar_contrato(self):
         """Monto total del contrato = suma de los montos de cada mes."""
-        filas = self.cronograma()
-        from decimal import Decimal
-        return sum((f["monto"] or Decimal("0")) for f in filas)
+        from .services import total_contrato
+        return total_contrato(self)
 
     @property
     def monto_actual(self):
         """Monto vigente este mes (según los tramos cargados)."""
-        from decimal import Decimal
-        monto = self.monto_mensual or Decimal("0")
+        if hasattr(self, "monto_actual_anotado"):
+            return self.monto_actual_anotado
         hoy = date.today()
-        for e in self.escalas.all().order_by("vigente_desde"):
-            if (e.vigente_desde.year, e.vigente_desde.month) <= (hoy.year, hoy.month):
-                monto = e.monto
-            else:
-                break
-        return monto
+        return self.monto_del_mes(hoy.year, hoy.month)
 
     @property
     def proximo_vencimiento(self):
@@ -0,0 +1,185 @@
+"""
+Motor de cronograma de alquileres.
+
+- `cronograma`: recorre el contrato UNA vez, avanzando en paralelo sobre los
+  tramos de monto (ordenados) y los pagos por período — sin re-escanear los
+  tramos en cada mes.
+- `total_contrato`: suma del contrato en forma cerrada (meses de cada tramo
+  × monto del tramo), sin armar el cronograma.
+- `anotar_alquileres`: para listados; deja en cada alquiler monto vigente,
+  cobrado del mes, último pago y total cobrado con una cantidad fija de
+  queries, sin importar cuántos alquileres haya.
+"""
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import DecimalField, Exists, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Alquiler, EscalaAlquiler, PagoAlquiler
+
+
+MESES = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+         "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+
+def _indice(anio, mes):
+    """Mes como entero correlativo (para restar y comparar períodos)."""
+    return anio * 12 + (mes - 1)
+
+
+def tramos(alquiler):
+    """
+    Lista ordenada de (indice_mes, monto) de los tramos del alquiler.
+    Usa `escalas.all()` (ordenado por Meta) para aprovechar un prefetch.
+    """
+    return [
+        (_indice(e.vigente_desde.year, e.vigente_desde.month), e.monto)
+        for e in alquiler.escalas.all()
+    ]
+
+
+def monto_en(alquiler, anio, mes, escalas=None):
+    """Monto vigente en (anio, mes): búsqueda binaria sobre los tramos."""
+    escalas = tramos(alquiler) if escalas is None else escalas
+    pos = bisect_right([i for i, _ in escalas], _indice(anio, mes))
+    if pos == 0:
+        return alquiler.monto_mensual or Decimal("0")
+    return escalas[pos - 1][1]
+
+
+def cronograma(alquiler):
+    """
+    Una fila por mes del contrato (de fecha_inicio a fecha_fin) con el monto
+    a cobrar y el pago asociado (si existe). Tramos y pagos se recorren en
+    una sola pasada ordenada.
+    """
+    if not (alquiler.fecha_inicio and alquiler.fecha_fin):
+        return []
+    pagos = {}
+    for p in alquiler.pagos.all():
+        if p.periodo_anio and p.periodo_mes:
+            pagos[(p.periodo_anio, p.periodo_mes)] = p
+
+    escalas = tramos(alquiler)
+    desde = _indice(alquiler.fecha_inicio.year, alquiler.fecha_inicio.month)
+    hasta = min(_indice(alquiler.fecha_fin.year, alquiler.fecha_fin.month), desde + 599)
+
+    monto = alquiler.monto_mensual or Decimal("0")
+    pos = 0
+    filas = []
+    for i in range(desde, hasta + 1):
+        # Avanza el puntero de tramos: cada tramo se visita una sola vez.
+        while pos < len(escalas) and escalas[pos][0] <= i:
+            monto = escalas[pos][1]
+            pos += 1
+        y, m = divmod(i, 12)
+        m += 1
+        pago = pagos.get((y, m))
+        filas.append({
+            "anio": y, "mes": m,
+            "label": f"{MESES[m]} {y}",
+            "monto": monto,
+            "pago": pago,
+            "cobrado": pago is not None,
+        })
+    return filas
+
+
+def total_contrato(alquiler):
+    """
+    Monto total del contrato en forma cerrada: por cada tramo, meses del
+    contrato en los que rige × su monto. O(tramos), no O(meses).
+    """
+    if not (alquiler.fecha_inicio and alquiler.fecha_fin):
+        return Decimal("0")
+    desde = _indice(alquiler.fecha_inicio.year, alquiler.fecha_inicio.month)
+    hasta = min(_indice(alquiler.fecha_fin.year, alquiler.fecha_fin.month), desde + 599)
+    if hasta < desde:
+        return Decimal("0")
+
+    # Segmentos [inicio, fin) con su monto: base hasta el primer tramo y
+    # luego cada tramo hasta el siguiente.
+    cortes = [(desde, alquiler.monto_mensual or Decimal("0"))]
+    for i, monto in tramos(alquiler):
+        if i <= desde:
+            cortes[0] = (desde, monto)
+        else:
+            cortes.append((i, monto))
+
+    total = Decimal("0")
+    for n, (inicio, monto) in enumerate(cortes):
+        fin = cortes[n + 1][0] if n + 1 < len(cortes) else hasta + 1
+        meses = min(fin, hasta + 1) - max(inicio, desde)
+        if meses > 0:
+            total += monto * meses
+    return total
+
+
+def anotar_alquileres(queryset=None, hoy=None):
+    """
+    Devuelve la lista de alquileres de `queryset` con, en cada uno:
+      - `total_pagado_anotado`: total cobrado,
+      - `pagado_mes_anotado`: si hay un cobro con fecha en el mes en curso,
+      - `ultimo_pago_anotado`: el último PagoAlquiler (o None),
+      - `monto_actual_anotado`: monto vigente hoy según los tramos.
+    Las properties del modelo usan estos valores si están presentes.
+
+    Costo fijo: 1 query de alquileres (con subqueries) + 1 de tramos
+    (prefetch) + 1 de últimos pagos.
+    """
+    hoy = hoy or date.today()
+    queryset = Alquiler.objects.all() if queryset is None else queryset
+    pagos = PagoAlquiler.objects.filter(alquiler=OuterRef("pk"))
+    alquileres = list(
+        queryset.annotate(
+            total_pagado_anotado=Coalesce(
+                Subquery(
+                    pagos.order_by().values("alquiler")
+                    .annotate(t=Sum("monto")).values("t")[:1]
+                ),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            pagado_mes_anotado=Exists(
+                pagos.filter(fecha__year=hoy.year, fecha__month=hoy.month)
+            ),
+            ultimo_pago_id_anotado=Subquery(
+                pagos.order_by("-fecha", "-id").values("id")[:1]
+            ),
+        ).prefetch_related(
+            Prefetch("escalas", queryset=EscalaAlquiler.objects.order_by("vigente_desde"))
+        )
+    )
+
+    ids = [a.ultimo_pago_id_anotado for a in alquileres if a.ultimo_pago_id_anotado]
+    ultimos = PagoAlquiler.objects.in_bulk(ids) if ids else {}
+    for a in alquileres:
+        a.ultimo_pago_anotado = ultimos.get(a.ultimo_pago_id_anotado)
+        a.monto_actual_anotado = monto_en(a, hoy.year, hoy.month)
+    return alquileres
+
+
+def pendientes_de_cobro(anio, mes, queryset=None):
+    """
+    Alquileres cuyo contrato incluye (anio, mes) y que todavía no tienen
+    un cobro de ese período: [{"alquiler", "monto"}, ...].
+    Costo fijo: alquileres sin cobro (1 query con NOT EXISTS) + tramos.
+    """
+    queryset = Alquiler.objects.filter(activo=True) if queryset is None else queryset
+    indice = _indice(anio, mes)
+    qs = queryset.exclude(
+        Exists(PagoAlquiler.objects.filter(
+            alquiler=OuterRef("pk"), periodo_mes=mes, periodo_anio=anio,
+        ))
+    ).exclude(fecha_inicio=None).exclude(fecha_fin=None).prefetch_related(
+        Prefetch("escalas", queryset=EscalaAlquiler.objects.order_by("vigente_desde"))
+    )
+    resultado = []
+    for alq in qs:
+        desde = _indice(alq.fecha_inicio.year, alq.fecha_inicio.month)
+        hasta = min(_indice(alq.fecha_fin.year, alq.fecha_fin.month), desde + 599)
+        if desde <= indice <= hasta:
+            resultado.append({"alquiler": alq, "monto": monto_en(alq, anio, mes)})
+    return resultado
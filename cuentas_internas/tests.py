@@ -1,3 +1,57 @@
+"""
+Tests del motor de cronograma de alquileres (tramos, totales y listados).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Alquiler, EscalaAlquiler, PagoAlquiler
+from .services import anotar_alquileres, pendientes_de_cobro
+
+
+class CronogramaTests(TestCase):
+    def setUp(self):
+        self.alq = Alquiler.objects.create(
+            nombre="Local", monto_mensual=Decimal("100"),
+            fecha_inicio=date(2026, 1, 10), fecha_fin=date(2026, 12, 10),
+        )
+        EscalaAlquiler.objects.create(alquiler=self.alq, vigente_desde=date(2026, 4, 1), monto=Decimal("150"))
+        EscalaAlquiler.objects.create(alquiler=self.alq, vigente_desde=date(2026, 10, 15), monto=Decimal("200"))
+
+    def test_montos_por_tramo(self):
+        filas = self.alq.cronograma()
+        self.assertEqual(len(filas), 12)
+        self.assertEqual([f["monto"] for f in filas[2:4]], [Decimal("100"), Decimal("150")])
+        self.assertEqual(filas[9]["monto"], Decimal("200"))
+
+    def test_total_contrato_cerrado_igual_a_suma(self):
+        # 3 × 100 + 6 × 150 + 3 × 200
+        self.assertEqual(self.alq.total_a_cobrar_contrato, Decimal("1800"))
+        self.assertEqual(
+            self.alq.total_a_cobrar_contrato,
+            sum(f["monto"] for f in self.alq.cronograma()),
+        )
+
+    def test_anotar_alquileres_cantidad_fija_de_queries(self):
+        hoy = date.today()
+        otro = Alquiler.objects.create(nombre="Galpón", monto_mensual=Decimal("50"))
+        PagoAlquiler.objects.create(alquiler=self.alq, fecha=hoy - timedelta(days=40), monto=Decimal("100"))
+        ultimo = PagoAlquiler.objects.create(alquiler=self.alq, fecha=hoy, monto=Decimal("150"))
+
+        with self.assertNumQueries(3):
+            alquileres = {a.pk: a for a in anotar_alquileres()}
+            self.assertEqual(alquileres[self.alq.pk].total_pagado, Decimal("250"))
+            self.assertTrue(alquileres[self.alq.pk].pagado_mes_actual)
+            self.assertEqual(alquileres[self.alq.pk].ultimo_pago, ultimo)
+            self.assertEqual(alquileres[otro.pk].total_pagado, Decimal("0"))
+            self.assertIsNone(alquileres[otro.pk].ultimo_pago)
+            self.assertEqual(alquileres[otro.pk].monto_actual, Decimal("50"))
+
+    def test_pendientes_de_cobro(self):
+        PagoAlquiler.objects.create(
+            alquiler=self.alq, fecha=date(2026, 5, 1), periodo_mes=5, periodo_anio=2026, monto=Decimal("150"),
+        )
+        self.assertEqual(pendientes_de_cobro(2026, 5), [])
+        self.assertEqual(pendientes_de_cobro(2026, 6), [{"alquiler": self.alq, "monto": Decimal("150")}])
+        self.assertEqual(pendientes_de_cobro(2027, 1), [])
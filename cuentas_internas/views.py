@@ -7,6 +7,7 @@ from django.contrib import messages
 from django.db.models import Q, Sum
 
 from .models import CuentaInterna, MovimientoInterno, Alquiler, PagoAlquiler, EscalaAlquiler
+from .services import anotar_alquileres
 from .forms import (
     CuentaInternaForm, MovimientoInternoForm, AlquilerForm, PagoAlquilerForm,
 )
@@ -332,7 +333,7 @@ def alquileres_lista(request):
     )
 
     return render(request, 'cuentas_internas/alquileres_lista.html', {
-        'alquileres': alquileres,
+        'alquileres': anotar_alquileres(alquileres),
         'query': query,
         'mostrar': mostrar,
         'total_mensual': total_mensual,
@@ -365,7 +366,7 @@ def alquileres_pdf(request):
 
     total = Decimal('0')
     filas = []
-    for a in alquileres:
+    for a in anotar_alquileres(alquileres):
         total += a.monto_mensual or Decimal('0')
         filas.append([
             a.arrendatario or '—',
@@ -575,12 +576,11 @@ def cobrar_alquiler_mes(request, alquiler_id, anio, mes):
         messages.warning(request, 'Ese período ya está cobrado.')
         return _redir()
 
-    # Monto del mes según el cronograma (respeta tramos)
+    # Monto del mes según los tramos (si el mes está dentro del contrato)
     monto = alq.monto_mensual or Decimal('0')
-    for f in alq.cronograma():
-        if f['mes'] == mes and f['anio'] == anio:
-            monto = f['monto']
-            break
+    if (alq.fecha_inicio and alq.fecha_fin and
+            (alq.fecha_inicio.year, alq.fecha_inicio.month) <= (anio, mes) <= (alq.fecha_fin.year, alq.fecha_fin.month)):
+        monto = alq.monto_del_mes(anio, mes)
 
     pago = PagoAlquiler.objects.create(
         alquiler=alq, fecha=date.today(), periodo_mes=mes, periodo_anio=anio,
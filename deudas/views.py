@@ -229,30 +229,25 @@ def deudas_situacion(request):
         # Vehículos ya VENDIDOS (salieron de stock) que todavía tienen saldo de
         # gastos de ingreso pendiente.
         from vehiculos.models import FichaVehicular
+        from vehiculos.services import saldos_gastos_ingreso
         fichas = (
             FichaVehicular.objects
             .filter(vehiculo__estado="vendido")
             .select_related("vehiculo")
         )
+        fichas = list(fichas)
+        saldos = saldos_gastos_ingreso(fichas)
         for ficha in fichas:
-            try:
-                mapa = ficha.mapa_gastos_ingreso()
-            except Exception:
-                continue
-            for concepto_label, monto in mapa.items():
-                if not monto or Decimal(monto) <= 0:
-                    continue
-                saldo = ficha.saldo_por_concepto(concepto_label) or Decimal("0")
-                if saldo > 0:
-                    filas.append({
-                        "vehiculo": ficha.vehiculo,
-                        "estado_vehiculo": ficha.vehiculo.get_estado_display(),
-                        "concepto": concepto_label,
-                        "ente": "—",
-                        "monto": saldo,
-                        "estado": "Vendido — adeuda gastos",
-                    })
-                    total += saldo
+            for concepto_label, saldo in saldos[ficha.vehiculo_id].items():
+                filas.append({
+                    "vehiculo": ficha.vehiculo,
+                    "estado_vehiculo": ficha.vehiculo.get_estado_display(),
+                    "concepto": concepto_label,
+                    "ente": "—",
+                    "monto": saldo,
+                    "estado": "Vendido — adeuda gastos",
+                })
+                total += saldo
         filas.sort(key=lambda f: f["monto"], reverse=True)
     elif tab == "proveedores":
         qs = (
@@ -306,13 +301,11 @@ def deudas_situacion(request):
     # Contadores para los badges de las solapas
     base = PagoGastoIngreso.objects
     from vehiculos.models import FichaVehicular
-    vendidos_con_deuda = 0
-    for f in FichaVehicular.objects.filter(vehiculo__estado="vendido").select_related("vehiculo"):
-        try:
-            if f.tiene_saldo_pendiente():
-                vendidos_con_deuda += 1
-        except Exception:
-            pass
+    from vehiculos.services import saldos_gastos_ingreso
+    saldos_vendidos = saldos_gastos_ingreso(
+        FichaVehicular.objects.filter(vehiculo__estado="vendido")
+    )
+    vendidos_con_deuda = sum(1 for conceptos in saldos_vendidos.values() if conceptos)
     counts = {
         "impagas": base.filter(situacion="cli_concesion", saldado=False).count(),
         "clientes": base.filter(situacion="cli_adelanto", saldado=False).count(),
@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import EstadoDocumentacion
+
+
+@admin.register(EstadoDocumentacion)
+class EstadoDocumentacionAdmin(admin.ModelAdmin):
+    list_display = (
+        "vehiculo", "f08_pendiente", "vtv_pendiente", "autopartes_pendiente",
+        "verificacion_pendiente", "primer_vencimiento",
+    )
+    list_filter = ("f08_pendiente", "vtv_pendiente", "autopartes_pendiente", "verificacion_pendiente")
+    list_select_related = ("vehiculo",)
+    readonly_fields = [f.name for f in EstadoDocumentacion._meta.fields]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DocumentacionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'documentacion'
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
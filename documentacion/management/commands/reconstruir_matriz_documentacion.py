@@ -0,0 +1,22 @@
+"""
+Rearma la matriz de estado de documentación (EstadoDocumentacion) desde las fichas.
+
+Uso:
+    python manage.py reconstruir_matriz_documentacion
+
+La migración 0002 ya la arma una vez y los signals de la ficha la
+mantienen; sirve si se cargaron datos por fuera del ORM (update / SQL).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from documentacion.matriz import reconstruir
+
+
+class Command(BaseCommand):
+    help = "Rearma la matriz de estado de documentación desde las fichas"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            filas = reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"Matriz de documentación rearmada | Filas: {filas}"))
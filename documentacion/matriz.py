@@ -0,0 +1,179 @@
+"""
+Matriz de estado de documentación por vehículo (`EstadoDocumentacion`).
+
+Cada ficha aporta una fila con lo que falta (F08, VTV, grabado de
+autopartes, verificación policial) y la fecha más antigua de cada
+vencimiento (VTV, verificación, patentes, beneficio habitualista). La fila
+se reescribe al guardar la ficha (signals en `documentacion.signals`) y la
+pantalla y el PDF leen de acá con una query cada uno:
+
+    matriz.pendientes("vtv", orden="dominio")   -> Vehiculo queryset
+    matriz.conteos(hoy)                         -> {"vtv": 3, ..., "vencidos": 2}
+    matriz.vencidos(hoy)                        -> Vehiculo queryset
+
+Un vehículo en stock sin ficha cuenta como pendiente de todo.
+"""
+from datetime import date
+
+from django.db.models import Count, F, Q
+
+from vehiculos import vencimientos
+from vehiculos.models import FichaVehicular, Vehiculo
+
+from .models import EstadoDocumentacion
+
+# Solapa -> (columna de la matriz, campo de la ficha, título)
+TABS = {
+    "vtv": ("vtv_pendiente", "vtv_estado", "VTV Pendiente"),
+    "autopartes": ("autopartes_pendiente", "autopartes_estado", "Grabado de Autopartes Pendiente"),
+    "verificacion": ("verificacion_pendiente", "verificacion_estado", "Verificación Policial Pendiente"),
+    "f08": ("f08_pendiente", "f08_estado", "Formulario 08 Pendiente"),
+}
+TAB_DEFAULT = "vtv"
+PENDIENTE = ("no_tiene", "", None)
+
+# Columna de vencimiento de la matriz -> etiqueta; y tipo del índice -> columna
+VENCIMIENTOS = {
+    "vtv_vencimiento": "VTV",
+    "verificacion_vencimiento": "Verificación Policial",
+    "patentes_vencimiento": "Patentes",
+    "habitualista_vencimiento": "Beneficio habitualista",
+}
+_COLUMNA_TIPO = {
+    "vtv": "vtv_vencimiento",
+    "verificacion": "verificacion_vencimiento",
+    "patente": "patentes_vencimiento",
+    "habitualista": "habitualista_vencimiento",
+}
+
+ORDENES = {
+    "vehiculo": ("marca", "modelo", "id"),
+    "dominio": ("dominio", "id"),
+    "anio": ("-anio", "id"),
+    "vencimiento": (F("estado_documentacion__primer_vencimiento").asc(nulls_last=True), "id"),
+}
+ORDEN_DEFAULT = "vehiculo"
+
+COLUMNAS = [c for c, _, _ in TABS.values()] + list(VENCIMIENTOS) + ["primer_vencimiento"]
+
+
+# ==========================================================
+# MANTENIMIENTO
+# ==========================================================
+def valores(ficha, es_habitualista, calendario=None):
+    """Columnas de la matriz para una ficha."""
+    datos = {columna: getattr(ficha, campo) in PENDIENTE for columna, campo, _ in TABS.values()}
+    datos.update(dict.fromkeys(VENCIMIENTOS))
+    for tipo, fecha in vencimientos.fechas_de(ficha, es_habitualista, calendario).values():
+        columna = _COLUMNA_TIPO.get(tipo)
+        if columna and (datos[columna] is None or fecha < datos[columna]):
+            datos[columna] = fecha
+    fechas = [datos[c] for c in VENCIMIENTOS if datos[c]]
+    datos["primer_vencimiento"] = min(fechas) if fechas else None
+    return datos
+
+
+def sincronizar(ficha, es_habitualista=None):
+    """Reescribe la fila del vehículo de la ficha (1 UPDATE, o INSERT si no estaba)."""
+    if es_habitualista is None:
+        es_habitualista = ficha.vehiculo.es_habitualista
+    EstadoDocumentacion(vehiculo_id=ficha.vehiculo_id, **valores(ficha, es_habitualista)).save()
+
+
+def campos_en_juego(update_fields):
+    """True si un save con `update_fields` puede cambiar alguna columna."""
+    if update_fields is None:
+        return True
+    campos = {campo for _, campo, _ in TABS.values()}
+    campos |= set(vencimientos.CAMPOS) | set(vencimientos.CAMPOS_HABITUALISTA)
+    return bool(set(update_fields) & campos)
+
+
+def _reescribir(Estado, fichas, calendario):
+    filas = [
+        Estado(vehiculo_id=ficha.vehiculo_id, **valores(ficha, ficha.vehiculo.es_habitualista, calendario))
+        for ficha in fichas.select_related("vehiculo").iterator(chunk_size=500)
+    ]
+    if filas:
+        Estado.objects.bulk_create(
+            filas,
+            update_conflicts=True,
+            unique_fields=["vehiculo"],
+            update_fields=COLUMNAS,
+            batch_size=500,
+        )
+    return len(filas)
+
+
+def reconstruir(apps=None):
+    """
+    Arma la matriz completa desde las fichas. Recibe el registro de apps
+    (sirve desde una migración) o usa los modelos actuales. Devuelve la
+    cantidad de filas.
+    """
+    Ficha = apps.get_model("vehiculos", "FichaVehicular") if apps else FichaVehicular
+    Estado = apps.get_model("documentacion", "EstadoDocumentacion") if apps else EstadoDocumentacion
+    Estado.objects.exclude(vehiculo_id__in=Ficha.objects.values("vehiculo_id")).delete()
+    return _reescribir(Estado, Ficha.objects.all(), vencimientos._calendario(apps))
+
+
+def actualizar_habitualistas(apps=None):
+    """Recalcula las filas de los vehículos habitualistas (cuando cambian los feriados)."""
+    Ficha = apps.get_model("vehiculos", "FichaVehicular") if apps else FichaVehicular
+    Estado = apps.get_model("documentacion", "EstadoDocumentacion") if apps else EstadoDocumentacion
+    fichas = Ficha.objects.filter(
+        vehiculo__es_habitualista=True, fecha_inscripcion_habitualista__isnull=False,
+    )
+    return _reescribir(Estado, fichas, vencimientos._calendario(apps))
+
+
+# ==========================================================
+# CONSULTAS
+# ==========================================================
+def _en_stock():
+    return Vehiculo.objects.filter(estado="stock")
+
+
+def _pendiente(tipo):
+    columna = TABS[tipo][0]
+    return Q(estado_documentacion__isnull=True) | Q(**{f"estado_documentacion__{columna}": True})
+
+
+def _vencido(hoy):
+    return Q(estado_documentacion__primer_vencimiento__lt=hoy)
+
+
+def normalizar(tipo):
+    return tipo if tipo in TABS else TAB_DEFAULT
+
+
+def titulo(tipo):
+    return TABS[normalizar(tipo)][2]
+
+
+def pendientes(tipo, orden=ORDEN_DEFAULT):
+    """Vehículos en stock con `tipo` pendiente, con ficha y matriz en la misma query."""
+    return (
+        _en_stock()
+        .filter(_pendiente(normalizar(tipo)))
+        .select_related("ficha", "estado_documentacion")
+        .order_by(*ORDENES.get(orden, ORDENES[ORDEN_DEFAULT]))
+    )
+
+
+def conteos(hoy=None):
+    """Pendientes por solapa y vehículos con algo vencido, en una query."""
+    hoy = hoy or date.today()
+    filtros = {tipo: Count("pk", filter=_pendiente(tipo)) for tipo in TABS}
+    filtros["vencidos"] = Count("pk", filter=_vencido(hoy))
+    return _en_stock().aggregate(**filtros)
+
+
+def vencidos(hoy=None):
+    """Vehículos en stock con algún vencimiento anterior a `hoy`, del más antiguo."""
+    return (
+        _en_stock()
+        .filter(_vencido(hoy or date.today()))
+        .select_related("estado_documentacion")
+        .order_by("estado_documentacion__primer_vencimiento", "id")
+    )
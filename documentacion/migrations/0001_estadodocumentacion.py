@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('vehiculos', '0045_vencimientos_desde_fichas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoDocumentacion',
+            fields=[
+                ('vehiculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estado_documentacion', serialize=False, to='vehiculos.vehiculo')),
+                ('f08_pendiente', models.BooleanField(default=True)),
+                ('vtv_pendiente', models.BooleanField(default=True)),
+                ('autopartes_pendiente', models.BooleanField(default=True)),
+                ('verificacion_pendiente', models.BooleanField(default=True)),
+                ('vtv_vencimiento', models.DateField(blank=True, null=True)),
+                ('verificacion_vencimiento', models.DateField(blank=True, null=True)),
+                ('patentes_vencimiento', models.DateField(blank=True, null=True)),
+                ('habitualista_vencimiento', models.DateField(blank=True, null=True)),
+                ('primer_vencimiento', models.DateField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estado de documentación',
+                'verbose_name_plural': 'Estado de documentación',
+                'indexes': [models.Index(fields=['primer_vencimiento'], name='documentaci_primer__e6352d_idx'), models.Index(condition=models.Q(('f08_pendiente', True)), fields=['f08_pendiente'], name='doc_f08_pendiente'), models.Index(condition=models.Q(('vtv_pendiente', True)), fields=['vtv_pendiente'], name='doc_vtv_pendiente'), models.Index(condition=models.Q(('autopartes_pendiente', True)), fields=['autopartes_pendiente'], name='doc_autopartes_pendiente'), models.Index(condition=models.Q(('verificacion_pendiente', True)), fields=['verificacion_pendiente'], name='doc_verificacion_pendiente')],
+            },
+        ),
+    ]
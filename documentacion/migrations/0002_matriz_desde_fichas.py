@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def armar_matriz(apps, schema_editor):
+    """Matriz de documentación de las fichas ya cargadas."""
+    from documentacion.matriz import reconstruir
+    reconstruir(apps)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documentacion", "0001_estadodocumentacion"),
+        ("calendario", "0003_feriados_nacionales"),
+    ]
+
+    operations = [
+        migrations.RunPython(armar_matriz, noop),
+    ]
@@ -1,3 +1,69 @@
 from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+from vehiculos.models import Vehiculo
+
+
+# ==========================================================
+# MATRIZ DE ESTADO DE DOCUMENTACIÓN
+# ==========================================================
+class EstadoDocumentacion(models.Model):
+    """
+    Una fila por vehículo con ficha: qué documentación falta (F08, VTV,
+    grabado de autopartes, verificación policial) y la fecha más antigua
+    de cada vencimiento. Se mantiene al guardar la ficha y la consulta
+    `documentacion_home` filtra, cuenta y ordena por SQL. La API está en
+    `documentacion.matriz`.
+    """
+    vehiculo = models.OneToOneField(
+        Vehiculo,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="estado_documentacion",
+    )
+
+    f08_pendiente = models.BooleanField(default=True)
+    vtv_pendiente = models.BooleanField(default=True)
+    autopartes_pendiente = models.BooleanField(default=True)
+    verificacion_pendiente = models.BooleanField(default=True)
+
+    vtv_vencimiento = models.DateField(null=True, blank=True)
+    verificacion_vencimiento = models.DateField(null=True, blank=True)
+    # El más antiguo de patentes_vto1 … patentes_vto5
+    patentes_vencimiento = models.DateField(null=True, blank=True)
+    habitualista_vencimiento = models.DateField(null=True, blank=True)
+    # El más antiguo de los anteriores: vencida si es < hoy
+    primer_vencimiento = models.DateField(null=True, blank=True)
+
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estado de documentación"
+        verbose_name_plural = "Estado de documentación"
+        indexes = [
+            models.Index(fields=["primer_vencimiento"]),
+            models.Index(fields=["f08_pendiente"], condition=Q(f08_pendiente=True), name="doc_f08_pendiente"),
+            models.Index(fields=["vtv_pendiente"], condition=Q(vtv_pendiente=True), name="doc_vtv_pendiente"),
+            models.Index(
+                fields=["autopartes_pendiente"], condition=Q(autopartes_pendiente=True),
+                name="doc_autopartes_pendiente",
+            ),
+            models.Index(
+                fields=["verificacion_pendiente"], condition=Q(verificacion_pendiente=True),
+                name="doc_verificacion_pendiente",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Documentación de {self.vehiculo_id}"
+
+    def vencidos(self, hoy):
+        """[{'tipo', 'fecha'}] de los vencimientos anteriores a `hoy`, del más antiguo."""
+        from .matriz import VENCIMIENTOS
+
+        items = [
+            {"tipo": etiqueta, "fecha": getattr(self, campo)}
+            for campo, etiqueta in VENCIMIENTOS.items()
+            if getattr(self, campo) and getattr(self, campo) < hoy
+        ]
+        return sorted(items, key=lambda i: i["fecha"])
@@ -0,0 +1,56 @@
+"""
+Mantienen la matriz de `documentacion.matriz` al guardar / borrar la ficha,
+al marcar el vehículo como habitualista y al cambiar los feriados (mueven
+el fin del beneficio habitualista).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import matriz
+
+
+def _ficha_guardada(sender, instance, update_fields=None, **kwargs):
+    if matriz.campos_en_juego(update_fields):
+        matriz.sincronizar(instance)
+
+
+def _ficha_borrada(sender, instance, **kwargs):
+    from .models import EstadoDocumentacion
+
+    EstadoDocumentacion.objects.filter(vehiculo_id=instance.vehiculo_id).delete()
+
+
+def _vehiculo_guardado(sender, instance, created=False, update_fields=None, **kwargs):
+    """El beneficio habitualista depende de un campo del vehículo."""
+    from vehiculos.models import FichaVehicular
+
+    if created or (update_fields is not None and "es_habitualista" not in update_fields):
+        return
+    ficha = FichaVehicular.objects.filter(vehiculo=instance).first()
+    if ficha:
+        matriz.sincronizar(ficha, es_habitualista=instance.es_habitualista)
+
+
+def _feriado_cambiado(sender, **kwargs):
+    transaction.on_commit(matriz.actualizar_habitualistas)
+
+
+def conectar_signals():
+    from calendario.models import Feriado
+    from vehiculos.models import FichaVehicular, Vehiculo
+
+    post_save.connect(
+        _ficha_guardada, sender=FichaVehicular, weak=False, dispatch_uid="documentacion_ficha_save",
+    )
+    post_delete.connect(
+        _ficha_borrada, sender=FichaVehicular, weak=False, dispatch_uid="documentacion_ficha_delete",
+    )
+    post_save.connect(
+        _vehiculo_guardado, sender=Vehiculo, weak=False, dispatch_uid="documentacion_vehiculo_save",
+    )
+    post_save.connect(
+        _feriado_cambiado, sender=Feriado, weak=False, dispatch_uid="documentacion_feriado_save",
+    )
+    post_delete.connect(
+        _feriado_cambiado, sender=Feriado, weak=False, dispatch_uid="documentacion_feriado_delete",
+    )
@@ -1,3 +1,104 @@
+"""
+Tests de la matriz de estado de documentación: se mantiene al guardar la
+ficha y la pantalla / el PDF salen de queries fijas sobre ella.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from vehiculos.models import FichaVehicular, Vehiculo
+
+from . import matriz
+from .models import EstadoDocumentacion
+
+
+def _vehiculo(dominio):
+    vehiculo = Vehiculo.objects.create(
+        marca="Ford", modelo="Ka", dominio=dominio, anio=2020, precio=Decimal("1000"),
+    )
+    ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=vehiculo)
+    return vehiculo, ficha
+
+
+class MatrizDocumentacionTests(TestCase):
+    def setUp(self):
+        self.hoy = date.today()
+        self.vehiculo, self.ficha = _vehiculo("AAA111")
+
+    def _fila(self):
+        return EstadoDocumentacion.objects.get(vehiculo=self.vehiculo)
+
+    def test_se_mantiene_al_guardar_la_ficha(self):
+        self.ficha.vtv_estado = "tiene"
+        self.ficha.f08_estado = "proveedor"
+        self.ficha.patentes_vto4 = self.hoy - timedelta(days=3)
+        self.ficha.patentes_vto1 = self.hoy - timedelta(days=10)
+        self.ficha.verificacion_vencimiento = self.hoy + timedelta(days=5)
+        self.ficha.save()
+        fila = self._fila()
+        self.assertEqual(
+            (fila.vtv_pendiente, fila.f08_pendiente, fila.autopartes_pendiente),
+            (False, False, True),
+        )
+        self.assertEqual(fila.patentes_vencimiento, self.hoy - timedelta(days=10))
+        self.assertEqual(fila.primer_vencimiento, self.hoy - timedelta(days=10))
+        self.assertEqual(fila.vencidos(self.hoy), [{"tipo": "Patentes", "fecha": fila.patentes_vencimiento}])
+
+        self.ficha.patentes_vto1 = None
+        self.ficha.save(update_fields=["patentes_vto1"])
+        self.assertEqual(self._fila().primer_vencimiento, self.hoy - timedelta(days=3))
+
+        self.vehiculo.es_habitualista = True
+        self.vehiculo.save()
+        self.ficha.fecha_inscripcion_habitualista = date(2026, 1, 2)
+        self.ficha.save()
+        self.assertEqual(self._fila().habitualista_vencimiento, self.ficha.habitualista_vencimiento)
+
+        self.assertEqual(matriz.reconstruir(), 1)
+        self.ficha.delete()
+        self.assertFalse(EstadoDocumentacion.objects.exists())
+
+    def test_consultas_y_conteos(self):
+        self.ficha.vtv_estado = "tiene"
+        self.ficha.vtv_vencimiento = self.hoy - timedelta(days=1)
+        self.ficha.save()
+        otro, ficha_otro = _vehiculo("BBB222")
+        ficha_otro.autopartes_estado = "tiene"
+        ficha_otro.save()
+        vendido, _ = _vehiculo("CCC333")
+        vendido.estado = "vendido"
+        vendido.save()
+
+        self.assertEqual(list(matriz.pendientes("vtv")), [otro])
+        self.assertEqual(list(matriz.pendientes("autopartes")), [self.vehiculo])
+        self.assertEqual(list(matriz.vencidos(self.hoy)), [self.vehiculo])
+        self.assertEqual(
+            matriz.conteos(self.hoy),
+            {"vtv": 1, "autopartes": 1, "verificacion": 2, "f08": 2, "vencidos": 1},
+        )
+        self.assertEqual(list(matriz.pendientes("f08", orden="dominio")), [self.vehiculo, otro])
+
+    def test_vistas_con_queries_constantes(self):
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        urls = [reverse("documentacion:home"), reverse("documentacion:pdf") + "?tipo=f08"]
+        antes = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+            antes[url] = len(ctx.captured_queries)
 
-# Create your tests here.
+        for i in range(4):
+            _, ficha = _vehiculo(f"DDD{i:03}")
+            ficha.vtv_vencimiento = self.hoy - timedelta(days=i + 1)
+            ficha.patentes_vto2 = self.hoy - timedelta(days=30)
+            ficha.save()
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                respuesta = self.client.get(url, secure=True)
+            self.assertEqual(len(ctx.captured_queries), antes[url], url)
+        self.assertEqual(respuesta["Content-Type"], "application/pdf")
@@ -14,10 +14,11 @@ from openpyxl import Workbook
 
 # PDF
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 
+from reportes.pdf_utils import encabezado, estilo, pie_empresa
+
 
 # ==========================================================
 # IDENTIDAD VISUAL
@@ -26,6 +27,23 @@ COLOR_AZUL = colors.HexColor("#002855")
 COLOR_NARANJA = colors.HexColor("#FF6C1A")
 COLOR_GRIS = colors.HexColor("#F4F6F8")
 
+# TableStyles de los listados y del total (se reutilizan en cada PDF)
+ESTILO_TABLA = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), COLOR_GRIS),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+    ("PADDING", (0, 0), (-1, -1), 8),
+])
+ESTILO_TOTAL = TableStyle([
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 13),
+    ("TEXTCOLOR", (1, 0), (1, 0), COLOR_NARANJA),
+    ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+    ("LINEABOVE", (0, 0), (-1, 0), 1, colors.lightgrey),
+    ("TOPPADDING", (0, 0), (-1, -1), 10),
+])
+
 
 # ==========================================================
 # HELPERS
@@ -164,8 +182,8 @@ def exportar_excel_mensual(request):
     ws.append(["Número", "Fecha", "Detalle", "Monto total", "Venta"])
 
     for f in facturas:
-        if f.venta:
-            detalle = f"Venta #{f.venta.id}"
+        if f.venta_id:
+            detalle = f"Venta #{f.venta_id}"
         else:
             detalle = f.descripcion or ""
         ws.append([
@@ -173,7 +191,7 @@ def exportar_excel_mensual(request):
             f.fecha.strftime("%d/%m/%Y"),
             detalle,
             float(f.monto),
-            f.venta.id if f.venta else ""
+            f.venta_id or ""
         ])
 
     total = facturas.aggregate(total=Sum("monto"))["total"] or 0
@@ -211,8 +229,8 @@ def exportar_excel_anual(request):
     ws.append(["Número", "Fecha", "Detalle", "Monto total", "Venta"])
 
     for f in facturas:
-        if f.venta:
-            detalle = f"Venta #{f.venta.id}"
+        if f.venta_id:
+            detalle = f"Venta #{f.venta_id}"
         else:
             detalle = f.descripcion or ""
         ws.append([
@@ -220,7 +238,7 @@ def exportar_excel_anual(request):
             f.fecha.strftime("%d/%m/%Y"),
             detalle,
             float(f.monto),
-            f.venta.id if f.venta else ""
+            f.venta_id or ""
         ])
 
     total = facturas.aggregate(total=Sum("monto"))["total"] or 0
@@ -266,41 +284,16 @@ def exportar_pdf_mensual(request):
         bottomMargin=40
     )
 
-    styles = getSampleStyleSheet()
     elementos = []
 
     MESES_NOMBRE = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
                     "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
 
-    header = Table(
-        [[
-            Paragraph(
-                "<b>AMICHETTI AUTOMOTORES</b><br/>"
-                f"Facturación Mensual – {MESES_NOMBRE[mes]} {anio}",
-                ParagraphStyle(
-                    "h1",
-                    fontSize=14,
-                    textColor=colors.white
-                )
-            ),
-            Paragraph(
-                f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
-                ParagraphStyle(
-                    "h2",
-                    fontSize=10,
-                    textColor=colors.white,
-                    alignment=2
-                )
-            )
-        ]],
-        colWidths=[340, 180]
+    header = encabezado(
+        f"<b>AMICHETTI AUTOMOTORES</b><br/>Facturación Mensual – {MESES_NOMBRE[mes]} {anio}",
+        f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
     )
 
-    header.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
-        ("PADDING", (0, 0), (-1, -1), 14),
-    ]))
-
     elementos.append(header)
     elementos.append(Spacer(1, 20))
 
@@ -313,8 +306,8 @@ def exportar_pdf_mensual(request):
         iva = f.monto_iva if f.monto_iva is not None else Decimal("0.00")
         total = f.monto
 
-        if f.venta:
-            detalle = f"Venta #{f.venta.id}"
+        if f.venta_id:
+            detalle = f"Venta #{f.venta_id}"
         else:
             detalle = f.descripcion or "-"
 
@@ -328,13 +321,7 @@ def exportar_pdf_mensual(request):
         ])
 
     tabla = Table(data, colWidths=[75, 65, 110, 85, 85, 95])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), COLOR_GRIS),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("PADDING", (0, 0), (-1, -1), 8),
-    ]))
+    tabla.setStyle(ESTILO_TABLA)
 
     elementos.append(tabla)
     elementos.append(Spacer(1, 16))
@@ -346,29 +333,12 @@ def exportar_pdf_mensual(request):
         colWidths=[390, 110]
     )
 
-    total_box.setStyle(TableStyle([
-        ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 13),
-        ("TEXTCOLOR", (1, 0), (1, 0), COLOR_NARANJA),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-        ("LINEABOVE", (0, 0), (-1, 0), 1, colors.lightgrey),
-        ("TOPPADDING", (0, 0), (-1, -1), 10),
-    ]))
+    total_box.setStyle(ESTILO_TOTAL)
 
     elementos.append(total_box)
     elementos.append(Spacer(1, 30))
 
-    elementos.append(
-        Paragraph(
-            "Amichetti Automotores · Rojas, Buenos Aires",
-            ParagraphStyle(
-                "f",
-                fontSize=8,
-                textColor=colors.grey,
-                alignment=1
-            )
-        )
-    )
+    elementos.append(pie_empresa())
 
     doc.build(elementos)
     return response
@@ -401,38 +371,13 @@ def exportar_pdf_anual(request):
         bottomMargin=40
     )
 
-    styles = getSampleStyleSheet()
     elementos = []
 
-    header = Table(
-        [[
-            Paragraph(
-                "<b>AMICHETTI AUTOMOTORES</b><br/>"
-                f"Facturación Anual – {anio}",
-                ParagraphStyle(
-                    "h1",
-                    fontSize=14,
-                    textColor=colors.white
-                )
-            ),
-            Paragraph(
-                f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
-                ParagraphStyle(
-                    "h2",
-                    fontSize=10,
-                    textColor=colors.white,
-                    alignment=2
-                )
-            )
-        ]],
-        colWidths=[340, 180]
+    header = encabezado(
+        f"<b>AMICHETTI AUTOMOTORES</b><br/>Facturación Anual – {anio}",
+        f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
     )
 
-    header.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
-        ("PADDING", (0, 0), (-1, -1), 14),
-    ]))
-
     elementos.append(header)
     elementos.append(Spacer(1, 20))
 
@@ -445,8 +390,8 @@ def exportar_pdf_anual(request):
         iva = f.monto_iva if f.monto_iva is not None else Decimal("0.00")
         total = f.monto
 
-        if f.venta:
-            detalle = f"Venta #{f.venta.id}"
+        if f.venta_id:
+            detalle = f"Venta #{f.venta_id}"
         else:
             detalle = f.descripcion or "-"
 
@@ -460,13 +405,7 @@ def exportar_pdf_anual(request):
         ])
 
     tabla = Table(data, colWidths=[75, 65, 110, 85, 85, 95])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), COLOR_GRIS),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("PADDING", (0, 0), (-1, -1), 8),
-    ]))
+    tabla.setStyle(ESTILO_TABLA)
 
     elementos.append(tabla)
     elementos.append(Spacer(1, 16))
@@ -478,29 +417,12 @@ def exportar_pdf_anual(request):
         colWidths=[390, 110]
     )
 
-    total_box.setStyle(TableStyle([
-        ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 13),
-        ("TEXTCOLOR", (1, 0), (1, 0), COLOR_NARANJA),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-        ("LINEABOVE", (0, 0), (-1, 0), 1, colors.lightgrey),
-        ("TOPPADDING", (0, 0), (-1, -1), 10),
-    ]))
+    total_box.setStyle(ESTILO_TOTAL)
 
     elementos.append(total_box)
     elementos.append(Spacer(1, 30))
 
-    elementos.append(
-        Paragraph(
-            "Amichetti Automotores · Rojas, Buenos Aires",
-            ParagraphStyle(
-                "f",
-                fontSize=8,
-                textColor=colors.grey,
-                alignment=1
-            )
-        )
-    )
+    elementos.append(pie_empresa())
 
     doc.build(elementos)
     return response
@@ -625,24 +547,10 @@ def compras_pdf_mensual(request):
     doc = SimpleDocTemplate(response, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40)
     elementos = []
 
-    header = Table(
-        [[
-            Paragraph(
-                "<b>AMICHETTI AUTOMOTORES</b><br/>"
-                f"Compras – {MESES[mes]} {anio}",
-                ParagraphStyle("h1", fontSize=14, textColor=colors.white)
-            ),
-            Paragraph(
-                f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
-                ParagraphStyle("h2", fontSize=10, textColor=colors.white, alignment=2)
-            )
-        ]],
-        colWidths=[340, 180]
+    header = encabezado(
+        f"<b>AMICHETTI AUTOMOTORES</b><br/>Compras – {MESES[mes]} {anio}",
+        f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
     )
-    header.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
-        ("PADDING", (0, 0), (-1, -1), 14),
-    ]))
     elementos.append(header)
     elementos.append(Spacer(1, 20))
 
@@ -661,29 +569,16 @@ def compras_pdf_mensual(request):
         ])
 
     tabla = Table(data, colWidths=[80, 90, 70, 90, 90, 90])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), COLOR_GRIS),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("PADDING", (0, 0), (-1, -1), 8),
-    ]))
+    tabla.setStyle(ESTILO_TABLA)
     elementos.append(tabla)
     elementos.append(Spacer(1, 16))
 
     total_general = compras.aggregate(total=Sum("monto"))["total"] or 0
     total_box = Table([["TOTAL COMPRAS", f"$ {total_general:,.2f}"]], colWidths=[390, 110])
-    total_box.setStyle(TableStyle([
-        ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 13),
-        ("TEXTCOLOR", (1, 0), (1, 0), COLOR_NARANJA),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-        ("LINEABOVE", (0, 0), (-1, 0), 1, colors.lightgrey),
-        ("TOPPADDING", (0, 0), (-1, -1), 10),
-    ]))
+    total_box.setStyle(ESTILO_TOTAL)
     elementos.append(total_box)
     elementos.append(Spacer(1, 30))
-    elementos.append(Paragraph("Amichetti Automotores · Rojas, Buenos Aires", ParagraphStyle("f", fontSize=8, textColor=colors.grey, alignment=1)))
+    elementos.append(pie_empresa())
 
     doc.build(elementos)
     return response
@@ -707,23 +602,10 @@ def compras_pdf_anual(request):
     doc = SimpleDocTemplate(response, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40)
     elementos = []
 
-    header = Table(
-        [[
-            Paragraph(
-                f"<b>AMICHETTI AUTOMOTORES</b><br/>Compras Anual – {anio}",
-                ParagraphStyle("h1", fontSize=14, textColor=colors.white)
-            ),
-            Paragraph(
-                f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
-                ParagraphStyle("h2", fontSize=10, textColor=colors.white, alignment=2)
-            )
-        ]],
-        colWidths=[340, 180]
+    header = encabezado(
+        f"<b>AMICHETTI AUTOMOTORES</b><br/>Compras Anual – {anio}",
+        f"Fecha emisión<br/>{hoy.strftime('%d/%m/%Y')}",
     )
-    header.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
-        ("PADDING", (0, 0), (-1, -1), 14),
-    ]))
     elementos.append(header)
     elementos.append(Spacer(1, 20))
 
@@ -742,29 +624,16 @@ def compras_pdf_anual(request):
         ])
 
     tabla = Table(data, colWidths=[80, 90, 70, 90, 90, 90])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), COLOR_GRIS),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("PADDING", (0, 0), (-1, -1), 8),
-    ]))
+    tabla.setStyle(ESTILO_TABLA)
     elementos.append(tabla)
     elementos.append(Spacer(1, 16))
 
     total_general = compras.aggregate(total=Sum("monto"))["total"] or 0
     total_box = Table([["TOTAL ANUAL COMPRAS", f"$ {total_general:,.2f}"]], colWidths=[390, 110])
-    total_box.setStyle(TableStyle([
-        ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 13),
-        ("TEXTCOLOR", (1, 0), (1, 0), COLOR_NARANJA),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-        ("LINEABOVE", (0, 0), (-1, 0), 1, colors.lightgrey),
-        ("TOPPADDING", (0, 0), (-1, -1), 10),
-    ]))
+    total_box.setStyle(ESTILO_TOTAL)
     elementos.append(total_box)
     elementos.append(Spacer(1, 30))
-    elementos.append(Paragraph("Amichetti Automotores · Rojas, Buenos Aires", ParagraphStyle("f", fontSize=8, textColor=colors.grey, alignment=1)))
+    elementos.append(pie_empresa())
 
     doc.build(elementos)
     return response
@@ -943,28 +812,15 @@ def iva_pdf(request):
     elementos = []
 
     # Header
-    header = Table(
-        [[
-            Paragraph(
-                f"<b>AMICHETTI AUTOMOTORES</b><br/>Posicion IVA - {mes_nombre} {anio}",
-                ParagraphStyle("h1", fontSize=14, textColor=colors.white)
-            ),
-            Paragraph(
-                f"Generado el {hoy.strftime('%d/%m/%Y')}",
-                ParagraphStyle("h2", fontSize=10, textColor=colors.white, alignment=2)
-            ),
-        ]],
-        colWidths=[340, 180]
+    header = encabezado(
+        f"<b>AMICHETTI AUTOMOTORES</b><br/>Posicion IVA - {mes_nombre} {anio}",
+        f"Generado el {hoy.strftime('%d/%m/%Y')}",
     )
-    header.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
-        ("PADDING", (0, 0), (-1, -1), 14),
-    ]))
     elementos.append(header)
     elementos.append(Spacer(1, 20))
 
     # Ventas
-    elementos.append(Paragraph("<b>IVA DEBITO FISCAL (VENTAS)</b>", ParagraphStyle("s", fontSize=11, textColor=COLOR_AZUL)))
+    elementos.append(Paragraph("<b>IVA DEBITO FISCAL (VENTAS)</b>", estilo("s", fontSize=11, textColor=COLOR_AZUL)))
     elementos.append(Spacer(1, 8))
 
     data_v = [["N° Factura", "Fecha", "Neto", "IVA", "Total"]]
@@ -986,11 +842,11 @@ def iva_pdf(request):
     ]))
     elementos.append(tabla_v)
     elementos.append(Spacer(1, 6))
-    elementos.append(Paragraph(f"<b>Total IVA Debito: $ {iva_debito:,.2f}</b>", ParagraphStyle("td", fontSize=10, alignment=2)))
+    elementos.append(Paragraph(f"<b>Total IVA Debito: $ {iva_debito:,.2f}</b>", estilo("td", fontSize=10, alignment=2)))
     elementos.append(Spacer(1, 16))
 
     # Compras
-    elementos.append(Paragraph("<b>IVA CREDITO FISCAL (COMPRAS)</b>", ParagraphStyle("s2", fontSize=11, textColor=COLOR_AZUL)))
+    elementos.append(Paragraph("<b>IVA CREDITO FISCAL (COMPRAS)</b>", estilo("s2", fontSize=11, textColor=COLOR_AZUL)))
     elementos.append(Spacer(1, 8))
 
     data_c = [["N° Factura", "Proveedor", "Neto", "IVA", "Total"]]
@@ -1012,7 +868,7 @@ def iva_pdf(request):
     ]))
     elementos.append(tabla_c)
     elementos.append(Spacer(1, 6))
-    elementos.append(Paragraph(f"<b>Total IVA Credito: $ {iva_credito:,.2f}</b>", ParagraphStyle("tc", fontSize=10, alignment=2)))
+    elementos.append(Paragraph(f"<b>Total IVA Credito: $ {iva_credito:,.2f}</b>", estilo("tc", fontSize=10, alignment=2)))
     elementos.append(Spacer(1, 20))
 
     # Resultado
@@ -1036,7 +892,7 @@ def iva_pdf(request):
 
     elementos.append(Paragraph(
         "Amichetti Automotores - Rojas, Buenos Aires",
-        ParagraphStyle("footer", fontSize=8, textColor=colors.grey, alignment=1)
+        estilo("footer", fontSize=8, textColor=colors.grey, alignment=1)
     ))
 
     doc.build(elementos)
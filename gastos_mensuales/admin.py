@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CategoriaGasto, GastoMensual, ResumenGastosMensual
+from .models import CategoriaGasto, GastoMensual, ResumenGastosCategoria, ResumenGastosMensual
 
 
 @admin.register(CategoriaGasto)
@@ -16,4 +16,10 @@ class GastoMensualAdmin(admin.ModelAdmin):
 
 @admin.register(ResumenGastosMensual)
 class ResumenGastosMensualAdmin(admin.ModelAdmin):
-    list_display = ("mes", "anio", "total_general", "total_pagado", "total_pendiente")
+    list_display = ("mes", "anio", "total_general", "total_pagado", "total_pendiente", "total_vehiculos")
+
+
+@admin.register(ResumenGastosCategoria)
+class ResumenGastosCategoriaAdmin(admin.ModelAdmin):
+    list_display = ("mes", "anio", "categoria", "total", "pagado", "cantidad")
+    list_filter = ("anio", "categoria")
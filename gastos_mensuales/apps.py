@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class GastosMensualesConfig(AppConfig):
     name = 'gastos_mensuales'
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
@@ -0,0 +1,22 @@
+"""
+Rearma los resúmenes mensuales de Control de Gastos desde los gastos.
+
+Uso:
+    python manage.py reconstruir_resumenes_gastos
+
+La migración 0005 ya los arma una vez y los signals de GastoMensual los
+mantienen; sirve si se cargaron gastos por fuera del ORM (update / SQL).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gastos_mensuales.resumenes import reconstruir
+
+
+class Command(BaseCommand):
+    help = "Rearma los resúmenes mensuales y por categoría de Control de Gastos"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            meses = reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes de gastos rearmados | Meses: {meses}"))
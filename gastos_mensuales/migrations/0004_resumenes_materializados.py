@@ -0,0 +1,48 @@
+# Generated by Django 5.2.10 on 2026-10-19 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gastos_mensuales', '0003_detalle_vehiculo_gastos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumengastosmensual',
+            name='cantidad',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resumengastosmensual',
+            name='pagado_vehiculos',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='resumengastosmensual',
+            name='total_vehiculos',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.CreateModel(
+            name='ResumenGastosCategoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.PositiveSmallIntegerField()),
+                ('anio', models.PositiveIntegerField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pagado', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('vehiculos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='gastos_mensuales.categoriagasto')),
+            ],
+            options={
+                'verbose_name': 'Resumen de gastos por categoría',
+                'verbose_name_plural': 'Resúmenes de gastos por categoría',
+                'ordering': ['-anio', '-mes', '-total'],
+                'unique_together': {('anio', 'mes', 'categoria')},
+            },
+        ),
+    ]
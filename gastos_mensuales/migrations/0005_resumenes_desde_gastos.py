@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def armar_resumenes(apps, schema_editor):
+    """Resúmenes mensuales y por categoría de los gastos ya cargados."""
+    from gastos_mensuales.resumenes import reconstruir
+    reconstruir(apps)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gastos_mensuales", "0004_resumenes_materializados"),
+    ]
+
+    operations = [
+        migrations.RunPython(armar_resumenes, noop),
+    ]
@@ -1,6 +1,5 @@
 from django.db import models
 from django.contrib.auth.models import User
-from decimal import Decimal
 
 
 # ============================================================
@@ -77,6 +76,11 @@ class GastoMensual(models.Model):
     def __str__(self):
         return f"{self.categoria.nombre} – ${self.monto} ({self.mes}/{self.anio})"
 
+    @property
+    def es_de_vehiculo(self):
+        """Espejo de un gasto cargado en la ficha de un vehículo (tag [GCF:...])."""
+        return bool(self.descripcion and "[GCF:" in self.descripcion)
+
     @property
     def descripcion_visible(self):
         """Descripción sin los tags internos de sincronización ([GCF:...] / [GC#...])."""
@@ -86,8 +90,10 @@ class GastoMensual(models.Model):
 
 
 # ============================================================
-# RESUMEN MENSUAL DE GASTOS (CACHE/CIERRE)
+# RESUMEN MENSUAL DE GASTOS (ROLLUP)
 # ============================================================
+# Los mantiene gastos_mensuales.resumenes: cada alta / edición / baja de un
+# GastoMensual recalcula solo los meses que toca.
 class ResumenGastosMensual(models.Model):
     mes = models.PositiveSmallIntegerField()
     anio = models.PositiveIntegerField()
@@ -98,6 +104,11 @@ class ResumenGastosMensual(models.Model):
     total_pagado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     total_pendiente = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
+    # Espejos de gastos de vehículos ([GCF:...]) dentro del total
+    total_vehiculos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pagado_vehiculos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cantidad = models.PositiveIntegerField(default=0)
+
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -107,26 +118,46 @@ class ResumenGastosMensual(models.Model):
     def __str__(self):
         return f"Resumen {self.mes}/{self.anio} – ${self.total_general}"
 
-    def recalcular(self):
-        gastos = GastoMensual.objects.filter(mes=self.mes, anio=self.anio)
+    @property
+    def total_generales(self):
+        """Total sin los gastos de vehículos."""
+        return self.total_general - self.total_vehiculos
 
-        self.total_fijos = gastos.filter(
-            categoria__es_fijo=True
-        ).aggregate(t=models.Sum("monto"))["t"] or Decimal("0")
+    @property
+    def pagado_generales(self):
+        return self.total_pagado - self.pagado_vehiculos
 
-        self.total_variables = gastos.filter(
-            categoria__es_fijo=False
-        ).aggregate(t=models.Sum("monto"))["t"] or Decimal("0")
+    def recalcular(self):
+        from . import resumenes
+        resumenes.recalcular([(self.anio, self.mes)])
+        actual = resumenes.del_periodo(self.anio, self.mes)
+        self.pk = actual.pk
+        for campo in resumenes.CAMPOS:
+            setattr(self, campo, getattr(actual, campo))
 
-        self.total_general = self.total_fijos + self.total_variables
 
-        self.total_pagado = gastos.filter(
-            pagado=True
-        ).aggregate(t=models.Sum("monto"))["t"] or Decimal("0")
+class ResumenGastosCategoria(models.Model):
+    mes = models.PositiveSmallIntegerField()
+    anio = models.PositiveIntegerField()
+    categoria = models.ForeignKey(
+        CategoriaGasto,
+        on_delete=models.CASCADE,
+        related_name="resumenes",
+    )
 
-        self.total_pendiente = self.total_general - self.total_pagado
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pagado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    vehiculos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cantidad = models.PositiveIntegerField(default=0)
 
-        self.save()
+    class Meta:
+        unique_together = ("anio", "mes", "categoria")
+        ordering = ["-anio", "-mes", "-total"]
+        verbose_name = "Resumen de gastos por categoría"
+        verbose_name_plural = "Resúmenes de gastos por categoría"
+
+    def __str__(self):
+        return f"{self.categoria_id} {self.mes}/{self.anio} – ${self.total}"
 
 
 # ============================================================
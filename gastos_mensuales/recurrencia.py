@@ -0,0 +1,96 @@
+"""
+Motor de recurrencia mensual (copiar gastos / pagos de un mes a otro).
+
+Lo usan la Agenda de Pagos (`copiar_mes_anterior`, próximo mes de un
+recurrente) y los "Copiar fijos del mes anterior" de Control de Gastos y
+Gastos Personales. En vez de un `.exists()` + `create()` por fila:
+
+  1) arma en memoria todas las filas destino (uno o varios meses),
+  2) detecta las que ya existen con UNA sola query sobre la clave,
+  3) inserta las faltantes con un único `bulk_create`.
+"""
+import calendar
+from datetime import date
+
+from django.db.models import Q
+
+
+def sumar_meses(anio, mes, n):
+    """(anio, mes) desplazado `n` meses (n puede ser negativo)."""
+    total = anio * 12 + (mes - 1) + n
+    return total // 12, total % 12 + 1
+
+
+def meses_desde(anio, mes, cantidad=1):
+    """Lista de `cantidad` períodos (anio, mes) consecutivos desde (anio, mes)."""
+    return [sumar_meses(anio, mes, i) for i in range(max(int(cantidad), 1))]
+
+
+def fecha_en_mes(fecha, anio, mes):
+    """Mismo día de `fecha` en el mes indicado (clamp al último día del mes)."""
+    ultimo = calendar.monthrange(anio, mes)[1]
+    return date(anio, mes, min(fecha.day, ultimo))
+
+
+def _clave(obj, campos):
+    return tuple(getattr(obj, c) for c in campos)
+
+
+def claves_existentes(queryset, campos, candidatos):
+    """
+    Devuelve el set de claves (tuplas de `campos`) de `queryset` que
+    coinciden con alguno de los `candidatos`, en una sola query.
+
+    El filtro es un superconjunto (IN por cada campo); la coincidencia
+    exacta de la tupla se resuelve en memoria.
+    """
+    if not candidatos:
+        return set()
+    filtro = Q()
+    for campo in campos:
+        valores = {getattr(c, campo) for c in candidatos}
+        cond = Q(**{f"{campo}__in": [v for v in valores if v is not None]})
+        if None in valores:
+            cond |= Q(**{f"{campo}__isnull": True})
+        filtro &= cond
+    return set(queryset.filter(filtro).values_list(*campos))
+
+
+def planificar(origen, periodos, construir, queryset, campos):
+    """
+    Calcula las copias de `origen` para cada período de `periodos`.
+
+    `construir(src, anio, mes)` devuelve la instancia nueva (sin guardar) o
+    None si ese período no corresponde (ej: pasado el fin de un recurrente).
+    `queryset`/`campos` definen dónde y con qué clave se detectan duplicados.
+
+    Devuelve una lista de dicts {"origen", "nuevo", "anio", "mes", "ya_existe"}
+    en el orden de `origen` y luego de `periodos`. Si el mismo origen genera
+    dos veces la misma clave (o dos orígenes colisionan) solo la primera
+    queda como nueva.
+    """
+    plan = []
+    for src in origen:
+        for anio, mes in periodos:
+            nuevo = construir(src, anio, mes)
+            if nuevo is not None:
+                plan.append({"origen": src, "nuevo": nuevo, "anio": anio, "mes": mes})
+
+    existentes = claves_existentes(queryset, campos, [p["nuevo"] for p in plan])
+    vistos = set()
+    for p in plan:
+        clave = _clave(p["nuevo"], campos)
+        p["ya_existe"] = clave in existentes or clave in vistos
+        vistos.add(clave)
+    return plan
+
+
+def insertar(model, plan):
+    """
+    Inserta con un único `bulk_create` las filas del plan que no existían.
+    Devuelve la lista de instancias creadas.
+    """
+    nuevos = [p["nuevo"] for p in plan if not p["ya_existe"]]
+    if nuevos:
+        model.objects.bulk_create(nuevos)
+    return nuevos
@@ -0,0 +1,167 @@
+"""
+Resúmenes mensuales materializados de Control de Gastos.
+
+ResumenGastosMensual (un registro por mes) y ResumenGastosCategoria (uno
+por mes y categoría) se mantienen al día desde los signals de
+GastoMensual: cada alta / edición / baja recalcula solo los meses que
+toca (una query de esos meses y un upsert). Las pantallas leen esas filas
+en lugar de agregar los gastos en cada request.
+
+    resumenes.recalcular([(anio, mes), ...])
+    resumenes.del_periodo(anio, mes)        -> ResumenGastosMensual (vacío si no hay gastos)
+    resumenes.serie([(anio, mes), ...])     -> {(anio, mes): ResumenGastosMensual}
+    resumenes.por_categoria(anio, mes)      -> [ResumenGastosCategoria] con la categoría
+    resumenes.reconstruir()                 -> rearma todos
+
+Las escrituras en lote que no pasan por los signals (`bulk_create`,
+`update`) llaman a `recalcular` con los meses afectados.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Q
+
+# Los espejos de gastos de vehículos llevan el tag [GCF:campo#ficha]
+Q_VEHICULO = Q(descripcion__contains="[GCF:")
+
+CAMPOS = (
+    "total_fijos", "total_variables", "total_general", "total_pagado",
+    "total_pendiente", "total_vehiculos", "pagado_vehiculos", "cantidad",
+)
+CAMPOS_CATEGORIA = ("total", "pagado", "vehiculos", "cantidad")
+
+
+def _modelos(apps=None):
+    if apps is None:
+        from .models import GastoMensual, ResumenGastosCategoria, ResumenGastosMensual
+        return GastoMensual, ResumenGastosMensual, ResumenGastosCategoria
+    return (
+        apps.get_model("gastos_mensuales", "GastoMensual"),
+        apps.get_model("gastos_mensuales", "ResumenGastosMensual"),
+        apps.get_model("gastos_mensuales", "ResumenGastosCategoria"),
+    )
+
+
+def _filtro(periodos):
+    filtro = Q()
+    for anio, mes in periodos:
+        filtro |= Q(anio=anio, mes=mes)
+    return filtro
+
+
+def recalcular(periodos, apps=None):
+    """
+    Recalcula los resúmenes de `periodos` [(anio, mes), ...]: 1 query de
+    los gastos de esos meses + upserts + borrado de lo que quedó vacío.
+    """
+    GastoMensual, Resumen, PorCategoria = _modelos(apps)
+    periodos = {(int(a), int(m)) for a, m in periodos if a and m}
+    if not periodos:
+        return
+
+    # Una sola query con las columnas justas; la suma y la separación de
+    # los espejos de vehículos se hacen en memoria (mismo criterio que
+    # GastoMensual.es_de_vehiculo, sin LIKE en la base).
+    filas = (
+        GastoMensual.objects.filter(_filtro(periodos))
+        .order_by()
+        .values_list("anio", "mes", "categoria_id", "categoria__es_fijo", "monto", "pagado", "descripcion")
+    )
+
+    cero = Decimal("0")
+    meses = defaultdict(lambda: dict.fromkeys(CAMPOS, cero))
+    categorias = {}
+    for anio, mes, categoria_id, es_fijo, monto, pagado, descripcion in filas:
+        monto = monto or cero
+        de_vehiculo = bool(descripcion and "[GCF:" in descripcion)
+        r = meses[(anio, mes)]
+        r["total_fijos" if es_fijo else "total_variables"] += monto
+        r["total_general"] += monto
+        r["cantidad"] += 1
+        c = categorias.get((anio, mes, categoria_id))
+        if c is None:
+            c = categorias[(anio, mes, categoria_id)] = PorCategoria(
+                anio=anio, mes=mes, categoria_id=categoria_id,
+                total=cero, pagado=cero, vehiculos=cero, cantidad=0,
+            )
+        c.total += monto
+        c.cantidad += 1
+        if pagado:
+            r["total_pagado"] += monto
+            c.pagado += monto
+        if de_vehiculo:
+            r["total_vehiculos"] += monto
+            c.vehiculos += monto
+            if pagado:
+                r["pagado_vehiculos"] += monto
+    for r in meses.values():
+        r["total_pendiente"] = r["total_general"] - r["total_pagado"]
+
+    vacios = periodos - set(meses)
+    if vacios:
+        Resumen.objects.filter(_filtro(vacios)).delete()
+    if meses:
+        Resumen.objects.bulk_create(
+            [Resumen(anio=a, mes=m, **r) for (a, m), r in meses.items()],
+            update_conflicts=True,
+            unique_fields=["mes", "anio"],
+            update_fields=list(CAMPOS) + ["fecha_actualizacion"],
+        )
+
+    # Por categoría: se reemplazan las filas de esos meses
+    PorCategoria.objects.filter(_filtro(periodos)).delete()
+    if categorias:
+        PorCategoria.objects.bulk_create(list(categorias.values()))
+
+
+def reconstruir(apps=None):
+    """Rearma los resúmenes de todos los meses con gastos. Devuelve cuántos meses."""
+    GastoMensual, Resumen, PorCategoria = _modelos(apps)
+    periodos = set(GastoMensual.objects.order_by().values_list("anio", "mes").distinct())
+    periodos |= set(Resumen.objects.values_list("anio", "mes"))
+    lista = sorted(periodos)
+    for i in range(0, len(lista), 50):
+        recalcular(lista[i:i + 50], apps)
+    return len(periodos)
+
+
+# ==========================================================
+# LECTURA
+# ==========================================================
+def serie(periodos):
+    """{(anio, mes): resumen} de los `periodos` en una query (vacíos si no hay gastos)."""
+    from .models import ResumenGastosMensual
+
+    periodos = [(int(a), int(m)) for a, m in periodos]
+    encontrados = {
+        (r.anio, r.mes): r
+        for r in ResumenGastosMensual.objects.filter(_filtro(periodos))
+    } if periodos else {}
+    return {
+        p: encontrados.get(p) or ResumenGastosMensual(anio=p[0], mes=p[1])
+        for p in periodos
+    }
+
+
+def del_periodo(anio, mes):
+    return serie([(anio, mes)])[(int(anio), int(mes))]
+
+
+def por_categoria(anio, mes):
+    from .models import ResumenGastosCategoria
+
+    return list(
+        ResumenGastosCategoria.objects.filter(anio=anio, mes=mes)
+        .select_related("categoria")
+        .order_by("-total", "categoria__nombre")
+    )
+
+
+def anios():
+    """Años con gastos cargados, del más reciente al más viejo."""
+    from .models import ResumenGastosMensual
+
+    return list(
+        ResumenGastosMensual.objects.order_by("-anio")
+        .values_list("anio", flat=True).distinct()
+    )
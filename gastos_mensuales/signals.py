@@ -0,0 +1,71 @@
+"""
+Mantiene los resúmenes mensuales (ver `gastos_mensuales.resumenes`) al
+guardar o borrar un GastoMensual, y al cambiar si una categoría es fija.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import resumenes
+
+# Campos de GastoMensual que cambian algún total
+CAMPOS_RESUMEN = {"categoria", "categoria_id", "descripcion", "monto", "mes", "anio", "pagado"}
+
+
+def _en_juego(update_fields):
+    return update_fields is None or bool(CAMPOS_RESUMEN & set(update_fields))
+
+
+def _guardar_periodo_previo(sender, instance, update_fields=None, **kwargs):
+    """Si el save puede mover el gasto de mes, recuerda el mes anterior (1 query)."""
+    instance._periodo_previo = None
+    if not instance.pk:
+        return
+    if update_fields is None or {"mes", "anio"} & set(update_fields):
+        instance._periodo_previo = (
+            sender.objects.filter(pk=instance.pk).values_list("anio", "mes").first()
+        )
+
+
+def _gasto_guardado(sender, instance, update_fields=None, **kwargs):
+    if not _en_juego(update_fields):
+        return
+    periodos = {(instance.anio, instance.mes)}
+    previo = getattr(instance, "_periodo_previo", None)
+    if previo:
+        periodos.add(previo)
+    resumenes.recalcular(periodos)
+
+
+def _gasto_borrado(sender, instance, **kwargs):
+    resumenes.recalcular([(instance.anio, instance.mes)])
+
+
+def _categoria_guardada(sender, instance, created, **kwargs):
+    # Fijo / variable se decide por la categoría: rehacer sus meses
+    if created:
+        return
+    from .models import GastoMensual
+    resumenes.recalcular(
+        GastoMensual.objects.filter(categoria=instance).order_by()
+        .values_list("anio", "mes").distinct()
+    )
+
+
+def conectar_signals():
+    from .models import CategoriaGasto, GastoMensual
+
+    pre_save.connect(
+        _guardar_periodo_previo, sender=GastoMensual, weak=False,
+        dispatch_uid="resumen_gastos_presave",
+    )
+    post_save.connect(
+        _gasto_guardado, sender=GastoMensual, weak=False,
+        dispatch_uid="resumen_gastos_save",
+    )
+    post_delete.connect(
+        _gasto_borrado, sender=GastoMensual, weak=False,
+        dispatch_uid="resumen_gastos_delete",
+    )
+    post_save.connect(
+        _categoria_guardada, sender=CategoriaGasto, weak=False,
+        dispatch_uid="resumen_gastos_categoria_save",
+    )
@@ -1,3 +1,143 @@
+"""
+Tests del motor de recurrencia mensual (copiar fijos / agenda de pagos) y
+de los resúmenes mensuales materializados.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from . import recurrencia, resumenes
+from .models import CategoriaGasto, GastoMensual, ResumenGastosCategoria, ResumenGastosMensual
+
+
+class FechasTests(TestCase):
+    def test_sumar_meses_cruza_anio(self):
+        self.assertEqual(recurrencia.sumar_meses(2026, 12, 1), (2027, 1))
+        self.assertEqual(recurrencia.sumar_meses(2026, 1, -1), (2025, 12))
+        self.assertEqual(recurrencia.meses_desde(2026, 11, 3), [(2026, 11), (2026, 12), (2027, 1)])
+
+    def test_fecha_en_mes_clampa_fin_de_mes(self):
+        self.assertEqual(recurrencia.fecha_en_mes(date(2026, 1, 31), 2026, 2), date(2026, 2, 28))
+
+
+class PlanificarTests(TestCase):
+    def setUp(self):
+        self.cat = CategoriaGasto.objects.create(nombre="Alquiler", es_fijo=True)
+        self.origen = GastoMensual.objects.create(
+            categoria=self.cat, descripcion="Local", monto=Decimal("1000"), mes=1, anio=2026,
+        )
+
+    def _plan(self, meses):
+        return recurrencia.planificar(
+            [self.origen],
+            recurrencia.meses_desde(2026, 2, meses),
+            lambda g, a, m: GastoMensual(
+                categoria_id=g.categoria_id, descripcion=g.descripcion,
+                monto=g.monto, mes=m, anio=a, unidad=g.unidad,
+            ),
+            GastoMensual.objects.all(),
+            ("categoria_id", "descripcion", "unidad", "mes", "anio"),
+        )
+
+    def test_proximo_mes_de_la_agenda_queda_auditado(self):
+        from agenda_pagos.models import PagoFuturo
+        from agenda_pagos.views import _crear_proximo_mes
+        from auditoria.models import LogActividad
+
+        user = User.objects.create_superuser("Vamichetti", "a@a.com", "x")
+        pago = PagoFuturo.objects.create(
+            descripcion="Alquiler", monto=Decimal("1000"), fecha_vencimiento=date.today(),
+            es_recurrente_mensual=True,
+        )
+        nuevo = _crear_proximo_mes(pago, user)
+        self.assertIsNotNone(nuevo.pk)
+        log = LogActividad.objects.get(modelo="PagoFuturo", accion="crear")
+        self.assertEqual(log.datos_despues["ids"], [nuevo.pk])
+        self.assertIsNone(_crear_proximo_mes(pago, user))  # ya agendado
+
+    def test_varios_meses_y_sin_duplicar(self):
+        # Marzo ya existe: solo se crean febrero y abril
+        GastoMensual.objects.create(
+            categoria=self.cat, descripcion="Local", monto=Decimal("1000"), mes=3, anio=2026,
+        )
+        with self.assertNumQueries(2):  # 1 detección + 1 INSERT
+            nuevos = recurrencia.insertar(GastoMensual, self._plan(3))
+        self.assertEqual(sorted(n.mes for n in nuevos), [2, 4])
+
+        # Repetir la operación no crea nada
+        self.assertEqual(recurrencia.insertar(GastoMensual, self._plan(3)), [])
+        self.assertEqual(GastoMensual.objects.filter(anio=2026).count(), 4)
+
+
+class ResumenesTests(TestCase):
+    def setUp(self):
+        self.alquiler = CategoriaGasto.objects.create(nombre="Alquiler", es_fijo=True)
+        self.varios = CategoriaGasto.objects.create(nombre="Varios")
+
+    def _gasto(self, categoria, monto, mes=3, **extra):
+        return GastoMensual.objects.create(
+            categoria=categoria, monto=Decimal(monto), mes=mes, anio=2026, **extra
+        )
+
+    def test_se_mantiene_al_guardar_y_borrar(self):
+        self._gasto(self.alquiler, "1000", pagado=True)
+        self._gasto(self.varios, "300", descripcion="Lavado – Ford Ka [GCF:gc_lavado#1]")
+        gasto = self._gasto(self.varios, "200")
+
+        r = resumenes.del_periodo(2026, 3)
+        self.assertEqual(
+            (r.total_fijos, r.total_variables, r.total_general, r.total_pagado, r.total_pendiente),
+            (Decimal("1000"), Decimal("500"), Decimal("1500"), Decimal("1000"), Decimal("500")),
+        )
+        self.assertEqual((r.total_vehiculos, r.total_generales, r.cantidad), (Decimal("300"), Decimal("1200"), 3))
+        por_cat = {c.categoria_id: c.total for c in resumenes.por_categoria(2026, 3)}
+        self.assertEqual(por_cat, {self.alquiler.pk: Decimal("1000"), self.varios.pk: Decimal("500")})
+
+        # Mover de mes actualiza los dos meses
+        gasto.mes = 4
+        gasto.save()
+        self.assertEqual(resumenes.del_periodo(2026, 3).total_variables, Decimal("300"))
+        self.assertEqual(resumenes.del_periodo(2026, 4).total_general, Decimal("200"))
+
+        # Borrar el único gasto del mes deja el mes vacío
+        gasto.delete()
+        self.assertFalse(ResumenGastosMensual.objects.filter(anio=2026, mes=4).exists())
+        self.assertFalse(ResumenGastosCategoria.objects.filter(anio=2026, mes=4).exists())
+
+    def test_categoria_que_pasa_a_fija(self):
+        self._gasto(self.varios, "200")
+        self.varios.es_fijo = True
+        self.varios.save()
+        r = resumenes.del_periodo(2026, 3)
+        self.assertEqual((r.total_fijos, r.total_variables), (Decimal("200"), Decimal("0")))
+
+    def test_reconstruir_coincide_con_lo_incremental(self):
+        self._gasto(self.alquiler, "1000", pagado=True)
+        self._gasto(self.varios, "50", mes=5)
+        GastoMensual.objects.filter(mes=5).update(monto=Decimal("75"))  # sin signals
+        self.assertEqual(resumenes.del_periodo(2026, 5).total_general, Decimal("50"))
+        self.assertEqual(resumenes.reconstruir(), 2)
+        self.assertEqual(resumenes.del_periodo(2026, 5).total_general, Decimal("75"))
+        self.assertEqual(resumenes.del_periodo(2026, 3).total_pagado, Decimal("1000"))
+
+    def test_pantalla_lee_los_resumenes(self):
+        self._gasto(self.alquiler, "1000", mes=2)
+        self._gasto(self.alquiler, "1200")
+        self._gasto(self.varios, "300", descripcion="Lavado – Ford Ka [GCF:gc_lavado#1]")
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        r = self.client.get(reverse("gastos_mensuales:resumen"), {"mes": 3, "anio": 2026}, secure=True)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context["total_general"], Decimal("1500"))
+        self.assertEqual(r.context["total_mes_anterior"], Decimal("1000"))
+        self.assertEqual(r.context["variacion"], Decimal("50"))
+        self.assertEqual(r.context["total_vehiculos"], Decimal("300"))
+        self.assertEqual(len(r.context["gastos_vehiculos"]), 1)
+        self.assertEqual(r.context["por_categoria"][0]["total"], Decimal("1200"))
 
-# Create your tests here.
+        pdf = self.client.get(
+            reverse("gastos_mensuales:pdf_mensual"), {"mes": 3, "anio": 2026, "tipo": "vehiculos"}, secure=True,
+        )
+        self.assertEqual(pdf.status_code, 200)
@@ -2,12 +2,16 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse
+from django.db import transaction
 from django.db.models import Sum, Q
 from django.utils import timezone
 from decimal import Decimal, InvalidOperation
 from datetime import date
 
-from .models import CategoriaGasto, GastoMensual, ResumenGastosMensual, IngresoMensual
+from auditoria.signals import registrar_lote
+
+from . import recurrencia, resumenes
+from .models import CategoriaGasto, GastoMensual, IngresoMensual
 from .forms import CategoriaGastoForm, GastoMensualForm, IngresoMensualForm
 
 
@@ -26,73 +30,54 @@ def resumen_mensual(request):
     mes = int(request.GET.get("mes", hoy.month))
     anio = int(request.GET.get("anio", hoy.year))
 
-    gastos = GastoMensual.objects.filter(
-        mes=mes, anio=anio,
-    ).select_related("categoria").order_by("categoria__nombre")
+    gastos = list(
+        GastoMensual.objects.filter(mes=mes, anio=anio)
+        .select_related("categoria").order_by("categoria__nombre")
+    )
 
     # Separar gastos de vehículos (sincronizados desde la ficha) del resto,
     # para mostrarlos en solapas distintas y que no se mezclen.
-    gastos_vehiculos = [g for g in gastos if g.descripcion and "[GCF:" in g.descripcion]
-    gastos_generales = [g for g in gastos if not (g.descripcion and "[GCF:" in g.descripcion)]
-    total_vehiculos = sum((g.monto for g in gastos_vehiculos), Decimal("0"))
-
-    # Totales
-    total_fijos = gastos.filter(
-        categoria__es_fijo=True
-    ).aggregate(t=Sum("monto"))["t"] or Decimal("0")
-
-    total_variables = gastos.filter(
-        categoria__es_fijo=False
-    ).aggregate(t=Sum("monto"))["t"] or Decimal("0")
-
-    total_general = total_fijos + total_variables
-
-    total_pagado = gastos.filter(
-        pagado=True
-    ).aggregate(t=Sum("monto"))["t"] or Decimal("0")
-
-    total_pendiente = total_general - total_pagado
-
-    # Por categoria
-    por_categoria = (
-        gastos.values("categoria__nombre", "categoria__es_fijo")
-        .annotate(total=Sum("monto"))
-        .order_by("-total")
-    )
+    gastos_vehiculos = [g for g in gastos if g.es_de_vehiculo]
+    gastos_generales = [g for g in gastos if not g.es_de_vehiculo]
+
+    # Totales: salen de los resúmenes materializados (este mes y el anterior
+    # en una sola query)
+    anio_anterior, mes_anterior = recurrencia.sumar_meses(anio, mes, -1)
+    periodos = resumenes.serie([(anio, mes), (anio_anterior, mes_anterior)])
+    resumen = periodos[(anio, mes)]
+    total_mes_anterior = periodos[(anio_anterior, mes_anterior)].total_general
+
+    por_categoria = [
+        {
+            "categoria__nombre": c.categoria.nombre,
+            "categoria__es_fijo": c.categoria.es_fijo,
+            "total": c.total,
+        }
+        for c in resumenes.por_categoria(anio, mes)
+    ]
 
     # Meses disponibles para navegacion
-    anios_disponibles = (
-        GastoMensual.objects.values_list("anio", flat=True)
-        .distinct()
-        .order_by("-anio")
-    )
+    anios_disponibles = resumenes.anios()
     if hoy.year not in anios_disponibles:
-        anios_disponibles = [hoy.year] + list(anios_disponibles)
-
-    # Comparar con mes anterior
-    mes_anterior = mes - 1 if mes > 1 else 12
-    anio_anterior = anio if mes > 1 else anio - 1
-    total_mes_anterior = GastoMensual.objects.filter(
-        mes=mes_anterior, anio=anio_anterior,
-    ).aggregate(t=Sum("monto"))["t"] or Decimal("0")
+        anios_disponibles = [hoy.year] + anios_disponibles
 
     variacion = None
     if total_mes_anterior > 0:
-        variacion = ((total_general - total_mes_anterior) / total_mes_anterior * 100)
+        variacion = ((resumen.total_general - total_mes_anterior) / total_mes_anterior * 100)
 
     return render(request, "gastos_mensuales/resumen.html", {
         "gastos": gastos,
         "gastos_generales": gastos_generales,
         "gastos_vehiculos": gastos_vehiculos,
-        "total_vehiculos": total_vehiculos,
+        "total_vehiculos": resumen.total_vehiculos,
         "mes": mes,
         "anio": anio,
         "mes_nombre": MESES[mes] if 1 <= mes <= 12 else "",
-        "total_fijos": total_fijos,
-        "total_variables": total_variables,
-        "total_general": total_general,
-        "total_pagado": total_pagado,
-        "total_pendiente": total_pendiente,
+        "total_fijos": resumen.total_fijos,
+        "total_variables": resumen.total_variables,
+        "total_general": resumen.total_general,
+        "total_pagado": resumen.total_pagado,
+        "total_pendiente": resumen.total_pendiente,
         "por_categoria": por_categoria,
         "anios_disponibles": anios_disponibles,
         "meses_choices": list(enumerate(MESES))[1:],
@@ -238,17 +223,23 @@ def pdf_mensual(request):
         .order_by("categoria__nombre", "descripcion")
     )
 
+    # Los totales salen del resumen materializado del mes
+    resumen = resumenes.del_periodo(anio, mes)
     if tipo == "pagos":
         qs = qs.filter(pagado=True)
+        total, total_pagado = resumen.total_pagado, resumen.total_pagado
     elif tipo == "adeudados":
         qs = qs.filter(pagado=False)
-
-    gastos = list(qs)
+        total, total_pagado = resumen.total_pendiente, Decimal("0")
     # Generales vs Gastos de vehículos: los de vehículos llevan el tag [GCF:...]
-    if tipo == "generales":
-        gastos = [g for g in gastos if not (g.descripcion and "[GCF:" in g.descripcion)]
+    elif tipo == "generales":
+        qs = qs.exclude(resumenes.Q_VEHICULO)
+        total, total_pagado = resumen.total_generales, resumen.pagado_generales
     elif tipo == "vehiculos":
-        gastos = [g for g in gastos if g.descripcion and "[GCF:" in g.descripcion]
+        qs = qs.filter(resumenes.Q_VEHICULO)
+        total, total_pagado = resumen.total_vehiculos, resumen.pagado_vehiculos
+    else:
+        total, total_pagado = resumen.total_general, resumen.total_pagado
 
     SUBTITULOS = {
         "todos": "Todos los gastos",
@@ -259,13 +250,8 @@ def pdf_mensual(request):
     }
     etiqueta = SUBTITULOS.get(tipo, "Todos los gastos")
 
-    total = Decimal("0")
-    total_pagado = Decimal("0")
     filas = []
-    for g in gastos:
-        total += g.monto or Decimal("0")
-        if g.pagado:
-            total_pagado += g.monto or Decimal("0")
+    for g in qs:
         try:
             unidad = g.get_unidad_display()
         except Exception:
@@ -497,43 +483,56 @@ def duplicar_fijos(request):
             return redirect("gastos_mensuales:resumen")
 
         # Mes origen
-        mes_origen = mes - 1 if mes > 1 else 12
-        anio_origen = anio if mes > 1 else anio - 1
+        anio_origen, mes_origen = recurrencia.sumar_meses(anio, mes, -1)
+        try:
+            meses = int(request.POST.get("meses", 1) or 1)
+        except ValueError:
+            meses = 1
+        meses = min(max(meses, 1), 12)
 
-        fijos_origen = GastoMensual.objects.filter(
+        fijos_origen = list(GastoMensual.objects.filter(
             mes=mes_origen,
             anio=anio_origen,
             categoria__es_fijo=True,
-        )
+        ))
 
-        if not fijos_origen.exists():
+        if not fijos_origen:
             messages.warning(request, f"No hay gastos fijos en {mes_origen}/{anio_origen}.")
             return redirect(f"{reverse('gastos_mensuales:resumen')}?mes={mes}&anio={anio}")
 
-        # Verificar que no existan ya
-        existentes = GastoMensual.objects.filter(
-            mes=mes, anio=anio, categoria__es_fijo=True,
-        ).count()
-
-        if existentes > 0:
-            messages.info(request, "Ya existen gastos fijos para este mes.")
-            return redirect(f"{reverse('gastos_mensuales:resumen')}?mes={mes}&anio={anio}")
-
-        creados = 0
-        for gasto in fijos_origen:
-            GastoMensual.objects.create(
-                categoria=gasto.categoria,
-                descripcion=gasto.descripcion,
-                monto=gasto.monto,
-                mes=mes,
-                anio=anio,
-                unidad=gasto.unidad,
+        # Todas las copias (uno o varios meses) se arman en memoria; las que
+        # ya existen se detectan con una sola query y no se duplican.
+        plan = recurrencia.planificar(
+            fijos_origen,
+            recurrencia.meses_desde(anio, mes, meses),
+            lambda g, a, m: GastoMensual(
+                categoria_id=g.categoria_id,
+                descripcion=g.descripcion,
+                monto=g.monto,
+                mes=m,
+                anio=a,
+                unidad=g.unidad,
                 pagado=False,
                 creado_por=request.user,
+            ),
+            GastoMensual.objects.all(),
+            ("categoria_id", "descripcion", "unidad", "mes", "anio"),
+        )
+        with transaction.atomic():
+            nuevos = recurrencia.insertar(GastoMensual, plan)
+            # bulk_create no pasa por los signals
+            resumenes.recalcular({(g.anio, g.mes) for g in nuevos})
+            registrar_lote(
+                "crear", GastoMensual, nuevos,
+                f"Copió {len(nuevos)} gasto(s) fijo(s) de {mes_origen}/{anio_origen}",
             )
-            creados += 1
 
-        messages.success(request, f"{creados} gasto(s) fijo(s) copiados a {MESES[mes]} {anio}.")
+        if not nuevos:
+            messages.info(request, "Ya existen gastos fijos para este mes.")
+            return redirect(f"{reverse('gastos_mensuales:resumen')}?mes={mes}&anio={anio}")
+
+        extra = f" y los {meses - 1} mes(es) siguientes" if meses > 1 else ""
+        messages.success(request, f"{len(nuevos)} gasto(s) fijo(s) copiados a {MESES[mes]} {anio}{extra}.")
         return redirect(f"{reverse('gastos_mensuales:resumen')}?mes={mes}&anio={anio}")
 
     return redirect("gastos_mensuales:resumen")
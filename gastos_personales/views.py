@@ -6,6 +6,7 @@ from django.db.models import Sum
 from django.urls import reverse
 from decimal import Decimal, InvalidOperation
 
+from gastos_mensuales import recurrencia
 from gastos_mensuales.models import CategoriaGasto
 from .models import GastoPersonal, IngresoPersonal
 from .forms import GastoPersonalForm, IngresoPersonalForm
@@ -190,25 +191,33 @@ def duplicar_fijos(request):
             messages.error(request, "Mes o año inválido.")
             return redirect("gastos_personales:resumen")
 
-        mes_origen = mes - 1 if mes > 1 else 12
-        anio_origen = anio if mes > 1 else anio - 1
+        anio_origen, mes_origen = recurrencia.sumar_meses(anio, mes, -1)
+        try:
+            meses = int(request.POST.get("meses", 1) or 1)
+        except ValueError:
+            meses = 1
+        meses = min(max(meses, 1), 12)
 
-        fijos_origen = GastoPersonal.objects.filter(
+        fijos_origen = list(GastoPersonal.objects.filter(
             usuario=request.user, mes=mes_origen, anio=anio_origen, categoria__es_fijo=True,
-        )
-        if not fijos_origen.exists():
+        ))
+        if not fijos_origen:
             messages.warning(request, f"No hay gastos fijos en {MESES[mes_origen]} {anio_origen}.")
             return redirect(f"{reverse('gastos_personales:resumen')}?mes={mes}&anio={anio}")
 
-        if GastoPersonal.objects.filter(usuario=request.user, mes=mes, anio=anio, categoria__es_fijo=True).exists():
+        plan = recurrencia.planificar(
+            fijos_origen,
+            recurrencia.meses_desde(anio, mes, meses),
+            lambda g, a, m: GastoPersonal(
+                usuario=request.user, categoria_id=g.categoria_id, descripcion=g.descripcion,
+                monto=g.monto, mes=m, anio=a,
+            ),
+            GastoPersonal.objects.filter(usuario=request.user),
+            ("categoria_id", "descripcion", "mes", "anio"),
+        )
+        if not recurrencia.insertar(GastoPersonal, plan):
             messages.info(request, "Ya existen gastos fijos para este mes.")
             return redirect(f"{reverse('gastos_personales:resumen')}?mes={mes}&anio={anio}")
-
-        for g in fijos_origen:
-            GastoPersonal.objects.create(
-                usuario=request.user, categoria=g.categoria, descripcion=g.descripcion,
-                monto=g.monto, mes=mes, anio=anio,
-            )
         messages.success(request, "Gastos fijos copiados del mes anterior.")
     return redirect(f"{reverse('gastos_personales:resumen')}?mes={mes}&anio={anio}")
 
@@ -235,17 +244,9 @@ def ingresos_resumen(request):
         anios_disponibles = [hoy.year] + anios_disponibles
 
     # Lo que está a ingresar: alquileres pendientes de cobro del mes
-    from cuentas_internas.models import Alquiler
-    a_ingresar = []
-    total_a_ingresar = Decimal("0")
-    for alq in Alquiler.objects.filter(activo=True):
-        if alq.pagos.filter(periodo_mes=mes, periodo_anio=anio).exists():
-            continue
-        for f in alq.cronograma():
-            if f["mes"] == mes and f["anio"] == anio:
-                a_ingresar.append({"alquiler": alq, "monto": f["monto"]})
-                total_a_ingresar += f["monto"] or Decimal("0")
-                break
+    from cuentas_internas.services import pendientes_de_cobro
+    a_ingresar = pendientes_de_cobro(anio, mes)
+    total_a_ingresar = sum((f["monto"] or Decimal("0") for f in a_ingresar), Decimal("0"))
 
     return render(request, "gastos_personales/ingresos_resumen.html", {
         "ingresos": ingresos,
@@ -14,18 +14,10 @@ def gestoria_inicio(request):
     return render(request, "gestoria/inicio.html")
 
 
-# ==========================================================
-# GESTORÍAS VIGENTES + BUSCADOR
-# ==========================================================
-def gestoria_vigentes(request):
-    query = request.GET.get("q", "").strip()
-
-    gestorias = (
-        Gestoria.objects
-        .filter(estado="vigente")
-        .select_related("vehiculo", "cliente", "venta")
-    )
-
+def gestorias_filtradas(estado, query=""):
+    """Gestorías de un estado (vigente / finalizada) con la búsqueda del
+    listado, ordenadas como se muestran. La usan las listas y su PDF."""
+    gestorias = Gestoria.objects.filter(estado=estado)
     if query:
         gestorias = gestorias.filter(
             Q(cliente__nombre_completo__icontains=query) |
@@ -35,8 +27,17 @@ def gestoria_vigentes(request):
             Q(vehiculo__dominio__icontains=query) |
             Q(venta__id__icontains=query)
         ).distinct()
+    orden = "-fecha_finalizacion" if estado == "finalizada" else "-fecha_creacion"
+    return gestorias.order_by(orden)
 
-    gestorias = gestorias.order_by("-fecha_creacion")
+
+# ==========================================================
+# GESTORÍAS VIGENTES + BUSCADOR
+# ==========================================================
+def gestoria_vigentes(request):
+    query = request.GET.get("q", "").strip()
+
+    gestorias = gestorias_filtradas("vigente", query).select_related("vehiculo", "cliente", "venta")
 
     return render(
         request,
@@ -55,26 +56,11 @@ def gestoria_finalizadas(request):
     query = request.GET.get("q", "").strip()
 
     gestorias = (
-        Gestoria.objects
-        .filter(
-            estado="finalizada",
-            fecha_finalizacion__isnull=False
-        )
+        gestorias_filtradas("finalizada", query)
+        .filter(fecha_finalizacion__isnull=False)
         .select_related("vehiculo", "cliente", "venta")
     )
 
-    if query:
-        gestorias = gestorias.filter(
-            Q(cliente__nombre_completo__icontains=query) |
-            Q(cliente__dni_cuit__icontains=query) |
-            Q(vehiculo__marca__icontains=query) |
-            Q(vehiculo__modelo__icontains=query) |
-            Q(vehiculo__dominio__icontains=query) |
-            Q(venta__id__icontains=query)
-        ).distinct()
-
-    gestorias = gestorias.order_by("-fecha_finalizacion")
-
     return render(
         request,
         "gestoria/finalizadas.html",
@@ -97,40 +83,37 @@ def pdf_gestorias(request):
         estado = "vigente"
     query = request.GET.get("q", "").strip()
 
-    gestorias = (
-        Gestoria.objects.filter(estado=estado)
-        .select_related("vehiculo", "cliente", "venta")
+    gestorias = gestorias_filtradas(estado, query).values(
+        "vehiculo_id", "vehiculo__marca", "vehiculo__modelo", "vehiculo__dominio",
+        "venta__cliente_id", "venta__cliente__nombre_completo", "venta__cliente__telefono",
+        "venta__cliente__activo", "cliente_id", "cliente__nombre_completo",
+        "cliente__telefono", "cliente__activo", "fecha_finalizacion", "fecha_creacion",
     )
-    if query:
-        gestorias = gestorias.filter(
-            Q(cliente__nombre_completo__icontains=query) |
-            Q(cliente__dni_cuit__icontains=query) |
-            Q(vehiculo__marca__icontains=query) |
-            Q(vehiculo__modelo__icontains=query) |
-            Q(vehiculo__dominio__icontains=query) |
-            Q(venta__id__icontains=query)
-        ).distinct()
 
-    orden = "-fecha_finalizacion" if estado == "finalizada" else "-fecha_creacion"
-    gestorias = gestorias.order_by(orden)
-
-    filas = []
-    for g in gestorias:
-        cli = g.cliente_actual
-        fecha_ref = g.fecha_finalizacion or g.fecha_creacion
-        filas.append([
-            f"{g.vehiculo.marca} {g.vehiculo.modelo}" if g.vehiculo_id else "—",
-            (g.vehiculo.dominio or "—") if g.vehiculo_id else "—",
-            str(cli) if cli else "Sin cliente",
-            (getattr(cli, "telefono", "") or "—") if cli else "—",
+    def fila(g):
+        # Cliente actual: el de la venta si hay, si no el de la gestoría
+        pre = "venta__cliente__" if g["venta__cliente_id"] else "cliente__"
+        tiene_cliente = g["venta__cliente_id"] or g["cliente_id"]
+        cliente = ""
+        if tiene_cliente:
+            # Mismo texto que Cliente.__str__
+            cliente = f"{g[pre + 'nombre_completo']} ({'Activo' if g[pre + 'activo'] else 'Inactivo'})"
+        fecha_ref = g["fecha_finalizacion"] or g["fecha_creacion"]
+        return [
+            f"{g['vehiculo__marca']} {g['vehiculo__modelo']}" if g["vehiculo_id"] else "—",
+            (g["vehiculo__dominio"] or "—") if g["vehiculo_id"] else "—",
+            cliente or "Sin cliente",
+            (g[pre + "telefono"] or "—") if tiene_cliente else "—",
             fecha_ref.strftime("%d/%m/%Y") if fecha_ref else "—",
-        ])
+        ]
+
+    filas = (fila(g) for g in gestorias.iterator(chunk_size=500))
 
     titulo = "Gestorías finalizadas" if estado == "finalizada" else "Gestorías vigentes"
     return render_pdf_listado(
         filename=f"gestorias_{estado}.pdf",
         titulo=titulo,
-        subtitulo=(f"Búsqueda: «{query}» – " if query else "") + f"{len(filas)} gestoría(s)",
+        subtitulo=lambda n: (f"Búsqueda: «{query}» – " if query else "") + f"{n} gestoría(s)",
         columnas=["Vehículo", "Dominio", "Cliente", "Teléfono", "Fecha"],
         filas=filas,
         pie=f"Generado el {date.today().strftime('%d/%m/%Y')}",
@@ -266,6 +249,7 @@ def generar_pago_cliente(request, gestoria_id):
     redirige al recibo PDF.
     """
     from decimal import Decimal, InvalidOperation
+    from cuentas import recibos
     from cuentas.models import MovimientoCuenta, Pago
 
     gestoria = get_object_or_404(Gestoria, id=gestoria_id)
@@ -321,6 +305,7 @@ def generar_pago_cliente(request, gestoria_id):
     pago.saldo_anterior = saldo_anterior
     pago.saldo_posterior = cuenta.saldo
     pago.save(update_fields=["saldo_anterior", "saldo_posterior"])
+    recibos.fijar_saldos(pago, cuenta)
 
     # Guardar el monto en la gestoría
     if gestoria.pago_cliente != monto:
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class InicioConfig(AppConfig):
     name = 'inicio'
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
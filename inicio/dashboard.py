@@ -0,0 +1,434 @@
+"""
+Datos del dashboard de inicio.
+
+Cada panel ("widget") es una función que devuelve su parte del contexto.
+Los contadores de un mismo modelo salen de UN `aggregate()` con
+`Count(filter=Q(...))` y las listas de fichas (vencimientos, turnos, docs
+vencidas) de una sola query que se reparte en memoria.
+
+El payload completo se cachea por rol durante `DASHBOARD_CACHE_TTL`
+segundos y se invalida con post_save / post_delete de los modelos que
+muestra (ver `inicio.signals`); las escrituras en lote que no disparan
+signals (`vehiculos.services.registrar_pagos_gastos_lote`, las copias de la
+Agenda de Pagos) llaman a `invalidar` a mano. Cada armado registra cuánto tardó y
+cuántas queries hizo cada panel.
+"""
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("gestion", "lgazaba", "namichetti", "estudio", "general")
+
+USUARIOS_GESTION = ("hamichetti", "vamichetti")
+
+ETAPAS_PENDIENTES = ["nuevo", "contactado", "en_negociacion", "presupuestado"]
+
+
+def rol_de(user):
+    """Rol de dashboard según el usuario (decide template y paneles)."""
+    nombre = (user.username or "").lower()
+    if nombre in USUARIOS_GESTION:
+        return "gestion"
+    if nombre == "lgazaba":
+        return "lgazaba"
+    if nombre == "namichetti":
+        return "namichetti"
+    if nombre == "estudio.ob":
+        return "estudio"
+    return "general"
+
+
+def ttl():
+    return getattr(settings, "DASHBOARD_CACHE_TTL", 60)
+
+
+def _clave(rol, hoy):
+    return f"inicio:dashboard:{rol}:{hoy.isoformat()}"
+
+
+def invalidar(hoy=None):
+    """Borra el payload cacheado de todos los roles, ya y de nuevo al
+    confirmar la transacción (un armado en el medio vio las filas viejas)."""
+    hoy = hoy or timezone.now().date()
+    claves = [_clave(rol, hoy) for rol in ROLES]
+    cache.delete_many(claves)
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+
+# ==========================================================
+# PANELES COMUNES
+# ==========================================================
+def _cuentas(hoy, rol):
+    from cuentas.models import CuentaCorriente
+
+    qs = CuentaCorriente.objects.filter(saldo__gt=0)
+    agg = qs.aggregate(cantidad=Count("id"), total=Sum("saldo"))
+    return {
+        "cantidad_deudores": agg["cantidad"],
+        "total_deuda": agg["total"] or 0,
+        "top_cuentas_deuda": list(qs.select_related("cliente").order_by("-saldo")[:5]),
+    }
+
+
+def _gestoria(hoy, rol):
+    from gestoria.models import Gestoria
+
+    qs = Gestoria.objects.filter(estado="vigente").select_related("cliente", "vehiculo")
+    return {
+        "transferencias_vigentes": qs.count(),
+        "top_gestoria_vigente": list(qs.order_by("-fecha_creacion")[:5]),
+        # Gestorías vigentes con observaciones cargadas
+        "gestorias_observaciones": list(
+            qs.exclude(observaciones="").order_by("-fecha_creacion")[:8]
+        ),
+    }
+
+
+def _stock(hoy, rol):
+    from vehiculos.models import Vehiculo
+
+    agg = Vehiculo.objects.aggregate(
+        stock=Count("id", filter=Q(estado="stock")),
+        temporal=Count("id", filter=Q(estado="temporal")),
+        vendidos_mes=Count("id", filter=Q(
+            estado="vendido",
+            venta__fecha_venta__year=hoy.year,
+            venta__fecha_venta__month=hoy.month,
+        )),
+    )
+    return {
+        "vehiculos_stock": agg["stock"],
+        "vehiculos_temporal": agg["temporal"],
+        "vehiculos_vendidos_mes": agg["vendidos_mes"],
+        # Vehículos que un cliente va a venir a ver (hay que tenerlos a mano)
+        "vehiculos_visita": list(
+            Vehiculo.objects.filter(visita_pendiente=True).order_by("marca", "modelo")
+        ),
+    }
+
+
+def _ventas(hoy, rol):
+    from ventas.models import Venta
+
+    # Ventas confirmadas del año cuyo vehículo tiene VTV / verificación
+    # vencida o sin cargar (alerta de falta de documentación)
+    doc_pendiente = Q(estado="confirmada", fecha_venta__gte=hoy.replace(month=1, day=1)) & (
+        Q(vehiculo__ficha__isnull=True)
+        | Q(vehiculo__ficha__vtv_vencimiento__isnull=True)
+        | Q(vehiculo__ficha__vtv_vencimiento__lt=hoy)
+        | Q(vehiculo__ficha__verificacion_vencimiento__isnull=True)
+        | Q(vehiculo__ficha__verificacion_vencimiento__lt=hoy)
+    )
+    agg = Venta.objects.aggregate(
+        activas=Count("id", filter=Q(estado__in=["pendiente", "confirmada"])),
+        mes=Count("id", filter=Q(fecha_venta__year=hoy.year, fecha_venta__month=hoy.month)),
+        doc_pendiente=Count("id", filter=doc_pendiente),
+    )
+    return {
+        "ventas_activas": agg["activas"],
+        "ventas_mes": agg["mes"],
+        "ultimas_ventas": list(
+            Venta.objects.filter(estado="confirmada")
+            .select_related("vehiculo", "cliente").order_by("-fecha_venta")[:5]
+        ),
+        "ventas_doc_pendiente": list(
+            Venta.objects.filter(doc_pendiente)
+            .select_related("vehiculo", "cliente", "vehiculo__ficha")
+            .order_by("-fecha_venta")[:10]
+        ),
+        "ventas_doc_pendiente_count": agg["doc_pendiente"],
+    }
+
+
+def _fichas(hoy, rol):
+    """
+    Vencimientos (30 días), vencidos y turnos (7 días) de los vehículos en
+    stock: una sola query al índice de vencimientos, después cada lista se
+    arma en memoria con las fichas de esas filas.
+    """
+    from vehiculos import vencimientos
+
+    en_30 = hoy + timedelta(days=30)
+    en_7 = hoy + timedelta(days=7)
+    filas = list(
+        (
+            vencimientos.vencidos(en_30 + timedelta(days=1), tipos=["vtv", "verificacion"])
+            | vencimientos.en_ventana(
+                hoy, en_7, tipos=["turno_vtv", "turno_verificacion", "turno_autopartes"],
+            )
+        )
+        .select_related("vehiculo__ficha")
+    )
+
+    def entre(tipo, desde, hasta, limite=None):
+        sel = [
+            f.vehiculo.ficha for f in filas
+            if f.tipo == tipo and (desde is None or f.fecha >= desde) and f.fecha <= hasta
+        ]
+        return sel[:limite] if limite else sel
+
+    ayer = hoy - timedelta(days=1)
+    docs_vtv_vencida = entre("vtv", None, ayer)
+    docs_verif_vencida = entre("verificacion", None, ayer)
+    datos = {
+        "vencimientos_vtv": entre("vtv", hoy, en_30, 5),
+        "vencimientos_verificacion": entre("verificacion", hoy, en_30, 5),
+        "vtv_vencidos": len(docs_vtv_vencida),
+        "verificacion_vencidos": len(docs_verif_vencida),
+        "turnos_vtv": entre("turno_vtv", hoy, en_7, 3),
+        "turnos_verificacion": entre("turno_verificacion", hoy, en_7, 3),
+        "turnos_autopartes": entre("turno_autopartes", hoy, en_7, 3),
+    }
+    if rol == "gestion":
+        datos["docs_vtv_vencida"] = docs_vtv_vencida
+        datos["docs_verif_vencida"] = docs_verif_vencida
+    return datos
+
+
+def _cuotas(hoy, rol):
+    from cuentas.models import CuotaPlan
+
+    return {
+        "cuotas_vencidas_count": CuotaPlan.objects.filter(
+            estado="pendiente", vencimiento__lt=hoy, plan__estado="activo",
+        ).count(),
+    }
+
+
+def _crm(hoy, rol):
+    from crm.models import NotificacionCRM, Prospecto
+
+    agg = Prospecto.objects.aggregate(
+        nuevos=Count("id", filter=Q(etapa="nuevo")),
+        en_negociacion=Count("id", filter=Q(etapa__in=["contactado", "en_negociacion", "presupuestado"])),
+        activos=Count("id", filter=~Q(etapa__in=["ganado", "perdido"])),
+    )
+    return {
+        "crm_contactos_pendientes": list(
+            Prospecto.objects.filter(
+                fecha_proximo_contacto__lte=hoy, etapa__in=ETAPAS_PENDIENTES,
+            ).select_related("vehiculo_interes").order_by("fecha_proximo_contacto")[:5]
+        ),
+        "crm_nuevos": agg["nuevos"],
+        "crm_en_negociacion": agg["en_negociacion"],
+        "crm_total_activos": agg["activos"],
+        "crm_notificaciones": list(
+            NotificacionCRM.objects.filter(leida=False).select_related("prospecto", "vehiculo")[:5]
+        ),
+    }
+
+
+def _recordatorios(hoy, rol):
+    from inicio.models import RecordatorioDashboard
+
+    return {"recordatorios": list(RecordatorioDashboard.objects.all()[:20])}
+
+
+def _agenda(hoy, rol):
+    from agenda_pagos.models import PagoFuturo
+
+    pendientes = PagoFuturo.objects.filter(pagado=False).select_related("categoria")
+    datos = {
+        "pagos_vencidos": list(
+            pendientes.filter(fecha_vencimiento__lt=hoy).order_by("fecha_vencimiento")[:4]
+        ),
+        "pagos_proximos": list(
+            pendientes.filter(fecha_vencimiento__range=(hoy, hoy + timedelta(days=7)))
+            .order_by("fecha_vencimiento")[:4]
+        ),
+        "agenda_mes_sin_cargar": False,
+    }
+    # Alerta: al inicio del mes (hoy <= día 7) sin pagos cargados para el mes
+    if rol == "gestion" and hoy.day <= 7:
+        datos["agenda_mes_sin_cargar"] = not PagoFuturo.objects.filter(
+            fecha_vencimiento__year=hoy.year, fecha_vencimiento__month=hoy.month,
+        ).exists()
+    return datos
+
+
+# ==========================================================
+# PANELES DE GESTIÓN INTERNA (Hamichetti / Vamichetti)
+# ==========================================================
+def _alquileres(hoy, rol):
+    from cuentas_internas.models import Alquiler
+
+    return {
+        # Contratos por vencer (próximos 60 días) y aviso de aumentos
+        "alquileres_por_vencer": list(
+            Alquiler.objects.filter(
+                activo=True, fecha_fin__isnull=False,
+                fecha_fin__gte=hoy, fecha_fin__lte=hoy + timedelta(days=60),
+            ).order_by("fecha_fin")
+        ),
+        "aviso_aumentos_alquileres": hoy.month in (6, 12),
+        "alquileres_activos_count": Alquiler.objects.filter(activo=True).count(),
+    }
+
+
+def _reventa(hoy, rol):
+    from reventa.models import CuentaRevendedor
+
+    # Lo que los revendedores nos deben (saldo > 0)
+    agg = CuentaRevendedor.objects.filter(saldo__gt=0).aggregate(
+        total=Sum("saldo"), cantidad=Count("id"),
+    )
+    return {"deuda_reventa": agg["total"] or 0, "reventa_count": agg["cantidad"]}
+
+
+def _compraventa(hoy, rol):
+    from compraventa import saldos
+
+    # Lo que nosotros debemos a proveedores: saldo por deuda con una
+    # subquery de pagos y suma / conteo en el mismo aggregate.
+    agg = saldos.totales()
+    return {"deuda_compraventa": agg["saldo"], "compraventa_count": agg["con_saldo"]}
+
+
+def _cuentas_internas(hoy, rol):
+    from cuentas_internas.models import CuentaInterna
+
+    cuentas = list(CuentaInterna.objects.filter(activa=True).order_by("-saldo"))
+    return {
+        "cuentas_internas": cuentas,
+        "cuentas_internas_total": sum((c.saldo or 0 for c in cuentas), Decimal("0")),
+    }
+
+
+def _entregados_deuda(hoy, rol):
+    """
+    Vehículos ya vendidos que todavía adeudan gastos de ingreso (misma
+    lógica que la solapa "Vendidos con deuda" del módulo Deudas).
+    """
+    from vehiculos.models import FichaVehicular
+    from vehiculos.services import saldos_gastos_ingreso
+
+    fichas = list(
+        FichaVehicular.objects.filter(vehiculo__estado="vendido").select_related("vehiculo")
+    )
+    saldos = saldos_gastos_ingreso(fichas)
+    entregados = []
+    for f in fichas:
+        total = sum(saldos[f.vehiculo_id].values(), Decimal("0"))
+        if total > 0:
+            entregados.append({"vehiculo": f.vehiculo, "total": total})
+    entregados.sort(key=lambda x: x["total"], reverse=True)
+    return {
+        "entregados_deuda": entregados[:6],
+        "entregados_deuda_count": len(entregados),
+        "total_entregados_deuda": sum((e["total"] for e in entregados), Decimal("0")),
+    }
+
+
+def _facturacion(hoy, rol):
+    from facturacion.models import FacturaRegistrada
+
+    agg = FacturaRegistrada.objects.filter(
+        estado="valida", fecha__year=hoy.year, fecha__month=hoy.month,
+    ).aggregate(
+        cantidad=Count("id"), total=Sum("monto"), neto=Sum("monto_neto"), iva=Sum("monto_iva"),
+    )
+    return {
+        "fact_mes_count": agg["cantidad"],
+        "fact_mes_total": agg["total"] or 0,
+        "fact_mes_neto": agg["neto"] or 0,
+        "fact_mes_iva": agg["iva"] or 0,
+        "fact_ultimas": list(
+            FacturaRegistrada.objects.filter(estado="valida")
+            .select_related("venta").order_by("-fecha", "-id")[:5]
+        ),
+    }
+
+
+WIDGETS = [
+    ("cuentas", _cuentas),
+    ("gestoria", _gestoria),
+    ("stock", _stock),
+    ("ventas", _ventas),
+    ("fichas", _fichas),
+    ("cuotas", _cuotas),
+    ("crm", _crm),
+    ("recordatorios", _recordatorios),
+    ("agenda", _agenda),
+]
+
+WIDGETS_POR_ROL = {
+    "gestion": [
+        ("alquileres", _alquileres),
+        ("reventa", _reventa),
+        ("compraventa", _compraventa),
+        ("cuentas_internas", _cuentas_internas),
+        ("entregados_deuda", _entregados_deuda),
+    ],
+    "namichetti": [("facturacion", _facturacion)],
+}
+
+
+# ==========================================================
+# ARMADO + CACHE
+# ==========================================================
+class _ContadorQueries:
+    def __init__(self):
+        self.n = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.n += 1
+        return execute(sql, params, many, context)
+
+
+def _medir(nombre, funcion, tiempos):
+    contador = _ContadorQueries()
+    inicio = time.perf_counter()
+    with connection.execute_wrapper(contador):
+        resultado = funcion()
+    tiempos.append({
+        "widget": nombre,
+        "ms": round((time.perf_counter() - inicio) * 1000, 1),
+        "queries": contador.n,
+    })
+    return resultado
+
+
+def armar(rol, hoy=None):
+    """
+    Arma el payload del rol sin cache:
+    {"contexto": {...}, "tiempos": [{"widget", "ms", "queries"}], "generado": datetime}
+    """
+    from vehiculos.services import actualizar_gastos_por_vencimientos
+
+    hoy = hoy or timezone.now().date()
+    tiempos = []
+    # Auto-acumula patentes / costos vencidos: corre una vez por armado
+    # (como mucho una vez por TTL) y no en cada visita al inicio.
+    _medir("vencimientos_auto", actualizar_gastos_por_vencimientos, tiempos)
+
+    contexto = {"hoy": hoy}
+    for nombre, funcion in WIDGETS + WIDGETS_POR_ROL.get(rol, []):
+        contexto.update(_medir(nombre, lambda: funcion(hoy, rol), tiempos))
+
+    total = sum(t["ms"] for t in tiempos)
+    logger.debug("dashboard %s armado en %.1f ms: %s", rol, total, tiempos)
+    return {"contexto": contexto, "tiempos": tiempos, "generado": timezone.now()}
+
+
+def datos(rol, hoy=None, refrescar=False):
+    """
+    Payload del dashboard para el rol, desde cache si está. Agrega
+    `desde_cache` para saber si se armó en este request.
+    """
+    hoy = hoy or timezone.now().date()
+    clave = _clave(rol, hoy)
+    payload = None if refrescar else cache.get(clave)
+    if payload is not None:
+        return {**payload, "desde_cache": True}
+    payload = armar(rol, hoy)
+    cache.set(clave, payload, ttl())
+    return {**payload, "desde_cache": False}
@@ -0,0 +1,22 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def crear_tabla_cache(apps, schema_editor):
+    """Tabla del cache compartido (settings.CACHES). Si ya existe no hace nada."""
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inicio", "0004_cuentabancaria_sucursal"),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_tabla_cache, noop),
+    ]
@@ -0,0 +1,51 @@
+"""
+Invalida el cache del dashboard de inicio cuando cambia alguno de los
+modelos que muestra.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from inicio import dashboard
+
+
+# Modelos que alimentan algún panel del dashboard: (app_label, model_name)
+MODELOS_DASHBOARD = [
+    ("cuentas", "CuentaCorriente"),
+    ("cuentas", "CuotaPlan"),
+    ("gestoria", "Gestoria"),
+    ("clientes", "Cliente"),
+    ("vehiculos", "Vehiculo"),
+    ("vehiculos", "FichaVehicular"),
+    ("vehiculos", "PagoGastoIngreso"),
+    ("ventas", "Venta"),
+    ("crm", "Prospecto"),
+    ("crm", "NotificacionCRM"),
+    ("inicio", "RecordatorioDashboard"),
+    ("agenda_pagos", "PagoFuturo"),
+    ("cuentas_internas", "Alquiler"),
+    ("cuentas_internas", "CuentaInterna"),
+    ("reventa", "CuentaRevendedor"),
+    ("compraventa", "DeudaProveedor"),
+    ("compraventa", "PagoProveedor"),
+    ("facturacion", "FacturaRegistrada"),
+]
+
+
+def _invalidar(sender, **kwargs):
+    dashboard.invalidar()
+
+
+def conectar_signals():
+    from django.apps import apps
+    for app_label, model_name in MODELOS_DASHBOARD:
+        try:
+            Model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        post_save.connect(
+            _invalidar, sender=Model, weak=False,
+            dispatch_uid=f"dashboard_save_{app_label}_{model_name}",
+        )
+        post_delete.connect(
+            _invalidar, sender=Model, weak=False,
+            dispatch_uid=f"dashboard_delete_{app_label}_{model_name}",
+        )
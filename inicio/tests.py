@@ -1,3 +1,104 @@
+"""
+Tests del armado del dashboard de inicio (agregados, cache e invalidación).
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from compraventa.models import DeudaProveedor, PagoProveedor, Proveedor
+from vehiculos.models import FichaVehicular, PagoGastoIngreso, Vehiculo
+from vehiculos.services import saldos_gastos_ingreso
+
+from . import dashboard
+from .models import RecordatorioDashboard
+
+
+def _vehiculo(dominio, estado="stock"):
+    return Vehiculo.objects.create(
+        marca="Ford", modelo="Ka", dominio=dominio, anio=2020,
+        precio=Decimal("1000"), estado=estado,
+    )
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hoy = date(2026, 3, 10)
+
+    def test_contadores_por_aggregate(self):
+        _vehiculo("AAA111")
+        _vehiculo("BBB222")
+        _vehiculo("CCC333", estado="temporal")
+        datos = dashboard._stock(self.hoy, "general")
+        self.assertEqual((datos["vehiculos_stock"], datos["vehiculos_temporal"]), (2, 1))
+
+    def test_saldo_compraventa_en_sql(self):
+        prov = Proveedor.objects.create(nombre_empresa="Prov")
+        d1 = DeudaProveedor.objects.create(proveedor=prov, vehiculo=_vehiculo("AAA111"), monto_total=Decimal("500"))
+        DeudaProveedor.objects.create(proveedor=prov, vehiculo=_vehiculo("BBB222"), monto_total=Decimal("300"))
+        PagoProveedor.objects.create(deuda=d1, monto=Decimal("500"))
+        with self.assertNumQueries(1):
+            datos = dashboard._compraventa(self.hoy, "gestion")
+        self.assertEqual(datos["deuda_compraventa"], Decimal("300"))
+        self.assertEqual(datos["compraventa_count"], 1)
+
+    def test_cache_por_rol_e_invalidacion(self):
+        primero = dashboard.datos("general")
+        self.assertFalse(primero["desde_cache"])
+        self.assertIn("stock", [t["widget"] for t in primero["tiempos"]])
+
+        with self.assertNumQueries(1):  # solo la lectura del cache compartido
+            self.assertTrue(dashboard.datos("general")["desde_cache"])
+
+        # Guardar un modelo del dashboard invalida el payload cacheado
+        RecordatorioDashboard.objects.create(texto="Llamar al gestor")
+        nuevo = dashboard.datos("general")
+        self.assertFalse(nuevo["desde_cache"])
+        self.assertEqual(len(nuevo["contexto"]["recordatorios"]), 1)
+
+    def test_invalida_al_confirmar_y_en_las_copias_de_la_agenda(self):
+        from agenda_pagos.models import PagoFuturo
+        from agenda_pagos.views import _crear_proximo_mes
+
+        clave = dashboard._clave("general", timezone.now().date())
+        dashboard.datos("general")
+        with self.captureOnCommitCallbacks(execute=True):
+            RecordatorioDashboard.objects.create(texto="Llamar al gestor")
+            dashboard.datos("general")  # otro armado antes del commit
+        self.assertIsNone(cache.get(clave))
+
+        pago = PagoFuturo.objects.create(
+            descripcion="Alquiler", monto=Decimal("1000"), fecha_vencimiento=date.today(),
+            es_recurrente_mensual=True,
+        )
+        dashboard.datos("general")
+        self.assertIsNotNone(cache.get(clave))
+        _crear_proximo_mes(pago, User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        self.assertIsNone(cache.get(clave))
+
+    def test_vista_inicio_por_rol(self):
+        user = User.objects.create_user("hamichetti", password="x")
+        self.client.force_login(user)
+        r = self.client.get("/inicio/", secure=True)
+        self.assertEqual(r.status_code, 200)
+        self.assertTemplateUsed(r, "inicio/inicio_gestion.html")
+
 
-# Create your tests here.
+class SaldosGastosIngresoTests(TestCase):
+    def test_coincide_con_el_calculo_por_ficha(self):
+        v = _vehiculo("AAA111", estado="vendido")
+        ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=v)
+        ficha.gasto_patentes = Decimal("100")
+        ficha.gasto_vtv = Decimal("50")
+        ficha.save()
+        PagoGastoIngreso.objects.create(
+            vehiculo=v, concepto="patentes", fecha_pago=date(2026, 1, 5),
+            monto=Decimal("40"), situacion="prov_directo",
+        )
+        saldos = saldos_gastos_ingreso([ficha])[v.id]
+        self.assertEqual(saldos, {"Patentes": Decimal("60"), "VTV": Decimal("50")})
+        self.assertEqual(saldos["Patentes"], ficha.saldo_por_concepto("Patentes"))
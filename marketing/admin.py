@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ConversacionMeta, MensajeMeta, LeadMeta
+from .models import ConversacionMeta, EventoMeta, MensajeMeta, LeadMeta
 
 
 @admin.register(ConversacionMeta)
@@ -20,3 +20,10 @@ class LeadMetaAdmin(admin.ModelAdmin):
     list_display = ("nombre", "plataforma", "telefono", "email", "fecha")
     list_filter = ("plataforma",)
     search_fields = ("nombre", "telefono", "email")
+
+
+@admin.register(EventoMeta)
+class EventoMetaAdmin(admin.ModelAdmin):
+    list_display = ("clave", "tipo", "estado", "intentos", "recibido", "procesado")
+    list_filter = ("tipo", "estado")
+    search_fields = ("clave",)
@@ -0,0 +1,225 @@
+"""
+Bandeja de entrada del webhook de Meta (`EventoMeta`).
+
+El webhook no procesa nada: separa el payload en eventos (mensajes de
+Messenger / Instagram Direct y leads de Lead Ads) y los guarda en un solo
+INSERT con una clave única (mid / leadgen_id). Si Meta reintenta la
+entrega, el conflicto de la clave lo descarta.
+
+`procesar_pendientes` los procesa en lotes (lo corre el comando
+`procesar_eventos_meta`):
+  - Cada worker reclama su lote con un UPDATE condicionado al estado, así
+    un evento lo toma un solo worker.
+  - Cada evento se procesa en su propia transacción junto con la marca de
+    "procesado": si falla, no queda nada a medias y vuelve a "error" para
+    reintentarse hasta `max_intentos`, no antes de `reintentar_desde`
+    (espera que se duplica con cada intento): una caída de la Graph API
+    no quema todos los intentos en la misma pasada.
+  - Al reclamarlo, `reintentar_desde` queda VENCIMIENTO_PROCESANDO
+    segundos adelante: si el worker se corta en el medio y el evento sigue
+    en "procesando" pasado ese plazo, otro worker lo vuelve a tomar (con
+    los mismos `max_intentos`). Un worker viejo que termine tarde no pisa
+    el estado: las marcas finales van condicionadas a su `lote`.
+"""
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import meta_api
+from .models import ConversacionMeta, EventoMeta, LeadMeta, MensajeMeta
+
+MAX_INTENTOS = 5
+ESPERA_REINTENTO = 60       # segundos antes del primer reintento
+ESPERA_REINTENTO_MAX = 3600
+VENCIMIENTO_PROCESANDO = 600  # segundos en "procesando" antes de darlo por cortado
+
+
+# ==========================================================
+# ENCOLAR (lo que hace el webhook)
+# ==========================================================
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def separar(data):
+    """Eventos del payload de Meta que nos interesan, ya con su clave."""
+    objeto = data.get("object", "")
+    eventos = []
+    for entry in data.get("entry", []):
+        # 1) Mensajes (Messenger / Instagram Direct)
+        for ev in entry.get("messaging", []):
+            msg = ev.get("message") or {}
+            if not (ev.get("sender") or {}).get("id") or not msg:
+                continue
+            if msg.get("is_echo"):  # eco de mensajes que enviamos nosotros
+                continue
+            clave = f"mid:{msg['mid']}" if msg.get("mid") else f"sha:{_hash(ev)}"
+            eventos.append(EventoMeta(clave=clave, tipo="mensaje", objeto=objeto, payload=ev))
+
+        # 2) Cambios (leadgen de Lead Ads; el resto no se usa)
+        for cambio in entry.get("changes", []):
+            if cambio.get("field", "") != "leadgen":
+                continue
+            valor = cambio.get("value", {}) or {}
+            leadgen_id = valor.get("leadgen_id", "")
+            clave = f"lead:{leadgen_id}" if leadgen_id else f"sha:{_hash(valor)}"
+            eventos.append(EventoMeta(clave=clave, tipo="lead", objeto=objeto, payload=valor))
+    return eventos
+
+
+def encolar(data):
+    """Guarda los eventos del payload (1 INSERT; los repetidos se ignoran)."""
+    eventos = separar(data)
+    if eventos:
+        EventoMeta.objects.bulk_create(eventos, ignore_conflicts=True)
+    return len(eventos)
+
+
+# ==========================================================
+# PROCESAR (lo que hace el worker)
+# ==========================================================
+def espera_reintento(intentos):
+    """Segundos hasta el próximo intento después de `intentos` fallidos."""
+    return min(ESPERA_REINTENTO * 2 ** max(intentos - 1, 0), ESPERA_REINTENTO_MAX)
+
+
+def reclamar(lote=50, max_intentos=MAX_INTENTOS):
+    """
+    Marca hasta `lote` eventos como tomados por este worker: pendientes,
+    errores cuya espera ya pasó y "procesando" de un worker que se cortó.
+    """
+    ahora = timezone.now()
+    tomables = Q(estado="pendiente") | (
+        Q(estado__in=("error", "procesando"), intentos__lt=max_intentos)
+        & (Q(reintentar_desde__isnull=True) | Q(reintentar_desde__lte=ahora))
+    )
+    ids = list(
+        EventoMeta.objects
+        .filter(tomables)
+        .order_by("intentos", "id")  # primero los nuevos, después los reintentos
+        .values_list("id", flat=True)[:lote]
+    )
+    if not ids:
+        return []
+    marca = uuid.uuid4().hex
+    EventoMeta.objects.filter(tomables, pk__in=ids).update(
+        estado="procesando", lote=marca, intentos=F("intentos") + 1,
+        reintentar_desde=ahora + timedelta(seconds=VENCIMIENTO_PROCESANDO),
+    )
+    return list(EventoMeta.objects.filter(lote=marca, estado="procesando").order_by("id"))
+
+
+def procesar_pendientes(lote=50, max_intentos=MAX_INTENTOS):
+    """Procesa un lote. Devuelve {"procesados": n, "errores": m}."""
+    resultado = {"procesados": 0, "errores": 0}
+    for evento in reclamar(lote, max_intentos):
+        try:
+            with transaction.atomic():
+                procesar(evento)
+                EventoMeta.objects.filter(pk=evento.pk, lote=evento.lote).update(
+                    estado="procesado", procesado=timezone.now(), ultimo_error="",
+                )
+            resultado["procesados"] += 1
+        except Exception as e:
+            EventoMeta.objects.filter(pk=evento.pk, lote=evento.lote).update(
+                estado="error", ultimo_error=f"{type(e).__name__}: {e}"[:2000],
+                reintentar_desde=timezone.now() + timedelta(seconds=espera_reintento(evento.intentos)),
+            )
+            resultado["errores"] += 1
+    return resultado
+
+
+def procesar(evento):
+    if evento.tipo == "mensaje":
+        plataforma = "instagram" if evento.objeto == "instagram" else "messenger"
+        _guardar_mensaje_entrante(evento.payload, plataforma)
+    elif evento.tipo == "lead":
+        _guardar_lead(evento.payload, evento.objeto)
+
+
+def _guardar_mensaje_entrante(ev, plataforma):
+    sender = (ev.get("sender") or {}).get("id")
+    msg = ev.get("message") or {}
+    texto = msg.get("text", "") or "[adjunto]"
+    mid = msg.get("mid", "")
+
+    conv, _ = ConversacionMeta.objects.get_or_create(
+        plataforma=plataforma, contacto_id=sender,
+    )
+    # Evita duplicados de mensajes guardados antes de la bandeja de entrada
+    if mid and conv.mensajes.filter(mid=mid).exists():
+        return
+
+    # Nombre del contacto (best-effort, solo si todavía no lo tenemos)
+    if not conv.nombre:
+        perfil = meta_api.obtener_perfil(sender)
+        if perfil.get("name"):
+            conv.nombre = perfil["name"]
+        if perfil.get("profile_pic"):
+            conv.foto_url = perfil["profile_pic"]
+
+    MensajeMeta.objects.create(
+        conversacion=conv, entrante=True, texto=texto, mid=mid,
+        fecha=timezone.now(),
+    )
+    conv.ultimo_texto = texto
+    conv.ultima_fecha = timezone.now()
+    conv.no_leido = True
+    conv.save()
+
+
+def _guardar_lead(valor, objeto):
+    leadgen_id = valor.get("leadgen_id", "")
+    if leadgen_id and LeadMeta.objects.filter(leadgen_id=leadgen_id).exists():
+        return
+
+    plataforma = "instagram" if objeto == "instagram" else "facebook"
+    detalle = {}
+    if leadgen_id:
+        # Sin los datos del lead no se guarda nada: el evento queda en error
+        # y se reintenta (una caída de la Graph API no deja un lead vacío)
+        ok, detalle = meta_api.consultar_lead(leadgen_id)
+        if not ok:
+            err = detalle.get("error")
+            raise RuntimeError(f"No se pudo traer el lead {leadgen_id}: "
+                               f"{err.get('message') if isinstance(err, dict) else err}")
+
+    # field_data = [{"name": "full_name", "values": ["Juan"]}, ...]
+    campos = {}
+    for f in detalle.get("field_data", []):
+        vals = f.get("values") or []
+        campos[f.get("name", "")] = vals[0] if vals else ""
+
+    nombre = campos.get("full_name") or campos.get("name") or ""
+    telefono = campos.get("phone_number") or campos.get("phone") or ""
+    email = campos.get("email") or ""
+
+    lead = LeadMeta.objects.create(
+        plataforma=plataforma,
+        leadgen_id=leadgen_id,
+        form_id=valor.get("form_id", "") or detalle.get("form_id", ""),
+        nombre=nombre, telefono=telefono, email=email,
+        datos=campos or valor,
+    )
+
+    # Crear el prospecto en el CRM (en un savepoint: si falla, el lead queda igual)
+    try:
+        with transaction.atomic():
+            from crm.models import Prospecto
+            prospecto = Prospecto.objects.create(
+                nombre_completo=nombre or "Lead sin nombre",
+                telefono=telefono,
+                email=email,
+                origen=plataforma,  # "instagram" / "facebook" existen en el CRM
+                etapa="nuevo",
+                observaciones="Lead capturado automáticamente desde Meta.",
+            )
+            lead.prospecto = prospecto
+            lead.save(update_fields=["prospecto"])
+    except Exception:
+        pass
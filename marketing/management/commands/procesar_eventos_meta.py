@@ -0,0 +1,53 @@
+"""
+Procesa la bandeja de entrada del webhook de Meta (`EventoMeta`): crea
+las conversaciones / mensajes y los leads (con su prospecto en el CRM).
+
+Uso:
+    python manage.py procesar_eventos_meta                  # vacía la cola y termina
+    python manage.py procesar_eventos_meta --intervalo 10   # queda corriendo
+
+Los eventos que fallan se reintentan en las próximas pasadas, con una
+espera que se duplica en cada intento (ver eventos.espera_reintento),
+hasta --max-intentos; después quedan en "error" para revisarlos en el
+admin. Los que quedan en "procesando" porque el worker se cortó se
+retoman pasados eventos.VENCIMIENTO_PROCESANDO segundos.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from marketing import eventos
+
+
+class Command(BaseCommand):
+    help = "Procesa en lotes los eventos del webhook de Meta que quedaron en cola"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=50, help="Eventos por lote (50)")
+        parser.add_argument(
+            "--max-intentos", type=int, default=eventos.MAX_INTENTOS,
+            help=f"Intentos por evento antes de dejarlo en error ({eventos.MAX_INTENTOS})",
+        )
+        parser.add_argument(
+            "--intervalo", type=int, default=0,
+            help="Segundos entre pasadas; 0 = vaciar la cola una vez y salir",
+        )
+
+    def handle(self, *args, **opts):
+        while True:
+            procesados = errores = 0
+            while True:
+                resultado = eventos.procesar_pendientes(opts["lote"], opts["max_intentos"])
+                procesados += resultado["procesados"]
+                errores += resultado["errores"]
+                # Lote incompleto: la cola quedó vacía. Los que fallaron no
+                # vuelven en esta pasada: quedan esperando su reintentar_desde.
+                if resultado["procesados"] + resultado["errores"] < opts["lote"]:
+                    break
+            if procesados or errores or not opts["intervalo"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Eventos de Meta | Procesados: {procesados} | Con error: {errores}"
+                ))
+            if not opts["intervalo"]:
+                return
+            time.sleep(opts["intervalo"])
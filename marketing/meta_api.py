@@ -83,11 +83,16 @@ def obtener_perfil(contacto_id):
     return {}
 
 
-def obtener_lead(leadgen_id):
-    """Trae los datos de un lead a partir de su leadgen_id."""
+def consultar_lead(leadgen_id):
+    """Datos de un lead a partir de su leadgen_id, como (ok, data|error)."""
     if not configurado():
-        return {}
-    ok, data = _get(leadgen_id, {"fields": "field_data,created_time,form_id"})
+        return False, {"error": "Falta configurar META_PAGE_ACCESS_TOKEN"}
+    return _get(leadgen_id, {"fields": "field_data,created_time,form_id"})
+
+
+def obtener_lead(leadgen_id):
+    """Trae los datos de un lead a partir de su leadgen_id ({} si falla)."""
+    ok, data = consultar_lead(leadgen_id)
     if ok:
         return data
     return {}
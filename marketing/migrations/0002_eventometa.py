@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-19 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoMeta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255, unique=True)),
+                ('tipo', models.CharField(choices=[('mensaje', 'Mensaje'), ('lead', 'Lead')], max_length=20)),
+                ('objeto', models.CharField(blank=True, default='', max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('procesado', 'Procesado'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('lote', models.CharField(blank=True, db_index=True, default='', max_length=32)),
+                ('recibido', models.DateTimeField(auto_now_add=True)),
+                ('procesado', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de Meta',
+                'verbose_name_plural': 'Eventos de Meta',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['estado', 'id'], name='marketing_e_estado_f1cae4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0002_eventometa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventometa',
+            name='reintentar_desde',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
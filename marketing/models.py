@@ -99,3 +99,50 @@ class LeadMeta(models.Model):
 
     def __str__(self):
         return f"{self.nombre or 'Lead'} ({self.get_plataforma_display()})"
+
+
+# ==========================================================
+# EVENTO (bandeja de entrada del webhook)
+# El webhook solo guarda acá cada evento crudo, con una clave única
+# (mid del mensaje / leadgen_id del lead) para que los reintentos de
+# Meta no lo dupliquen. El comando `procesar_eventos_meta` los procesa
+# en lotes (ver marketing/eventos.py).
+# ==========================================================
+class EventoMeta(models.Model):
+    TIPOS = [
+        ("mensaje", "Mensaje"),
+        ("lead", "Lead"),
+    ]
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("procesando", "Procesando"),
+        ("procesado", "Procesado"),
+        ("error", "Error"),
+    ]
+
+    clave = models.CharField(max_length=255, unique=True)
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    # "object" del payload de Meta: "page" / "instagram"
+    objeto = models.CharField(max_length=20, blank=True, default="")
+    payload = models.JSONField(default=dict)
+
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente")
+    intentos = models.PositiveIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True, default="")
+    # Después de un error no se vuelve a tomar antes de esta hora (backoff);
+    # mientras está "procesando", hora a la que se da al worker por cortado
+    reintentar_desde = models.DateTimeField(null=True, blank=True)
+    # Marca del lote del worker que lo tomó (para reclamarlo una sola vez)
+    lote = models.CharField(max_length=32, blank=True, default="", db_index=True)
+
+    recibido = models.DateTimeField(auto_now_add=True)
+    procesado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["estado", "id"])]
+        verbose_name = "Evento de Meta"
+        verbose_name_plural = "Eventos de Meta"
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.clave} ({self.get_estado_display()})"
@@ -0,0 +1,96 @@
+"""
+Tests de la bandeja de entrada del webhook de Meta: el webhook solo
+encola (sin duplicar reintentos) y el worker procesa una sola vez.
+"""
+import json
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import eventos
+from .models import ConversacionMeta, EventoMeta, LeadMeta, MensajeMeta
+
+
+def _payload(mid="m_1", leadgen_id="L1"):
+    return {
+        "object": "page",
+        "entry": [{
+            "messaging": [
+                {"sender": {"id": "PSID1"}, "message": {"mid": mid, "text": "Hola"}},
+                {"sender": {"id": "PSID1"}, "message": {"mid": "eco", "is_echo": True}},
+            ],
+            "changes": [{"field": "leadgen", "value": {"leadgen_id": leadgen_id, "form_id": "F"}}],
+        }],
+    }
+
+
+@mock.patch("marketing.meta_api.obtener_perfil", return_value={"name": "Ana"})
+@mock.patch("marketing.meta_api.consultar_lead", return_value=(True, {"field_data": [
+    {"name": "full_name", "values": ["Ana Gómez"]},
+]}))
+class BandejaEventosTests(TestCase):
+    def _post(self, data):
+        return self.client.post(
+            reverse("marketing:webhook"), json.dumps(data),
+            content_type="application/json", secure=True,
+        )
+
+    def test_webhook_encola_en_un_insert_y_deduplica(self, *_):
+        with self.assertNumQueries(1):
+            self.assertEqual(self._post(_payload()).status_code, 200)
+        self._post(_payload())  # reintento de Meta
+        self.assertEqual(
+            sorted(EventoMeta.objects.values_list("clave", flat=True)), ["lead:L1", "mid:m_1"],
+        )
+        self.assertFalse(MensajeMeta.objects.exists())
+
+    def test_worker_procesa_una_vez_y_reintenta_errores(self, consultar_lead, _):
+        eventos.encolar(_payload())
+        ok = consultar_lead.return_value
+        # Graph API caída: meta_api no lanza, devuelve ok=False
+        consultar_lead.return_value = (False, {"error": {"message": "Service unavailable"}})
+        self.assertEqual(eventos.procesar_pendientes(), {"procesados": 1, "errores": 1})
+        self.assertFalse(LeadMeta.objects.exists())
+        self.assertIn("Service unavailable", EventoMeta.objects.get(estado="error").ultimo_error)
+
+        # Mientras no pasa su espera, el que falló no se vuelve a tomar
+        # (ni en la misma pasada del comando)
+        call_command("procesar_eventos_meta", stdout=mock.MagicMock())
+        self.assertEqual(EventoMeta.objects.get(estado="error").intentos, 1)
+        self.assertEqual(
+            [eventos.espera_reintento(n) for n in (1, 2, 3, 10)], [60, 120, 240, eventos.ESPERA_REINTENTO_MAX],
+        )
+
+        consultar_lead.return_value = ok
+        EventoMeta.objects.filter(estado="error").update(reintentar_desde=timezone.now())
+        call_command("procesar_eventos_meta", stdout=mock.MagicMock())
+        self.assertEqual(
+            list(EventoMeta.objects.values_list("estado", "intentos").order_by("clave")),
+            [("procesado", 2), ("procesado", 1)],
+        )
+        self.assertEqual(LeadMeta.objects.get().prospecto.nombre_completo, "Ana Gómez")
+        self.assertEqual(ConversacionMeta.objects.get().nombre, "Ana")
+        self.assertEqual(MensajeMeta.objects.count(), 1)
+        self.assertEqual(eventos.procesar_pendientes(), {"procesados": 0, "errores": 0})
+
+    def test_procesando_cortado_se_retoma_y_las_pantallas_no_procesan(self, *_):
+        from django.contrib.auth.models import User
+
+        eventos.encolar(_payload())
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        for nombre in ("marketing:panel", "marketing:bandeja", "marketing:leads"):
+            self.client.get(reverse(nombre), secure=True)
+        self.assertEqual(EventoMeta.objects.filter(estado="pendiente").count(), 2)
+
+        # El worker se cortó con el lote tomado: antes del vencimiento nadie lo toca
+        tomados = eventos.reclamar()
+        self.assertEqual(eventos.procesar_pendientes(), {"procesados": 0, "errores": 0})
+        EventoMeta.objects.update(reintentar_desde=timezone.now())
+        self.assertEqual(eventos.procesar_pendientes(), {"procesados": 2, "errores": 0})
+        self.assertEqual(set(EventoMeta.objects.values_list("intentos", flat=True)), {2})
+
+        # Las marcas del worker viejo (condicionadas a su lote) ya no tocan nada
+        self.assertFalse(EventoMeta.objects.filter(pk=tomados[0].pk, lote=tomados[0].lote).exists())
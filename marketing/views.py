@@ -13,7 +13,7 @@ from django.views.decorators.http import require_POST
 
 from permisos.access import es_admin
 
-from . import meta_api
+from . import eventos, meta_api
 from .models import ConversacionMeta, MensajeMeta, LeadMeta
 
 
@@ -61,115 +61,18 @@ def webhook(request):
         except Exception:
             return HttpResponse("ok")  # No bloquear a Meta por un body raro
 
+        # Solo se encola (1 INSERT); lo procesa `procesar_eventos_meta`.
+        # Si el INSERT falla sí devolvemos error: Meta reintenta la entrega y
+        # la clave única evita duplicar lo que ya había entrado.
         try:
-            _procesar_evento(data)
+            eventos.encolar(data)
         except Exception:
-            # Nunca devolver error a Meta: reintentaría en loop
-            pass
+            return HttpResponse(status=500)
         return HttpResponse("ok")
 
     return HttpResponse(status=405)
 
 
-# ==========================================================
-# Procesamiento de eventos del webhook
-# ==========================================================
-def _procesar_evento(data):
-    objeto = data.get("object", "")
-    plataforma = "instagram" if objeto == "instagram" else "messenger"
-
-    for entry in data.get("entry", []):
-        # 1) Mensajes (Messenger / Instagram Direct)
-        for ev in entry.get("messaging", []):
-            _guardar_mensaje_entrante(ev, plataforma)
-
-        # 2) Cambios (leadgen de Lead Ads, comentarios, etc.)
-        for cambio in entry.get("changes", []):
-            campo = cambio.get("field", "")
-            valor = cambio.get("value", {}) or {}
-            if campo == "leadgen":
-                _guardar_lead(valor, objeto)
-
-
-def _guardar_mensaje_entrante(ev, plataforma):
-    sender = (ev.get("sender") or {}).get("id")
-    msg = ev.get("message") or {}
-    if not sender or not msg:
-        return
-    if msg.get("is_echo"):  # eco de mensajes que enviamos nosotros
-        return
-
-    texto = msg.get("text", "") or "[adjunto]"
-    mid = msg.get("mid", "")
-
-    conv, _ = ConversacionMeta.objects.get_or_create(
-        plataforma=plataforma, contacto_id=sender,
-    )
-    # Evita duplicados si Meta reintenta el mismo mensaje
-    if mid and conv.mensajes.filter(mid=mid).exists():
-        return
-
-    # Nombre del contacto (best-effort, solo si todavía no lo tenemos)
-    if not conv.nombre:
-        perfil = meta_api.obtener_perfil(sender)
-        if perfil.get("name"):
-            conv.nombre = perfil["name"]
-        if perfil.get("profile_pic"):
-            conv.foto_url = perfil["profile_pic"]
-
-    MensajeMeta.objects.create(
-        conversacion=conv, entrante=True, texto=texto, mid=mid,
-        fecha=timezone.now(),
-    )
-    conv.ultimo_texto = texto
-    conv.ultima_fecha = timezone.now()
-    conv.no_leido = True
-    conv.save()
-
-
-def _guardar_lead(valor, objeto):
-    leadgen_id = valor.get("leadgen_id", "")
-    if leadgen_id and LeadMeta.objects.filter(leadgen_id=leadgen_id).exists():
-        return
-
-    plataforma = "instagram" if objeto == "instagram" else "facebook"
-    detalle = meta_api.obtener_lead(leadgen_id) if leadgen_id else {}
-
-    # field_data = [{"name": "full_name", "values": ["Juan"]}, ...]
-    campos = {}
-    for f in detalle.get("field_data", []):
-        vals = f.get("values") or []
-        campos[f.get("name", "")] = vals[0] if vals else ""
-
-    nombre = campos.get("full_name") or campos.get("name") or ""
-    telefono = campos.get("phone_number") or campos.get("phone") or ""
-    email = campos.get("email") or ""
-
-    lead = LeadMeta.objects.create(
-        plataforma=plataforma,
-        leadgen_id=leadgen_id,
-        form_id=valor.get("form_id", "") or detalle.get("form_id", ""),
-        nombre=nombre, telefono=telefono, email=email,
-        datos=campos or valor,
-    )
-
-    # Crear el prospecto en el CRM
-    try:
-        from crm.models import Prospecto
-        prospecto = Prospecto.objects.create(
-            nombre_completo=nombre or "Lead sin nombre",
-            telefono=telefono,
-            email=email,
-            origen=plataforma,  # "instagram" / "facebook" existen en el CRM
-            etapa="nuevo",
-            observaciones="Lead capturado automáticamente desde Meta.",
-        )
-        lead.prospecto = prospecto
-        lead.save(update_fields=["prospecto"])
-    except Exception:
-        pass
-
-
 # ==========================================================
 # PANEL (hub del módulo)
 # ==========================================================
@@ -5,3 +5,7 @@ class ProyectosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'proyectos'
     verbose_name = 'Proyectos Personales'
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
@@ -0,0 +1,278 @@
+"""
+Avisos en vivo del navbar: recordatorios que llegan a su fecha_hora
+(`Recordatorio`, de cada usuario) y notificaciones nuevas del CRM
+(`NotificacionCRM`, para todos).
+
+Dos formas de entrega:
+
+  - SSE (`avisos_stream`), bajo ASGI (concesionario/asgi.py): un único
+    `Planificador` por proceso duerme hasta el próximo recordatorio de
+    los usuarios conectados o hasta que un signal avisa un cambio, y solo
+    entonces despierta a las conexiones que tienen algo para recibir.
+    Esperar no ocupa ningún hilo: es una corrutina. Lo único periódico es
+    que el planificador mira la versión del cache cada PASO segundos, una
+    vez por proceso y no por conexión.
+  - A pedido (`api_avisos`) para despliegues WSGI (gunicorn con workers
+    sync): el navegador consulta al cargar cada página y al volver a la
+    pestaña, sin timer; una pestaña quieta no hace requests. La consulta
+    responde enseguida: sin novedades solo lee el cache (versión y
+    próximo recordatorio, que con DatabaseCache son dos SELECT livianos).
+
+Cada recordatorio se entrega una sola vez: `entregar` lo marca notificado
+con un UPDATE condicional, así dos pestañas no lo muestran dos veces. Las
+notificaciones del CRM se entregan por cursor (id) y siguen sin leer
+hasta que se marcan desde el CRM.
+
+Los cambios se avisan subiendo una versión en el cache compartido
+(settings.CACHES), así que todos los procesos la ven enseguida; igual
+cada AVISOS_REVISION segundos se revisa la base por las dudas.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Recordatorio
+
+CLAVE_VERSION = "avisos:version"
+LIMITE = 20
+PASO = 2  # segundos entre miradas a la versión del cache (planificador SSE)
+
+
+def _revision():
+    return getattr(settings, "AVISOS_REVISION", 120)
+
+
+def latido():
+    return getattr(settings, "AVISOS_LATIDO", 20)
+
+
+# ==========================================================
+# VERSIÓN / CAMBIOS
+# ==========================================================
+def version():
+    return cache.get_or_set(CLAVE_VERSION, 1, None)
+
+
+def cambio(**kwargs):
+    """Algo cambió (signal de Recordatorio / NotificacionCRM): avisar a los que esperan."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, 2, None)
+    PLANIFICADOR.despertar()
+
+
+def _clave_proximo(usuario_id):
+    return f"avisos:proximo:{usuario_id}:{version()}"
+
+
+def proximo(usuario_id):
+    """fecha_hora del próximo recordatorio sin notificar del usuario, o None (cacheado)."""
+    clave = _clave_proximo(usuario_id)
+    guardado = cache.get(clave)
+    if guardado is None:
+        guardado = (
+            Recordatorio.objects
+            .filter(usuario_id=usuario_id, notificado=False)
+            .order_by("fecha_hora")
+            .values_list("fecha_hora", flat=True)
+            .first(),
+        )
+        cache.set(clave, guardado, _revision())
+    return guardado[0]
+
+
+def _proximos(usuario_ids):
+    """{usuario_id: próximo recordatorio sin notificar} en una query."""
+    return dict(
+        Recordatorio.objects
+        .filter(usuario_id__in=usuario_ids, notificado=False)
+        .order_by()
+        .values("usuario_id")
+        .annotate(f=Min("fecha_hora"))
+        .values_list("usuario_id", "f")
+    )
+
+
+# ==========================================================
+# ENTREGA
+# ==========================================================
+def entregar(usuario, cursor=0, crm=True, ahora=None):
+    """
+    Recordatorios vencidos del usuario (quedan notificados) y
+    notificaciones del CRM sin leer posteriores a `cursor`.
+    """
+    from crm.models import NotificacionCRM
+
+    ahora = ahora or timezone.now()
+    actual = version()
+    datos = {
+        "version": actual,
+        "revisado": time.time(),
+        "cursor": cursor,
+        "recordatorios": [],
+        "crm": [],
+    }
+
+    vencidos = list(
+        Recordatorio.objects
+        .filter(usuario=usuario, notificado=False, fecha_hora__lte=ahora)
+        .select_related("tarea")
+        .order_by("fecha_hora")[:LIMITE]
+    )
+    for r in vencidos:
+        # Solo lo entrega quien lo marca (dos pestañas no lo ven dos veces)
+        if Recordatorio.objects.filter(pk=r.pk, notificado=False).update(notificado=True):
+            datos["recordatorios"].append({
+                "id": r.pk,
+                "titulo": r.titulo,
+                "fecha_hora": r.fecha_hora.isoformat(),
+                "tarea": r.tarea.titulo if r.tarea else None,
+            })
+    if vencidos:
+        cache.delete(f"avisos:proximo:{usuario.pk}:{actual}")
+
+    if crm:
+        nuevas = list(
+            NotificacionCRM.objects
+            .filter(leida=False, pk__gt=cursor)
+            .select_related("prospecto", "vehiculo")
+            .order_by("-id")[:LIMITE]
+        )
+        datos["crm"] = [
+            {"id": n.pk, "mensaje": n.mensaje, "prospecto": n.prospecto.nombre_completo}
+            for n in nuevas
+        ]
+        datos["cursor"] = max([cursor] + [n.pk for n in nuevas])
+        datos["crm_no_leidas"] = NotificacionCRM.objects.filter(leida=False).count()
+    return datos
+
+
+def hay_novedades(usuario_id, version_vista, revisado, ahora=None):
+    """¿Conviene llamar a `entregar`? Solo mira el cache (salvo al vencer su entrada)."""
+    ahora = ahora or timezone.now()
+    if version() != version_vista or time.time() - revisado >= _revision():
+        return True
+    fecha = proximo(usuario_id)
+    return bool(fecha and fecha <= ahora)
+
+
+# ==========================================================
+# SSE (ASGI): un planificador por proceso
+# ==========================================================
+class Planificador:
+    """
+    Un solo bucle por proceso para todas las conexiones SSE: calcula el
+    próximo recordatorio de los usuarios conectados (1 query, solo cuando
+    cambia algo) y duerme hasta esa hora, mirando la versión del cache
+    cada PASO segundos. Al despertar marca el evento de cada conexión que
+    tiene algo para recibir.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._conexiones = {}  # usuario_id -> {asyncio.Event}
+        self._cambio = None
+        self._tarea = None
+        self._recalcular = True
+
+    def suscribir(self, usuario_id):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._conexiones, self._cambio, self._tarea = loop, {}, asyncio.Event(), None
+        evento = asyncio.Event()
+        self._conexiones.setdefault(usuario_id, set()).add(evento)
+        if self._tarea is None or self._tarea.done():
+            self._tarea = loop.create_task(self._bucle())
+        self.recalcular()
+        return evento
+
+    def desuscribir(self, usuario_id, evento):
+        eventos = self._conexiones.get(usuario_id, set())
+        eventos.discard(evento)
+        if not eventos:
+            self._conexiones.pop(usuario_id, None)
+
+    def recalcular(self):
+        """Volver a leer los próximos recordatorios en la próxima vuelta."""
+        self._recalcular = True
+        if self._cambio:
+            self._cambio.set()
+
+    def despertar(self):
+        """Thread-safe: lo llaman los signals desde cualquier hilo del proceso."""
+        loop = self._loop
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(self._cambio.set)
+
+    def _avisar(self, usuario_ids):
+        for usuario_id in usuario_ids:
+            for evento in self._conexiones.get(usuario_id, ()):
+                evento.set()
+
+    async def _bucle(self):
+        vista, revisado, proximos = None, time.monotonic(), {}
+        while self._conexiones:
+            actual = await sync_to_async(version)()
+            vencio_revision = time.monotonic() - revisado >= _revision()
+            if vista is not None and (actual != vista or vencio_revision):
+                # Cambió algo (acá o en otro proceso): que cada conexión revise
+                self._avisar(list(self._conexiones))
+                self._recalcular = True
+            if self._recalcular or vencio_revision:
+                vista, revisado, self._recalcular = actual, time.monotonic(), False
+                proximos = await sync_to_async(_proximos)(list(self._conexiones))
+
+            ahora = timezone.now()
+            vencidos = [u for u, fecha in proximos.items() if fecha <= ahora]
+            if vencidos:
+                self._avisar(vencidos)
+                for u in vencidos:
+                    proximos.pop(u)  # la conexión lo entrega y pide recalcular
+
+            espera = PASO
+            if proximos:
+                espera = min(espera, max((min(proximos.values()) - ahora).total_seconds(), 0))
+            try:
+                await asyncio.wait_for(self._cambio.wait(), espera)
+            except asyncio.TimeoutError:
+                pass
+            self._cambio.clear()
+
+
+PLANIFICADOR = Planificador()
+
+
+def evento_sse(datos):
+    return f"id: {datos['cursor']}\nevent: avisos\ndata: {json.dumps(datos)}\n\n"
+
+
+async def flujo(usuario, cursor=0):
+    """Generador SSE de un usuario: un evento al conectar y uno por novedad."""
+    evento = PLANIFICADOR.suscribir(usuario.pk)
+    try:
+        yield "retry: 5000\n\n"
+        datos = await sync_to_async(entregar)(usuario, cursor)
+        cursor = datos["cursor"]
+        yield evento_sse(datos)
+        while True:
+            try:
+                await asyncio.wait_for(evento.wait(), latido())
+            except asyncio.TimeoutError:
+                yield ": latido\n\n"  # mantiene viva la conexión (proxies)
+                continue
+            evento.clear()
+            datos = await sync_to_async(entregar)(usuario, cursor)
+            if datos["recordatorios"]:
+                PLANIFICADOR.recalcular()
+            if datos["recordatorios"] or datos["cursor"] != cursor:
+                cursor = datos["cursor"]
+                yield evento_sse(datos)
+    finally:
+        PLANIFICADOR.desuscribir(usuario.pk, evento)
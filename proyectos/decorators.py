@@ -1,25 +1,43 @@
 from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
 from django.conf import settings
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
 
+def _es_principal(user):
+    return user.is_authenticated and user.username == getattr(settings, 'USUARIO_PRINCIPAL', None)
+
+
+def _sin_permiso(request):
+    messages.error(
+        request,
+        'No tenés permiso para acceder a este módulo.',
+    )
+    return redirect('inicio')
+
+
 def solo_usuario_principal(view_func):
     """
     Restringe el acceso a la vista al usuario principal definido en
     settings.USUARIO_PRINCIPAL. Cualquier otro usuario es redirigido
-    al inicio con un mensaje de error.
+    al inicio con un mensaje de error. Sirve también para vistas async
+    (el stream de avisos).
     """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async(request, *args, **kwargs):
+            if not _es_principal(await request.auser()):
+                return _sin_permiso(request)
+            return await view_func(request, *args, **kwargs)
+        return login_required(_wrapped_async, login_url='ingreso')
+
     @wraps(view_func)
     @login_required(login_url='ingreso')
     def _wrapped(request, *args, **kwargs):
-        usuario_principal = getattr(settings, 'USUARIO_PRINCIPAL', None)
-        if not request.user.is_authenticated or request.user.username != usuario_principal:
-            messages.error(
-                request,
-                'No tenés permiso para acceder a este módulo.',
-            )
-            return redirect('inicio')
+        if not _es_principal(request.user):
+            return _sin_permiso(request)
         return view_func(request, *args, **kwargs)
     return _wrapped
@@ -0,0 +1,23 @@
+"""
+Avisa a las conexiones en vivo (ver `proyectos.avisos`) cuando cambian
+los recordatorios o llega una notificación del CRM.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from . import avisos
+
+
+def conectar_signals():
+    from crm.models import NotificacionCRM
+
+    from .models import Recordatorio
+
+    post_save.connect(
+        avisos.cambio, sender=Recordatorio, weak=False, dispatch_uid="avisos_recordatorio_save",
+    )
+    post_delete.connect(
+        avisos.cambio, sender=Recordatorio, weak=False, dispatch_uid="avisos_recordatorio_delete",
+    )
+    post_save.connect(
+        avisos.cambio, sender=NotificacionCRM, weak=False, dispatch_uid="avisos_crm_save",
+    )
@@ -0,0 +1,128 @@
+"""
+Tests de los avisos en vivo: cada recordatorio vencido se entrega una sola
+vez, la consulta a pedido responde enseguida mirando solo el cache y el
+stream SSE manda el primer evento al conectar (y responde 204 bajo WSGI).
+"""
+import asyncio
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from crm.models import NotificacionCRM, Prospecto
+
+from . import avisos
+from .models import Recordatorio
+
+
+def _solo_cache(ctx):
+    """True si todas las queries capturadas fueron al cache compartido."""
+    return all(
+        "cache_compartido" in q["sql"] or q["sql"].startswith(("SAVEPOINT", "RELEASE", "ROLLBACK"))
+        for q in ctx.captured_queries
+    )
+
+
+class AvisosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser("Vamichetti", "a@a.com", "x")
+        self.client.force_login(self.user)
+        ahora = timezone.now()
+        self.vencido = Recordatorio.objects.create(
+            usuario=self.user, titulo="Llamar al gestor", fecha_hora=ahora - timedelta(minutes=1),
+        )
+        Recordatorio.objects.create(
+            usuario=self.user, titulo="Más tarde", fecha_hora=ahora + timedelta(hours=1),
+        )
+
+    def test_entregar_una_sola_vez(self):
+        prospecto = Prospecto.objects.create(nombre_completo="Juan Pérez")
+        nota = NotificacionCRM.objects.create(prospecto=prospecto, mensaje="Entró un Gol")
+
+        datos = avisos.entregar(self.user)
+        self.assertEqual([r["titulo"] for r in datos["recordatorios"]], ["Llamar al gestor"])
+        self.assertEqual([n["id"] for n in datos["crm"]], [nota.pk])
+        self.assertEqual(datos["cursor"], nota.pk)
+        self.vencido.refresh_from_db()
+        self.assertTrue(self.vencido.notificado)
+
+        otra = avisos.entregar(self.user, datos["cursor"])
+        self.assertEqual((otra["recordatorios"], otra["crm"]), ([], []))
+        self.assertEqual(otra["crm_no_leidas"], 1)
+
+    def test_recordatorios_pendientes_conserva_el_formato(self):
+        r = self.client.get(reverse("proyectos:api_recordatorios_pendientes"), secure=True)
+        self.assertEqual(r.json()["count"], 1)
+        r = self.client.get(reverse("proyectos:api_recordatorios_pendientes"), secure=True)
+        self.assertEqual(r.json(), {"count": 0, "recordatorios": []})
+
+    def test_consulta_a_pedido(self):
+        url = reverse("proyectos:avisos")
+        datos = self.client.get(url, secure=True).json()
+        self.assertEqual(len(datos["recordatorios"]), 1)
+
+        # Sin cambios: mira solo el cache y responde enseguida "sin_cambios"
+        self.assertFalse(avisos.hay_novedades(self.user.pk, datos["version"], datos["revisado"]))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertFalse(avisos.hay_novedades(self.user.pk, datos["version"], datos["revisado"]))
+        self.assertTrue(_solo_cache(ctx))
+        sin_cambios = self.client.get(url, {
+            "v": datos["version"], "cursor": datos["cursor"], "revisado": datos["revisado"],
+        }, secure=True).json()
+        self.assertTrue(sin_cambios["sin_cambios"])
+
+        # Un recordatorio nuevo sube la versión y sale en la próxima consulta
+        Recordatorio.objects.create(
+            usuario=self.user, titulo="Ya", fecha_hora=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertTrue(avisos.hay_novedades(self.user.pk, datos["version"], datos["revisado"]))
+        nuevos = self.client.get(url, {
+            "v": datos["version"], "cursor": datos["cursor"], "revisado": datos["revisado"],
+        }, secure=True).json()
+        self.assertEqual([r["titulo"] for r in nuevos["recordatorios"]], ["Ya"])
+
+    def test_stream_bajo_wsgi_responde_204(self):
+        r = self.client.get(reverse("proyectos:avisos_stream"), secure=True)
+        self.assertEqual(r.status_code, 204)
+
+    def test_solo_el_usuario_principal(self):
+        self.assertContains(self.client.get(reverse("inicio"), secure=True), "avisosToasts")
+        self.client.force_login(User.objects.create_user("vendedor", "v@a.com", "x"))
+        for nombre in ("proyectos:avisos", "proyectos:avisos_stream", "proyectos:api_recordatorios_pendientes"):
+            r = self.client.get(reverse(nombre), secure=True)
+            self.assertRedirects(r, reverse("inicio"), fetch_redirect_response=False)
+        self.vencido.refresh_from_db()
+        self.assertFalse(self.vencido.notificado)
+        self.assertNotContains(self.client.get(reverse("inicio"), secure=True), "avisosToasts")
+
+
+class AvisosStreamTests(TransactionTestCase):
+    def test_primer_evento_al_conectar(self):
+        cache.clear()
+        user = User.objects.create_superuser("Vamichetti", "a@a.com", "x")
+        Recordatorio.objects.create(
+            usuario=user, titulo="Vencido", fecha_hora=timezone.now() - timedelta(minutes=5),
+        )
+
+        async def leer():
+            client = AsyncClient()
+            await client.aforce_login(user)
+            r = await client.get(reverse("proyectos:avisos_stream"), secure=True)
+            self.assertEqual(r["Content-Type"], "text/event-stream")
+            partes = aiter(r.streaming_content)
+            self.assertEqual(await anext(partes), b"retry: 5000\n\n")
+            evento = (await anext(partes)).decode()
+            await partes.aclose()
+            return evento
+
+        evento = asyncio.run(leer())
+        datos = json.loads(evento.split("data: ", 1)[1])
+        self.assertEqual([r["titulo"] for r in datos["recordatorios"]], ["Vencido"])
+        self.assertTrue(Recordatorio.objects.get().notificado)
@@ -41,4 +41,6 @@ urlpatterns = [
 
     # API
     path('api/recordatorios-pendientes/', views.api_recordatorios_pendientes, name='api_recordatorios_pendientes'),
+    path('api/avisos/', views.api_avisos, name='avisos'),
+    path('api/avisos/stream/', views.avisos_stream, name='avisos_stream'),
 ]
@@ -3,11 +3,13 @@ from datetime import timedelta, datetime
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.db.models import Q
 
+from . import avisos
 from .models import Proyecto, Tarea, Recordatorio, TareaDiaria
 from .forms import ProyectoForm, TareaForm, RecordatorioForm
 from .decorators import solo_usuario_principal
@@ -398,27 +400,58 @@ def recordatorio_eliminar(request, pk):
 def api_recordatorios_pendientes(request):
     """
     Devuelve los recordatorios cuya fecha_hora <= ahora y que aún no
-    fueron marcados como notificados. Usado para badge/aviso en el navbar.
+    fueron notificados, y los marca notificados (se entregan una vez).
     """
-    ahora = timezone.now()
-    pendientes = (
-        Recordatorio.objects
-        .filter(
-            usuario=request.user,
-            notificado=False,
-            fecha_hora__lte=ahora,
-        )
-        .select_related('tarea')
-    )
-    data = [{
-        'id': r.pk,
-        'titulo': r.titulo,
-        'fecha_hora': r.fecha_hora.isoformat(),
-        'tarea': r.tarea.titulo if r.tarea else None,
-    } for r in pendientes]
+    data = avisos.entregar(request.user, crm=False)['recordatorios']
     return JsonResponse({'count': len(data), 'recordatorios': data})
 
 
+# ==========================================================
+# AVISOS EN VIVO (recordatorios + CRM) — ver proyectos.avisos
+# ==========================================================
+def _entero(valor, defecto=0):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return defecto
+
+
+@solo_usuario_principal
+async def avisos_stream(request):
+    """
+    Server-sent events con los avisos del usuario. Solo bajo ASGI: en WSGI
+    responde 204 (el navegador deja de reintentar y pasa a `api_avisos`).
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    usuario = await request.auser()
+    cursor = _entero(request.headers.get('Last-Event-ID') or request.GET.get('cursor'))
+    respuesta = StreamingHttpResponse(
+        avisos.flujo(usuario, cursor), content_type='text/event-stream',
+    )
+    respuesta['Cache-Control'] = 'no-cache'
+    respuesta['X-Accel-Buffering'] = 'no'
+    return respuesta
+
+
+@solo_usuario_principal
+def api_avisos(request):
+    """
+    Avisos a pedido para WSGI (el navegador llama al cargar la página y al
+    volver a la pestaña). Responde enseguida: sin novedades mira solo el
+    cache y contesta "sin_cambios".
+    """
+    version = _entero(request.GET.get('v'))
+    cursor = _entero(request.GET.get('cursor'))
+    try:
+        revisado = float(request.GET.get('revisado') or 0)
+    except ValueError:
+        revisado = 0.0
+    if version and not avisos.hay_novedades(request.user.pk, version, revisado):
+        return JsonResponse({'sin_cambios': True, 'version': version, 'cursor': cursor, 'revisado': revisado})
+    return JsonResponse(avisos.entregar(request.user, cursor))
+
+
 # ==========================================================
 # AGENDA DIARIA — to-do simple por día
 # ==========================================================
@@ -0,0 +1,154 @@
+"""
+Mide cuánto tardan los PDFs de la casa sobre datos sintéticos, para tener
+una línea de base y detectar regresiones.
+
+Uso:
+    python manage.py benchmark_pdfs                        # todos, 50 filas, 5 repeticiones
+    python manage.py benchmark_pdfs --filas 500 --repeticiones 10
+    python manage.py benchmark_pdfs --solo recibo catalogo
+
+Los datos se crean dentro de una transacción que se deshace al terminar
+(no queda nada en la base). Cada caso se corre una vez para calentar
+caches y después se toman --repeticiones mediciones: mínimo, mediana,
+queries y tamaño del PDF.
+"""
+import statistics
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+
+class _Deshacer(Exception):
+    pass
+
+
+def _datos(filas):
+    """Crea lo mínimo para cada PDF y devuelve un dict con los objetos."""
+    from boletos import lotes
+    from boletos.models import Reserva
+    from clientes.models import Cliente
+    from cuentas.models import CuentaCorriente, Pago
+    from facturacion.models import FacturaRegistrada
+    from vehiculos.models import FichaVehicular, Vehiculo
+
+    hoy = date.today()
+    usuario = User.objects.create_superuser("benchmark_pdfs", "bench@example.com", None)
+    cliente = Cliente.objects.create(
+        nombre_completo="Cliente de prueba", dni_cuit="20111222333", direccion="Larrea 255",
+    )
+    cuenta = CuentaCorriente.objects.create(cliente=cliente)
+    pago = Pago.objects.create(cuenta=cuenta, forma_pago="efectivo", monto_total=Decimal("150000"))
+    vehiculos = [
+        Vehiculo.objects.create(
+            marca="Marca", modelo=f"Modelo {i}", dominio=f"BM{i:04d}",
+            anio=2020, precio=Decimal("1000000"), estado="stock",
+        )
+        for i in range(filas)
+    ]
+    FichaVehicular.objects.get_or_create(vehiculo=vehiculos[0])
+    FacturaRegistrada.objects.bulk_create([
+        FacturaRegistrada(
+            numero=f"0001-{i:08d}", fecha=hoy, descripcion="Servicio",
+            monto_neto=Decimal("1000"), monto_iva=Decimal("210"), monto=Decimal("1210"),
+        )
+        for i in range(filas)
+    ])
+    reserva = Reserva.objects.create(
+        apellido_nombre="Cliente de prueba", dni="11222333", domicilio="Larrea 255",
+        telefono="2475000000", marca="Marca", modelo="Modelo con nombre bastante largo",
+        precio_vehiculo=Decimal("1000000"), total_a_pagar=Decimal("1000000"),
+    )
+    lote = lotes.crear_lote(
+        cliente, [(Decimal("10000"), hoy)] * filas, "AMICHETTI", "Rojas", hoy,
+    )
+    return {
+        "usuario": usuario, "pago": pago, "vehiculo": vehiculos[0], "reserva": reserva,
+        "pagares": list(lote.pagares.select_related("cliente").order_by("numero")),
+        "filas": filas, "hoy": hoy,
+    }
+
+
+def _casos():
+    """nombre -> callable(datos, request) que devuelve los bytes del PDF."""
+    from boletos import pagares_pdf
+    from boletos import views as boletos_views
+    from community import views as community_views
+    from cuentas import recibos
+    from facturacion import views as facturacion_views
+    from reportes.pdf_utils import render_pdf_listado
+    from vehiculos import views as vehiculos_views
+
+    def listado(d, req):
+        filas = ([f"Fila {i}", "Detalle", f"$ {i * 1000:,}"] for i in range(d["filas"]))
+        return render_pdf_listado(
+            filename="benchmark.pdf", titulo="Listado", columnas=["Concepto", "Detalle", "Monto"],
+            filas=filas, totales=["", "TOTAL", "$ 0"], pie=lambda n: f"{n} filas",
+        ).content
+
+    return {
+        # el generador, no el endpoint: el endpoint sirve el recibo guardado
+        "recibo": lambda d, req: recibos.generar_pdf(recibos.datos_recibo(d["pago"], d["pago"].cuenta)),
+        "ficha_vehicular": lambda d, req: vehiculos_views.ficha_vehicular_pdf(req, d["vehiculo"].pk).content,
+        "reserva": lambda d, req: boletos_views.reserva_pdf(req, d["reserva"].pk).content,
+        "lote_pagares": lambda d, req: pagares_pdf.generar_lote(d["pagares"]),
+        "facturacion_mensual": lambda d, req: facturacion_views.exportar_pdf_mensual(req).content,
+        "catalogo": lambda d, req: community_views.catalogo_pdf(req).content,
+        "listado": listado,
+    }
+
+
+class Command(BaseCommand):
+    help = "Mide los generadores de PDF sobre datos sintéticos (no deja datos en la base)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=50, help="Vehículos / facturas / pagarés / filas (50)")
+        parser.add_argument("--repeticiones", type=int, default=5, help="Mediciones por caso (5)")
+        parser.add_argument("--solo", nargs="+", metavar="CASO", help="Correr solo estos casos")
+
+    def handle(self, *args, **opts):
+        casos = _casos()
+        elegidos = opts["solo"] or list(casos)
+        desconocidos = sorted(set(elegidos) - set(casos))
+        if desconocidos:
+            raise CommandError(f"Casos desconocidos: {', '.join(desconocidos)}. Opciones: {', '.join(casos)}")
+        if opts["filas"] < 1 or opts["repeticiones"] < 1:
+            raise CommandError("--filas y --repeticiones tienen que ser mayores a 0")
+
+        self._resultados = []
+        try:
+            with transaction.atomic():
+                datos = _datos(opts["filas"])
+                for nombre in elegidos:
+                    self._medir(nombre, casos[nombre], datos, opts["repeticiones"])
+                raise _Deshacer
+        except _Deshacer:
+            pass
+
+        self.stdout.write(f"{'PDF':<22}{'mín ms':>10}{'mediana ms':>12}{'queries':>9}{'KB':>9}")
+        for nombre, minimo, mediana, queries, kb in self._resultados:
+            self.stdout.write(f"{nombre:<22}{minimo:>10.1f}{mediana:>12.1f}{queries:>9}{kb:>9.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(self._resultados)} PDF(s) · {opts['filas']} filas · {opts['repeticiones']} repeticiones"
+        ))
+
+    def _medir(self, nombre, caso, datos, repeticiones):
+        hoy = datos["hoy"]
+        request = RequestFactory().get("/", {"mes": hoy.month, "anio": hoy.year})
+        request.user = datos["usuario"]
+
+        caso(datos, request)  # calienta caches de estilos / fuentes
+        tiempos = []
+        for _ in range(repeticiones):
+            with CaptureQueriesContext(connection) as ctx:
+                inicio = time.perf_counter()
+                contenido = caso(datos, request)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        self._resultados.append((
+            nombre, min(tiempos), statistics.median(tiempos), len(ctx.captured_queries), len(contenido) / 1024,
+        ))
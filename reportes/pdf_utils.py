@@ -2,104 +2,227 @@
 Helpers para generar PDFs simples de listados/resúmenes mensuales.
 Se importan desde otros módulos (cuentas_internas, gastos_personales,
 cheques, reportes mismo) para no duplicar el setup de ReportLab.
+
+También es el kit compartido del resto de los PDFs (recibos, fichas,
+reservas, facturación, catálogo): estilos, TableStyles, logo y medidas de
+texto se arman una vez por proceso y se reutilizan en cada documento.
+Los objetos que devuelve son compartidos: no modificarlos (para una
+variante, pedir otro `estilo(...)` con `parent=`).
 """
 
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
 from django.http import HttpResponse
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer,
+    SimpleDocTemplate, Paragraph, LongTable, Table, TableStyle, Spacer,
 )
 
 
 COLOR_AZUL = colors.HexColor("#002855")
 COLOR_GRIS = colors.HexColor("#f1f5f9")
+COLOR_NARANJA = colors.HexColor("#FF6C1A")
 
+LOGO = "img/logo_amichetti.png"
+
+
+# ----------------------------------------------------------
+# Estilos y recursos compartidos
+# ----------------------------------------------------------
+@lru_cache(maxsize=1)
+def hoja_base():
+    """getSampleStyleSheet() una sola vez (no hacerle `.add`: es compartida)."""
+    return getSampleStyleSheet()
 
-def render_pdf_listado(
-    *,
-    filename: str,
-    titulo: str,
-    subtitulo: str = "",
-    columnas: list,
-    filas: list,
-    totales: list = None,
-    pie: str = "",
-) -> HttpResponse:
-    """
-    Arma un PDF tipo 'listado mensual' con un encabezado, una tabla
-    de filas, opcionalmente una fila de totales y un pie.
 
-    columnas : list[str]                    — encabezados
-    filas    : list[list[str/number]]       — datos
-    totales  : list[str] | None             — fila final destacada
+@lru_cache(maxsize=None)
+def estilo(nombre, **atributos):
     """
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    ParagraphStyle memoizado por sus atributos: el mismo
+    `estilo("h", fontSize=9, textColor=colors.white)` devuelve siempre el
+    mismo objeto, así los PDFs no arman decenas de estilos por request.
+    """
+    return ParagraphStyle(nombre, **atributos)
 
-    doc = SimpleDocTemplate(
-        response, pagesize=A4,
-        rightMargin=24, leftMargin=24,
-        topMargin=28, bottomMargin=28,
-    )
 
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "title", fontSize=16, textColor=COLOR_AZUL,
-        alignment=1, fontName="Helvetica-Bold", spaceAfter=4,
-    )
-    subtitle_style = ParagraphStyle(
-        "subtitle", fontSize=11, alignment=1, spaceAfter=14,
-    )
-    pie_style = ParagraphStyle(
-        "pie", fontSize=9, alignment=1, spaceBefore=12, textColor=colors.grey,
+@lru_cache(maxsize=1)
+def estilos():
+    """Estilos con nombre que repiten los PDFs de la casa."""
+    return {
+        "normal": hoja_base()["Normal"],
+        "encabezado": estilo("h1", fontSize=14, textColor=colors.white),
+        "encabezado_der": estilo("h2", fontSize=10, textColor=colors.white, alignment=2),
+        "pie_empresa": estilo("f", fontSize=8, textColor=colors.grey, alignment=1),
+    }
+
+
+ESTILO_ENCABEZADO = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), COLOR_AZUL),
+    ("PADDING", (0, 0), (-1, -1), 14),
+])
+
+
+def encabezado(izquierda, derecha, anchos=(340, 180)):
+    """Banda azul con el título a la izquierda y la fecha a la derecha."""
+    est = estilos()
+    tabla = Table(
+        [[Paragraph(izquierda, est["encabezado"]), Paragraph(derecha, est["encabezado_der"])]],
+        colWidths=list(anchos),
     )
+    tabla.setStyle(ESTILO_ENCABEZADO)
+    return tabla
 
-    elements = [
-        Paragraph("AMICHETTI AUTOMOTORES", title_style),
-        Paragraph(titulo, title_style),
-    ]
-    if subtitulo:
-        elements.append(Paragraph(subtitulo, subtitle_style))
-    else:
-        elements.append(Spacer(1, 8))
 
-    ncols = len(columnas) or 1
+def pie_empresa(texto="Amichetti Automotores · Rojas, Buenos Aires"):
+    return Paragraph(texto, estilos()["pie_empresa"])
 
-    # Estilos de celda. Usamos Paragraph para que el texto AJUSTE (wrap)
-    # dentro de su columna y nunca se encime con la de al lado.
-    head_sty = ParagraphStyle("h", fontName="Helvetica-Bold", fontSize=10,
-                              leading=12.5, textColor=colors.white)
-    head_sty_r = ParagraphStyle("hr", parent=head_sty, alignment=2)
-    cell_sty = ParagraphStyle("c", fontName="Helvetica", fontSize=9.5, leading=12)
-    cell_sty_r = ParagraphStyle("cr", parent=cell_sty, alignment=2)
-    tot_sty = ParagraphStyle("t", fontName="Helvetica-Bold", fontSize=10.5, leading=13)
-    tot_sty_r = ParagraphStyle("tr", parent=tot_sty, alignment=2)
 
-    def fila_par(valores, sty_norm, sty_right):
-        out = []
-        for i, val in enumerate(valores):
-            out.append(Paragraph(str(val), sty_right if i == ncols - 1 else sty_norm))
-        return out
+@lru_cache(maxsize=1)
+def logo():
+    """ImageReader del logo, leído y decodificado una vez (None si no está)."""
+    from django.contrib.staticfiles import finders
+    from reportlab.lib.utils import ImageReader
 
-    data = [fila_par(columnas, head_sty, head_sty_r)]
-    for f in filas:
-        data.append(fila_par(f, cell_sty, cell_sty_r))
-    if totales:
-        data.append(fila_par(totales, tot_sty, tot_sty_r))
+    ruta = finders.find(LOGO)
+    return ImageReader(ruta) if ruta else None
 
-    # Anchos proporcionales: la primera columna un poco más ancha (etiquetas),
-    # el resto reparte parejo. Como el texto ajusta, no se desborda.
-    total_w = A4[0] - 48
-    if ncols == 1:
-        col_widths = [total_w]
-    else:
-        weights = [2.0] + [1.0] * (ncols - 1)
-        sw = sum(weights)
-        col_widths = [total_w * w / sw for w in weights]
 
-    tbl = Table(data, colWidths=col_widths, repeatRows=1)
+# Fotos remotas: se guardan achicadas (el catálogo las dibuja a ~10 cm) en
+# un LRU por proceso acotado por bytes, no por cantidad.
+LADO_MAX_FOTO = 700         # px; sobra para 10 cm a ~170 dpi
+CALIDAD_FOTO = 80
+
+_imagenes = OrderedDict()   # url -> bytes JPEG
+_imagenes_bytes = 0
+_imagenes_lock = threading.Lock()
+
+
+def _tope_imagenes():
+    return getattr(settings, "PDF_IMAGENES_CACHE_BYTES", 8 * 1024 * 1024)
+
+
+def _achicar(datos):
+    """JPEG de lado a lo sumo LADO_MAX_FOTO (respeta la orientación EXIF)."""
+    from PIL import Image as PILImage, ImageOps
+
+    img = ImageOps.exif_transpose(PILImage.open(BytesIO(datos)))
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.thumbnail((LADO_MAX_FOTO, LADO_MAX_FOTO), PILImage.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=CALIDAD_FOTO, optimize=True)
+    return buffer.getvalue()
+
+
+def imagen_remota(url):
+    """
+    Bytes JPEG achicados de una imagen remota (fotos del catálogo). Las URLs
+    de Cloudinary cambian con cada subida, así que se pueden cachear por
+    URL; el cache se acota a `PDF_IMAGENES_CACHE_BYTES` sacando las menos
+    usadas. Los errores no se cachean y se reintentan en el próximo PDF.
+    """
+    global _imagenes_bytes
+    import urllib.request
+
+    with _imagenes_lock:
+        if url in _imagenes:
+            _imagenes.move_to_end(url)
+            return _imagenes[url]
+
+    with urllib.request.urlopen(url, timeout=10) as respuesta:
+        datos = _achicar(respuesta.read())
+
+    tope = _tope_imagenes()
+    with _imagenes_lock:
+        if url not in _imagenes and len(datos) <= tope:
+            _imagenes[url] = datos
+            _imagenes_bytes += len(datos)
+            while _imagenes_bytes > tope:
+                _, viejo = _imagenes.popitem(last=False)
+                _imagenes_bytes -= len(viejo)
+    return datos
+
+
+def olvidar_imagenes():
+    """Vacía el cache de fotos remotas (tests)."""
+    global _imagenes_bytes
+    with _imagenes_lock:
+        _imagenes.clear()
+        _imagenes_bytes = 0
+
+
+# ----------------------------------------------------------
+# Medidas de texto (canvas)
+# ----------------------------------------------------------
+@lru_cache(maxsize=512)
+def partir_lineas(texto, fuente, tamanio, ancho):
+    """Parte `texto` en líneas más angostas que `ancho` (por palabras)."""
+    lineas, actual = [], ""
+    for palabra in texto.split():
+        prueba = actual + " " + palabra if actual else palabra
+        if stringWidth(prueba, fuente, tamanio) < ancho:
+            actual = prueba
+        else:
+            lineas.append(actual)
+            actual = palabra
+    if actual:
+        lineas.append(actual)
+    return tuple(lineas)
+
+
+def recortar(texto, fuente, tamanio, ancho):
+    """El prefijo más largo de `texto` que entra en `ancho` (búsqueda binaria)."""
+    if stringWidth(texto, fuente, tamanio) <= ancho:
+        return texto
+    bajo, alto = 0, len(texto) - 1
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if stringWidth(texto[:medio], fuente, tamanio) <= ancho:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return texto[:bajo]
+
+# Filas por tabla: los listados largos se arman en varias LongTable (cada
+# una con su encabezado) para que el layout no procese miles de filas de
+# una vez. Par, así el zebra de ROWBACKGROUNDS sigue igual entre tablas.
+FILAS_POR_TABLA = 300
+
+
+@lru_cache(maxsize=1)
+def estilos_listado():
+    """ParagraphStyles de los listados, creados una vez por proceso."""
+    head = ParagraphStyle("h", fontName="Helvetica-Bold", fontSize=10,
+                          leading=12.5, textColor=colors.white)
+    cell = ParagraphStyle("c", fontName="Helvetica", fontSize=9.5, leading=12)
+    tot = ParagraphStyle("t", fontName="Helvetica-Bold", fontSize=10.5, leading=13)
+    return {
+        "title": ParagraphStyle(
+            "title", fontSize=16, textColor=COLOR_AZUL,
+            alignment=1, fontName="Helvetica-Bold", spaceAfter=4,
+        ),
+        "subtitle": ParagraphStyle("subtitle", fontSize=11, alignment=1, spaceAfter=14),
+        "pie": ParagraphStyle(
+            "pie", fontSize=9, alignment=1, spaceBefore=12, textColor=colors.grey,
+        ),
+        "head": head,
+        "head_r": ParagraphStyle("hr", parent=head, alignment=2),
+        "cell": cell,
+        "cell_r": ParagraphStyle("cr", parent=cell, alignment=2),
+        "tot": tot,
+        "tot_r": ParagraphStyle("tr", parent=tot, alignment=2),
+    }
+
+
+@lru_cache(maxsize=2)
+def _estilo_tabla(con_totales):
     style = [
         ("BACKGROUND", (0, 0), (-1, 0), COLOR_AZUL),
         ("VALIGN",     (0, 0), (-1, -1), "MIDDLE"),
@@ -111,16 +234,112 @@ def render_pdf_listado(
         ("LEFTPADDING",   (0, 0), (-1, -1), 12),
         ("RIGHTPADDING",  (0, 0), (-1, -1), 12),
     ]
-    if totales:
+    if con_totales:
         style += [
             ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#fef3c7")),
             ("LINEABOVE",  (0, -1), (-1, -1), 0.8, COLOR_AZUL),
         ]
-    tbl.setStyle(TableStyle(style))
-    elements.append(tbl)
+    return TableStyle(style)
+
+
+def tablas_listado(columnas, filas, totales=None, anchos=None,
+                   ancho_total=A4[0] - 48, filas_por_tabla=FILAS_POR_TABLA):
+    """
+    Arma las LongTable de un listado consumiendo `filas` de a una (sirve un
+    generador sobre `.values().iterator()`: nunca se materializa el
+    queryset entero). Devuelve (tablas, cantidad de filas).
+
+    anchos : pesos relativos de cada columna; por defecto la primera
+             columna un poco más ancha (etiquetas) y el resto parejo.
+    """
+    est = estilos_listado()
+    ncols = len(columnas) or 1
+
+    # Usamos Paragraph para que el texto AJUSTE (wrap) dentro de su columna
+    # y nunca se encime con la de al lado. La última columna va a la derecha.
+    def fila_par(valores, sty_norm, sty_right):
+        return [
+            Paragraph(str(val), sty_right if i == ncols - 1 else sty_norm)
+            for i, val in enumerate(valores)
+        ]
+
+    if anchos is None:
+        anchos = [2.0] + [1.0] * (ncols - 1) if ncols > 1 else [1.0]
+    col_widths = [ancho_total * w / sum(anchos) for w in anchos]
+
+    tablas = []
+    bloque = []
+    n = 0
+
+    def cerrar(con_totales=False):
+        encabezado = fila_par(columnas, est["head"], est["head_r"])
+        tbl = LongTable([encabezado] + bloque, colWidths=col_widths, repeatRows=1)
+        tbl.setStyle(_estilo_tabla(con_totales))
+        tablas.append(tbl)
+
+    for f in filas:
+        bloque.append(fila_par(f, est["cell"], est["cell_r"]))
+        n += 1
+        if len(bloque) >= filas_por_tabla:
+            cerrar()
+            bloque = []
+    if totales:
+        bloque.append(fila_par(totales, est["tot"], est["tot_r"]))
+    if bloque or not tablas:
+        cerrar(con_totales=bool(totales))
+    return tablas, n
+
+
+def render_pdf_listado(
+    *,
+    filename: str,
+    titulo: str,
+    subtitulo="",
+    columnas: list,
+    filas,
+    totales: list = None,
+    pie="",
+    anchos: list = None,
+) -> HttpResponse:
+    """
+    Arma un PDF tipo 'listado mensual' con un encabezado, una tabla
+    de filas, opcionalmente una fila de totales y un pie.
+
+    columnas  : list[str]                    — encabezados
+    filas     : iterable[list[str/number]]   — datos (lista o generador)
+    totales   : list[str] | None             — fila final destacada
+    subtitulo / pie : str, o callable(cantidad_de_filas) -> str cuando el
+                      texto depende de cuántas filas salieron (útil con
+                      generadores, que no tienen len()).
+    """
+    response = HttpResponse(content_type="application/pdf")
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+
+    doc = SimpleDocTemplate(
+        response, pagesize=A4,
+        rightMargin=24, leftMargin=24,
+        topMargin=28, bottomMargin=28,
+    )
+    est = estilos_listado()
+
+    tablas, n = tablas_listado(columnas, filas, totales, anchos, ancho_total=doc.width)
+    if callable(subtitulo):
+        subtitulo = subtitulo(n)
+    if callable(pie):
+        pie = pie(n)
+
+    elements = [
+        Paragraph("AMICHETTI AUTOMOTORES", est["title"]),
+        Paragraph(titulo, est["title"]),
+    ]
+    if subtitulo:
+        elements.append(Paragraph(subtitulo, est["subtitle"]))
+    else:
+        elements.append(Spacer(1, 8))
+    elements += tablas
 
     if pie:
-        elements.append(Paragraph(pie, pie_style))
+        elements.append(Paragraph(pie, est["pie"]))
 
     doc.build(elements)
     return response
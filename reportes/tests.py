@@ -0,0 +1,63 @@
+"""
+Tests del kit compartido de PDFs (reportes.pdf_utils) y del comando que
+mide los generadores.
+"""
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from vehiculos.models import Vehiculo
+
+from . import pdf_utils
+
+
+class KitPdfTests(TestCase):
+    def test_estilos_y_medidas_cacheados(self):
+        a = pdf_utils.estilo("h", fontSize=9, textColor=colors.white)
+        self.assertIs(a, pdf_utils.estilo("h", fontSize=9, textColor=colors.white))
+        self.assertIsNot(a, pdf_utils.estilo("h", fontSize=10, textColor=colors.white))
+        self.assertIs(pdf_utils.hoja_base(), pdf_utils.hoja_base())
+
+        texto = "Dominio AB123CD – Volkswagen Amarok Highline 4x4"
+        for ancho in (0, 20, 80, 150, 1000):
+            esperado = texto
+            while esperado and stringWidth(esperado, "Helvetica-Bold", 8) > ancho:
+                esperado = esperado[:-1]
+            self.assertEqual(pdf_utils.recortar(texto, "Helvetica-Bold", 8, ancho), esperado)
+
+        lineas = pdf_utils.partir_lineas("uno dos tres cuatro cinco seis", "Helvetica", 10, 60)
+        self.assertEqual(" ".join(lineas), "uno dos tres cuatro cinco seis")
+        self.assertTrue(all(stringWidth(l, "Helvetica", 10) < 60 for l in lineas))
+
+    def test_fotos_remotas_achicadas_y_cache_acotado(self):
+        buffer = BytesIO()
+        PILImage.new("RGB", (3000, 2000), "red").save(buffer, format="PNG")
+        respuesta = mock.MagicMock()
+        respuesta.__enter__.return_value.read.return_value = buffer.getvalue()
+        self.addCleanup(pdf_utils.olvidar_imagenes)
+
+        with mock.patch("urllib.request.urlopen", return_value=respuesta) as urlopen:
+            foto = pdf_utils.imagen_remota("https://x/1.jpg")
+            self.assertEqual(PILImage.open(BytesIO(foto)).size, (700, 467))
+            self.assertIs(pdf_utils.imagen_remota("https://x/1.jpg"), foto)
+            self.assertEqual(urlopen.call_count, 1)
+
+            with override_settings(PDF_IMAGENES_CACHE_BYTES=len(foto) * 2):
+                pdf_utils.imagen_remota("https://x/2.jpg")
+                pdf_utils.imagen_remota("https://x/3.jpg")  # saca la menos usada
+            self.assertEqual(list(pdf_utils._imagenes), ["https://x/2.jpg", "https://x/3.jpg"])
+            self.assertLessEqual(pdf_utils._imagenes_bytes, len(foto) * 2)
+
+    def test_benchmark_no_deja_datos(self):
+        vehiculos, usuarios = Vehiculo.objects.count(), User.objects.count()
+        salida = StringIO()
+        call_command("benchmark_pdfs", filas=2, repeticiones=1, stdout=salida)
+        self.assertIn("catalogo", salida.getvalue())
+        self.assertIn("7 PDF(s)", salida.getvalue())
+        self.assertEqual((Vehiculo.objects.count(), User.objects.count()), (vehiculos, usuarios))
@@ -137,7 +137,8 @@ def lista_reportes(request):
       2. Cumplimiento de pagos de clientes (cuotas pagadas vs totales)
       3. Deuda en concesionario (a proveedores + saldo a cobrar a clientes)
     """
-    from compraventa.models import CompraVentaOperacion, DeudaProveedor
+    from compraventa import saldos as saldos_proveedores
+    from compraventa.models import CompraVentaOperacion
     from cuentas.models import CuotaPlan, CuentaCorriente, PlanPago
     from vehiculos.models import FichaVehicular, GastoConcesionario
 
@@ -263,14 +264,12 @@ def lista_reportes(request):
     # 3) DEUDA EN CONCESIONARIO
     # ==========================================================
     # 3a) Deuda a proveedores (lo que nosotros debemos)
-    deudas_prov = DeudaProveedor.objects.annotate(
-        total_pagado=Sum("pagos__monto"),
-    )
+    deudas_prov = saldos_proveedores.con_saldos().filter(saldo_anotado__gt=0)
     deuda_proveedores = Decimal("0")
     detalle_proveedores = []
     for d in deudas_prov.select_related("proveedor", "vehiculo"):
-        pagado = d.total_pagado or Decimal("0")
-        saldo = (d.monto_total or Decimal("0")) - pagado
+        pagado = d.pagado_anotado
+        saldo = d.saldo_anotado
         if saldo > 0:
             deuda_proveedores += saldo
             detalle_proveedores.append({
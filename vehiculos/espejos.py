@@ -0,0 +1,206 @@
+"""
+Vínculos de espejo entre módulos (ver `VinculoEspejo`).
+
+Los sync de vehículos espejan registros en otros módulos (Control de
+Gastos, reportes internos, cuentas corrientes). Antes cada espejo se
+encontraba buscando un tag dentro del texto (`descripcion__contains`),
+un LIKE '%…%' sin índice. Ahora el origen guarda un vínculo por slot y
+se resuelve con lookups por índice:
+
+    espejos.vincular(gasto, "mensual", gasto_mensual)
+    espejos.resolver(gasto)            -> {"reporte": ..., "mensual": ...}
+    espejos.resolver_uno(gasto, "mensual")
+    espejos.desvincular(gasto)
+
+Los tags siguen escribiéndose en las descripciones (los usan las vistas
+para clasificar y `descripcion_limpia` para ocultarlos), pero ya no se
+usan para buscar. `migrar_tags` arma los vínculos de los registros
+existentes a partir de esos tags.
+"""
+import re
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+
+from .models import VinculoEspejo
+
+
+def _tipo(modelo_o_instancia):
+    # get_for_model cachea por proceso: no cuesta queries después de la primera
+    return ContentType.objects.get_for_model(modelo_o_instancia)
+
+
+def vinculos(origen, slots=None):
+    """QuerySet de vínculos del origen (opcionalmente solo de `slots`)."""
+    qs = VinculoEspejo.objects.filter(origen_tipo=_tipo(origen), origen_id=origen.pk)
+    if slots is not None:
+        qs = qs.filter(slot__in=list(slots))
+    return qs
+
+
+def resolver(origen, slots=None):
+    """
+    {slot: instancia espejada} del origen: 1 query de vínculos + 1
+    `in_bulk` por modelo destino. Los vínculos cuyo destino ya no existe
+    se omiten.
+    """
+    filas = list(vinculos(origen, slots).values_list("slot", "destino_tipo_id", "destino_id"))
+    ids_por_tipo = defaultdict(list)
+    for _, tipo_id, destino_id in filas:
+        ids_por_tipo[tipo_id].append(destino_id)
+    objetos = {}
+    for tipo_id, ids in ids_por_tipo.items():
+        modelo = ContentType.objects.get_for_id(tipo_id).model_class()
+        objetos[tipo_id] = modelo._default_manager.in_bulk(ids)
+    return {
+        slot: objetos[tipo_id][destino_id]
+        for slot, tipo_id, destino_id in filas
+        if destino_id in objetos[tipo_id]
+    }
+
+
+def resolver_uno(origen, slot):
+    """Instancia espejada del origen en `slot`, o None."""
+    return resolver(origen, [slot]).get(slot)
+
+
+def vincular(origen, slot, destino):
+    """Vincula (o re-vincula) el slot del origen al destino. 1 query (upsert)."""
+    vincular_lote([(origen, slot, destino)])
+
+
+def vincular_lote(trios):
+    """Upsert de varios vínculos [(origen, slot, destino), ...] en un INSERT."""
+    filas = [
+        VinculoEspejo(
+            origen_tipo=_tipo(origen), origen_id=origen.pk, slot=slot,
+            destino_tipo=_tipo(destino), destino_id=destino.pk,
+        )
+        for origen, slot, destino in trios
+    ]
+    if filas:
+        VinculoEspejo.objects.bulk_create(
+            filas,
+            update_conflicts=True,
+            unique_fields=["origen_tipo", "origen_id", "slot"],
+            update_fields=["destino_tipo", "destino_id"],
+        )
+
+
+def desvincular(origen, slots=None):
+    """Borra los vínculos del origen (no toca los registros espejados)."""
+    vinculos(origen, slots).delete()
+
+
+def desvincular_destino(destino):
+    """Borra los vínculos que apuntan a `destino` (cuando se elimina)."""
+    VinculoEspejo.objects.filter(destino_tipo=_tipo(destino), destino_id=destino.pk).delete()
+
+
+# ==========================================================
+# MIGRACIÓN DESDE LOS TAGS EN TEXTO
+# ==========================================================
+RE_GC = re.compile(r"\[GC#(\d+)\]")
+RE_GCF_MENSUAL = re.compile(r"\[GCF:(\w+)#(\d+)\]")
+RE_GCF_REPORTE = re.compile(r"\[GCF:(\w+)\]")
+RE_GI = re.compile(r"\[GI:(\d+)\]")
+
+
+def migrar_tags(apps):
+    """
+    Crea los vínculos de los espejos existentes leyendo sus tags:
+      - GastoMensual        [GC#id]          → GastoConcesionario "mensual"
+      - GastoMensual        [GCF:campo#pk]   → FichaVehicular "campo:mensual"
+      - GastoReporteInterno [GC#id]          → GastoConcesionario "reporte"
+      - GastoReporteInterno [GCF:campo]      → FichaVehicular "campo:reporte"
+      - MovimientoCuenta    [GI:pk]          → PagoGastoIngreso "mov_debe"/"mov_haber"
+    Recibe el registro de apps (sirve desde una migración o desde el
+    comando). Es idempotente: no pisa vínculos ya existentes y, si hay
+    varios registros con el mismo tag, vincula el de menor id.
+    Devuelve la cantidad de vínculos nuevos por tipo de tag.
+    """
+    ContentTypeH = apps.get_model("contenttypes", "ContentType")
+    Vinculo = apps.get_model("vehiculos", "VinculoEspejo")
+    GastoConcesionario = apps.get_model("vehiculos", "GastoConcesionario")
+    FichaVehicular = apps.get_model("vehiculos", "FichaVehicular")
+    PagoGastoIngreso = apps.get_model("vehiculos", "PagoGastoIngreso")
+    GastoMensual = apps.get_model("gastos_mensuales", "GastoMensual")
+    GastoReporteInterno = apps.get_model("reportes", "GastoReporteInterno")
+    MovimientoCuenta = apps.get_model("cuentas", "MovimientoCuenta")
+
+    def tipo(modelo):
+        ct, _ = ContentTypeH.objects.get_or_create(
+            app_label=modelo._meta.app_label, model=modelo._meta.model_name,
+        )
+        return ct.pk
+
+    t_gc, t_ficha, t_gi = tipo(GastoConcesionario), tipo(FichaVehicular), tipo(PagoGastoIngreso)
+    t_mensual, t_reporte, t_mov = tipo(GastoMensual), tipo(GastoReporteInterno), tipo(MovimientoCuenta)
+
+    gc_ids = set(GastoConcesionario.objects.values_list("id", flat=True))
+    fichas_ids = set(FichaVehicular.objects.values_list("id", flat=True))
+    ficha_por_vehiculo = dict(FichaVehicular.objects.values_list("vehiculo_id", "id"))
+    gi_ids = set(PagoGastoIngreso.objects.values_list("id", flat=True))
+
+    # Lo ya vinculado (de una corrida anterior o por los sync) no se toca
+    ya_origen = set(Vinculo.objects.values_list("origen_tipo_id", "origen_id", "slot"))
+    ya_destino = set(Vinculo.objects.values_list("destino_tipo_id", "destino_id"))
+
+    vinculos_ = {}  # (origen_tipo, origen_id, slot) -> (destino_tipo, destino_id)
+    contados = defaultdict(int)
+
+    def agregar(clave, destino, etiqueta):
+        if clave in vinculos_ or clave in ya_origen or destino in ya_destino:
+            return
+        vinculos_[clave] = destino
+        ya_destino.add(destino)
+        contados[etiqueta] += 1
+
+    for pk, texto in (
+        GastoMensual.objects.filter(descripcion__contains="[GC").order_by("id")
+        .values_list("id", "descripcion")
+    ):
+        for m in RE_GC.finditer(texto):
+            if int(m.group(1)) in gc_ids:
+                agregar((t_gc, int(m.group(1)), "mensual"), (t_mensual, pk), "GC")
+        for m in RE_GCF_MENSUAL.finditer(texto):
+            if int(m.group(2)) in fichas_ids:
+                agregar((t_ficha, int(m.group(2)), f"{m.group(1)}:mensual"), (t_mensual, pk), "GCF")
+
+    for pk, texto, vehiculo_id in (
+        GastoReporteInterno.objects.filter(concepto__contains="[GC").order_by("id")
+        .values_list("id", "concepto", "ficha__vehiculo_id")
+    ):
+        for m in RE_GC.finditer(texto):
+            if int(m.group(1)) in gc_ids:
+                agregar((t_gc, int(m.group(1)), "reporte"), (t_reporte, pk), "GC")
+        ficha_id = ficha_por_vehiculo.get(vehiculo_id)
+        for m in RE_GCF_REPORTE.finditer(texto):
+            if ficha_id:
+                agregar((t_ficha, ficha_id, f"{m.group(1)}:reporte"), (t_reporte, pk), "GCF")
+
+    for pk, texto, tipo_mov in (
+        MovimientoCuenta.objects.filter(descripcion__contains="[GI:").order_by("id")
+        .values_list("id", "descripcion", "tipo")
+    ):
+        for m in RE_GI.finditer(texto):
+            pago_id = int(m.group(1))
+            if pago_id not in gi_ids:
+                continue
+            slot = f"mov_{tipo_mov}"
+            if (t_gi, pago_id, slot) in vinculos_ or (t_gi, pago_id, slot) in ya_origen:
+                slot = f"{slot}_{pk}"
+            agregar((t_gi, pago_id, slot), (t_mov, pk), "GI")
+
+    Vinculo.objects.bulk_create(
+        [
+            Vinculo(
+                origen_tipo_id=ot, origen_id=oid, slot=slot,
+                destino_tipo_id=dt, destino_id=did,
+            )
+            for (ot, oid, slot), (dt, did) in vinculos_.items()
+        ],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    return dict(contados)
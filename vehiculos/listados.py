@@ -0,0 +1,119 @@
+"""
+Consulta compartida del listado de vehículos.
+
+La usan la lista HTML (`lista_vehiculos`) y el PDF de stock (`stock_pdf`),
+así la búsqueda y los filtros de marca / año / precio se interpretan igual
+en los dos. Cada uno conserva su propio criterio de estado (las solapas de
+la lista no son las mismas opciones que el modal del PDF).
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Vehiculo
+
+# Un auto en CONSIGNACIÓN sigue siendo nuestro (prestado al revendedor):
+# debe aparecer también en stock. Los de reventa por COMPRA no.
+CONSIGNACION_Q = Q(estado="reventa", reventa__tipo="consignacion")
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decimal(valor):
+    try:
+        return Decimal(valor)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+
+
+def filtrar_vehiculos(qs, params):
+    """Búsqueda (q) y filtros de marca / año / precio. Los valores
+    inválidos o vacíos se ignoran."""
+    query = (params.get("q") or "").strip()
+    if query:
+        qs = qs.filter(
+            Q(marca__icontains=query)
+            | Q(modelo__icontains=query)
+            | Q(dominio__icontains=query)
+        )
+
+    marca = (params.get("marca") or "").strip()
+    if marca:
+        qs = qs.filter(marca__icontains=marca)
+
+    rangos = (
+        ("anio_min", "anio__gte", _entero),
+        ("anio_max", "anio__lte", _entero),
+        ("precio_min", "precio__gte", _decimal),
+        ("precio_max", "precio__lte", _decimal),
+    )
+    for param, lookup, convertir in rangos:
+        valor = convertir(params.get(param)) if params.get(param) else None
+        if valor is not None:
+            qs = qs.filter(**{lookup: valor})
+    return qs
+
+
+def vehiculos_lista(params):
+    """
+    QuerySet de la lista HTML. Solapa `estado` (por defecto "stock"):
+      - "stock" → los propios + los que están en consignación
+      - "todos" → sin filtro de estado
+      - otro    → ese estado exacto
+    """
+    estado = params.get("estado", "stock")
+    qs = (
+        Vehiculo.objects
+        .select_related("ficha", "ficha_reporte", "reventa")
+        .annotate(
+            estado_orden=Case(
+                When(estado="a_ingresar", then=Value(0)),
+                When(estado="stock", then=Value(1)),
+                When(estado="temporal", then=Value(2)),
+                When(estado="reventa", then=Value(3)),
+                When(estado="vendido", then=Value(4)),
+                default=Value(5),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("estado_orden", "marca", "modelo", "-id")
+    )
+    qs = filtrar_vehiculos(qs, params)
+    if estado == "stock":
+        qs = qs.filter(Q(estado="stock") | CONSIGNACION_Q).distinct()
+    elif estado and estado != "todos":
+        qs = qs.filter(estado=estado)
+    return qs
+
+
+def vehiculos_pdf(params):
+    """
+    QuerySet del PDF de stock. `estado`:
+      - "" o "activos" → todo lo no vendido (incluye "a ingresar")
+      - "stock"        → stock + temporal (lo que está disponible)
+      - "todos"        → absolutamente todos
+      - otro           → ese estado exacto
+    `incluir_a_ingresar=1` suma los "a ingresar" al estado elegido.
+    """
+    estado = params.get("estado", "")
+    incluir_a_ingresar = params.get("incluir_a_ingresar") == "1"
+
+    qs = filtrar_vehiculos(Vehiculo.objects.order_by("-id"), params)
+    if estado in ("", "activos"):
+        qs = qs.exclude(estado="vendido")
+    elif estado == "stock":
+        estados = ["stock", "temporal"]
+        if incluir_a_ingresar:
+            estados.append("a_ingresar")
+        qs = qs.filter(estado__in=estados)
+    elif estado != "todos":
+        estados = [estado]
+        if incluir_a_ingresar and estado != "a_ingresar":
+            estados.append("a_ingresar")
+        qs = qs.filter(estado__in=estados)
+    return qs
@@ -0,0 +1,23 @@
+"""
+Arma los VinculoEspejo de los espejos existentes a partir de los tags en
+sus descripciones ([GC#id], [GCF:campo#pk], [GCF:campo], [GI:pk]).
+
+Uso:
+    python manage.py migrar_vinculos_espejo
+
+La migración 0043 ya lo corre una vez; el comando es idempotente y sirve
+para re-procesar si quedaron registros cargados con tags a mano.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from vehiculos.espejos import migrar_tags
+
+
+class Command(BaseCommand):
+    help = "Crea los vínculos de espejo leyendo los tags de las descripciones (sin duplicar)"
+
+    def handle(self, *args, **kwargs):
+        contados = migrar_tags(apps)
+        detalle = " | ".join(f"{tag}: {n}" for tag, n in sorted(contados.items())) or "sin novedades"
+        self.stdout.write(self.style.SUCCESS(f"Vínculos de espejo creados | {detalle}"))
@@ -0,0 +1,22 @@
+"""
+Rearma el índice de vencimientos (VencimientoVehiculo) desde las fichas.
+
+Uso:
+    python manage.py reconstruir_vencimientos
+
+La migración 0045 ya lo arma una vez y los signals de la ficha lo
+mantienen; sirve si se cargaron fechas por fuera del ORM (update / SQL).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vehiculos.vencimientos import reconstruir
+
+
+class Command(BaseCommand):
+    help = "Rearma el índice de vencimientos de los vehículos desde las fichas"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            filas = reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"Índice de vencimientos rearmado | Filas: {filas}"))
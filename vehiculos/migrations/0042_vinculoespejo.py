@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('vehiculos', '0041_fichavehicular_costo_verificacion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VinculoEspejo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen_id', models.PositiveBigIntegerField()),
+                ('slot', models.CharField(max_length=60)),
+                ('destino_id', models.PositiveBigIntegerField()),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('destino_tipo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('origen_tipo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Vínculo de espejo',
+                'verbose_name_plural': 'Vínculos de espejo',
+                'indexes': [models.Index(fields=['destino_tipo', 'destino_id'], name='vehiculos_v_destino_0fd119_idx')],
+                'constraints': [models.UniqueConstraint(fields=('origen_tipo', 'origen_id', 'slot'), name='uniq_vinculoespejo_origen_slot')],
+            },
+        ),
+    ]
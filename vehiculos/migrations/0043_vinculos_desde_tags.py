@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def crear_vinculos(apps, schema_editor):
+    """Vínculos de los espejos ya existentes, leídos de sus tags."""
+    from vehiculos.espejos import migrar_tags
+    migrar_tags(apps)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vehiculos", "0042_vinculoespejo"),
+        ("gastos_mensuales", "0003_detalle_vehiculo_gastos"),
+        ("reportes", "0004_reporteanual_ganancia_total_and_more"),
+        ("cuentas", "0017_refinanciacion"),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_vinculos, noop),
+    ]
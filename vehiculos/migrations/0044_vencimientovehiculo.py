@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-19 18:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehiculos', '0043_vinculos_desde_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VencimientoVehiculo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('vtv', 'Vencimiento VTV'), ('verificacion', 'Vencimiento Verificación'), ('patente', 'Vencimiento Patente'), ('habitualista', 'Vencimiento beneficio habitualista'), ('turno_vtv', 'Turno VTV'), ('turno_verificacion', 'Turno verificación'), ('turno_autopartes', 'Turno autopartes'), ('turno_gnc', 'Turno GNC')], max_length=20)),
+                ('campo', models.CharField(max_length=40)),
+                ('fecha', models.DateField()),
+                ('vehiculo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vencimientos', to='vehiculos.vehiculo')),
+            ],
+            options={
+                'verbose_name': 'Vencimiento de vehículo',
+                'verbose_name_plural': 'Vencimientos de vehículos',
+                'ordering': ['fecha', 'id'],
+                'indexes': [models.Index(fields=['fecha', 'tipo'], name='vehiculos_v_fecha_29daef_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vehiculo', 'campo'), name='uniq_vencimiento_vehiculo_campo')],
+            },
+        ),
+    ]
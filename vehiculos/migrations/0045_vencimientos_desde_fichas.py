@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def armar_indice(apps, schema_editor):
+    """Índice de vencimientos de las fichas ya cargadas."""
+    from vehiculos.vencimientos import reconstruir
+    reconstruir(apps)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vehiculos", "0044_vencimientovehiculo"),
+    ]
+
+    operations = [
+        migrations.RunPython(armar_indice, noop),
+    ]
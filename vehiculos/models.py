@@ -1,21 +1,18 @@
 from django.db import models
 from decimal import Decimal
 from django.apps import apps
-from datetime import date, timedelta
+from datetime import date
+
+
+# Plazo del beneficio de comerciante habitualista
+DIAS_HABITUALISTA = 90
 
 
 def sumar_dias_habiles(fecha, dias):
-    """Devuelve la fecha resultante de sumar `dias` días hábiles (lunes a
-    viernes) a `fecha`. No contempla feriados."""
-    if not fecha:
-        return None
-    resultado = fecha
-    restantes = dias
-    while restantes > 0:
-        resultado += timedelta(days=1)
-        if resultado.weekday() < 5:  # 0=lunes ... 4=viernes
-            restantes -= 1
-    return resultado
+    """Devuelve la fecha resultante de sumar `dias` días hábiles a `fecha`:
+    lunes a viernes sin los feriados nacionales (ver calendario.habiles)."""
+    from calendario import habiles
+    return habiles.sumar(fecha, dias)
 
 
 # ============================================================
@@ -432,22 +429,23 @@ class FichaVehicular(models.Model):
     # proveedor, o me pagó a mí aunque yo todavía no le pague al organismo).
     SIT_CLIENTE_PAGADO = ["prov_directo", "cli_directo", "cli_adelanto", "prov_reintegro", "cli_concesion"]
 
+    # Mapeo entre los labels de mapa_gastos_ingreso y las keys cortas
+    # con las que se guardan los pagos en PagoGastoIngreso
+    LABEL_TO_KEY = {
+        "Formulario 08": "f08",
+        "Informes": "informes",
+        "Patentes": "patentes",
+        "Infracciones": "infracciones",
+        "Verificación": "verificacion",
+        "Autopartes": "autopartes",
+        "VTV": "vtv",
+        "R541": "r541",
+        "Firmas": "firmas",
+    }
+
     def total_pagado_por_concepto(self, concepto, situaciones=None):
-        # Mapeo entre los labels de mapa_gastos_ingreso y las keys cortas
-        # con las que se guardan los pagos en PagoGastoIngreso
-        LABEL_TO_KEY = {
-            "Formulario 08": "f08",
-            "Informes": "informes",
-            "Patentes": "patentes",
-            "Infracciones": "infracciones",
-            "Verificación": "verificacion",
-            "Autopartes": "autopartes",
-            "VTV": "vtv",
-            "R541": "r541",
-            "Firmas": "firmas",
-        }
         # Aceptar tanto label como key
-        key_corta = LABEL_TO_KEY.get(concepto, concepto)
+        key_corta = self.LABEL_TO_KEY.get(concepto, concepto)
 
         # Por defecto: saldo CON EL ENTE (solo los que efectivamente pagaron al
         # organismo). Pasando `situaciones` se puede calcular otra óptica.
@@ -526,7 +524,7 @@ class FichaVehicular(models.Model):
         """Fecha de vencimiento del beneficio: 90 días hábiles desde la
         inscripción a nombre del comerciante habitualista. None si no se cargó
         la fecha."""
-        return sumar_dias_habiles(self.fecha_inscripcion_habitualista, 90)
+        return sumar_dias_habiles(self.fecha_inscripcion_habitualista, DIAS_HABITUALISTA)
 
     @property
     def habitualista_vencido(self):
@@ -859,3 +857,92 @@ class Mantenimiento(models.Model):
 
     def __str__(self):
         return f"{self.nombre} – {self.fecha} – {self.vehiculo}"
+
+
+# ============================================================
+# VÍNCULOS DE ESPEJO (origen → registro espejado en otro módulo)
+# ============================================================
+class VinculoEspejo(models.Model):
+    """
+    Relaciona un registro de origen con el registro que lo espeja en otro
+    módulo, por "slot" (ej: un GastoConcesionario con su GastoMensual en
+    el slot "mensual", o una FichaVehicular con su GastoReporteInterno en
+    "gc_service:reporte"). Reemplaza la búsqueda por tags en el texto
+    ([GC#id], [GCF:campo#pk], [GI:pk]): el lookup es por índice.
+    La API está en `vehiculos.espejos`.
+    """
+
+    origen_tipo = models.ForeignKey(
+        "contenttypes.ContentType", on_delete=models.CASCADE, related_name="+",
+    )
+    origen_id = models.PositiveBigIntegerField()
+    slot = models.CharField(max_length=60)
+    destino_tipo = models.ForeignKey(
+        "contenttypes.ContentType", on_delete=models.CASCADE, related_name="+",
+    )
+    destino_id = models.PositiveBigIntegerField()
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Vínculo de espejo"
+        verbose_name_plural = "Vínculos de espejo"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["origen_tipo", "origen_id", "slot"],
+                name="uniq_vinculoespejo_origen_slot",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["destino_tipo", "destino_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.origen_tipo.model}#{self.origen_id} [{self.slot}] → {self.destino_tipo.model}#{self.destino_id}"
+
+
+# ============================================================
+# VENCIMIENTOS (índice de fechas de la ficha)
+# ============================================================
+class VencimientoVehiculo(models.Model):
+    """
+    Una fila por fecha a vigilar de la ficha (VTV, verificación, cada
+    vencimiento de patentes, beneficio habitualista y turnos). Se mantiene
+    al guardar la ficha y se consulta por (fecha, tipo) con índice, en
+    lugar de recorrer las columnas de cada ficha. La API está en
+    `vehiculos.vencimientos`.
+    """
+    TIPOS = [
+        ("vtv", "Vencimiento VTV"),
+        ("verificacion", "Vencimiento Verificación"),
+        ("patente", "Vencimiento Patente"),
+        ("habitualista", "Vencimiento beneficio habitualista"),
+        ("turno_vtv", "Turno VTV"),
+        ("turno_verificacion", "Turno verificación"),
+        ("turno_autopartes", "Turno autopartes"),
+        ("turno_gnc", "Turno GNC"),
+    ]
+
+    vehiculo = models.ForeignKey(
+        Vehiculo, on_delete=models.CASCADE, related_name="vencimientos",
+    )
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    # Campo de la ficha del que sale la fecha (patentes_vto1 … patentes_vto5
+    # comparten tipo "patente")
+    campo = models.CharField(max_length=40)
+    fecha = models.DateField()
+
+    class Meta:
+        ordering = ["fecha", "id"]
+        verbose_name = "Vencimiento de vehículo"
+        verbose_name_plural = "Vencimientos de vehículos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehiculo", "campo"], name="uniq_vencimiento_vehiculo_campo",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["fecha", "tipo"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.fecha:%d/%m/%Y} – vehículo #{self.vehiculo_id}"
@@ -47,6 +47,283 @@ def recalcular_cuentas_vinculadas(vehiculo):
             pass
 
 
+def saldos_gastos_ingreso(fichas):
+    """
+    Saldos de gastos de ingreso CON EL ENTE de varias fichas a la vez:
+    {vehiculo_id: {concepto_label: saldo}} con solo los conceptos que
+    adeudan (saldo > 0). Mismo criterio que `FichaVehicular.saldo_por_concepto`,
+    pero con UNA query agrupada de PagoGastoIngreso en lugar de una por
+    ficha y concepto.
+    """
+    from django.db.models import Sum
+    from vehiculos.models import PagoGastoIngreso
+
+    fichas = list(fichas)
+    claves = FichaVehicular.LABEL_TO_KEY
+    a_clave = {**{v: v for v in claves.values()}, **claves}
+
+    pagado = {}
+    filas = (
+        PagoGastoIngreso.objects
+        .filter(
+            vehiculo_id__in=[f.vehiculo_id for f in fichas],
+            situacion__in=FichaVehicular.SIT_ENTE_PAGADO,
+        )
+        .order_by()
+        .values("vehiculo_id", "concepto")
+        .annotate(total=Sum("monto"))
+    )
+    for fila in filas:
+        clave = a_clave.get(fila["concepto"])
+        if clave:
+            k = (fila["vehiculo_id"], clave)
+            pagado[k] = pagado.get(k, Decimal("0")) + (fila["total"] or Decimal("0"))
+
+    saldos = {}
+    for f in fichas:
+        conceptos = {}
+        for label, monto in f.mapa_gastos_ingreso().items():
+            if not monto or Decimal(monto) <= 0:
+                continue
+            saldo = Decimal(monto) - pagado.get((f.vehiculo_id, claves[label]), Decimal("0"))
+            if saldo > 0:
+                conceptos[label] = saldo
+        saldos[f.vehiculo_id] = conceptos
+    return saldos
+
+
+def saldos_gastos_cliente(vehiculo_ids):
+    """
+    `FichaVehicular.saldo_total_gastos_cliente` de varios vehículos a la
+    vez: {vehiculo_id: saldo}. Dos queries (fichas + pagos agrupados) en
+    lugar de una por vehículo y concepto. Los vehículos sin ficha no
+    figuran.
+    """
+    from django.db.models import Sum
+    from vehiculos.models import PagoGastoIngreso
+
+    vehiculo_ids = set(vehiculo_ids)
+    if not vehiculo_ids:
+        return {}
+    claves = FichaVehicular.LABEL_TO_KEY
+    a_clave = {**{v: v for v in claves.values()}, **claves}
+
+    pagado = {}
+    filas = (
+        PagoGastoIngreso.objects
+        .filter(vehiculo_id__in=vehiculo_ids, situacion__in=FichaVehicular.SIT_CLIENTE_PAGADO)
+        .order_by()
+        .values("vehiculo_id", "concepto")
+        .annotate(total=Sum("monto"))
+    )
+    for fila in filas:
+        clave = a_clave.get(fila["concepto"])
+        if clave:
+            k = (fila["vehiculo_id"], clave)
+            pagado[k] = pagado.get(k, Decimal("0")) + (fila["total"] or Decimal("0"))
+
+    saldos = {}
+    for ficha in FichaVehicular.objects.filter(vehiculo_id__in=vehiculo_ids):
+        total = Decimal("0")
+        for label, monto in ficha.mapa_gastos_ingreso().items():
+            if monto and Decimal(monto) > 0:
+                total += Decimal(monto) - pagado.get((ficha.vehiculo_id, claves[label]), Decimal("0"))
+        saldos[ficha.vehiculo_id] = total
+    return saldos
+
+
+def gastos_ingreso_ficha(ficha):
+    """
+    Lectura consolidada de los gastos de ingreso de UNA ficha: trae todos
+    los PagoGastoIngreso del vehículo en una sola query y los agrupa en
+    memoria por concepto y situación. Devuelve:
+
+      {
+        "conceptos": [{key, concepto, monto, total_pagado,
+                       cobrado_informativo, saldo, pagos, esta_pagado}, ...],
+        "total_pendiente": Decimal,
+        "pagos": [todos los pagos, por fecha_pago ascendente],
+      }
+
+    `conceptos` trae solo los que tienen monto > 0 (pagados incluidos;
+    cada vista filtra lo que muestra). `total_pagado` y `saldo` son CON EL
+    ENTE (mismo criterio que `FichaVehicular.saldo_por_concepto`);
+    `cobrado_informativo` es lo cobrado al cliente y todavía no pagado al
+    organismo (cli_concesion). `pagos` de cada concepto va del más nuevo
+    al más viejo, como el historial de la ficha.
+    """
+    from vehiculos.models import PagoGastoIngreso
+
+    claves = FichaVehicular.LABEL_TO_KEY
+    a_clave = {**{v: v for v in claves.values()}, **claves}
+
+    pagos = list(
+        PagoGastoIngreso.objects
+        .filter(vehiculo_id=ficha.vehiculo_id)
+        .order_by("fecha_pago", "id")
+    )
+    por_concepto = {}
+    for p in pagos:
+        por_concepto.setdefault(a_clave.get(p.concepto, p.concepto), []).append(p)
+
+    conceptos = []
+    for label, monto in ficha.mapa_gastos_ingreso().items():
+        if monto is None or Decimal(monto) <= 0:
+            continue
+        monto = Decimal(monto)
+        key = claves[label]
+        del_concepto = por_concepto.get(key, [])
+        total_pagado = sum(
+            (p.monto for p in del_concepto if p.situacion in FichaVehicular.SIT_ENTE_PAGADO),
+            Decimal("0"),
+        )
+        cobrado = sum(
+            (p.monto for p in del_concepto if p.situacion == "cli_concesion"),
+            Decimal("0"),
+        )
+        saldo = monto - total_pagado
+        conceptos.append({
+            "key": key,
+            "concepto": label,
+            "monto": monto,
+            "total_pagado": total_pagado,
+            "cobrado_informativo": cobrado,
+            "saldo": saldo,
+            "pagos": del_concepto[::-1],
+            "esta_pagado": saldo <= 0,
+        })
+
+    return {
+        "conceptos": conceptos,
+        "total_pendiente": sum((c["saldo"] for c in conceptos if c["saldo"] > 0), Decimal("0")),
+        "pagos": pagos,
+    }
+
+
+def registrar_pagos_gastos_lote(ficha, montos, fecha_pago, observaciones="",
+                                mantiene_deuda=False, cuenta=None, entes=None):
+    """
+    Registra de una vez los pagos de varios gastos de ingreso de la ficha.
+
+    `montos` es {key_concepto: Decimal > 0} en el orden en que se cargan.
+    Los saldos con el ente salen de UNA query agrupada; el monto se recorta
+    al saldo (salvo `mantiene_deuda`) y los conceptos ya pagados se saltean.
+    Pagos y movimientos de cuenta (situación cli_concesion) se insertan con
+    `bulk_create` — los ids vuelven en el mismo INSERT, así los movimientos
+    llevan el tag [GI:pk] y se vinculan sin re-guardar cada pago — y la
+    auditoría recibe un solo registro del lote.
+
+    Devuelve (pagos creados, conceptos salteados).
+    """
+    from django.db.models import Sum
+    from auditoria.signals import registrar_lote
+    from cuentas.models import MovimientoCuenta
+    from vehiculos import espejos
+    from vehiculos.models import PagoGastoIngreso
+
+    claves = FichaVehicular.LABEL_TO_KEY
+    labels = {v: k for k, v in claves.items()}
+    a_clave = {**{v: v for v in claves.values()}, **claves}
+    mapa = {claves[label]: monto for label, monto in ficha.mapa_gastos_ingreso().items()}
+    entes = entes or {}
+
+    ya_pagado = {}
+    filas = (
+        PagoGastoIngreso.objects
+        .filter(vehiculo_id=ficha.vehiculo_id, situacion__in=FichaVehicular.SIT_ENTE_PAGADO)
+        .order_by()
+        .values("concepto")
+        .annotate(total=Sum("monto"))
+    )
+    for fila in filas:
+        key = a_clave.get(fila["concepto"], fila["concepto"])
+        ya_pagado[key] = ya_pagado.get(key, Decimal("0")) + (fila["total"] or Decimal("0"))
+
+    # Situación según proveedor en Titularidad. En lote: pagos directos
+    # (saldados) salvo que se tilde "cliente me pagó, no pagué al organismo".
+    if ficha.vendedor_id:
+        pertenece, situacion = "proveedor", "prov_directo"
+    elif mantiene_deuda:
+        pertenece, situacion = "cliente", "cli_concesion"
+    else:
+        pertenece, situacion = "cliente", "cli_directo"
+    saldado = situacion in ("prov_directo", "cli_directo")
+
+    pagos = []
+    saltados = []
+    for key, monto in montos.items():
+        saldo = Decimal(mapa.get(key) or 0) - ya_pagado.get(key, Decimal("0"))
+        if not mantiene_deuda:
+            if saldo <= 0:
+                saltados.append(f"{labels.get(key, key)} (ya pagado)")
+                continue
+            monto = min(monto, saldo)
+        pagos.append(PagoGastoIngreso(
+            vehiculo_id=ficha.vehiculo_id,
+            concepto=key,
+            fecha_pago=fecha_pago,
+            monto=monto,
+            observaciones=observaciones,
+            pertenece=pertenece,
+            situacion=situacion,
+            ente=entes.get(key, ""),
+            saldado=saldado,
+            fecha_saldado=fecha_pago if saldado else None,
+            mantiene_deuda_vehiculo=(situacion == "cli_concesion"),
+        ))
+    if not pagos:
+        return pagos, saltados
+
+    PagoGastoIngreso.objects.bulk_create(pagos)
+
+    # Situación 2 en lote: reflejar el cobro del cliente (debe + haber).
+    movimientos = []
+    if situacion == "cli_concesion" and cuenta:
+        for pago in pagos:
+            label = labels.get(pago.concepto, pago.concepto)
+            marca = f"[GI:{pago.pk}]"
+            movimientos += [
+                MovimientoCuenta(
+                    cuenta=cuenta, vehiculo_id=ficha.vehiculo_id,
+                    descripcion=f"Gasto de ingreso: {label} {marca}",
+                    tipo="debe", monto=pago.monto, origen="manual",
+                ),
+                MovimientoCuenta(
+                    cuenta=cuenta, vehiculo_id=ficha.vehiculo_id,
+                    descripcion=f"Pago del cliente por {label} (pendiente de pagar al organismo) {marca}",
+                    tipo="haber", monto=pago.monto, origen="manual",
+                ),
+            ]
+        MovimientoCuenta.objects.bulk_create(movimientos)
+        vinculos = []
+        for pago, mov_debe, mov_haber in zip(pagos, movimientos[::2], movimientos[1::2]):
+            pago.movimiento_cuenta_id = mov_debe.pk
+            vinculos += [(pago, "mov_debe", mov_debe), (pago, "mov_haber", mov_haber)]
+        PagoGastoIngreso.objects.bulk_update(pagos, ["movimiento_cuenta_id"])
+        espejos.vincular_lote(vinculos)
+
+    # bulk_create no dispara post_save: el resumen 360° de quien entregó el
+    # vehículo (y del cliente de la cuenta cobrada) y el dashboard se
+    # invalidan a mano.
+    from clientes import resumen
+    from cuentas.models import CuentaCorriente
+    from inicio import dashboard
+    clientes = set(
+        CuentaCorriente.objects.filter(movimientos__vehiculo_id=ficha.vehiculo_id)
+        .values_list("cliente_id", flat=True)
+    )
+    if cuenta:
+        clientes.add(cuenta.cliente_id)
+    resumen.invalidar(clientes)
+    dashboard.invalidar()
+
+    descripcion = f"Registró {len(pagos)} pago(s) de gastos de ingreso en lote"
+    if movimientos:
+        descripcion += f" y {len(movimientos)} movimiento(s) de cuenta"
+    registrar_lote("crear", PagoGastoIngreso, pagos, f"{descripcion} — {ficha.vehiculo}")
+    return pagos, saltados
+
+
 def actualizar_gastos_por_vencimientos():
     """
     Revisa todos los vehiculos en stock y auto-acumula SOLO las patentes
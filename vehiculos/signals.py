@@ -1,9 +1,11 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from decimal import Decimal
 
-from vehiculos.models import GastoConcesionario, FichaVehicular
+from vehiculos import espejos, vencimientos
+from vehiculos.models import GastoConcesionario, FichaVehicular, Vehiculo, VencimientoVehiculo
 
 
 def _get_ficha_reporte(vehiculo):
@@ -24,6 +26,30 @@ def _get_gasto_reporte_model():
 CATEGORIA_GASTOS_VEHICULOS = "Gastos de vehículos"
 
 
+# id de la categoría, cacheado por proceso (se limpia si la categoría se
+# edita o borra). Solo se cachea una vez confirmada la transacción que la
+# leyó / creó, para no quedarse con un id que después se revierte.
+_categoria_vehiculos_id = None
+
+
+def _get_categoria_vehiculos_id():
+    """
+    Devuelve el id de la categoría 'Gastos de vehículos' (la crea si no
+    existe) usada para espejar los gastos del concesionario en Control de
+    Gastos. Después de la primera vez no cuesta queries.
+    """
+    if _categoria_vehiculos_id is not None:
+        return _categoria_vehiculos_id
+    cat = _get_categoria_vehiculos()
+
+    def _cachear():
+        global _categoria_vehiculos_id
+        _categoria_vehiculos_id = cat.pk
+
+    transaction.on_commit(_cachear)
+    return cat.pk
+
+
 def _get_categoria_vehiculos():
     """
     Devuelve (o crea) la categoría 'Gastos de vehículos' usada para
@@ -41,11 +67,25 @@ def _get_categoria_vehiculos():
     return cat
 
 
-def _sync_gastomensual(tag, descripcion, monto, fecha=None):
+@receiver(post_save, sender="gastos_mensuales.CategoriaGasto")
+@receiver(post_delete, sender="gastos_mensuales.CategoriaGasto")
+def olvidar_categoria_vehiculos(sender, instance, **kwargs):
+    global _categoria_vehiculos_id
+    if instance.pk == _categoria_vehiculos_id or instance.nombre == CATEGORIA_GASTOS_VEHICULOS:
+        _categoria_vehiculos_id = None
+
+
+_SIN_RESOLVER = object()
+
+
+def _sync_gastomensual(origen, slot, tag, descripcion, monto, fecha=None, existente=_SIN_RESOLVER):
     """
-    Crea / actualiza / elimina un GastoMensual identificado por el tag.
-    El tag se guarda al final de la descripción (formato '... [GC#42]').
+    Crea / actualiza / elimina el GastoMensual espejo de `origen` en `slot`
+    (ver `vehiculos.espejos`). El tag se sigue guardando al final de la
+    descripción (formato '... [GC#42]') para clasificarlo en Control de Gastos.
     Si monto <= 0, elimina el registro.
+    `existente` permite pasar el espejo ya resuelto (o None si no hay) y
+    ahorrar el lookup.
     """
     from gastos_mensuales.models import GastoMensual
 
@@ -53,35 +93,32 @@ def _sync_gastomensual(tag, descripcion, monto, fecha=None):
     mes = fecha.month
     anio = fecha.year
 
-    existente = GastoMensual.objects.filter(descripcion__contains=tag).first()
+    if existente is _SIN_RESOLVER:
+        existente = espejos.resolver_uno(origen, slot)
 
     if monto and monto > 0:
-        cat = _get_categoria_vehiculos()
+        categoria_id = _get_categoria_vehiculos_id()
         descripcion_full = f"{descripcion} {tag}"
         if existente:
             existente.descripcion = descripcion_full
             existente.monto = monto
             existente.mes = mes
             existente.anio = anio
-            existente.categoria = cat
+            existente.categoria_id = categoria_id
             existente.save(update_fields=["descripcion", "monto", "mes", "anio", "categoria"])
         else:
-            GastoMensual.objects.create(
-                categoria=cat,
+            nuevo = GastoMensual.objects.create(
+                categoria_id=categoria_id,
                 descripcion=descripcion_full,
                 monto=monto,
                 mes=mes,
                 anio=anio,
             )
+            espejos.vincular(origen, slot, nuevo)
     elif existente:
         existente.delete()
 
 
-def _delete_gastomensual(tag):
-    from gastos_mensuales.models import GastoMensual
-    GastoMensual.objects.filter(descripcion__contains=tag).delete()
-
-
 # ==========================================================
 # SYNC: GastoConcesionario → GastoReporteInterno
 # ==========================================================
@@ -97,11 +134,8 @@ def sync_gasto_extra_a_reporte(sender, instance, created, **kwargs):
     ficha_reporte = _get_ficha_reporte(instance.vehiculo)
 
     tag = f"[GC#{instance.pk}]"
-
-    existente = GastoReporteInterno.objects.filter(
-        ficha=ficha_reporte,
-        concepto__contains=tag,
-    ).first()
+    actuales = espejos.resolver(instance)
+    existente = actuales.get("reporte")
 
     concepto = f"{instance.concepto} {tag}"
 
@@ -110,41 +144,33 @@ def sync_gasto_extra_a_reporte(sender, instance, created, **kwargs):
         existente.monto = instance.monto
         existente.save(update_fields=["concepto", "monto"])
     else:
-        GastoReporteInterno.objects.create(
+        nuevo = GastoReporteInterno.objects.create(
             ficha=ficha_reporte,
             concepto=concepto,
             monto=instance.monto,
         )
+        espejos.vincular(instance, "reporte", nuevo)
 
     # 🔹 Espejo en Control de Gastos
     patente = getattr(instance.vehiculo, "patente", None) or getattr(instance.vehiculo, "marca", "") or "Vehículo"
     descripcion = f"{instance.concepto} – {patente}"
     _sync_gastomensual(
+        origen=instance,
+        slot="mensual",
         tag=tag,
         descripcion=descripcion,
         monto=instance.monto,
         fecha=instance.fecha,
+        existente=actuales.get("mensual"),
     )
 
 
 @receiver(post_delete, sender=GastoConcesionario)
 def delete_gasto_extra_de_reporte(sender, instance, **kwargs):
     """Al eliminar un gasto extra, lo borra de reportes y de Control de Gastos."""
-    GastoReporteInterno = _get_gasto_reporte_model()
-    try:
-        ficha_reporte = _get_ficha_reporte(instance.vehiculo)
-    except Exception:
-        ficha_reporte = None
-
-    tag = f"[GC#{instance.pk}]"
-    if ficha_reporte:
-        GastoReporteInterno.objects.filter(
-            ficha=ficha_reporte,
-            concepto__contains=tag,
-        ).delete()
-
-    # 🔹 Espejo en Control de Gastos
-    _delete_gastomensual(tag)
+    for espejo in espejos.resolver(instance).values():
+        espejo.delete()
+    espejos.desvincular(instance)
 
 
 # ==========================================================
@@ -204,56 +230,186 @@ def sync_vendedor_a_compraventa(sender, instance, **kwargs):
         op.save(update_fields=["proveedor", "origen"])
 
 
+CAMPOS_GC_LABEL = dict(CAMPOS_GC)
+
+
+def _campos_gc_en_juego(update_fields):
+    """Campos gc_* que pudo tocar el save (todos si no hay update_fields)."""
+    if update_fields is None:
+        return list(CAMPOS_GC_LABEL)
+    return [c for c in CAMPOS_GC_LABEL if c in update_fields]
+
+
+def _monto_gc(valor):
+    return Decimal(str(valor)) if valor else Decimal("0")
+
+
+def _identificacion_vehiculo(vehiculo):
+    """Identificador completo del vehículo: marca modelo (dominio)."""
+    ident = " ".join(
+        str(x) for x in [getattr(vehiculo, "marca", ""), getattr(vehiculo, "modelo", "")] if x
+    ).strip()
+    dominio = getattr(vehiculo, "dominio", "") or getattr(vehiculo, "patente", "") or ""
+    if dominio:
+        ident = f"{ident} ({dominio})".strip() if ident else str(dominio)
+    return ident or "Vehículo"
+
+
+@receiver(pre_save, sender=FichaVehicular)
+def guardar_gc_previos(sender, instance, update_fields=None, **kwargs):
+    """
+    Antes de guardar, lee los gc_* actuales de la base (1 query, solo de los
+    campos que el save puede tocar) para que el sync espeje solo lo que cambió.
+    """
+    instance._gc_previos = None
+    if not instance.pk:
+        return
+    campos = _campos_gc_en_juego(update_fields)
+    if campos:
+        instance._gc_previos = (
+            FichaVehicular.objects.filter(pk=instance.pk).values(*campos).first()
+        )
+
+
 @receiver(post_save, sender=FichaVehicular)
-def sync_gastos_concesionario_fijos(sender, instance, **kwargs):
+def sync_gastos_concesionario_fijos(sender, instance, created, update_fields=None, **kwargs):
     """
-    Al guardar la ficha, sincroniza los campos gc_* con GastoReporteInterno.
-    Usa tag [GCF:campo] para identificar cada gasto fijo.
+    Al guardar la ficha, espeja los campos gc_* que CAMBIARON en
+    GastoReporteInterno y en Control de Gastos (GastoMensual). Un save que
+    no toca gc_* (ej. update_fields de otro campo) no hace ninguna query.
     """
-    GastoReporteInterno = _get_gasto_reporte_model()
-    ficha_reporte = _get_ficha_reporte(instance.vehiculo)
+    campos = _campos_gc_en_juego(update_fields)
+    previos = getattr(instance, "_gc_previos", None)
+    if created or previos is None:
+        cambiados = [c for c in campos if _monto_gc(getattr(instance, c, None)) > 0]
+    else:
+        cambiados = [
+            c for c in campos
+            if _monto_gc(previos.get(c)) != _monto_gc(getattr(instance, c, None))
+        ]
+    if cambiados:
+        _espejar_gc(instance, cambiados)
 
-    # Identificador completo del vehículo: marca modelo (dominio)
-    _veh = instance.vehiculo
-    _ident = " ".join(
-        str(x) for x in [getattr(_veh, "marca", ""), getattr(_veh, "modelo", "")] if x
-    ).strip()
-    _dominio = getattr(_veh, "dominio", "") or getattr(_veh, "patente", "") or ""
-    if _dominio:
-        _ident = f"{_ident} ({_dominio})".strip() if _ident else str(_dominio)
-    patente_vehiculo = _ident or "Vehículo"
-
-    for campo, label in CAMPOS_GC:
-        monto = getattr(instance, campo, None) or Decimal("0")
-        # tag específico por ficha+campo, para que vehículos distintos
-        # no se pisen entre sí en Control de Gastos
-        tag_reporte = f"[GCF:{campo}]"
-        tag_mensual = f"[GCF:{campo}#{instance.pk}]"
+
+def _espejar_gc(ficha, campos):
+    """
+    Aplica los cambios de `campos` en los espejos de la ficha: resuelve los
+    espejos existentes de una vez y hace creates / updates / deletes en lote.
+    Tags: [GCF:campo] en reportes y [GCF:campo#pk] en Control de Gastos.
+    """
+    from auditoria.signals import registrar_lote
+    from gastos_mensuales import resumenes
+    from gastos_mensuales.models import GastoMensual
+
+    GastoReporteInterno = _get_gasto_reporte_model()
+    actuales = espejos.resolver(ficha, [f"{c}:{s}" for c in campos for s in ("reporte", "mensual")])
+    hoy = timezone.now().date()
+    vehiculo = _identificacion_vehiculo(ficha.vehiculo)
+
+    ficha_reporte = None
+    categoria_id = None
+    nuevos, editados_rep, editados_men, borrar = [], [], [], []
+    periodos = set()  # meses de Control de Gastos a resumir de nuevo
+    for campo in campos:
+        label = CAMPOS_GC_LABEL[campo]
+        monto = _monto_gc(getattr(ficha, campo, None))
+        reporte = actuales.get(f"{campo}:reporte")
+        mensual = actuales.get(f"{campo}:mensual")
+
+        if monto <= 0:
+            borrar.extend(e for e in (reporte, mensual) if e)
+            continue
 
         # ---- Espejo en reportes (FichaReporteInterno) ----
-        existente = GastoReporteInterno.objects.filter(
-            ficha=ficha_reporte,
-            concepto__contains=tag_reporte,
-        ).first()
-
-        if monto > 0:
-            concepto = f"{label} {tag_reporte}"
-            if existente:
-                existente.concepto = concepto
-                existente.monto = monto
-                existente.save(update_fields=["concepto", "monto"])
-            else:
-                GastoReporteInterno.objects.create(
-                    ficha=ficha_reporte,
-                    concepto=concepto,
-                    monto=monto,
-                )
-        elif existente:
-            existente.delete()
+        concepto = f"{label} [GCF:{campo}]"
+        if reporte:
+            reporte.concepto, reporte.monto = concepto, monto
+            editados_rep.append(reporte)
+        else:
+            ficha_reporte = ficha_reporte or _get_ficha_reporte(ficha.vehiculo)
+            nuevos.append((f"{campo}:reporte", GastoReporteInterno(
+                ficha=ficha_reporte, concepto=concepto, monto=monto,
+            )))
 
         # ---- Espejo en Control de Gastos (GastoMensual) ----
-        _sync_gastomensual(
-            tag=tag_mensual,
-            descripcion=f"{label} – {patente_vehiculo}",
-            monto=monto,
+        categoria_id = categoria_id or _get_categoria_vehiculos_id()
+        descripcion = f"{label} – {vehiculo} [GCF:{campo}#{ficha.pk}]"
+        if mensual:
+            periodos.add((mensual.anio, mensual.mes))
+            mensual.descripcion, mensual.monto = descripcion, monto
+            mensual.mes, mensual.anio, mensual.categoria_id = hoy.month, hoy.year, categoria_id
+            editados_men.append(mensual)
+        else:
+            nuevos.append((f"{campo}:mensual", GastoMensual(
+                categoria_id=categoria_id, descripcion=descripcion,
+                monto=monto, mes=hoy.month, anio=hoy.year,
+            )))
+
+    nuevos_rep = [o for _, o in nuevos if isinstance(o, GastoReporteInterno)]
+    nuevos_men = [o for _, o in nuevos if isinstance(o, GastoMensual)]
+    if nuevos_rep:
+        GastoReporteInterno.objects.bulk_create(nuevos_rep)
+    if nuevos_men:
+        GastoMensual.objects.bulk_create(nuevos_men)
+        registrar_lote("crear", GastoMensual, nuevos_men)
+    espejos.vincular_lote([(ficha, slot, obj) for slot, obj in nuevos])
+
+    if editados_rep:
+        GastoReporteInterno.objects.bulk_update(editados_rep, ["concepto", "monto"])
+    if editados_men:
+        GastoMensual.objects.bulk_update(
+            editados_men, ["descripcion", "monto", "mes", "anio", "categoria"],
         )
+        registrar_lote("editar", GastoMensual, editados_men)
+    if nuevos_men or editados_men:
+        # bulk_create / bulk_update no pasan por los signals
+        periodos.add((hoy.year, hoy.month))
+        resumenes.recalcular(periodos)
+
+    # Los deletes pasan por los signals (auditoría + limpieza de vínculos)
+    for modelo in (GastoReporteInterno, GastoMensual):
+        ids = [e.pk for e in borrar if isinstance(e, modelo)]
+        if ids:
+            modelo.objects.filter(pk__in=ids).delete()
+
+
+# ==========================================================
+# VÍNCULOS DE ESPEJO: limpieza al borrar origen o destino
+# ==========================================================
+@receiver(post_delete, sender="gastos_mensuales.GastoMensual")
+@receiver(post_delete, sender="reportes.GastoReporteInterno")
+@receiver(post_delete, sender="cuentas.MovimientoCuenta")
+def desvincular_espejo_borrado(sender, instance, **kwargs):
+    espejos.desvincular_destino(instance)
+
+
+@receiver(post_delete, sender=FichaVehicular)
+def desvincular_ficha_borrada(sender, instance, **kwargs):
+    espejos.desvincular(instance)
+
+
+# ==========================================================
+# ÍNDICE DE VENCIMIENTOS (ver vehiculos.vencimientos)
+# ==========================================================
+@receiver(post_save, sender=FichaVehicular)
+def sync_vencimientos_ficha(sender, instance, update_fields=None, **kwargs):
+    if vencimientos.campos_en_juego(update_fields):
+        vencimientos.sincronizar(instance)
+
+
+@receiver(post_delete, sender=FichaVehicular)
+def borrar_vencimientos_ficha(sender, instance, **kwargs):
+    VencimientoVehiculo.objects.filter(vehiculo_id=instance.vehiculo_id).delete()
+
+
+@receiver(post_save, sender=Vehiculo)
+def sync_vencimiento_habitualista(sender, instance, update_fields=None, **kwargs):
+    """El beneficio habitualista depende de un campo del vehículo."""
+    if update_fields is not None and "es_habitualista" not in update_fields:
+        return
+    if not instance.es_habitualista:
+        VencimientoVehiculo.objects.filter(vehiculo=instance, tipo="habitualista").delete()
+        return
+    ficha = FichaVehicular.objects.filter(vehiculo=instance).first()
+    if ficha:
+        vencimientos.sincronizar(ficha, es_habitualista=True)
@@ -1,3 +1,321 @@
+"""
+Tests de los espejos de gastos (vínculos indexados en lugar de tags), de
+la lectura consolidada de la ficha, del pago de gastos en lote, de los
+listados y del índice de vencimientos.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from gastos_mensuales.models import GastoMensual
+from reportes.models import FichaReporteInterno, GastoReporteInterno
+
+from . import espejos, listados, vencimientos
+from .models import (
+    FichaVehicular, GastoConcesionario, PagoGastoIngreso, VencimientoVehiculo, Vehiculo, VinculoEspejo,
+)
+from .services import gastos_ingreso_ficha, registrar_pagos_gastos_lote
+from .signals import _get_categoria_vehiculos
+
+
+def _vehiculo(dominio="AAA111"):
+    return Vehiculo.objects.create(
+        marca="Ford", modelo="Ka", dominio=dominio, anio=2020, precio=Decimal("1000"),
+    )
+
+
+class EspejosTests(TestCase):
+    def setUp(self):
+        self.vehiculo = _vehiculo()
+
+    def test_gasto_concesionario_espejado_sin_busqueda_por_texto(self):
+        with CaptureQueriesContext(connection) as ctx:
+            gasto = GastoConcesionario.objects.create(
+                vehiculo=self.vehiculo, concepto="Lavado", monto=Decimal("200"),
+            )
+            gasto.monto = Decimal("250")
+            gasto.save()
+        self.assertFalse([q for q in ctx.captured_queries if "LIKE" in q["sql"]])
+
+        espejo = espejos.resolver(gasto)
+        self.assertEqual(set(espejo), {"reporte", "mensual"})
+        self.assertEqual(espejo["mensual"].monto, Decimal("250"))
+        self.assertIn(f"[GC#{gasto.pk}]", espejo["mensual"].descripcion)
+
+        gasto.delete()
+        self.assertFalse(GastoMensual.objects.filter(descripcion__contains=f"[GC#{gasto.pk}]").exists())
+        self.assertFalse(VinculoEspejo.objects.exists())
+
+    def test_ficha_gc_vinculada_por_campo(self):
+        ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=self.vehiculo)
+        ficha.gc_service = Decimal("100")
+        ficha.save()
+        espejo = espejos.resolver(ficha)
+        self.assertEqual(set(espejo), {"gc_service:reporte", "gc_service:mensual"})
+
+        ficha.gc_service = Decimal("0")
+        ficha.save()
+        self.assertEqual(espejos.resolver(ficha), {})
+
+    def test_migrar_tags_existentes(self):
+        ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=self.vehiculo)
+        gm = GastoMensual.objects.create(
+            categoria=_get_categoria_vehiculos(),
+            descripcion=f"Service – Ford Ka [GCF:gc_service#{ficha.pk}]",
+            monto=Decimal("100"), mes=1, anio=2026,
+        )
+        gr = GastoReporteInterno.objects.create(
+            ficha=FichaReporteInterno.objects.get_or_create(vehiculo=self.vehiculo)[0],
+            concepto="Service [GCF:gc_service]", monto=Decimal("100"),
+        )
+        self.assertEqual(espejos.migrar_tags(apps), {"GCF": 2})
+        self.assertEqual(
+            espejos.resolver(ficha),
+            {"gc_service:mensual": gm, "gc_service:reporte": gr},
+        )
+        # Idempotente
+        self.assertEqual(espejos.migrar_tags(apps), {})
+
+
+class SyncGcDiffTests(TestCase):
+    def setUp(self):
+        self.ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=_vehiculo())
+
+    def _queries_de_save(self, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            self.ficha.save(**kwargs)
+        return [q["sql"] for q in ctx.captured_queries]
+
+    def test_save_sin_gc_no_toca_espejos(self):
+        sqls = self._queries_de_save(update_fields=["vtv_vencimiento"])
+        self.assertFalse([q for q in sqls if "gastos_mensuales" in q or "vinculoespejo" in q])
+
+    def test_solo_se_espeja_el_campo_cambiado(self):
+        self.ficha.gc_service = Decimal("100")
+        self.ficha.gc_lavado = Decimal("50")
+        self.ficha.save()
+        mensual = espejos.resolver_uno(self.ficha, "gc_lavado:mensual")
+
+        # Cambia solo gc_service: el espejo de gc_lavado no se reescribe
+        GastoMensual.objects.filter(pk=mensual.pk).update(mes=1, anio=2020)
+        self.ficha.gc_service = Decimal("150")
+        self.ficha.save()
+        mensual.refresh_from_db()
+        self.assertEqual((mensual.mes, mensual.anio), (1, 2020))
+        self.assertEqual(espejos.resolver_uno(self.ficha, "gc_service:mensual").monto, Decimal("150"))
+
+        # Bajar a 0 elimina los dos espejos del campo
+        self.ficha.gc_lavado = Decimal("0")
+        self.ficha.save(update_fields=["gc_lavado"])
+        self.assertEqual(
+            set(espejos.resolver(self.ficha)), {"gc_service:reporte", "gc_service:mensual"},
+        )
+
+
+class LecturaFichaTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.vehiculo = _vehiculo()
+        self.ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=self.vehiculo)
+        for campo in ("gasto_f08", "gasto_informes", "gasto_patentes", "gasto_vtv"):
+            setattr(self.ficha, campo, Decimal("100"))
+        self.ficha.save()
+        for concepto in ("f08", "informes", "patentes"):
+            for situacion in ("cli_directo", "cli_concesion", "pendiente"):
+                PagoGastoIngreso.objects.create(
+                    vehiculo=self.vehiculo, concepto=concepto, fecha_pago=date(2026, 1, 5),
+                    monto=Decimal("30"), situacion=situacion,
+                )
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+
+    def test_agrupa_por_concepto_y_situacion_en_una_query(self):
+        with self.assertNumQueries(1):
+            lectura = gastos_ingreso_ficha(self.ficha)
+        f08 = next(g for g in lectura["conceptos"] if g["key"] == "f08")
+        self.assertEqual(
+            (f08["total_pagado"], f08["cobrado_informativo"], f08["saldo"], len(f08["pagos"])),
+            (Decimal("30"), Decimal("30"), Decimal("70"), 3),
+        )
+        self.assertEqual(lectura["total_pendiente"], Decimal("70") * 3 + Decimal("100"))
+
+    def test_ficha_completa_no_escala_con_los_conceptos(self):
+        url = reverse("vehiculos:ficha_completa", args=[self.vehiculo.pk])
+        self.client.get(url, secure=True)  # crea la ficha técnica
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(url, secure=True)
+        self.assertEqual(r.status_code, 200)
+        pagos_gi = [q for q in ctx.captured_queries if "vehiculos_pagogastoingreso" in q["sql"]]
+        self.assertEqual(len(pagos_gi), 1)
+        self.assertContains(r, "Formulario 08")
+
+
+class PagosLoteTests(TestCase):
+    def setUp(self):
+        from clientes.models import Cliente
+        from cuentas.models import CuentaCorriente
+
+        self.vehiculo = _vehiculo()
+        self.ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=self.vehiculo)
+        self.ficha.gasto_f08 = Decimal("100")
+        self.ficha.gasto_informes = Decimal("50")
+        self.ficha.save()
+        PagoGastoIngreso.objects.create(
+            vehiculo=self.vehiculo, concepto="f08", fecha_pago=date(2026, 1, 5),
+            monto=Decimal("40"), situacion="cli_directo",
+        )
+        self.cuenta = CuentaCorriente.objects.create(
+            cliente=Cliente.objects.create(nombre_completo="Juan Pérez"),
+        )
+
+    def test_recorta_al_saldo_y_saltea_lo_pagado(self):
+        self.ficha.gasto_informes = Decimal("0")
+        pagos, saltados = registrar_pagos_gastos_lote(
+            self.ficha, {"f08": Decimal("90"), "informes": Decimal("10")}, "2026-02-01",
+        )
+        self.assertEqual([(p.concepto, p.monto) for p in pagos], [("f08", Decimal("60"))])
+        self.assertEqual(saltados, ["Informes (ya pagado)"])
+
+    def test_cli_concesion_inserta_en_lote_y_vincula(self):
+        from auditoria.models import LogActividad
+
+        logs_antes = LogActividad.objects.count()
+        with CaptureQueriesContext(connection) as ctx:
+            pagos, _ = registrar_pagos_gastos_lote(
+                self.ficha, {"f08": Decimal("60"), "informes": Decimal("50")}, "2026-02-01",
+                mantiene_deuda=True, cuenta=self.cuenta,
+            )
+        # + el DELETE del cache del dashboard (bulk_create no dispara sus signals)
+        self.assertLessEqual(len(ctx.captured_queries), 11)
+        for pago in pagos:
+            pago.refresh_from_db()
+            espejo = espejos.resolver(pago)
+            self.assertEqual(set(espejo), {"mov_debe", "mov_haber"})
+            self.assertEqual(pago.movimiento_cuenta_id, espejo["mov_debe"].pk)
+            self.assertIn(f"[GI:{pago.pk}]", espejo["mov_haber"].descripcion)
+        self.assertEqual(LogActividad.objects.count() - logs_antes, 1)
+
+    def test_lote_invalida_el_resumen_de_quien_entrego_el_usado(self):
+        from django.core.cache import cache
+        from clientes import resumen
+        from inicio import dashboard
+        from cuentas.models import MovimientoCuenta
+
+        MovimientoCuenta.objects.create(
+            cuenta=self.cuenta, vehiculo=self.vehiculo, descripcion="Permuta",
+            tipo="haber", monto=Decimal("500"), origen="permuta",
+        )
+        resumen.de_cliente(self.cuenta.cliente)
+        dashboard.datos("general")
+        self.assertIsNotNone(cache.get(resumen._clave(self.cuenta.cliente_id)))
+        registrar_pagos_gastos_lote(self.ficha, {"informes": Decimal("50")}, "2026-02-01")
+        self.assertIsNone(cache.get(resumen._clave(self.cuenta.cliente_id)))
+        self.assertFalse(dashboard.datos("general")["desde_cache"])
+
+    def test_agregar_a_agenda_dos_gastos_del_mismo_dia(self):
+        from django.contrib.auth.models import User
+        from agenda_pagos.models import PagoFuturo
+
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        pagos = [
+            PagoGastoIngreso.objects.create(
+                vehiculo=self.vehiculo, concepto="informes", fecha_pago=date(2026, 2, 1),
+                monto=Decimal("25"), situacion="cli_concesion", ente="DNRPA",
+            )
+            for _ in range(2)
+        ]
+        for pago in pagos:
+            r = self.client.post(reverse("vehiculos:agregar_gasto_a_agenda", args=[pago.pk]), secure=True)
+            self.assertEqual(r.status_code, 302)
+        # Cada gasto queda con su propio pago agendado
+        agendados = [
+            PagoGastoIngreso.objects.values_list("pago_futuro_id", flat=True).get(pk=p.pk)
+            for p in pagos
+        ]
+        self.assertEqual(sorted(agendados), sorted(PagoFuturo.objects.values_list("pk", flat=True)))
+        self.assertEqual(len(set(agendados)), 2)
+
+
+class ListadosTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Vehiculo.objects.create(
+                marca="Ford", modelo=f"Ka {i}", dominio=f"AB{i:03d}", anio=2018 + i,
+                precio=Decimal("1000") * (i + 1), estado="stock",
+            )
+
+    def test_filtros_compartidos_ignoran_valores_invalidos(self):
+        params = {"q": "ka", "anio_min": "2020", "precio_max": "4000", "anio_max": "x"}
+        self.assertEqual(
+            sorted(listados.vehiculos_pdf(params).values_list("anio", flat=True)),
+            [2020, 2021],
+        )
+        self.assertEqual(listados.vehiculos_lista(params).count(), 2)
+
+    def test_stock_pdf_en_tablas_por_bloques_sin_n_mas_1(self):
+        from django.contrib.auth.models import User
+        from reportes.pdf_utils import tablas_listado
+
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(reverse("vehiculos:stock_pdf"), {"estado": "stock"}, secure=True)
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.content.startswith(b"%PDF"))
+        self.assertLess(len(ctx.captured_queries), 6)
+
+        tablas, n = tablas_listado(["A", "B"], ([i, i] for i in range(7)), filas_por_tabla=3)
+        self.assertEqual((len(tablas), n), (3, 7))
+
+
+class VencimientosTests(TestCase):
+    def setUp(self):
+        self.hoy = date.today()
+        self.vehiculo = _vehiculo()
+        self.vehiculo.estado = "stock"
+        self.vehiculo.save()
+        self.ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=self.vehiculo)
+
+    def _indice(self):
+        return dict(VencimientoVehiculo.objects.values_list("campo", "fecha"))
+
+    def test_se_mantiene_al_guardar_la_ficha(self):
+        self.ficha.vtv_vencimiento = self.hoy - timedelta(days=1)
+        self.ficha.patentes_vto3 = self.hoy + timedelta(days=10)
+        self.ficha.save()
+        self.assertEqual(set(self._indice()), {"vtv_vencimiento", "patentes_vto3"})
+
+        self.ficha.patentes_vto3 = None
+        self.ficha.save(update_fields=["patentes_vto3"])
+        self.assertEqual(set(self._indice()), {"vtv_vencimiento"})
+
+        self.vehiculo.es_habitualista = True
+        self.vehiculo.save()
+        self.ficha.fecha_inscripcion_habitualista = date(2026, 1, 2)  # viernes
+        self.ficha.save()
+        self.assertEqual(self._indice()["habitualista"], self.ficha.habitualista_vencimiento)
+
+        self.assertEqual(vencimientos.reconstruir(), 2)
+
+    def test_consultas_y_lectores(self):
+        from django.contrib.auth.models import User
+
+        self.ficha.vtv_vencimiento = self.hoy - timedelta(days=1)
+        self.ficha.verificacion_vencimiento = self.hoy + timedelta(days=5)
+        self.ficha.patentes_vto2 = self.hoy + timedelta(days=40)
+        self.ficha.save()
+
+        self.assertEqual([v.tipo for v in vencimientos.vencidos(self.hoy)], ["vtv"])
+        self.assertEqual(
+            [v.tipo for v in vencimientos.en_ventana(self.hoy, self.hoy + timedelta(days=30))],
+            ["verificacion"],
+        )
+        self.assertEqual([v.campo for v in vencimientos.proximos(5)], ["verificacion_vencimiento", "patentes_vto2"])
 
-# Create your tests here.
+        self.client.force_login(User.objects.create_superuser("Vamichetti", "a@a.com", "x"))
+        eventos = self.client.get(reverse("api_calendario_vencimientos"), secure=True).json()
+        self.assertIn(f"patente2-{self.vehiculo.pk}-{self.ficha.patentes_vto2}", [e["id"] for e in eventos])
@@ -0,0 +1,174 @@
+"""
+Índice de vencimientos de los vehículos (`VencimientoVehiculo`).
+
+Cada ficha aporta una fila por fecha cargada (VTV, verificación, los cinco
+vencimientos de patentes, turnos y el fin del beneficio habitualista). Las
+filas se reescriben al guardar la ficha (signal en `vehiculos.signals`) y
+todas las pantallas leen de acá con lookups por (fecha, tipo):
+
+    vencimientos.en_ventana(hoy, hoy + timedelta(days=30), tipos=["vtv"])
+    vencimientos.vencidos(hoy, tipos=["vtv", "verificacion"])
+    vencimientos.proximos(10)
+
+Por defecto solo se consideran los vehículos en stock.
+"""
+from datetime import date
+
+from .models import DIAS_HABITUALISTA, FichaVehicular, VencimientoVehiculo, sumar_dias_habiles
+
+# Campo de la ficha -> tipo de vencimiento
+CAMPOS = {
+    "vtv_vencimiento": "vtv",
+    "verificacion_vencimiento": "verificacion",
+    "patentes_vto1": "patente",
+    "patentes_vto2": "patente",
+    "patentes_vto3": "patente",
+    "patentes_vto4": "patente",
+    "patentes_vto5": "patente",
+    "vtv_turno": "turno_vtv",
+    "verificacion_turno": "turno_verificacion",
+    "autopartes_turno": "turno_autopartes",
+    "gnc_turno": "turno_gnc",
+}
+# Campos que mueven el vencimiento del beneficio habitualista
+CAMPOS_HABITUALISTA = ("fecha_inscripcion_habitualista",)
+
+VENCIMIENTOS = ("vtv", "verificacion", "patente", "habitualista")
+TURNOS = ("turno_vtv", "turno_verificacion", "turno_autopartes", "turno_gnc")
+
+
+# ==========================================================
+# MANTENIMIENTO
+# ==========================================================
+def fechas_de(ficha, es_habitualista, calendario=None):
+    """{campo: (tipo, fecha)} de lo que la ficha tiene cargado."""
+    fechas = {
+        campo: (tipo, getattr(ficha, campo))
+        for campo, tipo in CAMPOS.items()
+        if getattr(ficha, campo)
+    }
+    if es_habitualista and ficha.fecha_inscripcion_habitualista:
+        sumar = calendario.sumar if calendario else sumar_dias_habiles
+        fechas["habitualista"] = (
+            "habitualista", sumar(ficha.fecha_inscripcion_habitualista, DIAS_HABITUALISTA),
+        )
+    return fechas
+
+
+def _filas(modelo, vehiculo_id, fechas):
+    return [
+        modelo(vehiculo_id=vehiculo_id, tipo=tipo, campo=campo, fecha=fecha)
+        for campo, (tipo, fecha) in fechas.items()
+    ]
+
+
+def sincronizar(ficha, es_habitualista=None):
+    """Reescribe las filas del vehículo de la ficha: 1 DELETE + 1 upsert."""
+    if es_habitualista is None:
+        es_habitualista = ficha.vehiculo.es_habitualista
+    fechas = fechas_de(ficha, es_habitualista)
+    VencimientoVehiculo.objects.filter(vehiculo_id=ficha.vehiculo_id).exclude(
+        campo__in=list(fechas),
+    ).delete()
+    if fechas:
+        VencimientoVehiculo.objects.bulk_create(
+            _filas(VencimientoVehiculo, ficha.vehiculo_id, fechas),
+            update_conflicts=True,
+            unique_fields=["vehiculo", "campo"],
+            update_fields=["tipo", "fecha"],
+        )
+
+
+def _calendario(apps=None):
+    """Calendario de hábiles; desde una migración, con los feriados de ese estado."""
+    from calendario import habiles
+
+    if apps is None:
+        return habiles.calendario()
+    try:
+        Feriado = apps.get_model("calendario", "Feriado")
+    except LookupError:
+        return habiles.Calendario()
+    return habiles.Calendario(Feriado.objects.values_list("fecha", flat=True))
+
+
+def actualizar_habitualistas(apps=None):
+    """
+    Recalcula el fin del beneficio habitualista de todas las fichas (cuando
+    cambian los feriados): 1 query de fechas + 1 upsert. Devuelve cuántas.
+    """
+    Ficha = apps.get_model("vehiculos", "FichaVehicular") if apps else FichaVehicular
+    Vencimiento = apps.get_model("vehiculos", "VencimientoVehiculo") if apps else VencimientoVehiculo
+    cal = _calendario(apps)
+
+    filas = [
+        Vencimiento(
+            vehiculo_id=vehiculo_id, tipo="habitualista", campo="habitualista",
+            fecha=cal.sumar(inscripcion, DIAS_HABITUALISTA),
+        )
+        for vehiculo_id, inscripcion in Ficha.objects.filter(
+            vehiculo__es_habitualista=True, fecha_inscripcion_habitualista__isnull=False,
+        ).values_list("vehiculo_id", "fecha_inscripcion_habitualista")
+    ]
+    if filas:
+        Vencimiento.objects.bulk_create(
+            filas,
+            update_conflicts=True,
+            unique_fields=["vehiculo", "campo"],
+            update_fields=["tipo", "fecha"],
+            batch_size=500,
+        )
+    return len(filas)
+
+
+def campos_en_juego(update_fields):
+    """True si un save con `update_fields` puede cambiar alguna fecha."""
+    if update_fields is None:
+        return True
+    return bool(set(update_fields) & (set(CAMPOS) | set(CAMPOS_HABITUALISTA)))
+
+
+def reconstruir(apps=None):
+    """
+    Arma el índice completo desde las fichas. Recibe el registro de apps
+    (sirve desde una migración) o usa los modelos actuales. Devuelve la
+    cantidad de filas.
+    """
+    Ficha = apps.get_model("vehiculos", "FichaVehicular") if apps else FichaVehicular
+    Vencimiento = apps.get_model("vehiculos", "VencimientoVehiculo") if apps else VencimientoVehiculo
+    cal = _calendario(apps)
+
+    filas = []
+    for ficha in Ficha.objects.select_related("vehiculo").iterator(chunk_size=500):
+        filas += _filas(Vencimiento, ficha.vehiculo_id, fechas_de(ficha, ficha.vehiculo.es_habitualista, cal))
+    Vencimiento.objects.all().delete()
+    Vencimiento.objects.bulk_create(filas, batch_size=500)
+    return len(filas)
+
+
+# ==========================================================
+# CONSULTAS
+# ==========================================================
+def todos(tipos=None, solo_stock=True):
+    """Todos los vencimientos (de `tipos`), ordenados por fecha."""
+    qs = VencimientoVehiculo.objects.select_related("vehiculo")
+    if tipos is not None:
+        qs = qs.filter(tipo__in=list(tipos))
+    if solo_stock:
+        qs = qs.filter(vehiculo__estado="stock")
+    return qs.order_by("fecha", "id")
+
+
+def en_ventana(desde, hasta, tipos=None, solo_stock=True):
+    """Vencimientos con fecha entre `desde` y `hasta` (inclusive)."""
+    return todos(tipos, solo_stock).filter(fecha__range=(desde, hasta))
+
+
+def vencidos(hoy=None, tipos=None, solo_stock=True):
+    """Vencimientos con fecha anterior a `hoy`."""
+    return todos(tipos, solo_stock).filter(fecha__lt=hoy or date.today())
+
+
+def proximos(n, tipos=None, desde=None, solo_stock=True):
+    """Los próximos `n` vencimientos desde `desde` (hoy por defecto)."""
+    return todos(tipos, solo_stock).filter(fecha__gte=desde or date.today())[:n]
@@ -6,7 +6,7 @@ from django.urls import reverse
 from django.http import JsonResponse, HttpResponse
 from django.template.loader import render_to_string
 from django.contrib import messages
-from django.db.models import Q, Sum, Case, When, IntegerField, Value
+from django.db.models import Q
 from django.db import transaction
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
@@ -23,12 +23,12 @@ from .models import (
 )
 
 from .forms import VehiculoBasicoForm, VehiculoForm, FichaVehicularForm, FichaTecnicaForm
+from . import espejos, listados
 
 # ===============================
 # REPORTLAB – PDF (SIN DEPENDENCIAS NATIVAS)
 # ===============================
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 
@@ -62,23 +62,27 @@ def construir_gastos_conc_pago(vehiculo, ficha, gastos_extras):
 
     Para cada gasto fijo (gc_*) con monto > 0 y para cada gasto adicional,
     calcula total pagado y saldo (mismo patrón que gastos de ingreso). Devuelve
-    también el historial de pagos del vehículo.
+    también el historial de pagos del vehículo. Los pagos se leen una sola
+    vez y se agrupan por concepto en memoria.
     """
-    pagos_qs = PagoGastoConcesionario.objects.filter(vehiculo=vehiculo)
-
-    def _pagado(key):
-        return pagos_qs.filter(concepto=key).aggregate(t=Sum("monto"))["t"] or Decimal("0")
+    pagos = list(
+        PagoGastoConcesionario.objects.filter(vehiculo=vehiculo)
+        .order_by("-fecha_pago", "-creado")
+    )
+    pagado_por_concepto = {}
+    for p in pagos:
+        pagado_por_concepto[p.concepto] = pagado_por_concepto.get(p.concepto, Decimal("0")) + p.monto
 
     items = []
 
-    for campo, label in GASTOS_CONC_CAMPOS:
-        monto = Decimal(getattr(ficha, campo, None) or 0)
+    def _item(key, label, monto):
+        monto = Decimal(monto or 0)
         if monto <= 0:
-            continue
-        pagado = Decimal(_pagado(campo))
+            return
+        pagado = pagado_por_concepto.get(key, Decimal("0"))
         saldo = monto - pagado
         items.append({
-            "key": campo,
+            "key": key,
             "concepto": label,
             "monto": monto,
             "total_pagado": pagado,
@@ -86,28 +90,17 @@ def construir_gastos_conc_pago(vehiculo, ficha, gastos_extras):
             "esta_pagado": saldo <= 0,
         })
 
+    for campo, label in GASTOS_CONC_CAMPOS:
+        _item(campo, label, getattr(ficha, campo, None))
+
     for extra in gastos_extras:
-        monto = Decimal(extra.monto or 0)
-        if monto <= 0:
-            continue
-        key = f"extra:{extra.pk}"
-        pagado = Decimal(_pagado(key))
-        saldo = monto - pagado
-        items.append({
-            "key": key,
-            "concepto": extra.concepto,
-            "monto": monto,
-            "total_pagado": pagado,
-            "saldo": saldo,
-            "esta_pagado": saldo <= 0,
-        })
+        _item(f"extra:{extra.pk}", extra.concepto, extra.monto)
 
     total_pendiente = sum((i["saldo"] for i in items if i["saldo"] > 0), Decimal("0"))
     total_pagado = sum((i["total_pagado"] for i in items), Decimal("0"))
 
     # Historial con etiqueta legible del concepto
     extras_labels = {f"extra:{e.pk}": e.concepto for e in gastos_extras}
-    pagos = list(pagos_qs.order_by("-fecha_pago", "-creado"))
     for p in pagos:
         p.concepto_label = (
             GASTOS_CONC_LABELS.get(p.concepto)
@@ -123,6 +116,33 @@ def construir_gastos_conc_pago(vehiculo, ficha, gastos_extras):
     }
 
 
+def _vehiculo_con_fichas(vehiculo_id):
+    """Vehículo con su ficha vehicular y técnica en una query (las crea si
+    todavía no existen)."""
+    vehiculo = get_object_or_404(
+        Vehiculo.objects.select_related("ficha", "ficha_tecnica"), id=vehiculo_id,
+    )
+    ficha = getattr(vehiculo, "ficha", None)
+    if ficha is None:
+        ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=vehiculo)
+    ficha_tec = getattr(vehiculo, "ficha_tecnica", None)
+    if ficha_tec is None:
+        ficha_tec, _ = FichaTecnica.objects.get_or_create(vehiculo=vehiculo)
+    return vehiculo, ficha, ficha_tec
+
+
+def _gastos_conc_ficha(vehiculo, ficha):
+    """Gastos de concesionario de la ficha: (items fijos gc_*, gastos
+    adicionales ya evaluados, total de los adicionales)."""
+    items = [
+        {"campo": campo, "label": label, "monto": getattr(ficha, campo, None) or Decimal("0")}
+        for campo, label in GASTOS_CONC_CAMPOS
+    ]
+    extras = list(GastoConcesionario.objects.filter(vehiculo=vehiculo))
+    total_extras = sum((Decimal(e.monto or 0) for e in extras), Decimal("0"))
+    return items, extras, total_extras
+
+
 # ==========================================================
 # ACCESO ÚNICO A CONFIGURACIÓN GLOBAL DE GASTOS (ÚNICO VÁLIDO)
 # ==========================================================
@@ -161,44 +181,8 @@ def lista_vehiculos(request):
     # el usuario tiene que cambiar de tab.
     estado_filtro = request.GET.get("estado", "stock")
 
-    # Un auto en CONSIGNACIÓN sigue siendo nuestro (prestado al revendedor):
-    # debe aparecer también en stock. Los de reventa por COMPRA no.
-    consignacion_q = Q(estado="reventa", reventa__tipo="consignacion")
-
-    vehiculos = (
-        Vehiculo.objects
-        .all()
-        .select_related('ficha', 'ficha_reporte', 'reventa')
-        .annotate(
-            estado_orden=Case(
-                When(estado="a_ingresar", then=Value(0)),
-                When(estado="stock", then=Value(1)),
-                When(estado="temporal", then=Value(2)),
-                When(estado="reventa", then=Value(3)),
-                When(estado="vendido", then=Value(4)),
-                default=Value(5),
-                output_field=IntegerField(),
-            )
-        )
-        .order_by("estado_orden", "marca", "modelo", "-id")
-    )
-
-    # Filtro por búsqueda
-    if query:
-        vehiculos = vehiculos.filter(
-            Q(marca__icontains=query)
-            | Q(modelo__icontains=query)
-            | Q(dominio__icontains=query)
-        )
-
-    # Filtro por estado:
-    #   "todos" → no filtra (incluye todos los estados)
-    #   <estado puntual> → filtra por ese estado exacto
-    if estado_filtro == "stock":
-        # Stock = los propios + los que están en consignación (prestados).
-        vehiculos = vehiculos.filter(Q(estado="stock") | consignacion_q).distinct()
-    elif estado_filtro and estado_filtro != "todos":
-        vehiculos = vehiculos.filter(estado=estado_filtro)
+    # Misma consulta (búsqueda y filtros) que el PDF de stock.
+    vehiculos = listados.vehiculos_lista(request.GET)
 
     # Calcular días en stock para cada vehículo
     hoy = date.today()
@@ -230,7 +214,7 @@ def lista_vehiculos(request):
     # Contadores para los filtros
     total_a_ingresar = Vehiculo.objects.filter(estado='a_ingresar').count()
     # En stock contamos también los que están en consignación (siguen siendo nuestros).
-    total_stock = Vehiculo.objects.filter(Q(estado="stock") | consignacion_q).distinct().count()
+    total_stock = Vehiculo.objects.filter(Q(estado="stock") | listados.CONSIGNACION_Q).distinct().count()
     total_temporal = Vehiculo.objects.filter(estado='temporal').count()
     total_vendido = Vehiculo.objects.filter(estado='vendido').count()
     total_reventa = Vehiculo.objects.filter(estado='reventa').count()
@@ -580,104 +564,26 @@ def cambiar_estado_vehiculo(request, vehiculo_id):
 # MODAL FICHA VEHICULAR (AJAX) – DEFINITIVA
 # ==========================================================
 def ficha_vehicular_ajax(request, vehiculo_id):
-    vehiculo = get_object_or_404(Vehiculo, id=vehiculo_id)
-    ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=vehiculo)
-    ficha_tec, _ = FichaTecnica.objects.get_or_create(vehiculo=vehiculo)
+    vehiculo, ficha, ficha_tec = _vehiculo_con_fichas(vehiculo_id)
 
     vehiculo_form = VehiculoForm(instance=vehiculo)
     ficha_form = FichaVehicularForm(instance=ficha)
     ficha_tecnica_form = FichaTecnicaForm(instance=ficha_tec)
 
-    CONCEPTOS = {
-        "f08": "Formulario 08",
-        "informes": "Informes",
-        "patentes": "Patentes",
-        "infracciones": "Infracciones",
-        "verificacion": "Verificación",
-        "autopartes": "Autopartes",
-        "vtv": "VTV",
-        "r541": "R541",
-        "firmas": "Firmas",
-    }
-
-    mapa_gastos = {
-        "f08": ficha.gasto_f08,
-        "informes": ficha.gasto_informes,
-        "patentes": ficha.gasto_patentes,
-        "infracciones": ficha.gasto_infracciones,
-        "verificacion": ficha.gasto_verificacion,
-        "autopartes": ficha.gasto_autopartes,
-        "vtv": ficha.gasto_vtv,
-        "r541": ficha.gasto_r541,
-        "firmas": ficha.gasto_firmas,
-    }
-
-    gastos_ingreso = []
-
-    for key, monto in mapa_gastos.items():
-        if monto is None:
-            continue
+    from vehiculos.services import gastos_ingreso_ficha
+    lectura = gastos_ingreso_ficha(ficha)
 
-        monto = Decimal(monto)
-        if monto <= 0:
-            continue
-
-        total_pagado = (
-            PagoGastoIngreso.objects.filter(
-                vehiculo=vehiculo,
-                concepto=key,
-                situacion__in=["prov_directo", "cli_directo", "cli_adelanto", "prov_reintegro"],
-            ).aggregate(total=Sum("monto"))["total"]
-            or Decimal("0")
-        )
-
-        saldo = monto - Decimal(total_pagado)
-
-        # 🔴 FILTRO CLAVE: SI EL SALDO ES 0, NO SE MUESTRA
-        if saldo <= 0:
-            continue
-
-        gastos_ingreso.append({
-            "key": key,
-            "concepto": CONCEPTOS[key],
-            "monto": monto,
-            "total_pagado": total_pagado,
-            "saldo": saldo,
-            "ente_sugerido": ENTE_SUGERIDO.get(key, ""),
-        })
-
-    total_pendiente = sum(
-        (g["saldo"] for g in gastos_ingreso if g["saldo"] > 0),
-        Decimal("0")
-    )
-
-    # Gastos concesionario
-    GASTOS_CONC_CAMPOS = [
-        ("gc_service", "Service"),
-        ("gc_mecanica", "Mecanica"),
-        ("gc_chapa_pintura", "Chapa y pintura"),
-        ("gc_tapizado", "Tapizado"),
-        ("gc_neumaticos", "Neumaticos"),
-        ("gc_vidrios", "Vidrios"),
-        ("gc_cerrajeria", "Cerrajeria"),
-        ("gc_lavado", "Lavado / Pulido"),
-        ("gc_gnc", "GNC"),
-        ("gc_grabado_autopartes", "Grabado autopartes"),
-        ("gc_vtv", "VTV"),
-        ("gc_verificacion", "Verificacion policial"),
-        ("gc_patentes", "Patentes"),
-        ("gc_otros", "Otros"),
+    # 🔴 FILTRO CLAVE: SI EL SALDO ES 0, NO SE MUESTRA
+    gastos_ingreso = [
+        {**g, "ente_sugerido": ENTE_SUGERIDO.get(g["key"], "")}
+        for g in lectura["conceptos"]
+        if g["saldo"] > 0
     ]
-    gastos_conc_items = []
-    total_gastos_conc = Decimal("0")
-    for campo, label in GASTOS_CONC_CAMPOS:
-        monto = getattr(ficha, campo, None) or Decimal("0")
-        gastos_conc_items.append({"campo": campo, "label": label, "monto": monto})
-        total_gastos_conc += Decimal(monto)
+    total_pendiente = lectura["total_pendiente"]
 
-    gastos_extras = GastoConcesionario.objects.filter(vehiculo=vehiculo)
-    total_extras = gastos_extras.aggregate(t=Sum("monto"))["t"] or Decimal("0")
-    total_gastos_conc += total_extras
+    # Gastos concesionario
+    gastos_conc_items, gastos_extras, total_extras = _gastos_conc_ficha(vehiculo, ficha)
+    total_gastos_conc = sum((i["monto"] for i in gastos_conc_items), Decimal("0")) + total_extras
 
     # Pago de gastos de concesionario (mismo patrón que gastos de ingreso)
     ctx_pago_conc = construir_gastos_conc_pago(vehiculo, ficha, gastos_extras)
@@ -920,131 +826,29 @@ def guardar_ficha_vehicular(request, vehiculo_id):
 # FICHA COMPLETA – DEFINITIVA
 # ============================================
 def ficha_completa(request, vehiculo_id):
-    vehiculo = get_object_or_404(Vehiculo, id=vehiculo_id)
-    ficha, _ = FichaVehicular.objects.get_or_create(vehiculo=vehiculo)
-    ficha_tec, _ = FichaTecnica.objects.get_or_create(vehiculo=vehiculo)
+    vehiculo, ficha, ficha_tec = _vehiculo_con_fichas(vehiculo_id)
 
     # 🔴 AGREGADO MÍNIMO PARA QUE SE RENDERICEN LAS FECHAS
     ficha_form = FichaVehicularForm(instance=ficha)
     vehiculo_form = VehiculoForm(instance=vehiculo)
     ficha_tecnica_form = FichaTecnicaForm(instance=ficha_tec)
 
-    CONCEPTOS = {
-        "f08": "Formulario 08",
-        "informes": "Informes",
-        "patentes": "Patentes",
-        "infracciones": "Infracciones",
-        "verificacion": "Verificación",
-        "autopartes": "Autopartes",
-        "vtv": "VTV",
-        "r541": "R541",
-        "firmas": "Firmas",
-    }
-
-    mapa_gastos = {
-        "f08": ficha.gasto_f08,
-        "informes": ficha.gasto_informes,
-        "patentes": ficha.gasto_patentes,
-        "infracciones": ficha.gasto_infracciones,
-        "verificacion": ficha.gasto_verificacion,
-        "autopartes": ficha.gasto_autopartes,
-        "vtv": ficha.gasto_vtv,
-        "r541": ficha.gasto_r541,
-        "firmas": ficha.gasto_firmas,
-    }
-
-    gastos_ingreso = []
-
-    for key, monto in mapa_gastos.items():
-        if monto is None:
-            continue
-
-        monto = Decimal(monto)
-        if monto <= 0:
-            continue
-
-        # Saldo del vehículo = deuda con el ENTE. Solo lo bajan los pagos en
-        # los que el ente quedó pagado (prov_directo, cli_directo, cli_adelanto,
-        # prov_reintegro).
-        total_pagado = (
-            PagoGastoIngreso.objects.filter(
-                vehiculo=vehiculo,
-                concepto=key,
-                situacion__in=["prov_directo", "cli_directo", "cli_adelanto", "prov_reintegro"],
-            ).aggregate(total=Sum("monto"))["total"]
-            or Decimal("0")
-        )
-
-        saldo = monto - Decimal(total_pagado)
-
-        # Cobrado al cliente pero todavía no pagado al organismo (situación 2):
-        # impaga por concesionario. Se muestra como informativo.
-        cobrado_informativo = (
-            PagoGastoIngreso.objects.filter(
-                vehiculo=vehiculo,
-                concepto=key,
-                situacion="cli_concesion",
-            ).aggregate(total=Sum("monto"))["total"]
-            or Decimal("0")
-        )
-
-        # 🆕 OBTENER HISTORIAL DE PAGOS DE ESTE CONCEPTO (todos)
-        pagos = PagoGastoIngreso.objects.filter(
-            vehiculo=vehiculo,
-            concepto=key
-        ).order_by('-fecha_pago')
-
-        # 🔴 SI EL SALDO ES 0, MARCAMOS COMO PAGADO PERO LO MOSTRAMOS
-        esta_pagado = saldo <= 0
-
-        gastos_ingreso.append({
-            "key": key,
-            "concepto": CONCEPTOS[key],
-            "monto": monto,
-            "total_pagado": total_pagado,
-            "cobrado_informativo": cobrado_informativo,
-            "saldo": saldo,
-            "pagos": pagos,
-            "esta_pagado": esta_pagado,
-            "ente_sugerido": ENTE_SUGERIDO.get(key, ""),
-        })
-
-    total_pendiente = sum(
-        (g["saldo"] for g in gastos_ingreso if g["saldo"] > 0),
-        Decimal("0")
-    )
+    # Saldo del vehículo = deuda con el ENTE; lo cobrado al cliente y no
+    # pagado al organismo va como informativo. Los conceptos saldados
+    # también se muestran (marcados como pagados) con su historial.
+    from vehiculos.services import gastos_ingreso_ficha
+    lectura = gastos_ingreso_ficha(ficha)
+    gastos_ingreso = [
+        {**g, "ente_sugerido": ENTE_SUGERIDO.get(g["key"], "")}
+        for g in lectura["conceptos"]
+    ]
+    total_pendiente = lectura["total_pendiente"]
 
     # =============================
     # GASTOS DE CONCESIONARIO
     # =============================
-    GASTOS_CONC_CAMPOS = [
-        ("gc_service", "Service"),
-        ("gc_mecanica", "Mecanica"),
-        ("gc_chapa_pintura", "Chapa y pintura"),
-        ("gc_tapizado", "Tapizado"),
-        ("gc_neumaticos", "Neumaticos"),
-        ("gc_vidrios", "Vidrios"),
-        ("gc_cerrajeria", "Cerrajeria"),
-        ("gc_lavado", "Lavado / Pulido"),
-        ("gc_gnc", "GNC"),
-        ("gc_grabado_autopartes", "Grabado autopartes"),
-        ("gc_vtv", "VTV"),
-        ("gc_verificacion", "Verificacion policial"),
-        ("gc_patentes", "Patentes"),
-        ("gc_otros", "Otros"),
-    ]
-
-    gastos_conc_items = []
-    total_gastos_conc = Decimal("0")
-    for campo, label in GASTOS_CONC_CAMPOS:
-        monto = getattr(ficha, campo, None) or Decimal("0")
-        gastos_conc_items.append({"campo": campo, "label": label, "monto": monto})
-        total_gastos_conc += Decimal(monto)
-
-    # Gastos extras (modelo GastoConcesionario)
-    gastos_extras = GastoConcesionario.objects.filter(vehiculo=vehiculo)
-    total_extras = gastos_extras.aggregate(t=Sum("monto"))["t"] or Decimal("0")
-    total_gastos_conc += total_extras
+    gastos_conc_items, gastos_extras, total_extras = _gastos_conc_ficha(vehiculo, ficha)
+    total_gastos_conc = sum((i["monto"] for i in gastos_conc_items), Decimal("0")) + total_extras
 
     # Pago de gastos de concesionario (mismo patrón que gastos de ingreso)
     ctx_pago_conc = construir_gastos_conc_pago(vehiculo, ficha, gastos_extras)
@@ -1282,7 +1086,7 @@ def gastos_adeudados_pdf(request, vehiculo_id):
     """
     from reportes.pdf_utils import render_pdf_listado
 
-    vehiculo = get_object_or_404(Vehiculo, id=vehiculo_id)
+    vehiculo = get_object_or_404(Vehiculo.objects.select_related("ficha"), id=vehiculo_id)
     ficha = getattr(vehiculo, "ficha", None)
 
     def money(v):
@@ -1291,54 +1095,19 @@ def gastos_adeudados_pdf(request, vehiculo_id):
         except Exception:
             return "$ 0,00"
 
-    CONCEPTOS = {
-        "f08": "Formulario 08",
-        "informes": "Informes",
-        "patentes": "Patentes",
-        "infracciones": "Infracciones",
-        "verificacion": "Verificación",
-        "autopartes": "Autopartes",
-        "vtv": "VTV",
-        "r541": "R541",
-        "firmas": "Firmas",
-    }
-
     filas = []
     total_adeudado = Decimal("0")
     if ficha:
-        mapa = {
-            "f08": ficha.gasto_f08,
-            "informes": ficha.gasto_informes,
-            "patentes": ficha.gasto_patentes,
-            "infracciones": ficha.gasto_infracciones,
-            "verificacion": ficha.gasto_verificacion,
-            "autopartes": ficha.gasto_autopartes,
-            "vtv": ficha.gasto_vtv,
-            "r541": ficha.gasto_r541,
-            "firmas": ficha.gasto_firmas,
-        }
-        for key, monto in mapa.items():
-            if monto is None:
-                continue
-            monto = Decimal(monto)
-            if monto <= 0:
-                continue
-            pagado = (
-                PagoGastoIngreso.objects.filter(
-                    vehiculo=vehiculo, concepto=key, mantiene_deuda_vehiculo=False
-                )
-                .aggregate(total=Sum("monto"))["total"]
-                or Decimal("0")
-            )
-            saldo = monto - Decimal(pagado)
-            if saldo <= 0:
+        from vehiculos.services import gastos_ingreso_ficha
+        for g in gastos_ingreso_ficha(ficha)["conceptos"]:
+            if g["saldo"] <= 0:
                 continue  # solo lo que se adeuda
-            total_adeudado += saldo
+            total_adeudado += g["saldo"]
             filas.append([
-                CONCEPTOS.get(key, key),
-                money(monto),
-                money(pagado),
-                money(saldo),
+                g["concepto"],
+                money(g["monto"]),
+                money(g["total_pagado"]),
+                money(g["saldo"]),
             ])
 
     dominio = getattr(vehiculo, "dominio", "") or "—"
@@ -1355,9 +1124,6 @@ def gastos_adeudados_pdf(request, vehiculo_id):
 # ==========================================================
 # REGISTRAR PAGO DE GASTO DE INGRESO (DEFINITIVO)
 # ==========================================================
-from cuentas.models import MovimientoCuenta
-
-
 CONCEPTOS_GASTO = {
     "f08": "Formulario 08",
     "informes": "Informes",
@@ -1522,6 +1288,7 @@ def registrar_pago_gasto(request):
                 descripcion=f"Gasto de ingreso adelantado: {label} — el cliente lo debe {marca}",
                 tipo="debe", monto=monto, origen="manual",
             )
+            espejos.vincular(pago, "mov_debe", mov)
             pago.movimiento_cuenta_id = mov.pk
             pago.save(update_fields=["movimiento_cuenta_id"])
             cuenta.recalcular_saldo()
@@ -1537,11 +1304,12 @@ def registrar_pago_gasto(request):
                 descripcion=f"Gasto de ingreso: {label} {marca}",
                 tipo="debe", monto=monto, origen="manual",
             )
-            MovimientoCuenta.objects.create(
+            mov_haber = MovimientoCuenta.objects.create(
                 cuenta=cuenta, vehiculo=vehiculo,
                 descripcion=f"Pago del cliente por {label} (pendiente de pagar al organismo) {marca}",
                 tipo="haber", monto=monto, origen="manual",
             )
+            espejos.vincular_lote([(pago, "mov_debe", mov_debe), (pago, "mov_haber", mov_haber)])
             pago.movimiento_cuenta_id = mov_debe.pk
             pago.save(update_fields=["movimiento_cuenta_id"])
             cuenta.recalcular_saldo()
@@ -1616,34 +1384,14 @@ def registrar_pagos_gastos_lote(request):
         messages.error(request, "El vehículo no tiene ficha vehicular.")
         return redirect("vehiculos:ficha_completa", vehiculo_id=vehiculo.id)
 
-    CONCEPTOS = {
-        "f08": "Formulario 08",
-        "informes": "Informes",
-        "patentes": "Patentes",
-        "infracciones": "Infracciones",
-        "verificacion": "Verificación",
-        "autopartes": "Autopartes",
-        "vtv": "VTV",
-        "r541": "R541",
-        "firmas": "Firmas",
-    }
-
-    mapa_gastos = {
-        "f08": ficha.gasto_f08, "informes": ficha.gasto_informes,
-        "patentes": ficha.gasto_patentes, "infracciones": ficha.gasto_infracciones,
-        "verificacion": ficha.gasto_verificacion, "autopartes": ficha.gasto_autopartes,
-        "vtv": ficha.gasto_vtv, "r541": ficha.gasto_r541, "firmas": ficha.gasto_firmas,
-    }
-
     cuenta = None
     if hasattr(vehiculo, "venta") and vehiculo.venta:
         if hasattr(vehiculo.venta, "cuenta_corriente"):
             cuenta = vehiculo.venta.cuenta_corriente
 
-    creados = 0
+    montos = {}
     saltados = []
-
-    for key, label in CONCEPTOS.items():
+    for key, label in CONCEPTOS_GASTO.items():
         monto_raw = (request.POST.get(f"monto_{key}") or "").strip()
         if not monto_raw:
             continue
@@ -1652,67 +1400,21 @@ def registrar_pagos_gastos_lote(request):
         except Exception:
             saltados.append(f"{label} (monto inválido)")
             continue
-        if monto <= 0:
-            continue
-
-        monto_total = mapa_gastos.get(key) or Decimal("0")
-        ya_pagado = (
-            PagoGastoIngreso.objects.filter(
-                vehiculo=vehiculo, concepto=key,
-                situacion__in=["prov_directo", "cli_directo", "cli_adelanto", "prov_reintegro"],
-            )
-            .aggregate(total=Sum("monto"))["total"] or Decimal("0")
-        )
-        saldo = Decimal(monto_total) - Decimal(ya_pagado)
-        if not mantiene_deuda:
-            if saldo <= 0:
-                saltados.append(f"{label} (ya pagado)")
-                continue
-            if monto > saldo:
-                monto = saldo
-
-        # Situación según proveedor en Titularidad. En lote: pagos directos
-        # (saldados) salvo que se tilde "cliente me pagó, no pagué al organismo".
-        if ficha.vendedor_id:
-            pertenece, situacion = "proveedor", "prov_directo"
-        elif mantiene_deuda:
-            pertenece, situacion = "cliente", "cli_concesion"
-        else:
-            pertenece, situacion = "cliente", "cli_directo"
-        saldado = situacion in ("prov_directo", "cli_directo")
-
-        pago = PagoGastoIngreso.objects.create(
-            vehiculo=vehiculo,
-            concepto=key,
-            fecha_pago=fecha_pago,
-            monto=monto,
-            observaciones=observaciones_comunes,
-            pertenece=pertenece,
-            situacion=situacion,
-            ente=ENTE_SUGERIDO.get(key, ""),
-            saldado=saldado,
-            fecha_saldado=fecha_pago if saldado else None,
-            mantiene_deuda_vehiculo=(situacion == "cli_concesion"),
-        )
-        creados += 1
-
-        # Situación 2 en lote: reflejar el cobro del cliente (debe + haber).
-        if situacion == "cli_concesion" and cuenta:
-            marca = f"[GI:{pago.pk}]"
-            mov_debe = MovimientoCuenta.objects.create(
-                cuenta=cuenta, vehiculo=vehiculo,
-                descripcion=f"Gasto de ingreso: {label} {marca}",
-                tipo="debe", monto=monto, origen="manual",
-            )
-            MovimientoCuenta.objects.create(
-                cuenta=cuenta, vehiculo=vehiculo,
-                descripcion=f"Pago del cliente por {label} (pendiente de pagar al organismo) {marca}",
-                tipo="haber", monto=monto, origen="manual",
-            )
-            pago.movimiento_cuenta_id = mov_debe.pk
-            pago.save(update_fields=["movimiento_cuenta_id"])
+        if monto > 0:
+            montos[key] = monto
+
+    from vehiculos import services
+    pagos, ya_pagados = services.registrar_pagos_gastos_lote(
+        ficha, montos, fecha_pago,
+        observaciones=observaciones_comunes,
+        mantiene_deuda=mantiene_deuda,
+        cuenta=cuenta,
+        entes=ENTE_SUGERIDO,
+    )
+    creados = len(pagos)
+    saltados += ya_pagados
 
-    if cuenta:
+    if cuenta and creados:
         cuenta.recalcular_saldo()
 
     if creados:
@@ -1821,16 +1523,16 @@ def recibo_gastos_pagados_pdf(request, vehiculo_id):
     con el total abonado al pie."""
     from reportes.pdf_utils import render_pdf_listado
 
-    vehiculo = get_object_or_404(Vehiculo, id=vehiculo_id)
+    vehiculo = get_object_or_404(Vehiculo.objects.select_related("ficha"), id=vehiculo_id)
 
     # Pagos registrados de gastos de ingreso (excluye los que quedaron
     # marcados como pendientes / sin abonar).
-    pagos = (
-        PagoGastoIngreso.objects
-        .filter(vehiculo=vehiculo)
-        .exclude(situacion="pendiente")
-        .order_by("fecha_pago", "id")
-    )
+    from vehiculos.services import gastos_ingreso_ficha
+    ficha = getattr(vehiculo, "ficha", None) or FichaVehicular(vehiculo=vehiculo)
+    pagos = [
+        p for p in gastos_ingreso_ficha(ficha)["pagos"]
+        if p.situacion != "pendiente"
+    ]
 
     veh = f"{vehiculo.marca} {vehiculo.modelo}"
     if vehiculo.dominio:
@@ -1940,15 +1642,16 @@ def eliminar_pago_gasto(request, pago_id):
 
     if request.method == "POST":
         # Revertir lo que el pago haya generado en otros módulos:
-        # - movimientos en la cuenta corriente (marcados con [GI:pk])
+        # - movimientos en la cuenta corriente (vinculados al pago)
         # - reintegro del proveedor
         # - pago futuro en Agenda de Pagos
         from cuentas.models import MovimientoCuenta as _Mov
         cuenta = None
-        movs = _Mov.objects.filter(descripcion__contains=f"[GI:{pago.pk}]")
+        movs = [m for m in espejos.resolver(pago).values() if isinstance(m, _Mov)]
         for m in movs:
             cuenta = m.cuenta
-        movs.delete()
+            m.delete()
+        espejos.desvincular(pago)
         if cuenta:
             cuenta.recalcular_saldo()
 
@@ -2304,10 +2007,9 @@ def stock_pdf(request):
     Acepta filtros: estado, q, marca, anio_min, anio_max, precio_min, precio_max.
     Acepta columnas opcionales: col_dominio, col_anio, col_km, col_precio, col_dias, col_carpeta.
     """
-    from io import BytesIO
     from datetime import date as _date
+    from reportes.pdf_utils import render_pdf_listado
 
-    query = request.GET.get("q", "")
     estado_filtro = request.GET.get("estado", "")
     marca_filtro = request.GET.get("marca", "").strip()
     anio_min = request.GET.get("anio_min", "")
@@ -2333,79 +2035,8 @@ def stock_pdf(request):
     if not ver_precio:
         col_precio = None
 
-    vehiculos = Vehiculo.objects.all().order_by("-id")
-
-    if query:
-        vehiculos = vehiculos.filter(
-            Q(marca__icontains=query)
-            | Q(modelo__icontains=query)
-            | Q(dominio__icontains=query)
-        )
-
-    # ¿Incluir también los "a ingresar"? (check opcional del modal). Suma esos
-    # vehículos al filtro de estado elegido (salvo que ya estén incluidos).
-    incluir_a_ingresar = request.GET.get("incluir_a_ingresar") == "1"
-
-    # Filtrar por estado:
-    # - "" o "activos"  -> todo lo no vendido (a_ingresar + stock + temporal + reventa)
-    # - "stock"         -> stock + temporal (lo que está disponible)
-    # - "todos"         -> absolutamente todos los vehículos
-    # - cualquier otro  -> filtro exacto por ese estado
-    if estado_filtro in ("", "activos"):
-        # "activos" ya incluye los "a ingresar" (solo excluye vendidos).
-        vehiculos = vehiculos.exclude(estado="vendido")
-    elif estado_filtro == "stock":
-        estados = ["stock", "temporal"]
-        if incluir_a_ingresar:
-            estados.append("a_ingresar")
-        vehiculos = vehiculos.filter(estado__in=estados)
-    elif estado_filtro == "todos":
-        pass  # sin filtro de estado
-    else:
-        # Filtro exacto por un estado (temporal, reventa, vendido, a_ingresar…),
-        # sumando los "a ingresar" si se pidió.
-        estados = [estado_filtro]
-        if incluir_a_ingresar and estado_filtro != "a_ingresar":
-            estados.append("a_ingresar")
-        vehiculos = vehiculos.filter(estado__in=estados)
-
-    if marca_filtro:
-        vehiculos = vehiculos.filter(marca__icontains=marca_filtro)
-
-    if anio_min:
-        try:
-            vehiculos = vehiculos.filter(anio__gte=int(anio_min))
-        except ValueError:
-            pass
-
-    if anio_max:
-        try:
-            vehiculos = vehiculos.filter(anio__lte=int(anio_max))
-        except ValueError:
-            pass
-
-    if precio_min:
-        try:
-            from decimal import Decimal
-            vehiculos = vehiculos.filter(precio__gte=Decimal(precio_min))
-        except Exception:
-            pass
-
-    if precio_max:
-        try:
-            from decimal import Decimal
-            vehiculos = vehiculos.filter(precio__lte=Decimal(precio_max))
-        except Exception:
-            pass
-
-    # Calcular días en stock
-    hoy = _date.today()
-    vehiculos_data = []
-    for v in vehiculos:
-        dias = None
-        if hasattr(v, 'ficha_reporte') and v.ficha_reporte and v.ficha_reporte.fecha_compra:
-            dias = (hoy - v.ficha_reporte.fecha_compra).days
-        vehiculos_data.append((v, dias))
+    # Misma consulta (búsqueda y filtros) que la lista de vehículos.
+    vehiculos = listados.vehiculos_pdf(request.GET)
 
     precio_header = "Precio reventa" if precio_tipo == "reventa" else "Precio"
 
@@ -2438,79 +2069,36 @@ def stock_pdf(request):
         if ver_precio:
             columnas.insert(4, (precio_header, 0.16))
 
-    # Ajustar anchos proporcionalmente
-    total_w = sum(c[1] for c in columnas)
-    columnas = [(name, w / total_w) for name, w in columnas]
-
-    encabezado = [c[0] for c in columnas]
-    filas = [encabezado]
-
-    # Estilo para que el modelo haga wrap en celdas
-    modelo_style = ParagraphStyle(
-        "modelo",
-        fontSize=9,
-        leading=11,
-        fontName="Helvetica",
-    )
-
-    for v, dias in vehiculos_data:
-        modelo_txt = f"{v.marca} {v.modelo}"
-        fila = [Paragraph(modelo_txt, modelo_style)]
-        for col_name, _ in columnas[1:]:
-            if col_name == "Carpeta":
-                fila.append(v.numero_carpeta or "–")
-            elif col_name == "Dominio":
-                fila.append(v.dominio or "–")
-            elif col_name == "Año":
-                fila.append(str(v.anio))
-            elif col_name == "Kilómetros":
-                fila.append(f"{v.kilometros:,}".replace(",", ".") if v.kilometros else "–")
-            elif col_name in ("Precio", "Precio reventa"):
-                if precio_tipo == "reventa":
-                    valor_precio = v.precio_reventa if v.precio_reventa is not None else v.precio
-                else:
-                    valor_precio = v.precio
-                fila.append(f"$ {valor_precio:,.0f}".replace(",", "."))
-            elif col_name == "Días":
-                fila.append(f"{dias}d" if dias is not None else "–")
-        filas.append(fila)
-
-    if len(filas) == 1:
-        filas.append(["Sin vehículos"] + [""] * (len(columnas) - 1))
-
-    # ── Respuesta PDF ─────────────────────────────────────
-    buffer = BytesIO()
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=30,
-        leftMargin=30,
-        topMargin=30,
-        bottomMargin=30,
-    )
-
-    title_style = ParagraphStyle(
-        "title",
-        fontSize=18,
-        textColor=colors.HexColor("#002855"),
-        alignment=1,
-        fontName="Helvetica-Bold",
-        spaceAfter=4,
-    )
-    subtitle_style = ParagraphStyle(
-        "subtitle",
-        fontSize=10,
-        alignment=1,
-        textColor=colors.HexColor("#555555"),
-        spaceAfter=16,
-    )
-
-    AZUL = colors.HexColor("#002855")
-    AZUL_CLARO = colors.HexColor("#dce9f7")
+    # Filas en streaming: solo los valores que se imprimen, sin instanciar
+    # modelos ni cargar el listado entero en memoria.
+    hoy = _date.today()
 
-    elements = []
-    elements.append(Paragraph("AMICHETTI AUTOMOTORES", title_style))
+    def celda(v, col_name):
+        if col_name == "Carpeta":
+            return v["numero_carpeta"] or "–"
+        if col_name == "Dominio":
+            return v["dominio"] or "–"
+        if col_name == "Año":
+            return str(v["anio"])
+        if col_name == "Kilómetros":
+            return f"{v['kilometros']:,}".replace(",", ".") if v["kilometros"] else "–"
+        if col_name in ("Precio", "Precio reventa"):
+            valor_precio = v["precio"]
+            if precio_tipo == "reventa" and v["precio_reventa"] is not None:
+                valor_precio = v["precio_reventa"]
+            return f"$ {valor_precio:,.0f}".replace(",", ".")
+        if col_name == "Días":
+            compra = v["ficha_reporte__fecha_compra"]
+            return f"{(hoy - compra).days}d" if compra else "–"
+        return ""
+
+    def filas():
+        valores = vehiculos.values(
+            "marca", "modelo", "numero_carpeta", "dominio", "anio", "kilometros",
+            "precio", "precio_reventa", "ficha_reporte__fecha_compra",
+        )
+        for v in valores.iterator(chunk_size=500):
+            yield [f"{v['marca']} {v['modelo']}"] + [celda(v, c) for c, _ in columnas[1:]]
 
     label_estado = {
         "stock": "En stock",
@@ -2529,66 +2117,49 @@ def stock_pdf(request):
         filtros_txt.append(f"Precio: ${precio_min or '...'} – ${precio_max or '...'}")
     filtros_str = (" &nbsp;|&nbsp; ".join(filtros_txt)) if filtros_txt else ""
 
-    sub = f"Listado de vehículos – {label_estado} &nbsp;|&nbsp; {hoy.strftime('%d/%m/%Y')}"
+    sub = hoy.strftime('%d/%m/%Y')
     if precio_tipo == "reventa":
         sub += " &nbsp;|&nbsp; Precios de reventa"
     if filtros_str:
         sub += f"<br/><font size='8'>{filtros_str}</font>"
 
-    elements.append(Paragraph(sub, subtitle_style))
-
-    # ── Tabla ─────────────────────────────────────────────
-    col_widths = [doc.width * w for _, w in columnas]
-
-    tabla = Table(filas, colWidths=col_widths, repeatRows=1)
-
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), AZUL),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, 0), 10),
-        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-        ("FONTSIZE", (0, 1), (-1, -1), 9),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, AZUL_CLARO]),
-        ("ALIGN", (0, 1), (0, -1), "LEFT"),
-        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-        ("ALIGN", (-1, 1), (-1, -1), "RIGHT"),
-        ("GRID", (0, 0), (-1, -1), 0.4, colors.HexColor("#aaaaaa")),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 5),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-    ]))
-
-    elements.append(tabla)
-
-    # ── Pie ───────────────────────────────────────────────
-    elements.append(Spacer(1, 16))
-    pie_style = ParagraphStyle(
-        "pie",
-        fontSize=8,
-        textColor=colors.HexColor("#888888"),
-        alignment=1,
-    )
-    elements.append(
-        Paragraph(
-            f"Total de vehículos: {len(filas) - 1}",
-            pie_style,
-        )
+    return render_pdf_listado(
+        filename="stock_vehiculos.pdf",
+        titulo=f"Listado de vehículos – {label_estado}",
+        subtitulo=sub,
+        columnas=[c[0] for c in columnas],
+        filas=filas(),
+        anchos=[c[1] for c in columnas],
+        pie=lambda n: f"Total de vehículos: {n}" if n else "Sin vehículos",
     )
 
-    doc.build(elements)
-
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type="application/pdf")
-    response["Content-Disposition"] = 'inline; filename="stock_vehiculos.pdf"'
-    return response
-
 
 # ==========================================================
 # FICHA VEHICULAR PDF
 # ==========================================================
+# Estilos de la ficha: se arman una vez por proceso (ver reportes.pdf_utils)
+_ESTILO_SECCION_FICHA = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONT", (0, 0), (0, -1), "Helvetica-Bold"),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+])
+
+
+def _estilos_ficha():
+    """(título, subtítulo, título de sección) – identidad Amichetti."""
+    from reportes.pdf_utils import COLOR_AZUL, estilo
+
+    return (
+        estilo("title", fontSize=18, textColor=COLOR_AZUL, alignment=1,
+               fontName="Helvetica-Bold", spaceAfter=6),
+        estilo("subtitle", fontSize=11, alignment=1, spaceAfter=16),
+        estilo("section", fontSize=11, textColor=colors.white, backColor=COLOR_AZUL,
+               fontName="Helvetica-Bold", leftIndent=6, spaceBefore=12, spaceAfter=6),
+    )
+
+
 def ficha_vehicular_pdf(request, vehiculo_id):
     vehiculo = get_object_or_404(Vehiculo, id=vehiculo_id)
     ficha = vehiculo.ficha
@@ -2618,38 +2189,8 @@ def ficha_vehicular_pdf(request, vehiculo_id):
         bottomMargin=30
     )
 
-    styles = getSampleStyleSheet()
     elements = []
-
-    # ==================================================
-    # ESTILOS – IDENTIDAD AMICHETTI
-    # ==================================================
-    title_style = ParagraphStyle(
-        "title",
-        fontSize=18,
-        textColor=colors.HexColor("#002855"),
-        alignment=1,
-        fontName="Helvetica-Bold",
-        spaceAfter=6
-    )
-
-    subtitle_style = ParagraphStyle(
-        "subtitle",
-        fontSize=11,
-        alignment=1,
-        spaceAfter=16
-    )
-
-    section_title_style = ParagraphStyle(
-        "section",
-        fontSize=11,
-        textColor=colors.white,
-        backColor=colors.HexColor("#002855"),
-        fontName="Helvetica-Bold",
-        leftIndent=6,
-        spaceBefore=12,
-        spaceAfter=6
-    )
+    title_style, subtitle_style, section_title_style = _estilos_ficha()
 
     # ==================================================
     # HEADER
@@ -2668,13 +2209,7 @@ def ficha_vehicular_pdf(request, vehiculo_id):
             colWidths=[doc.width * 0.35, doc.width * 0.65]
         )
 
-        table.setStyle(TableStyle([
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("FONT", (0, 0), (0, -1), "Helvetica-Bold"),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ]))
+        table.setStyle(_ESTILO_SECCION_FICHA)
 
         elements.append(table)
 
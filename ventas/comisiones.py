@@ -0,0 +1,87 @@
+"""
+Tablero de comisiones por vendedor.
+
+    comisiones.vendedores()   -> usuarios con `n_ventas`, `comisiones`, `pagos` y `saldo_anotado`
+    comisiones.tablero()      -> (filas, total_adeudado)
+
+Los vendedores salen de una sola query de User con subqueries agrupadas
+(ventas, comisiones y pagos), así que el tablero cuesta lo mismo con 2 o
+con 50 vendedores. Las cuentas que faltan se crean juntas con un
+bulk_create la primera vez que el vendedor aparece.
+
+El saldo guardado en `CuentaVendedor.saldo` lo mantienen los movimientos
+con deltas atómicos (ver `MovimientoComision.save`).
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db.models import Count, DecimalField, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import CuentaVendedor, MovimientoComision, Venta
+
+# Dueños que NO cobran comisión (no aparecen en Comisiones).
+VENDEDORES_SIN_COMISION = {"hamichetti"}
+
+_MONTO = DecimalField(max_digits=14, decimal_places=2)
+_CERO = Value(Decimal("0"))
+
+
+def _suma(tipo):
+    return Subquery(
+        MovimientoComision.objects
+        .filter(cuenta__vendedor=OuterRef("pk"), tipo=tipo)
+        .order_by().values("cuenta__vendedor").annotate(t=Sum("monto")).values("t")[:1]
+    )
+
+
+def vendedores():
+    """
+    Todos los que figuran como vendedor en alguna venta + los que ya tienen
+    cuenta de comisiones, excluyendo a los dueños sin comisión.
+    """
+    ventas = Venta.objects.filter(vendido_por=OuterRef("pk"))
+    n_ventas = ventas.order_by().values("vendido_por").annotate(n=Count("pk")).values("n")[:1]
+    excluidos = Q()
+    for username in VENDEDORES_SIN_COMISION:
+        excluidos |= Q(username__iexact=username)
+    return (
+        User.objects
+        .filter(Q(Exists(ventas)) | Q(cuenta_comisiones__isnull=False))
+        .exclude(excluidos)
+        .annotate(
+            cuenta_id=F("cuenta_comisiones__id"),
+            n_ventas=Coalesce(Subquery(n_ventas), Value(0), output_field=IntegerField()),
+            comisiones=Coalesce(_suma("comision"), _CERO, output_field=_MONTO),
+            pagos=Coalesce(_suma("pago"), _CERO, output_field=_MONTO),
+        )
+        .annotate(saldo_anotado=F("comisiones") - F("pagos"))
+        .order_by("first_name", "username")
+    )
+
+
+def asegurar_cuentas(usuarios):
+    """Crea en un solo INSERT las cuentas de los vendedores que no tienen."""
+    faltan = [u.pk for u in usuarios if u.cuenta_id is None]
+    if faltan:
+        CuentaVendedor.objects.bulk_create(
+            [CuentaVendedor(vendedor_id=pk) for pk in faltan], ignore_conflicts=True,
+        )
+    return len(faltan)
+
+
+def tablero():
+    """(filas, total_adeudado) del tablero de comisiones."""
+    usuarios = list(vendedores())
+    asegurar_cuentas(usuarios)
+    filas = [
+        {
+            "vendedor": u,
+            "n_ventas": u.n_ventas,
+            "comisiones": u.comisiones,
+            "pagos": u.pagos,
+            "saldo": u.saldo_anotado,
+        }
+        for u in usuarios
+    ]
+    return filas, sum((f["saldo"] for f in filas), Decimal("0"))
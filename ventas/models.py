@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from vehiculos.models import Vehiculo
 from clientes.models import Cliente
@@ -231,6 +231,11 @@ class CuentaVendedor(models.Model):
         return f"{nombre} – Saldo: ${self.saldo}"
 
     def recalcular_saldo(self):
+        """
+        Rearma el saldo desde los movimientos. Los movimientos ya lo
+        mantienen con deltas (ver MovimientoComision.save); esto queda para
+        corregir datos cargados por fuera del ORM.
+        """
         from django.db.models import Sum
         comisiones = self.movimientos.filter(tipo="comision").aggregate(
             t=Sum("monto")
@@ -273,12 +278,55 @@ class MovimientoComision(models.Model):
     def __str__(self):
         return f"{self.get_tipo_display()} ${self.monto} – {self.cuenta}"
 
+    # ------------------------------------------------------
+    # Saldo de la cuenta: se ajusta con un delta atómico
+    # (UPDATE saldo = saldo + x) en lugar de re-sumar todos los
+    # movimientos. Los valores con los que se leyó la fila quedan
+    # en `_original` para calcular el delta al editar.
+    # ------------------------------------------------------
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        if {"cuenta_id", "tipo", "monto"} <= set(field_names):
+            instancia._original = instancia._aporte()
+        return instancia
+
+    def _aporte(self):
+        """(cuenta_id, efecto sobre el saldo) de este movimiento."""
+        signo = 1 if self.tipo == "comision" else -1
+        return self.cuenta_id, signo * (self.monto or Decimal("0"))
+
+    @staticmethod
+    def _ajustar(cuenta_id, delta):
+        if delta:
+            CuentaVendedor.objects.filter(pk=cuenta_id).update(saldo=models.F("saldo") + delta)
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.cuenta.recalcular_saldo()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"cuenta", "cuenta_id", "tipo", "monto"} & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        anterior = None
+        if not self._state.adding:
+            anterior = getattr(self, "_original", None)
+            if anterior is None:
+                original = MovimientoComision.objects.filter(pk=self.pk).first()
+                anterior = original._aporte() if original else None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            actual = self._aporte()
+            if anterior and anterior[0] == actual[0]:
+                self._ajustar(actual[0], actual[1] - anterior[1])
+            else:
+                if anterior:
+                    self._ajustar(anterior[0], -anterior[1])
+                self._ajustar(*actual)
+        self._original = actual
 
     def delete(self, *args, **kwargs):
-        cuenta = self.cuenta
-        super().delete(*args, **kwargs)
-        cuenta.recalcular_saldo()
+        cuenta_id, aporte = getattr(self, "_original", None) or self._aporte()
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            self._ajustar(cuenta_id, -aporte)
+        return resultado
 
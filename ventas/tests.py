@@ -0,0 +1,112 @@
+"""
+Tests de las comisiones por vendedor: el saldo de la cuenta se mantiene con
+deltas al escribir movimientos y el tablero sale de una query de User.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import comisiones
+from .models import CuentaVendedor, MovimientoComision, Venta
+
+
+class SaldoComisionesTests(TestCase):
+    def setUp(self):
+        self.vendedor = User.objects.create_user("juan", first_name="Juan")
+        self.cuenta = CuentaVendedor.objects.create(vendedor=self.vendedor)
+
+    def _saldo(self, cuenta=None):
+        return CuentaVendedor.objects.get(pk=(cuenta or self.cuenta).pk).saldo
+
+    def test_deltas_al_crear_editar_y_borrar(self):
+        comision = MovimientoComision.objects.create(cuenta=self.cuenta, tipo="comision", monto=Decimal("1000"))
+        MovimientoComision.objects.create(cuenta=self.cuenta, tipo="pago", monto=Decimal("300"))
+        self.assertEqual(self._saldo(), Decimal("700"))
+
+        # Editar con la instancia leída: un solo UPDATE del saldo, sin aggregates
+        leida = MovimientoComision.objects.get(pk=comision.pk)
+        leida.monto = Decimal("1500")
+        with CaptureQueriesContext(connection) as ctx:
+            leida.save()
+        self.assertFalse([q for q in ctx.captured_queries if "SUM" in q["sql"].upper()])
+        self.assertEqual(self._saldo(), Decimal("1200"))
+
+        # Cambiar de tipo invierte el efecto
+        leida.tipo = "pago"
+        leida.save()
+        self.assertEqual(self._saldo(), Decimal("-1800"))
+
+        # Mover a otra cuenta ajusta las dos
+        otra = CuentaVendedor.objects.create(vendedor=User.objects.create_user("ana"))
+        leida.cuenta = otra
+        leida.save()
+        self.assertEqual((self._saldo(), self._saldo(otra)), (Decimal("-300"), Decimal("-1500")))
+
+        leida.delete()
+        self.assertEqual(self._saldo(otra), Decimal("0"))
+        self.cuenta.recalcular_saldo()
+        self.assertEqual(self._saldo(), Decimal("-300"))
+
+    def test_save_sin_campos_de_saldo_no_toca_la_cuenta(self):
+        mov = MovimientoComision.objects.create(cuenta=self.cuenta, tipo="comision", monto=Decimal("100"))
+        mov.descripcion = "Ajuste"
+        with CaptureQueriesContext(connection) as ctx:
+            mov.save(update_fields=["descripcion"])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(self._saldo(), Decimal("100"))
+
+
+class TableroComisionesTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("Vamichetti", "a@a.com", "x")
+        self.client.force_login(self.admin)
+        self.juan = User.objects.create_user("juan", first_name="Juan")
+        self.dueno = User.objects.create_user("Hamichetti")
+        for _ in range(3):
+            Venta.objects.create(vendido_por=self.juan)
+        Venta.objects.create(vendido_por=self.dueno)
+
+    def test_tablero_y_cuentas_en_bulk(self):
+        filas, total = comisiones.tablero()
+        self.assertEqual([f["vendedor"] for f in filas], [self.juan])
+        self.assertEqual(filas[0]["n_ventas"], 3)
+        self.assertTrue(CuentaVendedor.objects.filter(vendedor=self.juan).exists())
+
+        cuenta = CuentaVendedor.objects.get(vendedor=self.juan)
+        MovimientoComision.objects.create(cuenta=cuenta, tipo="comision", monto=Decimal("500"))
+        MovimientoComision.objects.create(cuenta=cuenta, tipo="pago", monto=Decimal("200"))
+        filas, total = comisiones.tablero()
+        self.assertEqual((filas[0]["comisiones"], filas[0]["pagos"]), (Decimal("500"), Decimal("200")))
+        self.assertEqual(total, Decimal("300"))
+        self.assertEqual(total, CuentaVendedor.objects.get(vendedor=self.juan).saldo)
+
+    def test_vistas_con_queries_constantes(self):
+        url = reverse("ventas:comisiones_vendedores")
+        self.client.get(url, secure=True)  # crea las cuentas que faltan
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+        antes = len(ctx.captured_queries)
+
+        for i in range(4):
+            otro = User.objects.create_user(f"vendedor{i}")
+            Venta.objects.create(vendido_por=otro)
+            CuentaVendedor.objects.create(vendedor=otro)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), antes)
+
+    def test_historial_paginado(self):
+        from .views import COMISIONES_POR_PAGINA
+
+        cuenta = CuentaVendedor.objects.create(vendedor=self.juan)
+        for _ in range(COMISIONES_POR_PAGINA + 5):
+            MovimientoComision.objects.create(cuenta=cuenta, tipo="comision", monto=Decimal("10"))
+        url = reverse("ventas:detalle_comision_vendedor", args=[self.juan.pk])
+        r = self.client.get(url, {"page": 2}, secure=True)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.context["movimientos"]), 5)
+        self.assertEqual(r.context["cuenta"].saldo, Decimal("10") * (COMISIONES_POR_PAGINA + 5))
@@ -16,6 +16,7 @@ from cuentas.models import (
 
 from gestoria.models import Gestoria
 from permisos.views import solo_admin
+from . import comisiones
 from .models import Venta, CuentaVendedor, MovimientoComision
 
 
@@ -392,42 +393,17 @@ def _parse_monto(raw):
     return monto if monto > 0 else None
 
 
-# Dueños que NO cobran comisión (no aparecen en Comisiones).
-VENDEDORES_SIN_COMISION = {"hamichetti"}
+COMISIONES_POR_PAGINA = 50
+VENTAS_POR_PAGINA = 25
 
 
 @solo_admin
 def comisiones_vendedores(request):
     """Una tarjeta por vendedor (excepto Hamichetti) con sus ventas = comisiones
     que se le deben. Aparecen todos los que vendieron, aunque no se les haya
-    cargado todavía ninguna comisión a mano."""
-    from django.contrib.auth.models import User
-    from decimal import Decimal
-
-    # Todos los que figuran como vendedor en alguna venta + los que ya tienen
-    # cuenta de comisiones, EXCLUYENDO a los dueños sin comisión.
-    ids_vendedores = set(
-        Venta.objects
-        .exclude(vendido_por__isnull=True)
-        .values_list("vendido_por_id", flat=True)
-    )
-    ids_vendedores |= set(CuentaVendedor.objects.values_list("vendedor_id", flat=True))
-
-    usuarios = (
-        User.objects
-        .filter(id__in=ids_vendedores)
-        .order_by("first_name", "username")
-    )
-
-    filas = []
-    total_adeudado = Decimal("0")
-    for u in usuarios:
-        if u.username.lower() in VENDEDORES_SIN_COMISION:
-            continue
-        cuenta, _ = CuentaVendedor.objects.get_or_create(vendedor=u)
-        n_ventas = Venta.objects.filter(vendido_por=u).count()
-        filas.append({"vendedor": u, "cuenta": cuenta, "n_ventas": n_ventas})
-        total_adeudado += cuenta.saldo or Decimal("0")
+    cargado todavía ninguna comisión a mano. Una query para todo el tablero
+    (ver ventas.comisiones)."""
+    filas, total_adeudado = comisiones.tablero()
 
     # Usuarios para el modal "cargar comisión" (mismos, sin los excluidos)
     usuarios_modal = [f["vendedor"] for f in filas]
@@ -445,25 +421,26 @@ def comisiones_vendedores(request):
 
 @solo_admin
 def detalle_comision_vendedor(request, user_id):
-    """Detalle de movimientos (comisiones y pagos) de un vendedor."""
+    """Detalle de movimientos (comisiones y pagos) de un vendedor, paginado."""
     from django.contrib.auth.models import User
+    from django.core.paginator import Paginator
 
     vendedor = get_object_or_404(User, id=user_id)
     cuenta, _ = CuentaVendedor.objects.get_or_create(vendedor=vendedor)
 
-    movimientos = (
-        cuenta.movimientos
-        .select_related("venta", "venta__vehiculo")
-        .all()
-    )
+    movimientos = Paginator(
+        cuenta.movimientos.select_related("venta", "venta__vehiculo"),
+        COMISIONES_POR_PAGINA,
+    ).get_page(request.GET.get("page", 1))
 
     # Ventas de este vendedor, para vincularlas al cargar una comisión.
-    ventas_vendedor = (
+    ventas_vendedor = Paginator(
         Venta.objects
         .filter(vendido_por=vendedor)
-        .select_related("vehiculo")
-        .order_by("-id")
-    )
+        .select_related("vehiculo", "cliente")
+        .order_by("-id"),
+        VENTAS_POR_PAGINA,
+    ).get_page(request.GET.get("pv", 1))
 
     return render(
         request,
@@ -535,7 +512,7 @@ def registrar_pago_comision(request):
 
 @solo_admin
 def eliminar_movimiento_comision(request, movimiento_id):
-    """Elimina un movimiento de comisión y recalcula el saldo."""
+    """Elimina un movimiento de comisión (descuenta su efecto del saldo)."""
     movimiento = get_object_or_404(MovimientoComision, id=movimiento_id)
     user_id = movimiento.cuenta.vendedor_id
     if request.method == "POST":
@@ -558,6 +535,6 @@ def editar_movimiento_comision(request, movimiento_id):
             desc = request.POST.get("descripcion")
             if desc is not None:
                 movimiento.descripcion = desc.strip()
-            movimiento.save()  # recalcula el saldo
+            movimiento.save()  # ajusta el saldo con la diferencia
             messages.success(request, "Comisión actualizada.")
     return redirect("ventas:detalle_comision_vendedor", user_id=user_id)
\ No newline at end of file
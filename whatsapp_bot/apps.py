@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class WhatsappBotConfig(AppConfig):
     name = 'whatsapp_bot'
+
+    def ready(self):
+        from . import signals
+        signals.conectar_signals()
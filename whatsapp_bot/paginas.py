@@ -0,0 +1,105 @@
+"""
+Listados paginados del bot (stock / precios).
+
+Las páginas de cada listado se arman una sola vez y se cachean bajo la
+versión actual del stock. Guardar o borrar un Vehiculo sube la versión
+(ver `whatsapp_bot.signals`), así que se regeneran solo cuando el stock
+cambia. Cada respuesta manda UNA página; el número de teléfono guarda en
+el cache un cursor con el listado que está recorriendo y la página en la
+que va, y "más" manda la siguiente.
+
+Versión, páginas y cursores van al cache compartido (settings.CACHES, en
+la base): el "más" puede caer en cualquier worker de gunicorn y el cambio
+de stock que guarda uno lo ven todos.
+
+    texto = paginas.primera(telefono, "stock", "", armar)
+    texto = paginas.siguiente(telefono, {"stock": armar, ...})
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+POR_PAGINA = 15
+
+_VERSION = "whatsapp:stock:version"
+
+
+def ttl_cursor():
+    return getattr(settings, "WHATSAPP_CURSOR_TTL", 1800)
+
+
+def version():
+    actual = cache.get(_VERSION)
+    if actual is None:
+        cache.add(_VERSION, 1, None)
+        actual = cache.get(_VERSION, 1)
+    return actual
+
+
+def invalidar():
+    """El stock cambió: las páginas cacheadas dejan de valer."""
+    try:
+        cache.incr(_VERSION)
+    except ValueError:
+        cache.set(_VERSION, 2, None)
+
+
+def _clave_paginas(tipo, consulta):
+    consulta = hashlib.sha1(consulta.encode()).hexdigest()[:16]
+    return f"whatsapp:paginas:{version()}:{tipo}:{consulta}"
+
+
+def _clave_cursor(telefono):
+    return f"whatsapp:cursor:{hashlib.sha1(telefono.encode()).hexdigest()[:16]}"
+
+
+def paginas(tipo, consulta, armar):
+    """Lista de textos (uno por página); `armar(consulta)` solo corre si no están en cache."""
+    clave = _clave_paginas(tipo, consulta)
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = armar(consulta)
+        cache.set(clave, resultado, 24 * 3600)
+    return resultado
+
+
+def _con_pie(pags, n):
+    if n + 1 < len(pags):
+        pie = f"\n_Página {n + 1}/{len(pags)} · escribí *más* para ver la siguiente._"
+    elif len(pags) > 1:
+        pie = f"\n_Página {n + 1}/{len(pags)} · fin del listado._"
+    else:
+        pie = ""
+    return pags[n] + pie
+
+
+def primera(telefono, tipo, consulta, armar):
+    """Primera página del listado (None si está vacío) y deja el cursor en ella."""
+    pags = paginas(tipo, consulta, armar)
+    if not pags:
+        cache.delete(_clave_cursor(telefono))
+        return None
+    cache.set(
+        _clave_cursor(telefono), {"tipo": tipo, "consulta": consulta, "pagina": 0}, ttl_cursor(),
+    )
+    return _con_pie(pags, 0)
+
+
+def siguiente(telefono, armadores):
+    """
+    Página siguiente del listado abierto por el teléfono, o None si no hay
+    ninguno abierto (o ya se mandó la última). Si el stock cambió en el
+    medio se sigue con las páginas nuevas desde la misma posición.
+    """
+    cursor = cache.get(_clave_cursor(telefono))
+    if not cursor:
+        return None
+    pags = paginas(cursor["tipo"], cursor["consulta"], armadores[cursor["tipo"]])
+    n = cursor["pagina"] + 1
+    if n >= len(pags):
+        cache.delete(_clave_cursor(telefono))
+        return None
+    cursor["pagina"] = n
+    cache.set(_clave_cursor(telefono), cursor, ttl_cursor())
+    return _con_pie(pags, n)
@@ -0,0 +1,21 @@
+"""
+Invalida las páginas cacheadas del bot (`whatsapp_bot.paginas`) cuando
+cambia algún vehículo.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from whatsapp_bot import paginas
+
+
+def _invalidar(sender, **kwargs):
+    paginas.invalidar()
+
+
+def conectar_signals():
+    from vehiculos.models import Vehiculo
+    post_save.connect(
+        _invalidar, sender=Vehiculo, weak=False, dispatch_uid="whatsapp_paginas_save_vehiculo",
+    )
+    post_delete.connect(
+        _invalidar, sender=Vehiculo, weak=False, dispatch_uid="whatsapp_paginas_delete_vehiculo",
+    )
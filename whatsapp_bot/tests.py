@@ -1,3 +1,86 @@
+"""
+Tests de los listados paginados del bot: una página por respuesta, cursor
+por teléfono ("más") y páginas cacheadas hasta que cambia el stock.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from vehiculos.models import Vehiculo
+
+
+def _solo_cache(ctx):
+    """True si todas las queries capturadas fueron al cache compartido."""
+    return all(
+        "cache_compartido" in q["sql"] or q["sql"].startswith(("SAVEPOINT", "RELEASE", "ROLLBACK"))
+        for q in ctx.captured_queries
+    )
+
+
+class ListadoPaginadoTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        cache.clear()
+        self.client.force_login(User.objects.create_user("bot", password="x"))
+        for i in range(20):
+            Vehiculo.objects.create(
+                marca="Ford", modelo=f"Ka {i:02d}", dominio=f"AB{i:03d}", anio=2020,
+                precio=Decimal("1000"), estado="stock",
+            )
+
+    def _mensaje(self, texto, telefono="whatsapp:+5491100000000"):
+        r = self.client.post(reverse("whatsapp_bot:webhook"), {"Body": texto, "From": telefono}, secure=True)
+        self.assertEqual(r.status_code, 200)
+        body = r.content.decode()
+        self.assertEqual(body.count("<Message>"), 1)
+        return body
+
+    def test_una_pagina_por_respuesta_y_cursor_por_telefono(self):
+        primera = self._mensaje("stock")
+        self.assertIn("STOCK ACTUAL (20 unidades)", primera)
+        self.assertIn("Página 1/2", primera)
+        self.assertNotIn("16. FORD", primera)
+
+        # Otro teléfono no comparte el cursor
+        self.assertIn("No hay más resultados", self._mensaje("más", telefono="whatsapp:+1"))
+
+        segunda = self._mensaje("más")
+        self.assertIn("16. FORD KA 15", segunda)
+        self.assertIn("fin del listado", segunda)
+        self.assertIn("No hay más resultados", self._mensaje("más"))
+
+    def test_cursor_visible_desde_otro_worker(self):
+        from django.conf import settings
+        from django.core.cache.backends.db import DatabaseCache
+        from whatsapp_bot import paginas
+
+        self._mensaje("stock")
+        # Otro proceso arma su propio backend a partir de la misma config
+        config = settings.CACHES["default"]
+        otro = DatabaseCache(config["LOCATION"], config)
+        cursor = otro.get(paginas._clave_cursor("whatsapp:+5491100000000"))
+        self.assertEqual((cursor["tipo"], cursor["pagina"]), ("stock", 0))
+
+        antes = paginas.version()
+        otro.incr(paginas._VERSION)  # el stock cambió en ese proceso
+        self.assertEqual(paginas.version(), antes + 1)
+
+    def test_paginas_cacheadas_hasta_que_cambia_el_stock(self):
+        from whatsapp_bot import paginas
+
+        self._mensaje("precios")
+        with CaptureQueriesContext(connection) as ctx:
+            paginas.primera("whatsapp:+1", "precio", "", lambda consulta: self.fail("rearmó"))
+        self.assertTrue(_solo_cache(ctx))
 
-# Create your tests here.
+        Vehiculo.objects.filter(modelo="Ka 00").first().delete()
+        self.assertIn("STOCK ACTUAL (19 unidades)", self._mensaje("stock"))
+        Vehiculo.objects.create(
+            marca="Fiat", modelo="Uno", dominio="ZZ999", anio=2010, precio=Decimal("500"), estado="stock",
+        )
+        self.assertIn("STOCK ACTUAL (20 unidades)", self._mensaje("stock"))
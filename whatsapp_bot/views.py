@@ -8,6 +8,8 @@ from twilio.rest import Client
 
 from vehiculos.models import Vehiculo, FichaVehicular
 from cuentas.models import CuentaCorriente
+from . import paginas
+from clientes import resumen
 from clientes.models import Cliente
 from decimal import Decimal
 import traceback
@@ -41,6 +43,51 @@ def buscar_vehiculos(texto):
     return qs.order_by("marca", "modelo")
 
 
+# ==========================================================
+# PÁGINAS DE LOS LISTADOS (se cachean en `paginas`)
+# ==========================================================
+def _bloques(filas):
+    for inicio in range(0, len(filas), paginas.POR_PAGINA):
+        yield inicio, filas[inicio:inicio + paginas.POR_PAGINA]
+
+
+def _paginas_stock(consulta=""):
+    filas = list(
+        Vehiculo.objects.filter(estado="stock").order_by("marca", "modelo")
+        .values_list("marca", "modelo", "anio", "dominio", "kilometros")
+    )
+    pags = []
+    for inicio, bloque in _bloques(filas):
+        lineas = [f"*STOCK ACTUAL ({len(filas)} unidades)*\n" if inicio == 0 else "*... continuación*\n"]
+        for i, (marca, modelo, anio, dominio, km) in enumerate(bloque, inicio + 1):
+            km_txt = f" - {int(km):,} km".replace(",", ".") if km else ""
+            lineas.append(f"{i}. {marca.upper()} {modelo.upper()} {anio} ({dominio.upper()}){km_txt}")
+        if inicio + paginas.POR_PAGINA >= len(filas):
+            lineas.append("\nEscribí el nombre o modelo para ver fotos.")
+            lineas.append("Escribí *precio* + modelo para ver precios.")
+        pags.append("\n".join(lineas))
+    return pags
+
+
+def _paginas_precio(consulta=""):
+    if consulta:
+        qs = buscar_vehiculos(consulta)
+    else:
+        qs = Vehiculo.objects.filter(estado="stock").order_by("marca", "modelo")
+    filas = list(qs.values_list("marca", "modelo", "anio", "precio"))
+    pags = []
+    for inicio, bloque in _bloques(filas):
+        lineas = ["*PRECIOS*\n"] if inicio == 0 else ["*... continuación*\n"]
+        for marca, modelo, anio, precio in bloque:
+            precio_txt = f"${int(precio):,}".replace(",", ".") if precio else "Consultar"
+            lineas.append(f"- {marca.upper()} {modelo.upper()} {anio} → {precio_txt}")
+        pags.append("\n".join(lineas))
+    return pags
+
+
+ARMADORES = {"stock": _paginas_stock, "precio": _paginas_precio}
+
+
 def formatear_vehiculo(v, mostrar_precio=False):
     """Formatea los datos de un vehículo para WhatsApp."""
     lineas = [
@@ -109,41 +156,19 @@ def webhook(request):
 def _procesar_mensaje(texto, body, from_number, resp):
 
     # ==========================================================
-    # COMANDO: STOCK COMPLETO (paginado para no exceder límite)
+    # COMANDO: MÁS (página siguiente del último listado)
     # ==========================================================
-    if texto in ("stock", "lista", "todos", "listar"):
-        vehiculos = Vehiculo.objects.filter(estado="stock").order_by("marca", "modelo")
-
-        if not vehiculos.exists():
-            resp.message("No hay vehículos en stock en este momento.")
-            return HttpResponse(str(resp), content_type="text/xml")
-
-        lista_vehiculos = list(vehiculos)
-        total = len(lista_vehiculos)
-
-        # Dividir en bloques de 15 para no exceder límite de WhatsApp
-        BLOQUE = 15
-        for inicio in range(0, total, BLOQUE):
-            bloque = lista_vehiculos[inicio:inicio + BLOQUE]
-
-            if inicio == 0:
-                lineas = [f"*STOCK ACTUAL ({total} unidades)*\n"]
-            else:
-                lineas = [f"*... continuación*\n"]
-
-            for i, v in enumerate(bloque, inicio + 1):
-                km_txt = f" - {int(v.kilometros):,} km".replace(",", ".") if v.kilometros else ""
-                lineas.append(
-                    f"{i}. {v.marca.upper()} {v.modelo.upper()} {v.anio} "
-                    f"({v.dominio.upper()}){km_txt}"
-                )
-
-            if inicio + BLOQUE >= total:
-                lineas.append("\nEscribí el nombre o modelo para ver fotos.")
-                lineas.append("Escribí *precio* + modelo para ver precios.")
-
-            resp.message("\n".join(lineas))
+    if texto in ("mas", "más", "siguiente"):
+        pagina = paginas.siguiente(from_number, ARMADORES)
+        resp.message(pagina or "No hay más resultados. Escribí *stock* o *precios* para empezar otro listado.")
+        return HttpResponse(str(resp), content_type="text/xml")
 
+    # ==========================================================
+    # COMANDO: STOCK COMPLETO (una página por respuesta)
+    # ==========================================================
+    if texto in ("stock", "lista", "todos", "listar"):
+        pagina = paginas.primera(from_number, "stock", "", ARMADORES["stock"])
+        resp.message(pagina or "No hay vehículos en stock en este momento.")
         return HttpResponse(str(resp), content_type="text/xml")
 
     # ==========================================================
@@ -151,28 +176,8 @@ def _procesar_mensaje(texto, body, from_number, resp):
     # ==========================================================
     if texto.startswith("precio"):
         consulta = texto.replace("precios", "").replace("precio", "").strip()
-
-        if consulta:
-            vehiculos = buscar_vehiculos(consulta)
-        else:
-            vehiculos = Vehiculo.objects.filter(estado="stock").order_by("marca", "modelo")
-
-        if not vehiculos.exists():
-            resp.message("No encontré vehículos con esa búsqueda.")
-            return HttpResponse(str(resp), content_type="text/xml")
-
-        lista_vehiculos = list(vehiculos)
-        BLOQUE = 15
-        for inicio in range(0, len(lista_vehiculos), BLOQUE):
-            bloque = lista_vehiculos[inicio:inicio + BLOQUE]
-            lineas = ["*PRECIOS*\n"] if inicio == 0 else ["*... continuación*\n"]
-            for v in bloque:
-                precio_txt = f"${int(v.precio):,}".replace(",", ".") if v.precio else "Consultar"
-                lineas.append(
-                    f"- {v.marca.upper()} {v.modelo.upper()} {v.anio} → {precio_txt}"
-                )
-            resp.message("\n".join(lineas))
-
+        pagina = paginas.primera(from_number, "precio", consulta, ARMADORES["precio"])
+        resp.message(pagina or "No encontré vehículos con esa búsqueda.")
         return HttpResponse(str(resp), content_type="text/xml")
 
     # ==========================================================
@@ -182,26 +187,31 @@ def _procesar_mensaje(texto, body, from_number, resp):
         consulta = texto.replace("deuda", "").replace("cuenta", "").strip()
 
         if not consulta:
-            # Mostrar todas las cuentas con deuda
-            cuentas = CuentaCorriente.objects.select_related("cliente", "venta").all()
+            # Mostrar todos los clientes con deuda (resumen 360° cacheado)
+            resumenes = resumen.de_clientes(
+                CuentaCorriente.objects.exclude(estado="cerrada")
+                .values_list("cliente_id", flat=True).distinct()
+            )
+            nombres = dict(
+                Cliente.objects.filter(pk__in=resumenes).values_list("id", "nombre_completo")
+            )
             con_deuda = []
-            for c in cuentas:
-                deuda = c.deuda_total_real
-                if deuda > 0:
-                    vehiculo_txt = ""
-                    if c.venta and c.venta.vehiculo:
-                        v = c.venta.vehiculo
-                        vehiculo_txt = f" ({v.marca} {v.modelo})"
+            for cliente_id in sorted(resumenes, key=lambda pk: nombres.get(pk, "")):
+                r = resumenes[cliente_id]
+                if r["deuda_total"] > 0:
+                    vencido_txt = (
+                        f" (vencido ${int(r['monto_vencido']):,})" if r["monto_vencido"] > 0 else ""
+                    )
                     con_deuda.append(
-                        f"- {c.cliente.nombre_completo}{vehiculo_txt}: "
-                        f"*${int(deuda):,}*".replace(",", ".")
+                        f"- {nombres.get(cliente_id, '')}: "
+                        f"*${int(r['deuda_total']):,}*{vencido_txt}".replace(",", ".")
                     )
 
             if con_deuda:
                 BLOQUE = 15
                 for inicio in range(0, len(con_deuda), BLOQUE):
                     bloque = con_deuda[inicio:inicio + BLOQUE]
-                    header = f"*CUENTAS CON DEUDA ({len(con_deuda)})*\n\n" if inicio == 0 else ""
+                    header = f"*CLIENTES CON DEUDA ({len(con_deuda)})*\n\n" if inicio == 0 else ""
                     resp.message(header + "\n".join(bloque))
             else:
                 resp.message("No hay cuentas con deuda pendiente.")
@@ -218,7 +228,9 @@ def _procesar_mensaje(texto, body, from_number, resp):
             resp.message(f"No encontré cuentas corrientes para *{consulta}*.")
             return HttpResponse(str(resp), content_type="text/xml")
 
-        for cuenta in cuentas[:3]:
+        cuentas = list(cuentas[:3])
+        resumenes = resumen.de_clientes([c.cliente_id for c in cuentas])
+        for cuenta in cuentas:
             deuda = cuenta.deuda_total_real
             plan = getattr(cuenta, "plan_pago", None)
 
@@ -247,6 +259,17 @@ def _procesar_mensaje(texto, body, from_number, resp):
                     )
 
             lineas.append(f"\nDeuda total: *${int(deuda):,}*".replace(",", "."))
+            r = resumenes[cuenta.cliente_id]
+            if r["monto_vencido"] > 0:
+                lineas.append(
+                    f"Vencido: ${int(r['monto_vencido']):,} "
+                    f"({r['cuotas_vencidas']} cuotas)".replace(",", ".")
+                )
+            if r["ultimo_pago"]:
+                lineas.append(
+                    f"Último pago: {r['ultimo_pago']['fecha'].strftime('%d/%m/%Y')} "
+                    f"${int(r['ultimo_pago']['monto']):,}".replace(",", ".")
+                )
             resp.message("\n".join(lineas))
 
         return HttpResponse(str(resp), content_type="text/xml")
@@ -422,7 +445,8 @@ def _procesar_mensaje(texto, body, from_number, resp):
             "Comandos disponibles:\n\n"
             "*stock* → ver todas las unidades\n"
             "*precio amarok* → precio de un modelo\n"
-            "*precios* → ver todos los precios\n\n"
+            "*precios* → ver todos los precios\n"
+            "*más* → siguiente página del listado\n\n"
             "*datos ford ka 2013* → datos del vehículo + foto de portada\n"
             "*fotos ford ka 2013* → todas las fotos\n\n"
             "*deuda* → cuentas con deuda\n"